@@ -20,8 +20,7 @@ from pydantic import BaseModel, Field
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(__file__))
 
-# Import config
-from config import settings as app_settings
+from core.session_refresh import refresh_session_cookie
 
 # Import routers
 from routers import auth, user, user_counter, audit_logs, user_data, interview, health, status, sessions, contact, tax_filing, insights
@@ -30,6 +29,12 @@ from routers.swisstax import subscription_new as subscription
 from services.document_service import DocumentService
 from services.tax_calculation_service import TaxCalculationService
 from services.background_jobs import start_background_jobs, stop_background_jobs
+from services.session_activity_tracker import get_session_activity_tracker
+from services.canton_tax_calculators import warm_up_canton_calculators
+from services.wealth_tax_calculators import warm_up_wealth_tax_calculators
+from services.municipality_index import get_municipality_index
+from services.church_tax_rate_table import get_church_tax_rate_table
+from models.question import get_question_graph
 from utils.validators import validate_session_id, validate_tax_year
 
 # Try to import connection pool for App Runner, fallback to regular connection
@@ -61,6 +66,33 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("Database connection successful")
 
+    # Build the shared canton and wealth tax calculators before the first request
+    try:
+        canton_count = warm_up_canton_calculators([tax_service.tax_year])
+        wealth_count = warm_up_wealth_tax_calculators([tax_service.tax_year])
+        logger.info(f"Tax calculators warmed up ({canton_count} canton, {wealth_count} wealth)")
+    except Exception as e:
+        logger.error(f"Failed to warm up tax calculators: {e}", exc_info=True)
+
+    # Load municipal tax multipliers and church tax rates so calculations don't query them per request
+    municipality_index = get_municipality_index(tax_service.tax_year)
+    if municipality_index is None:
+        logger.error("Municipality index could not be loaded, will retry on first use")
+    else:
+        logger.info(f"Municipality index loaded ({len(municipality_index)} municipalities)")
+
+    if get_church_tax_rate_table(tax_service.church_tax_service.tax_year) is None:
+        logger.error("Church tax rates could not be loaded, will retry on first use")
+    else:
+        logger.info("Church tax rates loaded")
+
+    # Compile the interview question graph so requests never parse questions.yaml
+    try:
+        question_graph = get_question_graph()
+        logger.info(f"Interview questions loaded ({len(question_graph.questions)} questions)")
+    except Exception as e:
+        logger.error(f"Failed to load interview questions: {e}", exc_info=True)
+
     # Start background jobs for account deletions and exports cleanup
     try:
         start_background_jobs()
@@ -80,6 +112,12 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error stopping background jobs: {e}", exc_info=True)
 
+    # Write session last_active timestamps still buffered in memory
+    try:
+        get_session_activity_tracker().stop()
+    except Exception as e:
+        logger.error(f"Error flushing session activity: {e}", exc_info=True)
+
 # Create FastAPI app
 app = FastAPI(
     title="SwissAI Tax API",
@@ -160,46 +198,17 @@ async def security_headers_middleware(request: Request, call_next):
 @app.middleware("http")
 async def sliding_session_middleware(request: Request, call_next):
     """
-    Middleware that refreshes JWT token on each authenticated request
+    Middleware that refreshes JWT token on authenticated requests
     This creates a sliding window session - as long as user is active,
-    their session stays alive for 6 hours from last activity
+    their session stays alive for 6 hours from last activity.
+    See core.session_refresh for when a token is actually re-signed.
     """
-    from core.security import create_access_token, get_cookie_settings_for_request
-    from jose import jwt
-
     response = await call_next(request)
 
-    # Check if user has a valid token
-    access_token = request.cookies.get("access_token")
-    if access_token:
-        try:
-            # Remove "Bearer " prefix if present for decoding
-            token = access_token.replace("Bearer ", "")
-
-            # Decode token to get user info
-            payload = jwt.decode(token, app_settings.SECRET_KEY, algorithms=["HS256"])
-            email = payload.get("email")
-            user_type = payload.get("user_type")
-            session_id = payload.get("session_id")
-
-            if email:
-                # Create a new token with refreshed expiry (keep session_id)
-                new_token = create_access_token(email, user_type, session_id)
-
-                # Get appropriate cookie settings for this request (localhost vs production)
-                cookie_settings = get_cookie_settings_for_request(request)
-
-                # Set new cookie with refreshed expiry
-                response.set_cookie(
-                    key="access_token",
-                    value=f"Bearer {new_token}",
-                    **cookie_settings
-                )
-                logger.debug(f"Refreshed session for user: {email}")
-        except Exception as e:
-            # Token invalid or expired - let it expire naturally
-            logger.debug(f"Could not refresh token: {e}")
-            pass
+    try:
+        refresh_session_cookie(request, response)
+    except Exception as e:
+        logger.debug(f"Could not refresh token: {e}")
 
     return response
 
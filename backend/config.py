@@ -45,6 +45,8 @@ class Settings(BaseSettings):
     # No default value to prevent using weak secrets in production
     SECRET_KEY: str | None = Field(default=None)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(360)  # 6 hours sliding window
+    # Re-sign the session cookie only once this fraction of the token lifetime has passed
+    SESSION_REFRESH_AFTER_FRACTION: float = Field(0.1)
 
     # Database settings
     # SECURITY: All database credentials must be loaded from Parameter Store (/swissai/db/*)
@@ -75,6 +75,41 @@ def create_access_token(email: str, user_type: str = None, session_id: str = Non
     return jwt.encode(payload, settings.SECRET_KEY, algorithm=ALGORITHM)
 
 
+def decode_access_token(request: Request, token: str) -> dict:
+    """
+    Decode and verify a JWT, at most once per request.
+
+    Authentication, session tracking and the sliding session middleware all
+    need the same claims; the result (or the failure) is kept on
+    request.state so the signature is only verified once.
+
+    Args:
+        request: FastAPI Request object
+        token: JWT without the "Bearer " prefix
+
+    Returns:
+        Token claims
+
+    Raises:
+        JWTError: If the token is invalid or expired
+    """
+    claims_by_token = getattr(request.state, "token_claims", None)
+    if claims_by_token is None:
+        claims_by_token = {}
+        request.state.token_claims = claims_by_token
+
+    if token not in claims_by_token:
+        try:
+            claims_by_token[token] = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError as e:
+            claims_by_token[token] = e
+
+    claims = claims_by_token[token]
+    if isinstance(claims, JWTError):
+        raise claims
+    return claims
+
+
 async def get_current_user_from_cookie(
     request: Request,
     access_token: str = Cookie(None, alias="access_token")
@@ -93,19 +128,26 @@ async def get_current_user_from_cookie(
     token = access_token.replace("Bearer ", "")
 
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(request, token)
         email: str = payload.get("email")
 
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
 
+        from services.user_principal_cache import get_user_principal_cache
+
+        # Known inactive users are rejected without a database round trip
+        principal = get_user_principal_cache().get(email)
+        if principal is not None and not principal.is_active:
+            raise HTTPException(status_code=401, detail="Inactive user")
+
         # Get user from database
         from db.session import get_db
-        from services.user_service import get_user_by_email
+        from services.user_service import get_user_for_subject
 
         db = next(get_db())
         try:
-            user = get_user_by_email(db, email)
+            user = get_user_for_subject(db, email)
 
             if user is None:
                 raise HTTPException(status_code=401, detail="User not found")
@@ -146,11 +188,11 @@ async def get_current_user_from_header(
                 email = handler.payload.get("email")
 
                 from db.session import get_db
-                from services.user_service import get_user_by_email
+                from services.user_service import get_user_for_subject
 
                 db = next(get_db())
                 try:
-                    user = get_user_by_email(db, email)
+                    user = get_user_for_subject(db, email)
 
                     if user and user.is_active:
                         return user
@@ -186,7 +228,7 @@ def get_session_id_from_request(request: Request) -> str:
         token = access_token.replace("Bearer ", "")
 
         try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+            payload = decode_access_token(request, token)
             return payload.get("session_id")
         except JWTError:
             return None
@@ -194,43 +236,51 @@ def get_session_id_from_request(request: Request) -> str:
     return None
 
 
-async def get_current_user(request: Request):
+def _track_session_activity(request: Request) -> None:
     """
-    Main authentication method that tries both cookie and header.
-    This allows gradual migration from header-based to cookie-based auth.
+    Best-effort session validation and activity tracking for an authenticated request.
+
+    Session validity comes from the session activity tracker's short-lived
+    cache and last_active is written behind in batches, so a request
+    normally costs no database round trip here. Auth never fails because
+    of session tracking.
     """
     import logging
     logger = logging.getLogger(__name__)
 
+    session_id = get_session_id_from_request(request)
+    if not session_id:
+        return
+
+    from services.session_activity_tracker import (INVALID, VALID,
+                                                   get_session_activity_tracker)
+
+    try:
+        tracker = get_session_activity_tracker()
+        state = tracker.check(session_id)
+        if state == VALID:
+            tracker.touch(session_id)
+        elif state == INVALID:
+            logger.warning(f"Session {session_id} validation failed - session may be expired or revoked")
+        # If session doesn't exist, that's okay - might be a legacy login
+        # The session will be created on next login
+    except Exception as e:
+        # Log but don't fail auth - session tracking is secondary to authentication
+        logger.warning(f"Session validation skipped due to error: {e}", exc_info=True)
+
+
+async def get_current_user(request: Request):
+    """
+    Main authentication method that tries both cookie and header.
+    This allows gradual migration from header-based to cookie-based auth.
+    """
     # Try cookie first (new method)
     access_token = request.cookies.get("access_token")
 
     if access_token:
         try:
             user = await get_current_user_from_cookie(request, access_token)
-
-            # Optionally validate and update session if session_id is present
-            # This is best-effort - we don't fail auth if session validation fails
-            session_id = get_session_id_from_request(request)
-            if session_id:
-                from services.session_service import session_service
-                from db.session import get_db
-                db = next(get_db())
-                try:
-                    session_exists = session_service.get_session_by_id(db, session_id)
-                    if session_exists:
-                        # Session exists, validate and update it
-                        is_valid = session_service.validate_session(db, session_id)
-                        if not is_valid:
-                            logger.warning(f"Session {session_id} validation failed - session may be expired or revoked")
-                    # If session doesn't exist, that's okay - might be a legacy login
-                    # The session will be created on next login
-                except Exception as e:
-                    # Log but don't fail auth - session tracking is secondary to authentication
-                    logger.warning(f"Session validation skipped due to error: {e}", exc_info=True)
-                finally:
-                    db.close()
-
+            _track_session_activity(request)
             return user
         except HTTPException:
             pass  # Fall through to header auth
@@ -238,24 +288,7 @@ async def get_current_user(request: Request):
     # Fall back to header auth (legacy method)
     try:
         user = await get_current_user_from_header(request)
-
-        # Optionally validate and update session if session_id is present
-        session_id = get_session_id_from_request(request)
-        if session_id:
-            from services.session_service import session_service
-            from db.session import get_db
-            db = next(get_db())
-            try:
-                session_exists = session_service.get_session_by_id(db, session_id)
-                if session_exists:
-                    is_valid = session_service.validate_session(db, session_id)
-                    if not is_valid:
-                        logger.warning(f"Session {session_id} validation failed - session may be expired or revoked")
-            except Exception as e:
-                logger.warning(f"Session validation skipped due to error: {e}", exc_info=True)
-            finally:
-                db.close()
-
+        _track_session_activity(request)
         return user
     except HTTPException:
         raise HTTPException(
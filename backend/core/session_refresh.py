@@ -0,0 +1,155 @@
+"""
+Sliding session refresh policy
+
+The access token cookie is re-issued so that an active user's session
+stays alive for ACCESS_TOKEN_EXPIRE_MINUTES from their last activity.
+Signing a new token on every response is wasted work for requests made
+shortly after the last refresh, so a token is only re-signed once
+SESSION_REFRESH_AFTER_FRACTION of its lifetime has passed (with the
+6 hour default and 0.1, at most every 36 minutes). Health checks, docs
+and polling endpoints never refresh the session.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Path prefixes that never refresh the session
+SESSION_REFRESH_EXCLUDED_PREFIXES = tuple(
+    prefix.strip()
+    for prefix in os.getenv(
+        'SESSION_REFRESH_EXCLUDED_PATHS',
+        '/health,/api/health,/api/status,/api/docs,/api/redoc,/openapi.json,/static,/favicon.ico'
+    ).split(',')
+    if prefix.strip()
+)
+
+# Polling endpoints, called every few seconds while the user waits
+SESSION_REFRESH_EXCLUDED_PATTERNS = (
+    re.compile(r'^/api/documents/[^/]+/status$'),
+)
+
+_metrics_lock = threading.Lock()
+_metrics = {
+    'refreshed': 0,
+    'skipped_fresh': 0,
+    'skipped_excluded_path': 0,
+    'skipped_invalid_token': 0,
+}
+
+
+def _count(name: str) -> None:
+    with _metrics_lock:
+        _metrics[name] += 1
+
+
+def is_refresh_excluded(path: str) -> bool:
+    """
+    Check whether requests to a path leave the session as it is.
+
+    Args:
+        path: Request path
+
+    Returns:
+        True if the session must not be refreshed for this path
+    """
+    if path.startswith(SESSION_REFRESH_EXCLUDED_PREFIXES):
+        return True
+    return any(pattern.match(path) for pattern in SESSION_REFRESH_EXCLUDED_PATTERNS)
+
+
+def needs_refresh(claims: Dict, now: Optional[float] = None) -> bool:
+    """
+    Check whether a token has used up enough of its lifetime to be re-signed.
+
+    Args:
+        claims: Decoded token claims
+        now: Current Unix time (defaults to time.time())
+
+    Returns:
+        True if a new token should be issued
+    """
+    exp = claims.get('exp')
+    if exp is None:
+        return True
+
+    lifetime = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    remaining = float(exp) - (time.time() if now is None else now)
+    return lifetime - remaining >= lifetime * settings.SESSION_REFRESH_AFTER_FRACTION
+
+
+def refresh_session_cookie(request, response) -> bool:
+    """
+    Re-issue the access token cookie if the policy asks for it.
+
+    Args:
+        request: FastAPI Request object
+        response: Response the new cookie is set on
+
+    Returns:
+        True if a new token was issued
+    """
+    access_token = request.cookies.get('access_token')
+    if not access_token:
+        return False
+
+    # Login, logout and token endpoints set or clear the cookie themselves
+    if any(header.startswith('access_token=') for header in response.headers.getlist('set-cookie')):
+        return False
+
+    if is_refresh_excluded(request.url.path):
+        _count('skipped_excluded_path')
+        return False
+
+    from jose import JWTError
+
+    from core.security import create_access_token, decode_access_token, get_cookie_settings_for_request
+
+    try:
+        claims = decode_access_token(request, access_token.replace('Bearer ', ''))
+    except JWTError as e:
+        # Token invalid or expired - let it expire naturally
+        logger.debug(f"Could not refresh token: {e}")
+        _count('skipped_invalid_token')
+        return False
+
+    email = claims.get('email')
+    if not email:
+        _count('skipped_invalid_token')
+        return False
+
+    if not needs_refresh(claims):
+        _count('skipped_fresh')
+        return False
+
+    # Create a new token with refreshed expiry (keep session_id)
+    new_token = create_access_token(email, claims.get('user_type'), claims.get('session_id'))
+    response.set_cookie(
+        key='access_token',
+        value=f"Bearer {new_token}",
+        **get_cookie_settings_for_request(request)
+    )
+    _count('refreshed')
+    logger.debug(f"Refreshed session for user: {email}")
+    return True
+
+
+def get_session_refresh_metrics() -> Dict[str, int]:
+    """
+    Get counters of issued and avoided session refreshes.
+
+    Returns:
+        Dictionary with refresh and skip counts
+    """
+    with _metrics_lock:
+        metrics = dict(_metrics)
+
+    # Responses that would have carried a freshly signed token before
+    metrics['avoided'] = metrics['skipped_fresh'] + metrics['skipped_excluded_path']
+    return metrics
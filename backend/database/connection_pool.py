@@ -1,29 +1,58 @@
 """
 Database connection pool module for App Runner
 Uses connection pooling for persistent connections
+
+Connections are checked before reuse (closed connections are dropped,
+idle ones are pinged), every session gets a default statement timeout,
+and checkout counts and wait times are available via get_pool_metrics().
 """
 
 import logging
 import os
+import threading
+import time
 from contextlib import contextmanager
 from typing import Any, Dict, Optional
 
 import boto3
 import psycopg2
+import psycopg2.errors
 from psycopg2 import pool as pg_pool
 from psycopg2.extras import RealDictCursor
 from sqlalchemy import create_engine, pool
 from sqlalchemy.orm import sessionmaker
 
+from utils.shared_state import Lazy
+
 logger = logging.getLogger(__name__)
 
 # Initialize SSM client
 ssm = boto3.client('ssm', region_name='us-east-1')
 
+# Pool sizing and timeouts
+POOL_MIN_CONNECTIONS = int(os.getenv('DATABASE_POOL_MIN', 2))
+POOL_MAX_CONNECTIONS = int(os.getenv('DATABASE_POOL_MAX', 20))
+POOL_CHECKOUT_TIMEOUT_SECONDS = float(os.getenv('DATABASE_POOL_TIMEOUT', 10))
+STATEMENT_TIMEOUT_MS = int(os.getenv('DATABASE_STATEMENT_TIMEOUT_MS', 30000))
+# Connections idle longer than this are pinged before reuse
+POOL_PING_AFTER_IDLE_SECONDS = 30
+
 # Cache for parameters
 _param_cache = {}
-_connection_pool = None
 _engine = None
+_last_used: Dict[int, float] = {}
+
+_metrics_lock = threading.Lock()
+_metrics: Dict[str, float] = {
+    'checkouts': 0,
+    'in_use': 0,
+    'checkout_timeouts': 0,
+    'discarded_connections': 0,
+    'failed_pings': 0,
+    'statement_timeouts': 0,
+    'total_wait_ms': 0.0,
+    'max_wait_ms': 0.0,
+}
 
 def get_parameter(name: str, decrypt: bool = False) -> str:
     """Get parameter from AWS Parameter Store with caching"""
@@ -33,9 +62,7 @@ def get_parameter(name: str, decrypt: bool = False) -> str:
             _param_cache[name] = response['Parameter']['Value']
         except Exception as e:
             logger.error(f"Error fetching parameter {name}: {e}")
-            # Fallback to environment variables for local development
-            env_name = name.replace('/swissai-tax/', '').replace('/', '_').upper()
-            return os.environ.get(env_name, '')
+            raise
     return _param_cache[name]
 
 def get_db_config() -> Dict[str, Any]:
@@ -44,46 +71,123 @@ def get_db_config() -> Dict[str, Any]:
     if os.getenv('DATABASE_HOST'):
         return {
             'host': os.getenv('DATABASE_HOST'),
-            'port': int(os.getenv('DATABASE_PORT', 5432)),
+            'port': int(os.getenv('DATABASE_PORT', '5432')),
             'database': os.getenv('DATABASE_NAME', 'swissai_tax'),
-            'user': os.getenv('DATABASE_USER', 'webscrapinguser'),
+            'user': os.getenv('DATABASE_USER', 'postgres'),
             'password': os.getenv('DATABASE_PASSWORD', ''),
             'options': f"-csearch_path={os.getenv('DATABASE_SCHEMA', 'public')}"
         }
 
     # Fall back to Parameter Store
     return {
-        'host': get_parameter('/swissai-tax/db/host') or 'localhost',
+        'host': get_parameter('/swissai-tax/db/host'),
         'port': int(get_parameter('/swissai-tax/db/port') or '5432'),
-        'database': get_parameter('/swissai-tax/db/database') or 'swissai_tax_db',
-        'user': get_parameter('/swissai-tax/db/username') or 'webscrapinguser',
+        'database': get_parameter('/swissai-tax/db/database'),
+        'user': get_parameter('/swissai-tax/db/username'),
         'password': get_parameter('/swissai-tax/db/password', decrypt=True),
         'options': f"-csearch_path={get_parameter('/swissai-tax/db/schema') or 'swisstax'}"
     }
 
+def _create_pool():
+    """Create the connection pool and the semaphore callers queue on"""
+    config = get_db_config()
+    try:
+        connection_pool = pg_pool.ThreadedConnectionPool(
+            minconn=POOL_MIN_CONNECTIONS,
+            maxconn=POOL_MAX_CONNECTIONS,
+            host=config['host'],
+            port=config['port'],
+            database=config['database'],
+            user=config['user'],
+            password=config['password'],
+            options=f"{config['options']} -c statement_timeout={STATEMENT_TIMEOUT_MS}"
+        )
+    except Exception as e:
+        logger.error(f"Failed to create connection pool: {e}")
+        raise
+
+    # getconn() fails instead of waiting when all connections are
+    # in use, so callers queue on this semaphore first
+    slots = threading.BoundedSemaphore(POOL_MAX_CONNECTIONS)
+    logger.info("Database connection pool created successfully")
+    return connection_pool, slots
+
+# Pool and semaphore are created together, so no caller sees one without the other
+_pool = Lazy(_create_pool)
+
 def get_connection_pool():
     """Get or create connection pool"""
-    global _connection_pool
+    return _pool.get()[0]
 
-    if _connection_pool is None:
-        config = get_db_config()
-        try:
-            _connection_pool = pg_pool.ThreadedConnectionPool(
-                minconn=2,
-                maxconn=20,
-                host=config['host'],
-                port=config['port'],
-                database=config['database'],
-                user=config['user'],
-                password=config['password'],
-                options=config['options']
-            )
-            logger.info("Database connection pool created successfully")
-        except Exception as e:
-            logger.error(f"Failed to create connection pool: {e}")
-            raise
+def _record(metric: str, amount: float = 1) -> None:
+    """Increment a pool metric"""
+    with _metrics_lock:
+        _metrics[metric] += amount
 
-    return _connection_pool
+def _discard_connection(connection_pool, conn) -> None:
+    """Close a broken connection instead of returning it to the pool"""
+    _last_used.pop(id(conn), None)
+    _record('discarded_connections')
+    try:
+        connection_pool.putconn(conn, close=True)
+    except Exception as e:
+        logger.warning(f"Failed to discard database connection: {e}")
+
+def _is_healthy(conn) -> bool:
+    """Check a pooled connection before handing it out"""
+    if conn.closed:
+        return False
+
+    # Only ping connections that sat idle long enough for the server or a
+    # load balancer to have dropped them
+    idle_since = _last_used.get(id(conn))
+    if idle_since is not None and time.monotonic() - idle_since < POOL_PING_AFTER_IDLE_SECONDS:
+        return True
+
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except Exception as e:
+        logger.warning(f"Discarding unhealthy database connection: {e}")
+        _record('failed_pings')
+        return False
+
+def _checkout(connection_pool):
+    """Take a healthy connection from the pool"""
+    for _ in range(POOL_MAX_CONNECTIONS + 1):
+        conn = connection_pool.getconn()
+        if _is_healthy(conn):
+            return conn
+        _discard_connection(connection_pool, conn)
+
+    raise pg_pool.PoolError("Could not obtain a healthy database connection")
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """
+    Get connection pool usage metrics.
+
+    Returns:
+        Dictionary with pool sizing, checkout counts and wait times
+    """
+    with _metrics_lock:
+        metrics = dict(_metrics)
+
+    checkouts = metrics['checkouts']
+    return {
+        'pool_created': _pool.peek() is not None,
+        'min_connections': POOL_MIN_CONNECTIONS,
+        'max_connections': POOL_MAX_CONNECTIONS,
+        'in_use': metrics['in_use'],
+        'checkouts': checkouts,
+        'checkout_timeouts': metrics['checkout_timeouts'],
+        'discarded_connections': metrics['discarded_connections'],
+        'failed_pings': metrics['failed_pings'],
+        'statement_timeouts': metrics['statement_timeouts'],
+        'avg_wait_ms': round(metrics['total_wait_ms'] / checkouts, 3) if checkouts else 0.0,
+        'max_wait_ms': round(metrics['max_wait_ms'], 3),
+    }
 
 def get_sqlalchemy_engine():
     """Get SQLAlchemy engine with connection pooling"""
@@ -112,26 +216,61 @@ def get_sqlalchemy_engine():
 @contextmanager
 def get_db_connection():
     """Get a connection from the pool"""
-    pool = get_connection_pool()
+    connection_pool, slots = _pool.get()
+
+    wait_start = time.monotonic()
+    if not slots.acquire(timeout=POOL_CHECKOUT_TIMEOUT_SECONDS):
+        _record('checkout_timeouts')
+        raise pg_pool.PoolError(
+            f"No database connection available within {POOL_CHECKOUT_TIMEOUT_SECONDS}s"
+        )
+
     conn = None
+    discard = False
     try:
-        conn = pool.getconn()
+        conn = _checkout(connection_pool)
+        wait_ms = (time.monotonic() - wait_start) * 1000
+        with _metrics_lock:
+            _metrics['checkouts'] += 1
+            _metrics['in_use'] += 1
+            _metrics['total_wait_ms'] += wait_ms
+            _metrics['max_wait_ms'] = max(_metrics['max_wait_ms'], wait_ms)
         yield conn
     except Exception as e:
+        if isinstance(e, psycopg2.errors.QueryCanceled):
+            _record('statement_timeouts')
         if conn:
-            conn.rollback()
+            discard = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
         raise e
     finally:
         if conn:
-            pool.putconn(conn)
+            _record('in_use', -1)
+            if discard or conn.closed:
+                _discard_connection(connection_pool, conn)
+            else:
+                _last_used[id(conn)] = time.monotonic()
+                connection_pool.putconn(conn)
+        slots.release()
 
 @contextmanager
-def get_db_cursor(dict_cursor: bool = True):
-    """Get a cursor from pooled connection"""
+def get_db_cursor(dict_cursor: bool = True, timeout_ms: Optional[int] = None):
+    """
+    Get a cursor from pooled connection.
+
+    Args:
+        dict_cursor: Return rows as dictionaries
+        timeout_ms: Statement timeout for this transaction, overriding the pool default
+    """
     with get_db_connection() as conn:
         cursor_factory = RealDictCursor if dict_cursor else None
         cursor = conn.cursor(cursor_factory=cursor_factory)
         try:
+            if timeout_ms is not None:
+                cursor.execute("SET LOCAL statement_timeout = %s", (int(timeout_ms),))
             yield cursor
             conn.commit()
         except Exception as e:
@@ -140,31 +279,34 @@ def get_db_cursor(dict_cursor: bool = True):
         finally:
             cursor.close()
 
-def execute_query(query: str, params: Optional[tuple] = None, fetch: bool = True) -> Any:
+def execute_query(query: str, params: Optional[tuple] = None, fetch: bool = True,
+                  timeout_ms: Optional[int] = None) -> Any:
     """Execute a database query using connection pool"""
-    with get_db_cursor() as cursor:
+    with get_db_cursor(timeout_ms=timeout_ms) as cursor:
         cursor.execute(query, params)
         if fetch:
             return cursor.fetchall()
         return cursor.rowcount
 
-def execute_one(query: str, params: Optional[tuple] = None) -> Optional[Dict]:
+def execute_one(query: str, params: Optional[tuple] = None,
+                timeout_ms: Optional[int] = None) -> Optional[Dict]:
     """Execute query and return single result"""
-    with get_db_cursor() as cursor:
+    with get_db_cursor(timeout_ms=timeout_ms) as cursor:
         cursor.execute(query, params)
         return cursor.fetchone()
 
-def execute_insert(query: str, params: Optional[tuple] = None, returning: bool = True) -> Any:
+def execute_insert(query: str, params: Optional[tuple] = None, returning: bool = True,
+                   timeout_ms: Optional[int] = None) -> Any:
     """Execute insert query"""
-    with get_db_cursor() as cursor:
+    with get_db_cursor(timeout_ms=timeout_ms) as cursor:
         cursor.execute(query, params)
         if returning:
             return cursor.fetchone()
         return cursor.rowcount
 
-def execute_batch(query: str, params_list: list) -> int:
+def execute_batch(query: str, params_list: list, timeout_ms: Optional[int] = None) -> int:
     """Execute batch of queries"""
-    with get_db_cursor() as cursor:
+    with get_db_cursor(timeout_ms=timeout_ms) as cursor:
         cursor.executemany(query, params_list)
         return cursor.rowcount
 
@@ -179,11 +321,12 @@ def check_db_health() -> bool:
 
 def close_connection_pool():
     """Close all connections in the pool"""
-    global _connection_pool, _engine
+    global _engine
 
-    if _connection_pool:
-        _connection_pool.closeall()
-        _connection_pool = None
+    pool_state = _pool.reset()
+    if pool_state:
+        pool_state[0].closeall()
+        _last_used.clear()
         logger.info("Connection pool closed")
 
     if _engine:
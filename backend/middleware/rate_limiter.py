@@ -1,32 +1,34 @@
 """Rate limiting middleware for AI endpoints"""
 
-from typing import Dict, Optional
-from datetime import datetime, timedelta
-from collections import defaultdict
-import asyncio
 from fastapi import HTTPException, Request, status
 from fastapi.responses import JSONResponse
 
+from utils.rate_limiter import RateLimitPolicy, get_rate_limiter
+
+
 class RateLimiter:
-    """Simple in-memory rate limiter for AI endpoints"""
+    """Rate limiter for AI endpoints, backed by the shared sliding-window limiter"""
 
     def __init__(
         self,
         requests_per_minute: int = 10,
         requests_per_hour: int = 100,
-        ai_extraction_limit: int = 5  # Expensive AI operations
+        ai_extraction_limit: int = 5,  # Expensive AI operations
+        limiter=None
     ):
         self.requests_per_minute = requests_per_minute
         self.requests_per_hour = requests_per_hour
         self.ai_extraction_limit = ai_extraction_limit
+        self._limiter = limiter
 
-        # Store request counts by user ID
-        self.minute_counts: Dict[str, list] = defaultdict(list)
-        self.hour_counts: Dict[str, list] = defaultdict(list)
-        self.ai_counts: Dict[str, list] = defaultdict(list)
+        self.minute_policy = RateLimitPolicy('ai_minute', requests_per_minute, 60)
+        self.hour_policy = RateLimitPolicy('ai_hour', requests_per_hour, 3600)
+        self.extraction_policy = RateLimitPolicy('ai_extraction_hour', ai_extraction_limit, 3600)
 
-        # Cleanup old entries periodically
-        self._cleanup_task = None
+    @property
+    def limiter(self):
+        # Resolved lazily so the backend is chosen on first use, not at import
+        return self._limiter if self._limiter is not None else get_rate_limiter()
 
     async def check_rate_limit(
         self,
@@ -35,99 +37,27 @@ class RateLimiter:
     ) -> bool:
         """Check if request is within rate limits"""
 
-        now = datetime.utcnow()
-
-        # Clean old entries
-        self._cleanup_old_entries(user_id, now)
-
-        # Check minute limit
-        minute_ago = now - timedelta(minutes=1)
-        self.minute_counts[user_id] = [
-            ts for ts in self.minute_counts[user_id]
-            if ts > minute_ago
-        ]
-
-        if len(self.minute_counts[user_id]) >= self.requests_per_minute:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded. Please wait before making more requests."
-            )
-
-        # Check hour limit
-        hour_ago = now - timedelta(hours=1)
-        self.hour_counts[user_id] = [
-            ts for ts in self.hour_counts[user_id]
-            if ts > hour_ago
-        ]
-
-        if len(self.hour_counts[user_id]) >= self.requests_per_hour:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Hourly rate limit exceeded. Please try again later."
-            )
-
-        # Check AI extraction limit for expensive operations
+        # Expensive operations count against the AI extraction limit too
+        policies = [self.minute_policy, self.hour_policy]
         if "extract" in endpoint or "generate-pdf" in endpoint:
-            self.ai_counts[user_id] = [
-                ts for ts in self.ai_counts[user_id]
-                if ts > hour_ago
-            ]
-
-            if len(self.ai_counts[user_id]) >= self.ai_extraction_limit:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="AI processing limit reached. Please wait an hour before processing more documents."
-                )
-
-            self.ai_counts[user_id].append(now)
-
-        # Record this request
-        self.minute_counts[user_id].append(now)
-        self.hour_counts[user_id].append(now)
-
-        return True
-
-    def _cleanup_old_entries(self, user_id: str, now: datetime):
-        """Remove old entries to prevent memory bloat"""
-
-        minute_ago = now - timedelta(minutes=1)
-        hour_ago = now - timedelta(hours=1)
-
-        # Clean minute counts
-        self.minute_counts[user_id] = [
-            ts for ts in self.minute_counts[user_id]
-            if ts > minute_ago
-        ]
-
-        # Clean hour counts
-        self.hour_counts[user_id] = [
-            ts for ts in self.hour_counts[user_id]
-            if ts > hour_ago
-        ]
-
-        # Clean AI counts
-        self.ai_counts[user_id] = [
-            ts for ts in self.ai_counts[user_id]
-            if ts > hour_ago
-        ]
-
-    async def cleanup_loop(self):
-        """Periodic cleanup of old entries"""
-        while True:
-            await asyncio.sleep(300)  # Run every 5 minutes
-
-            now = datetime.utcnow()
-            hour_ago = now - timedelta(hours=1)
-
-            # Remove users with no recent activity
-            for counts_dict in [self.minute_counts, self.hour_counts, self.ai_counts]:
-                users_to_remove = []
-                for user_id, timestamps in counts_dict.items():
-                    if not timestamps or all(ts < hour_ago for ts in timestamps):
-                        users_to_remove.append(user_id)
-
-                for user_id in users_to_remove:
-                    del counts_dict[user_id]
+            policies.append(self.extraction_policy)
+
+        result = await self.limiter.check_async(user_id, policies)
+        if result.allowed:
+            return True
+
+        if result.policy == self.minute_policy.name:
+            detail = "Rate limit exceeded. Please wait before making more requests."
+        elif result.policy == self.hour_policy.name:
+            detail = "Hourly rate limit exceeded. Please try again later."
+        else:
+            detail = "AI processing limit reached. Please wait an hour before processing more documents."
+
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(result.retry_after)}
+        )
 
 
 # Global rate limiter instance
@@ -155,7 +85,8 @@ async def rate_limit_middleware(request: Request, call_next):
     except HTTPException as e:
         return JSONResponse(
             status_code=e.status_code,
-            content={"detail": e.detail}
+            content={"detail": e.detail},
+            headers=e.headers
         )
 
     # Process request
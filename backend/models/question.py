@@ -1,11 +1,25 @@
 """Question model and loader for interview system"""
 
+import hashlib
+import logging
 import os
+import threading
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
 import yaml
 
+from models.rule_condition import ConditionSyntaxError, compile_condition
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUESTIONS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    'config',
+    'questions.yaml'
+)
+
 
 class QuestionType(Enum):
     TEXT = "text"
@@ -154,26 +168,150 @@ class Question:
 
         return True, ""
 
+def _as_question_ids(target: Any) -> Tuple[str, ...]:
+    """Normalize a branching target (id, list of ids or None) to a tuple of ids"""
+    if not target:
+        return ()
+    if isinstance(target, list):
+        return tuple(target)
+    return (target,)
+
+
+def _never(answers: Dict[str, Any]) -> bool:
+    """Condition of a rule whose condition could not be parsed"""
+    return False
+
+
+class QuestionGraph:
+    """
+    Compiled question configuration, shared by all QuestionLoaders.
+
+    Built once per version of questions.yaml and treated as read-only:
+    questions and document rules are exposed as read-only mappings, and the
+    branching of every question is precompiled into a lookup table.
+    """
+
+    def __init__(self, config: Dict[str, Any], digest: str = ''):
+        self.config = config
+        self.digest = digest
+
+        questions = {}
+        for q_id, q_data in config['questions'].items():
+            q_data['id'] = q_id
+            questions[q_id] = Question(q_data)
+        self.questions: Mapping[str, Question] = MappingProxyType(questions)
+        self.document_rules: Mapping[str, Any] = MappingProxyType(config.get('document_rules') or {})
+
+        # Rule conditions are parsed once; rules_by_question indexes them by the answers they read
+        self.rule_conditions: Dict[str, Callable[[Dict[str, Any]], bool]] = {}
+        self.rules_by_question: Dict[str, Tuple[str, ...]] = {}
+        for rule_id, rule in self.document_rules.items():
+            try:
+                condition = compile_condition(rule['condition'])
+            except ConditionSyntaxError as e:
+                logger.error(f"Document rule {rule_id} has an invalid condition, it will never match: {e}")
+                condition = _never
+            self.rule_conditions[rule_id] = condition
+            for question_id in getattr(condition, 'question_ids', ()):
+                self.rules_by_question[question_id] = self.rules_by_question.get(question_id, ()) + (rule_id,)
+
+        # question id -> (answer -> next ids, next ids for any other answer)
+        self.branching_table: Dict[str, Tuple[Dict[Any, Tuple[str, ...]], Tuple[str, ...]]] = {}
+        for q_id, question in questions.items():
+            branches = {
+                answer: _as_question_ids(target)
+                for answer, target in question.branching.items()
+                if answer != 'default'
+            }
+            default = question.branching.get('default', question.next) if question.branching else question.next
+            self.branching_table[q_id] = (branches, _as_question_ids(default))
+
+    def get_next_questions(self, current_id: str, answer: Any) -> List[str]:
+        """Look up the next question id(s) for an answer in the branching table"""
+        entry = self.branching_table.get(current_id)
+        if entry is None:
+            return []
+
+        branches, default = entry
+        try:
+            next_ids = branches.get(answer, default)
+        except TypeError:
+            # Unhashable answers (e.g. multi-select lists) never match a branch
+            next_ids = default
+        return list(next_ids)
+
+
+# Registry state: compiled graph per config path and the file stat it was checked against
+_graph_cache: Dict[str, QuestionGraph] = {}
+_graph_stat: Dict[str, Tuple[int, int]] = {}
+_graph_lock = threading.Lock()
+
+
+def get_question_graph(config_path: str = None) -> QuestionGraph:
+    """
+    Get the shared compiled question graph for a configuration file.
+
+    The file is stat'ed on every call; it is only re-read when its mtime or
+    size changed, and only re-parsed when its content hash changed. If a
+    changed file fails to parse, the previous graph keeps being served.
+
+    Args:
+        config_path: Path to questions.yaml (default: config/questions.yaml)
+
+    Returns:
+        Compiled QuestionGraph
+    """
+    path = os.path.abspath(config_path or DEFAULT_QUESTIONS_PATH)
+    stat = os.stat(path)
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+
+    graph = _graph_cache.get(path)
+    if graph is not None and _graph_stat.get(path) == stat_key:
+        return graph
+
+    with _graph_lock:
+        graph = _graph_cache.get(path)
+        if graph is not None and _graph_stat.get(path) == stat_key:
+            return graph
+
+        with open(path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        if graph is None or graph.digest != digest:
+            try:
+                new_graph = QuestionGraph(yaml.safe_load(raw.decode('utf-8')), digest)
+            except Exception as e:
+                if graph is None:
+                    raise
+                logger.error(f"Could not reload questions from {path}, keeping previous version: {e}")
+                new_graph = graph
+            else:
+                logger.info(f"Loaded {len(new_graph.questions)} questions from {path}")
+            graph = new_graph
+            _graph_cache[path] = graph
+
+        _graph_stat[path] = stat_key
+
+    return graph
+
+
+def invalidate_question_graph() -> None:
+    """Drop all compiled graphs so the next lookup re-parses the files."""
+    with _graph_lock:
+        _graph_cache.clear()
+        _graph_stat.clear()
+
+
 class QuestionLoader:
     """Load and manage questions from configuration"""
 
     def __init__(self, config_path: str = None):
-        if config_path is None:
-            config_path = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)),
-                'config',
-                'questions.yaml'
-            )
-
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = yaml.safe_load(f)
-
-        self.questions = {}
-        for q_id, q_data in self.config['questions'].items():
-            q_data['id'] = q_id
-            self.questions[q_id] = Question(q_data)
-
-        self.document_rules = self.config.get('document_rules', {})
+        # The compiled graph is shared process-wide; this loader is a cheap view onto it
+        self._graph = get_question_graph(config_path)
+        self.config = self._graph.config
+        self.questions = self._graph.questions
+        self.document_rules = self._graph.document_rules
 
     def get_question(self, question_id: str) -> Optional[Question]:
         """Get a specific question by ID"""
@@ -185,27 +323,62 @@ class QuestionLoader:
 
     def get_next_questions(self, current_id: str, answer: Any) -> List[str]:
         """Get next question(s) based on current answer"""
-        current = self.get_question(current_id)
-        if not current:
-            return []
-
-        next_id = current.get_next_question(answer)
+        # Branching that returns a list (like Q01 → married → [Q01a, Q01b, Q01c, Q01d]) is kept as a list
+        return self._graph.get_next_questions(current_id, answer)
+
+    def evaluate_document_rules(
+        self,
+        answers: Dict[str, Any],
+        changed_question_ids: Optional[List[str]] = None,
+        rule_state: Optional[Dict[str, bool]] = None
+    ) -> Dict[str, bool]:
+        """
+        Evaluate document rule conditions, incrementally when possible.
+
+        With a previous rule_state and the ids of the changed answers, only the
+        rules whose conditions reference those questions are re-evaluated.
+
+        Args:
+            answers: Interview answers
+            changed_question_ids: Questions answered since rule_state was computed
+            rule_state: Previous result of this method (rule id -> condition met)
+
+        Returns:
+            Rule id -> whether its condition is met
+        """
+        conditions = self._graph.rule_conditions
+        if rule_state is None or changed_question_ids is None:
+            return {rule_id: condition(answers) for rule_id, condition in conditions.items()}
+
+        # Rules added to questions.yaml since the state was stored are evaluated too
+        stale = {rule_id for rule_id in conditions if rule_id not in rule_state}
+        for question_id in changed_question_ids:
+            stale.update(self._graph.rules_by_question.get(question_id, ()))
+
+        state = {rule_id: rule_state[rule_id] for rule_id in conditions if rule_id in rule_state}
+        for rule_id in stale:
+            state[rule_id] = conditions[rule_id](answers)
+        return state
+
+    def get_document_requirements(
+        self,
+        answers: Dict[str, Any],
+        rule_state: Optional[Dict[str, bool]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate document requirements based on answers
+
+        Args:
+            answers: Interview answers
+            rule_state: Optional up-to-date result of evaluate_document_rules
+        """
+        if rule_state is None:
+            rule_state = self.evaluate_document_rules(answers)
 
-        # Handle branching that returns a list (like Q01 → married → [Q01a, Q01b, Q01c, Q01d])
-        if isinstance(next_id, list):
-            return next_id
-        elif next_id:
-            return [next_id]
-        return []
-
-    def get_document_requirements(self, answers: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Generate document requirements based on answers"""
         required_documents = []
 
         for rule_id, rule in self.document_rules.items():
-            # Evaluate condition
-            condition = rule['condition']
-            if self._evaluate_condition(condition, answers):
+            if rule_state.get(rule_id, False):
                 for doc in rule['documents']:
                     doc_requirement = {
                         'type': doc['type'],
@@ -227,43 +400,3 @@ class QuestionLoader:
                     required_documents.append(doc_requirement)
 
         return required_documents
-
-    def _evaluate_condition(self, condition: str, answers: Dict[str, Any]) -> bool:
-        """Evaluate a rule condition against answers"""
-        # Simple condition parser
-        # Examples: "Q04 > 0", "Q05 == yes", "Q09 == yes"
-
-        parts = condition.split()
-        if len(parts) != 3:
-            return False
-
-        question_id, operator, value = parts
-
-        if question_id not in answers:
-            return False
-
-        answer = answers[question_id]
-
-        # Convert value to appropriate type
-        if value.isdigit():
-            value = int(value)
-        elif value == 'yes':
-            value = True
-        elif value == 'no':
-            value = False
-
-        # Evaluate condition
-        if operator == '>':
-            return answer > value
-        elif operator == '>=':
-            return answer >= value
-        elif operator == '<':
-            return answer < value
-        elif operator == '<=':
-            return answer <= value
-        elif operator == '==':
-            return answer == value
-        elif operator == '!=':
-            return answer != value
-
-        return False
\ No newline at end of file
@@ -0,0 +1,282 @@
+"""Compiled conditions for document rules in questions.yaml
+
+A condition is parsed once into a predicate over the interview answers.
+
+Grammar (keywords are case-insensitive):
+
+    expression := or_expr
+    or_expr    := and_expr ('or' and_expr)*
+    and_expr   := not_expr ('and' not_expr)*
+    not_expr   := 'not' not_expr | '(' expression ')' | comparison
+    comparison := QUESTION_ID ('==' | '!=' | '>' | '>=' | '<' | '<=') value
+                | QUESTION_ID ['not'] 'in' '[' value (',' value)* ']'
+    value      := number | yes | no | true | false | 'quoted' | "quoted" | word
+
+Examples: "Q04 > 0", "Q05 == yes", "Q01 in [married, registered_partnership]
+and (Q04 >= 2 or Q05 == yes)".
+
+A comparison on an unanswered question is False. yes/no compare equal to
+both the boolean and the 'yes'/'no' strings an answer may be stored as, and
+numeric comparisons accept numbers stored as strings.
+"""
+
+import re
+from typing import Any, Callable, Dict, FrozenSet, List, Tuple
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+_TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<operator>==|!=|>=|<=|>|<)
+      | (?P<punct>[()\[\],])
+      | (?P<string>'[^']*'|"[^"]*")
+      | (?P<word>[^\s()\[\],=!<>]+)
+    )
+""", re.VERBOSE)
+
+_KEYWORDS = {'and', 'or', 'not', 'in'}
+
+
+class ConditionSyntaxError(ValueError):
+    """Raised when a rule condition cannot be parsed"""
+    pass
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    """Split a condition into (kind, text) tokens."""
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN_PATTERN.match(expression, position)
+        if not match:
+            raise ConditionSyntaxError(f"Unexpected character at {position} in {expression!r}")
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == 'word' and text.lower() in _KEYWORDS:
+            kind, text = 'keyword', text.lower()
+        tokens.append((kind, text))
+        position = match.end()
+    return tokens
+
+
+def _literal(kind: str, text: str) -> Any:
+    """Convert a value token to its Python value."""
+    if kind == 'string':
+        return text[1:-1]
+    lowered = text.lower()
+    if lowered in ('yes', 'true'):
+        return True
+    if lowered in ('no', 'false'):
+        return False
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def _as_bool(answer: Any) -> Any:
+    """Map 'yes'/'no' answers to booleans, leave everything else unchanged."""
+    if isinstance(answer, str) and answer.lower() in ('yes', 'true', 'no', 'false'):
+        return answer.lower() in ('yes', 'true')
+    return answer
+
+
+def _as_number(answer: Any) -> Any:
+    """Map numeric answers (including numeric strings) to numbers, None otherwise."""
+    if isinstance(answer, bool):
+        return None
+    if isinstance(answer, (int, float)):
+        return answer
+    try:
+        return float(answer)
+    except (TypeError, ValueError):
+        return None
+
+
+def _matches(answer: Any, value: Any) -> bool:
+    """Equality between an answer and a literal, tolerant of storage format."""
+    if isinstance(value, bool):
+        return _as_bool(answer) is value
+    if isinstance(value, (int, float)):
+        return _as_number(answer) == value
+    return answer == value
+
+
+_ORDERING = {
+    '>': lambda left, right: left > right,
+    '>=': lambda left, right: left >= right,
+    '<': lambda left, right: left < right,
+    '<=': lambda left, right: left <= right,
+}
+
+
+class _Parser:
+    """Recursive-descent parser producing a predicate and the questions it reads"""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.position = 0
+        self.question_ids = set()
+
+    def parse(self) -> Predicate:
+        if not self.tokens:
+            raise ConditionSyntaxError("Empty condition")
+        predicate = self._or()
+        if self.position != len(self.tokens):
+            raise ConditionSyntaxError(
+                f"Unexpected {self.tokens[self.position][1]!r} in {self.expression!r}"
+            )
+        return predicate
+
+    def _peek(self) -> Tuple[str, str]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return ('end', '')
+
+    def _next(self) -> Tuple[str, str]:
+        token = self._peek()
+        if token[0] == 'end':
+            raise ConditionSyntaxError(f"Unexpected end of {self.expression!r}")
+        self.position += 1
+        return token
+
+    def _expect(self, text: str) -> None:
+        kind, actual = self._next()
+        if actual != text:
+            raise ConditionSyntaxError(f"Expected {text!r}, got {actual!r} in {self.expression!r}")
+
+    def _or(self) -> Predicate:
+        operands = [self._and()]
+        while self._peek() == ('keyword', 'or'):
+            self._next()
+            operands.append(self._and())
+        if len(operands) == 1:
+            return operands[0]
+        return lambda answers: any(operand(answers) for operand in operands)
+
+    def _and(self) -> Predicate:
+        operands = [self._not()]
+        while self._peek() == ('keyword', 'and'):
+            self._next()
+            operands.append(self._not())
+        if len(operands) == 1:
+            return operands[0]
+        return lambda answers: all(operand(answers) for operand in operands)
+
+    def _not(self) -> Predicate:
+        if self._peek() == ('keyword', 'not'):
+            self._next()
+            operand = self._not()
+            return lambda answers: not operand(answers)
+        if self._peek() == ('punct', '('):
+            self._next()
+            predicate = self._or()
+            self._expect(')')
+            return predicate
+        return self._comparison()
+
+    def _value(self) -> Any:
+        kind, text = self._next()
+        if kind not in ('word', 'string'):
+            raise ConditionSyntaxError(f"Expected a value, got {text!r} in {self.expression!r}")
+        return _literal(kind, text)
+
+    def _comparison(self) -> Predicate:
+        kind, question_id = self._next()
+        if kind != 'word':
+            raise ConditionSyntaxError(f"Expected a question id, got {question_id!r} in {self.expression!r}")
+        self.question_ids.add(question_id)
+
+        kind, operator = self._next()
+        negate = False
+        if (kind, operator) == ('keyword', 'not'):
+            negate = True
+            kind, operator = self._next()
+            if (kind, operator) != ('keyword', 'in'):
+                raise ConditionSyntaxError(f"Expected 'in' after 'not' in {self.expression!r}")
+
+        if (kind, operator) == ('keyword', 'in'):
+            self._expect('[')
+            values = [self._value()]
+            while self._peek() == ('punct', ','):
+                self._next()
+                values.append(self._value())
+            self._expect(']')
+
+            def contains(answers: Dict[str, Any]) -> bool:
+                if question_id not in answers:
+                    return False
+                answer = answers[question_id]
+                return any(_matches(answer, value) for value in values) != negate
+            return contains
+
+        if kind != 'operator':
+            raise ConditionSyntaxError(f"Expected an operator, got {operator!r} in {self.expression!r}")
+        value = self._value()
+
+        if operator in ('==', '!='):
+            negate = operator == '!='
+
+            def equals(answers: Dict[str, Any]) -> bool:
+                if question_id not in answers:
+                    return False
+                return _matches(answers[question_id], value) != negate
+            return equals
+
+        if _as_number(value) is None:
+            raise ConditionSyntaxError(f"{operator!r} needs a number in {self.expression!r}")
+        ordering = _ORDERING[operator]
+
+        def compare(answers: Dict[str, Any]) -> bool:
+            if question_id not in answers:
+                return False
+            number = _as_number(answers[question_id])
+            return number is not None and ordering(number, value)
+        return compare
+
+
+class CompiledCondition:
+    """A rule condition parsed into a predicate over interview answers"""
+
+    def __init__(self, expression: str):
+        """
+        Parse a condition.
+
+        Args:
+            expression: Condition string, e.g. "Q04 > 0 and Q05 == yes"
+
+        Raises:
+            ConditionSyntaxError: If the condition cannot be parsed
+        """
+        parser = _Parser(expression)
+        self.expression = expression
+        self._predicate = parser.parse()
+        self.question_ids: FrozenSet[str] = frozenset(parser.question_ids)
+
+    def __call__(self, answers: Dict[str, Any]) -> bool:
+        return self._predicate(answers)
+
+    def __repr__(self) -> str:
+        return f"CompiledCondition({self.expression!r})"
+
+
+def compile_condition(expression: str) -> CompiledCondition:
+    """
+    Parse a document rule condition once for repeated evaluation.
+
+    Args:
+        expression: Condition string
+
+    Returns:
+        CompiledCondition
+
+    Raises:
+        ConditionSyntaxError: If the condition cannot be parsed
+    """
+    return CompiledCondition(str(expression))
@@ -9,7 +9,6 @@ Reference: https://www.ech.ch/de/ech/ech-0196
 
 import io
 import logging
-import re
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from decimal import Decimal
@@ -18,6 +17,9 @@ from typing import Any, Dict, Optional, Tuple
 from PIL import Image
 import PyPDF2
 
+from parsers.pdf_xml_scanner import find_embedded_xml, scan_barcodes
+from parsers.xml_stream import collect_texts
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,7 +48,7 @@ class ECH0196Parser:
                 - format: 'eCH-0196-X.X'
                 - data: Extracted structured data
                 - confidence: Confidence score (1.0 for structured, lower for fallback)
-                - method: 'barcode', 'xml', or 'fallback'
+                - method: 'attachment', 'xmp', 'barcode' or 'text_extraction'
         """
         try:
             # Try to extract from Data Matrix barcode first
@@ -85,7 +87,11 @@ class ECH0196Parser:
 
     def _extract_xml_from_pdf(self, pdf_bytes: bytes) -> Tuple[Optional[str], str]:
         """
-        Extract XML from Data Matrix or PDF417 barcode in PDF.
+        Extract XML from an attachment, XMP metadata, or a Data Matrix or
+        PDF417 barcode in the PDF.
+
+        Barcodes are scanned page by page, starting with the pages that
+        usually carry them at a low resolution (see pdf_xml_scanner).
 
         Args:
             pdf_bytes: PDF file as bytes
@@ -94,29 +100,23 @@ class ECH0196Parser:
             Tuple of (XML string, extraction method) or (None, '')
         """
         try:
-            # Try to use pyzbar for barcode detection
+            page_count = None
             try:
-                from pyzbar.pyzbar import decode as barcode_decode
-                from pdf2image import convert_from_bytes
-
-                # Convert PDF pages to images
-                images = convert_from_bytes(pdf_bytes, dpi=300, fmt='png')
-
-                for page_num, image in enumerate(images):
-                    # Decode barcodes from image
-                    barcodes = barcode_decode(image)
-
-                    for barcode in barcodes:
-                        if barcode.type in ['DATAMATRIX', 'PDF417']:
-                            xml_data = barcode.data.decode('utf-8')
-
-                            # Validate it's XML
-                            if xml_data.strip().startswith('<?xml') or '<eTaxStatement' in xml_data:
-                                logger.info(f"Found {barcode.type} barcode on page {page_num + 1}")
-                                return xml_data, 'barcode'
-
-            except ImportError:
-                logger.warning("pyzbar or pdf2image not available, skipping barcode extraction")
+                pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+                xml_content, method = find_embedded_xml(pdf_reader, 'eTaxStatement')
+                if xml_content:
+                    return xml_content, method
+                page_count = len(pdf_reader.pages)
+            except Exception as e:
+                logger.warning(f"Could not read PDF structure, scanning barcodes only: {e}")
+
+            xml_data, _ = scan_barcodes(
+                pdf_bytes,
+                lambda data: data.strip().startswith('<?xml') or '<eTaxStatement' in data,
+                page_count=page_count
+            )
+            if xml_data:
+                return xml_data, 'barcode'
 
             return None, ''
 
@@ -155,83 +155,112 @@ class ECH0196Parser:
             text: Extracted text from PDF
 
         Returns:
-            XML string or None
+            XML string (with its XML declaration, if one precedes it) or None
         """
-        # Look for XML declaration or eTaxStatement tag
-        xml_patterns = [
-            r'<\?xml.*?<eTaxStatement.*?</eTaxStatement>',
-            r'<eTaxStatement.*?</eTaxStatement>'
+        # Plain substring search: a lazy regex over the whole text backtracks
+        # heavily on long statements without a closing tag
+        lowered = text.lower()
+        start = lowered.find('<etaxstatement')
+        if start == -1:
+            return None
+
+        end = lowered.find('</etaxstatement>', start)
+        if end == -1:
+            return None
+
+        declaration = lowered.find('<?xml', 0, start)
+        if declaration != -1:
+            start = declaration
+
+        return text[start:end + len('</etaxstatement>')]
+
+    # Fields read below the eTaxStatement root, by local element name
+    SECTION_FIELDS = {
+        'taxpayer': (
+            'ssn', 'ahvNumber', 'lastName', 'firstName', 'dateOfBirth', 'maritalStatus',
+            'address', 'address/street', 'address/postalCode', 'address/city',
+            'spouse', 'spouse/lastName', 'spouse/firstName', 'spouse/ssn',
+        ),
+        'income': ('employment', 'selfEmployment', 'capital', 'rental', 'pension', 'other', 'total'),
+        'deductions': (
+            'professionalExpenses', 'pillar3a', 'insurancePremiums', 'medicalExpenses',
+            'childDeduction', 'total',
+        ),
+        'assets': (
+            'bankAccounts', 'cashAssets', 'securities', 'securitiesValue', 'realEstate',
+            'propertyValue', 'otherAssets', 'totalAssets', 'total', 'mortgages',
+            'otherDebts', 'totalDebts', 'netWealth',
+        ),
+    }
+
+    WANTED_PATHS = frozenset(
+        [('taxYear',), ('canton',)]
+        + [(section,) for section in SECTION_FIELDS]
+        + [
+            (section,) + tuple(field.split('/'))
+            for section, fields in SECTION_FIELDS.items()
+            for field in fields
         ]
-
-        for pattern in xml_patterns:
-            match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-            if match:
-                return match.group(0)
-
-        return None
+    )
 
     def _parse_ech_xml(self, xml_string: str) -> Dict[str, Any]:
         """
         Parse eCH-0196 XML and extract all data.
 
+        The document is streamed in a single pass; only the fields in
+        SECTION_FIELDS are kept, whatever the namespace prefix.
+
         Args:
-            xml_string: eCH-0196 XML content
+            xml_string: eCH-0196 XML content (str, bytes or binary file object)
 
         Returns:
             Dict with extracted data
         """
         try:
-            root = ET.fromstring(xml_string)
-
-            # Define namespace (eCH-0196 uses specific namespace)
-            ns = {'ech': 'http://www.ech.ch/xmlns/eCH-0196/1'}
-
-            # Helper function to get text with fallback
-            def get_text(elem, path, namespaces=None):
-                found = elem.find(path, namespaces) if namespaces else elem.find(path)
-                return found.text if found is not None else None
-
-            # Extract header information
-            header = root.find('header') or root.find('ech:header', ns)
-
-            # Extract taxpayer information
-            taxpayer_elem = root.find('taxpayer') or root.find('ech:taxpayer', ns)
-
-            # Extract income data
-            income_elem = root.find('income') or root.find('ech:income', ns)
-
-            # Extract deductions
-            deductions_elem = root.find('deductions') or root.find('ech:deductions', ns)
+            texts, _ = collect_texts(xml_string, wanted=self.WANTED_PATHS)
+        except ET.ParseError as e:
+            logger.error(f"XML parsing error: {e}")
+            raise ValueError(f"Invalid eCH-0196 XML: {e}")
 
-            # Extract assets (if present in bank statements)
-            assets_elem = root.find('assets') or root.find('ech:assets', ns)
+        def section(name: str) -> Optional[Dict[Tuple[str, ...], Optional[str]]]:
+            if (name,) not in texts:
+                return None
+            return {path[1:]: text for path, text in texts.items() if path[0] == name and len(path) > 1}
 
-            # Build structured data
-            data = {
-                'document_type': 'eCH-0196-bank-statement',
-                'tax_year': get_text(root, 'taxYear') or get_text(root, 'ech:taxYear', ns),
-                'canton': get_text(root, 'canton') or get_text(root, 'ech:canton', ns),
+        taxpayer = section('taxpayer')
+        income = section('income')
+        deductions = section('deductions')
+        assets = section('assets')
 
-                # Taxpayer information
-                'taxpayer': self._parse_taxpayer(taxpayer_elem, ns) if taxpayer_elem is not None else {},
+        # Build structured data
+        return {
+            'document_type': 'eCH-0196-bank-statement',
+            'tax_year': texts.get(('taxYear',)),
+            'canton': texts.get(('canton',)),
 
-                # Financial data
-                'income': self._parse_income(income_elem, ns) if income_elem is not None else {},
-                'deductions': self._parse_deductions(deductions_elem, ns) if deductions_elem is not None else {},
-                'assets': self._parse_assets(assets_elem, ns) if assets_elem is not None else {},
-            }
+            # Taxpayer information
+            'taxpayer': self._parse_taxpayer(taxpayer) if taxpayer is not None else {},
 
-            return data
+            # Financial data
+            'income': self._parse_income(income) if income is not None else {},
+            'deductions': self._parse_deductions(deductions) if deductions is not None else {},
+            'assets': self._parse_assets(assets) if assets is not None else {},
+        }
 
-        except ET.ParseError as e:
-            logger.error(f"XML parsing error: {e}")
-            raise ValueError(f"Invalid eCH-0196 XML: {e}")
+    @staticmethod
+    def _amount(text: Optional[str]) -> float:
+        """Parse an amount; missing or invalid amounts are 0.0."""
+        if text:
+            try:
+                return float(text)
+            except ValueError:
+                return 0.0
+        return 0.0
 
-    def _parse_taxpayer(self, elem: ET.Element, ns: dict) -> Dict[str, Any]:
-        """Parse taxpayer information from XML."""
-        def get_text(path):
-            found = elem.find(path) or elem.find(f'ech:{path}', ns)
-            return found.text if found is not None else None
+    def _parse_taxpayer(self, fields: Dict[Tuple[str, ...], Optional[str]]) -> Dict[str, Any]:
+        """Parse taxpayer information from the taxpayer element's field texts."""
+        def get_text(*path):
+            return fields.get(path)
 
         data = {
             'ssn': get_text('ssn') or get_text('ahvNumber'),
@@ -242,43 +271,27 @@ class ECH0196Parser:
         }
 
         # Address
-        address_elem = elem.find('address') or elem.find('ech:address', ns)
-        if address_elem is not None:
-            street_elem = address_elem.find('street') or address_elem.find('ech:street', ns)
-            postal_elem = address_elem.find('postalCode') or address_elem.find('ech:postalCode', ns)
-            city_elem = address_elem.find('city') or address_elem.find('ech:city', ns)
-
+        if ('address',) in fields:
             data['address'] = {
-                'street': street_elem.text if street_elem is not None else None,
-                'postal_code': postal_elem.text if postal_elem is not None else None,
-                'city': city_elem.text if city_elem is not None else None,
+                'street': get_text('address', 'street'),
+                'postal_code': get_text('address', 'postalCode'),
+                'city': get_text('address', 'city'),
             }
 
         # Spouse (if married)
-        spouse_elem = elem.find('spouse') or elem.find('ech:spouse', ns)
-        if spouse_elem is not None:
-            spouse_last_elem = spouse_elem.find('lastName') or spouse_elem.find('ech:lastName', ns)
-            spouse_first_elem = spouse_elem.find('firstName') or spouse_elem.find('ech:firstName', ns)
-            spouse_ssn_elem = spouse_elem.find('ssn') or spouse_elem.find('ech:ssn', ns)
-
+        if ('spouse',) in fields:
             data['spouse'] = {
-                'last_name': spouse_last_elem.text if spouse_last_elem is not None else None,
-                'first_name': spouse_first_elem.text if spouse_first_elem is not None else None,
-                'ssn': spouse_ssn_elem.text if spouse_ssn_elem is not None else None,
+                'last_name': get_text('spouse', 'lastName'),
+                'first_name': get_text('spouse', 'firstName'),
+                'ssn': get_text('spouse', 'ssn'),
             }
 
         return data
 
-    def _parse_income(self, elem: ET.Element, ns: dict) -> Dict[str, Any]:
-        """Parse income data from XML."""
-        def get_amount(path):
-            found = elem.find(path) or elem.find(f'ech:{path}', ns)
-            if found is not None and found.text:
-                try:
-                    return float(found.text)
-                except ValueError:
-                    return 0.0
-            return 0.0
+    def _parse_income(self, fields: Dict[Tuple[str, ...], Optional[str]]) -> Dict[str, Any]:
+        """Parse income data from the income element's field texts."""
+        def get_amount(name):
+            return self._amount(fields.get((name,)))
 
         return {
             'employment': get_amount('employment'),
@@ -290,16 +303,10 @@ class ECH0196Parser:
             'total': get_amount('total'),
         }
 
-    def _parse_deductions(self, elem: ET.Element, ns: dict) -> Dict[str, Any]:
-        """Parse deductions from XML."""
-        def get_amount(path):
-            found = elem.find(path) or elem.find(f'ech:{path}', ns)
-            if found is not None and found.text:
-                try:
-                    return float(found.text)
-                except ValueError:
-                    return 0.0
-            return 0.0
+    def _parse_deductions(self, fields: Dict[Tuple[str, ...], Optional[str]]) -> Dict[str, Any]:
+        """Parse deductions from the deductions element's field texts."""
+        def get_amount(name):
+            return self._amount(fields.get((name,)))
 
         return {
             'professional_expenses': get_amount('professionalExpenses'),
@@ -310,16 +317,10 @@ class ECH0196Parser:
             'total': get_amount('total'),
         }
 
-    def _parse_assets(self, elem: ET.Element, ns: dict) -> Dict[str, Any]:
-        """Parse assets/wealth data from XML (bank statements)."""
-        def get_amount(path):
-            found = elem.find(path) or elem.find(f'ech:{path}', ns)
-            if found is not None and found.text:
-                try:
-                    return float(found.text)
-                except ValueError:
-                    return 0.0
-            return 0.0
+    def _parse_assets(self, fields: Dict[Tuple[str, ...], Optional[str]]) -> Dict[str, Any]:
+        """Parse assets/wealth data from the assets element's field texts (bank statements)."""
+        def get_amount(name):
+            return self._amount(fields.get((name,)))
 
         return {
             'bank_accounts': get_amount('bankAccounts') or get_amount('cashAssets'),
@@ -0,0 +1,222 @@
+"""
+PDF XML Scanner - locate structured XML inside PDF documents
+
+Shared by the eCH-0196 and Swissdec parsers. Sources are tried from
+cheapest to most expensive and scanning stops at the first hit:
+
+1. Embedded XML file attachments and XMP metadata (no rendering)
+2. Data Matrix / PDF417 barcodes, rendered one page at a time: the pages
+   that usually carry the code (last, then first) at a low DPI, then at
+   higher DPIs, and only then the remaining pages
+
+Rendering a single page at 150 DPI instead of every page at 300 DPI keeps
+memory flat for long multi-page bank statements.
+"""
+
+import html
+import io
+import logging
+import os
+import re
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import PyPDF2
+
+logger = logging.getLogger(__name__)
+
+# Barcode scan resolutions, lowest first; higher ones are only tried if nothing was found
+BARCODE_SCAN_DPIS = tuple(
+    int(dpi) for dpi in os.getenv('BARCODE_SCAN_DPIS', '150,300').split(',') if dpi.strip()
+)
+
+BARCODE_TYPES = ('DATAMATRIX', 'PDF417')
+
+
+def find_embedded_xml(pdf_reader, root_tag: str) -> Tuple[Optional[str], str]:
+    """
+    Find an XML document in the attachments or XMP metadata of a PDF.
+
+    Args:
+        pdf_reader: PyPDF2.PdfReader of the document
+        root_tag: Local name of the expected root element, e.g. 'eTaxStatement'
+
+    Returns:
+        Tuple of (XML string, 'attachment' or 'xmp') or (None, '')
+    """
+    for filename, data in _iter_attachments(pdf_reader):
+        if not filename.lower().endswith('.xml'):
+            continue
+        xml_content = _find_xml(_decode(data), root_tag)
+        if xml_content:
+            logger.info(f"Found {root_tag} XML in attachment {filename}")
+            return xml_content, 'attachment'
+
+    xml_content = _find_xml(_decode(_xmp_bytes(pdf_reader)), root_tag)
+    if xml_content:
+        logger.info(f"Found {root_tag} XML in XMP metadata")
+        return xml_content, 'xmp'
+
+    return None, ''
+
+
+def scan_barcodes(
+    pdf_bytes: bytes,
+    is_match: Callable[[str], bool],
+    page_count: Optional[int] = None,
+    dpis: Tuple[int, ...] = BARCODE_SCAN_DPIS,
+    likely_pages_only: bool = False
+) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Scan PDF pages for a Data Matrix or PDF417 code, one page at a time.
+
+    Args:
+        pdf_bytes: PDF file as bytes
+        is_match: Accepts the decoded barcode content
+        page_count: Number of pages, if already known
+        dpis: Resolutions to try, lowest first
+        likely_pages_only: Scan only the last and first page
+
+    Returns:
+        Tuple of (barcode content, zero-based page number) or (None, None)
+    """
+    try:
+        from pdf2image import convert_from_bytes
+        from pyzbar.pyzbar import decode as barcode_decode
+    except ImportError:
+        logger.warning("pyzbar or pdf2image not available, skipping barcode extraction")
+        return None, None
+
+    if page_count is None:
+        page_count = _page_count(pdf_bytes)
+    if not page_count:
+        return None, None
+
+    for page_num, dpi in scan_order(page_count, dpis, likely_pages_only):
+        try:
+            images = convert_from_bytes(
+                pdf_bytes, dpi=dpi, fmt='png', first_page=page_num + 1, last_page=page_num + 1
+            )
+        except Exception as e:
+            # Rendering failures are not page specific (broken PDF, missing poppler)
+            logger.error(f"Could not render page {page_num + 1} for barcode scan: {e}")
+            return None, None
+
+        for image in images:
+            try:
+                for barcode in barcode_decode(image):
+                    if barcode.type not in BARCODE_TYPES:
+                        continue
+                    try:
+                        content = barcode.data.decode('utf-8')
+                    except UnicodeDecodeError:
+                        continue
+                    if is_match(content):
+                        logger.info(f"Found {barcode.type} barcode on page {page_num + 1} at {dpi} DPI")
+                        return content, page_num
+            finally:
+                image.close()
+
+    return None, None
+
+
+def scan_order(
+    page_count: int,
+    dpis: Tuple[int, ...] = BARCODE_SCAN_DPIS,
+    likely_pages_only: bool = False
+) -> Iterator[Tuple[int, int]]:
+    """
+    Order in which (page, DPI) combinations are scanned.
+
+    The last and first page are tried at every resolution before any
+    other page is rendered; remaining pages go from the back to the front.
+
+    Args:
+        page_count: Number of pages
+        dpis: Resolutions, lowest first
+        likely_pages_only: Stop after the last and first page
+
+    Yields:
+        (zero-based page number, DPI)
+    """
+    likely: List[int] = []
+    for page_num in (page_count - 1, 0):
+        if page_num not in likely:
+            likely.append(page_num)
+
+    for dpi in dpis:
+        for page_num in likely:
+            yield page_num, dpi
+
+    if likely_pages_only:
+        return
+
+    for page_num in range(page_count - 2, 0, -1):
+        for dpi in dpis:
+            yield page_num, dpi
+
+
+def _iter_attachments(pdf_reader) -> Iterator[Tuple[str, bytes]]:
+    """Yield (filename, content) of the embedded files of a PDF."""
+    try:
+        names = pdf_reader.trailer['/Root'].get_object().get('/Names')
+        tree = names.get_object().get('/EmbeddedFiles') if names is not None else None
+    except Exception as e:
+        logger.debug(f"No embedded files: {e}")
+        return
+
+    nodes = [tree] if tree is not None else []
+    while nodes:
+        node = nodes.pop().get_object()
+        nodes.extend(node.get('/Kids', []))
+
+        entries = node.get('/Names', [])
+        for i in range(0, len(entries) - 1, 2):
+            try:
+                file_spec = entries[i + 1].get_object()
+                filename = str(file_spec.get('/UF') or file_spec.get('/F') or entries[i])
+                yield filename, file_spec['/EF']['/F'].get_object().get_data()
+            except Exception as e:
+                logger.debug(f"Skipping unreadable attachment: {e}")
+
+
+def _xmp_bytes(pdf_reader) -> Optional[bytes]:
+    """Raw XMP metadata packet of a PDF, if any."""
+    try:
+        xmp = pdf_reader.xmp_metadata
+        data = xmp.stream.get_data() if xmp is not None else None
+    except Exception as e:
+        logger.debug(f"No XMP metadata: {e}")
+        return None
+    return data if isinstance(data, bytes) else None
+
+
+def _decode(data: Optional[bytes]) -> Optional[str]:
+    if not isinstance(data, bytes):
+        return None
+    for encoding in ('utf-8', 'latin-1'):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def _find_xml(text: Optional[str], root_tag: str) -> Optional[str]:
+    """Extract the (possibly prefixed, possibly escaped) root_tag element from text."""
+    if not text:
+        return None
+    if '&lt;' in text and f'<{root_tag}' not in text:
+        # XMP properties carry embedded XML escaped
+        text = html.unescape(text)
+
+    pattern = rf'(<\?xml[^>]*\?>\s*)?<(\w+:)?{root_tag}\b.*?</(\w+:)?{root_tag}>'
+    match = re.search(pattern, text, re.DOTALL)
+    return match.group(0) if match else None
+
+
+def _page_count(pdf_bytes: bytes) -> Optional[int]:
+    try:
+        return len(PyPDF2.PdfReader(io.BytesIO(pdf_bytes)).pages)
+    except Exception as e:
+        logger.error(f"Could not read PDF page count: {e}")
+        return None
@@ -9,6 +9,7 @@ Reference: https://www.swissdec.ch/
 
 import io
 import logging
+import os
 import re
 import xml.etree.ElementTree as ET
 from datetime import datetime
@@ -17,8 +18,15 @@ from typing import Any, Dict, Optional, Tuple
 
 import PyPDF2
 
+from parsers.pdf_xml_scanner import find_embedded_xml, scan_barcodes
+from parsers.xml_stream import collect_texts, read_root
+
 logger = logging.getLogger(__name__)
 
+# Resolution of the barcode fallback scan. Salary certificates carry their
+# code on the first or last page, so only those are rendered, once each.
+SWISSDEC_BARCODE_DPI = int(os.getenv('SWISSDEC_BARCODE_DPI', '300'))
+
 
 class SwissdecParser:
     """
@@ -86,7 +94,11 @@ class SwissdecParser:
 
     def _extract_xml_from_pdf(self, pdf_bytes: bytes) -> Optional[str]:
         """
-        Extract embedded XML from PDF attachment or text.
+        Extract embedded XML from PDF attachment, XMP metadata, text or barcode.
+
+        Sources are tried from cheapest to most expensive and the search
+        stops at the first hit; page text is read one page at a time, and
+        only the last and first page are rendered for barcodes.
 
         Args:
             pdf_bytes: PDF file as bytes
@@ -97,28 +109,32 @@ class SwissdecParser:
         try:
             pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
 
-            # Method 1: Check for file attachments
-            if hasattr(pdf_reader, 'attachments') and pdf_reader.attachments:
-                for filename, file_data in pdf_reader.attachments.items():
-                    if filename.endswith('.xml'):
-                        return file_data.decode('utf-8')
+            # Method 1: Check for file attachments and XMP metadata
+            xml_content, _ = find_embedded_xml(pdf_reader, 'SalaryDeclaration')
+            if xml_content:
+                return xml_content
 
-            # Method 2: Extract text and look for XML
+            # Method 2: Extract text page by page and look for XML
             text = ""
             for page in pdf_reader.pages:
-                text += page.extract_text()
-
-            # Look for Swissdec XML in text
-            xml_match = re.search(r'<\?xml.*?<SalaryDeclaration.*?</SalaryDeclaration>', text, re.DOTALL)
-            if xml_match:
-                return xml_match.group(0)
-
-            # Method 3: Check metadata for XML
-            if pdf_reader.metadata and '/EmbeddedFiles' in pdf_reader.metadata:
-                logger.info("Found embedded files in PDF metadata")
-                # This would require more advanced PDF parsing
-
-            return None
+                page_text = page.extract_text()
+                text += page_text
+
+                # The XML may span pages; only search once it could be complete
+                if '</SalaryDeclaration>' in page_text:
+                    xml_match = re.search(r'<\?xml.*?<SalaryDeclaration.*?</SalaryDeclaration>', text, re.DOTALL)
+                    if xml_match:
+                        return xml_match.group(0)
+
+            # Method 3: Scan for a barcode carrying the XML
+            xml_content, _ = scan_barcodes(
+                pdf_bytes,
+                lambda data: '<SalaryDeclaration' in data,
+                page_count=len(pdf_reader.pages),
+                dpis=(SWISSDEC_BARCODE_DPI,),
+                likely_pages_only=True
+            )
+            return xml_content
 
         except Exception as e:
             logger.error(f"XML extraction from PDF failed: {e}")
@@ -128,6 +144,10 @@ class SwissdecParser:
         """
         Detect Swissdec ELM version from XML.
 
+        Only the root element's start tag is read: its version attribute
+        (e.g. version="ELM-5.4") or, failing that, the version in a
+        declared ELM namespace.
+
         Args:
             xml_string: XML content
 
@@ -135,19 +155,19 @@ class SwissdecParser:
             Version string (e.g., '5.0')
         """
         try:
-            # Look for version in XML declaration or root element
-            version_patterns = [
-                r'version="ELM-([0-9.]+)"',
-                r'elm:version="([0-9.]+)"',
-                r'<SalaryDeclaration.*?version="([0-9.]+)"',
-            ]
-
-            for pattern in version_patterns:
-                match = re.search(pattern, xml_string)
+            _, attributes, namespaces = read_root(xml_string)
+
+            candidates = []
+            if attributes.get('version'):
+                candidates.append(re.sub(r'^ELM-', '', attributes['version']))
+            for uri in namespaces.values():
+                match = re.search(r'swissdec\.ch/schema/elm/([0-9.]+)', uri)
                 if match:
-                    version = match.group(1)
-                    if version in self.supported_versions:
-                        return version
+                    candidates.append(match.group(1))
+
+            for version in candidates:
+                if version in self.supported_versions:
+                    return version
 
             # Default to 5.0 if not found
             logger.warning("Could not detect ELM version, defaulting to 5.0")
@@ -157,232 +177,167 @@ class SwissdecParser:
             logger.error(f"Version detection failed: {e}")
             return '5.0'
 
+    # Elements whose fields are read, wherever they occur (first occurrence)
+    SECTIONS = ('Employer', 'Employee', 'Salary', 'Deductions', 'SocialSecurity')
+
+    # Elements the tax year is taken from, in order of preference
+    TAX_YEAR_PATHS = (('Period', 'From'), ('TaxYear',), ('Year',))
+
     def _parse_elm_xml(self, xml_string: str, version: str) -> Dict[str, Any]:
         """
         Parse Swissdec ELM XML and extract all data.
 
+        The document is streamed in a single pass; elements are matched by
+        local name, so any namespace prefix or version namespace works.
+
         Args:
-            xml_string: Swissdec ELM XML content
+            xml_string: Swissdec ELM XML content (str, bytes or binary file object)
             version: ELM version
 
         Returns:
             Dict with extracted data
         """
         try:
-            root = ET.fromstring(xml_string)
+            texts, sections = collect_texts(
+                xml_string,
+                anywhere=self.TAX_YEAR_PATHS,
+                sections=self.SECTIONS
+            )
+        except ET.ParseError as e:
+            logger.error(f"XML parsing error: {e}")
+            raise ValueError(f"Invalid Swissdec ELM XML: {e}")
 
-            # Swissdec uses multiple namespaces
-            ns = {
-                'elm': 'http://www.swissdec.ch/schema/elm/5.0',
-                'sd': 'http://www.swissdec.ch/schema/sd/20200220',
-                'xsi': 'http://www.w3.org/2001/XMLSchema-instance'
-            }
+        employer = sections.get('Employer')
+        employee = sections.get('Employee')
+        salary = sections.get('Salary')
+        deductions = sections.get('Deductions')
+        social_security = sections.get('SocialSecurity')
 
-            # Helper to get text with namespace fallback
-            def get_text(elem, *paths):
-                for path in paths:
-                    # Try with namespace
-                    found = elem.find(path, ns)
-                    if found is not None:
-                        return found.text
-                    # Try without namespace
-                    found = elem.find(path.split(':')[-1]) if ':' in path else elem.find(path)
-                    if found is not None:
-                        return found.text
-                return None
-
-            # Extract employer information
-            employer_elem = root.find('.//elm:Employer', ns) or root.find('.//Employer')
-
-            # Extract employee information
-            employee_elem = root.find('.//elm:Employee', ns) or root.find('.//Employee')
-
-            # Extract salary information
-            salary_elem = root.find('.//elm:Salary', ns) or root.find('.//Salary')
-
-            # Extract deductions and contributions
-            deductions_elem = root.find('.//elm:Deductions', ns) or root.find('.//Deductions')
-            social_sec_elem = root.find('.//elm:SocialSecurity', ns) or root.find('.//SocialSecurity')
-
-            # Build structured data
-            data = {
-                'document_type': 'Swissdec-ELM-salary-certificate',
-                'tax_year': self._extract_tax_year(root, ns),
-
-                # Employer information
-                'employer': self._parse_employer(employer_elem, ns) if employer_elem is not None else {},
-
-                # Employee information
-                'employee': self._parse_employee(employee_elem, ns) if employee_elem is not None else {},
-
-                # Salary data
-                'salary': self._parse_salary(salary_elem, ns) if salary_elem is not None else {},
-
-                # Deductions and social security
-                'deductions': self._parse_deductions(deductions_elem, ns) if deductions_elem is not None else {},
-                'social_security': self._parse_social_security(social_sec_elem, ns) if social_sec_elem is not None else {},
-            }
+        # Build structured data
+        return {
+            'document_type': 'Swissdec-ELM-salary-certificate',
+            'tax_year': self._extract_tax_year(texts),
 
-            return data
+            # Employer information
+            'employer': self._parse_employer(employer) if employer is not None else {},
 
-        except ET.ParseError as e:
-            logger.error(f"XML parsing error: {e}")
-            raise ValueError(f"Invalid Swissdec ELM XML: {e}")
+            # Employee information
+            'employee': self._parse_employee(employee) if employee is not None else {},
 
-    def _extract_tax_year(self, root: ET.Element, ns: dict) -> Optional[str]:
-        """Extract tax year from XML."""
-        # Look for period or year fields
-        paths = [
-            './/elm:Period/elm:From',
-            './/Period/From',
-            './/elm:TaxYear',
-            './/TaxYear',
-            './/elm:Year',
-            './/Year'
-        ]
+            # Salary data
+            'salary': self._parse_salary(salary) if salary is not None else {},
 
-        for path in paths:
-            elem = root.find(path, ns) or root.find(path.split('/')[-1])
-            if elem is not None and elem.text:
+            # Deductions and social security
+            'deductions': self._parse_deductions(deductions) if deductions is not None else {},
+            'social_security': self._parse_social_security(social_security) if social_security is not None else {},
+        }
+
+    def _extract_tax_year(self, texts: Dict[Tuple[str, ...], Optional[str]]) -> Optional[str]:
+        """Extract tax year from the period or year element texts."""
+        for path in self.TAX_YEAR_PATHS:
+            text = texts.get(path)
+            if text:
                 # Extract year from date (YYYY-MM-DD) or year directly
-                year_match = re.match(r'(\d{4})', elem.text)
+                year_match = re.match(r'(\d{4})', text)
                 if year_match:
                     return year_match.group(1)
 
         return None
 
-    def _parse_employer(self, elem: ET.Element, ns: dict) -> Dict[str, Any]:
-        """Parse employer information from XML."""
+    @staticmethod
+    def _get_text(fields: Dict[Tuple[str, ...], Optional[str]], *paths: str) -> Optional[str]:
+        """Text of the first of the 'Parent/Child' paths present in a section."""
+        for path in paths:
+            key = tuple(path.split('/'))
+            if key in fields:
+                return fields[key]
+        return None
+
+    @staticmethod
+    def _get_amount(fields: Dict[Tuple[str, ...], Optional[str]], *paths: str) -> float:
+        """First of the paths holding a valid amount, else 0.0."""
+        for path in paths:
+            text = fields.get(tuple(path.split('/')))
+            if text:
+                try:
+                    return float(text)
+                except ValueError:
+                    pass
+        return 0.0
+
+    def _parse_employer(self, fields: Dict[Tuple[str, ...], Optional[str]]) -> Dict[str, Any]:
+        """Parse employer information from the Employer element's field texts."""
         def get_text(*paths):
-            for path in paths:
-                found = elem.find(path, ns)
-                if found is not None:
-                    return found.text
-                # Try without namespace
-                simple_path = path.split(':')[-1]
-                found = elem.find(simple_path)
-                if found is not None:
-                    return found.text
-            return None
+            return self._get_text(fields, *paths)
 
         return {
-            'name': get_text('elm:Name', 'Name', 'elm:CompanyName', 'CompanyName'),
-            'uid': get_text('elm:UID', 'UID', 'elm:CompanyID', 'CompanyID'),
+            'name': get_text('Name', 'CompanyName'),
+            'uid': get_text('UID', 'CompanyID'),
             'address': {
-                'street': get_text('elm:Address/elm:Street', 'Address/Street'),
-                'postal_code': get_text('elm:Address/elm:PostalCode', 'Address/PostalCode'),
-                'city': get_text('elm:Address/elm:City', 'Address/City'),
+                'street': get_text('Address/Street'),
+                'postal_code': get_text('Address/PostalCode'),
+                'city': get_text('Address/City'),
             }
         }
 
-    def _parse_employee(self, elem: ET.Element, ns: dict) -> Dict[str, Any]:
-        """Parse employee information from XML."""
+    def _parse_employee(self, fields: Dict[Tuple[str, ...], Optional[str]]) -> Dict[str, Any]:
+        """Parse employee information from the Employee element's field texts."""
         def get_text(*paths):
-            for path in paths:
-                found = elem.find(path, ns)
-                if found is not None:
-                    return found.text
-                simple_path = path.split(':')[-1]
-                found = elem.find(simple_path)
-                if found is not None:
-                    return found.text
-            return None
+            return self._get_text(fields, *paths)
 
         return {
-            'ssn': get_text('elm:SSN', 'SSN', 'elm:AHVNumber', 'AHVNumber'),
-            'first_name': get_text('elm:FirstName', 'FirstName', 'elm:GivenName', 'GivenName'),
-            'last_name': get_text('elm:LastName', 'LastName', 'elm:FamilyName', 'FamilyName'),
-            'date_of_birth': get_text('elm:DateOfBirth', 'DateOfBirth', 'elm:BirthDate', 'BirthDate'),
-            'marital_status': get_text('elm:MaritalStatus', 'MaritalStatus'),
+            'ssn': get_text('SSN', 'AHVNumber'),
+            'first_name': get_text('FirstName', 'GivenName'),
+            'last_name': get_text('LastName', 'FamilyName'),
+            'date_of_birth': get_text('DateOfBirth', 'BirthDate'),
+            'marital_status': get_text('MaritalStatus'),
             'address': {
-                'street': get_text('elm:Address/elm:Street', 'Address/Street'),
-                'postal_code': get_text('elm:Address/elm:PostalCode', 'Address/PostalCode'),
-                'city': get_text('elm:Address/elm:City', 'Address/City'),
+                'street': get_text('Address/Street'),
+                'postal_code': get_text('Address/PostalCode'),
+                'city': get_text('Address/City'),
             }
         }
 
-    def _parse_salary(self, elem: ET.Element, ns: dict) -> Dict[str, Any]:
-        """Parse salary information from XML."""
+    def _parse_salary(self, fields: Dict[Tuple[str, ...], Optional[str]]) -> Dict[str, Any]:
+        """Parse salary information from the Salary element's field texts."""
         def get_amount(*paths):
-            for path in paths:
-                found = elem.find(path, ns)
-                if found is not None and found.text:
-                    try:
-                        return float(found.text)
-                    except ValueError:
-                        pass
-                simple_path = path.split(':')[-1]
-                found = elem.find(simple_path)
-                if found is not None and found.text:
-                    try:
-                        return float(found.text)
-                    except ValueError:
-                        pass
-            return 0.0
+            return self._get_amount(fields, *paths)
 
         return {
-            'gross_salary': get_amount('elm:GrossSalary', 'GrossSalary', 'elm:TotalGross', 'TotalGross'),
-            'net_salary': get_amount('elm:NetSalary', 'NetSalary', 'elm:NetPay', 'NetPay'),
-            'bonuses': get_amount('elm:Bonuses', 'Bonuses', 'elm:BonusPayments', 'BonusPayments'),
-            'overtime_pay': get_amount('elm:OvertimePay', 'OvertimePay'),
-            'expenses_allowance': get_amount('elm:ExpensesAllowance', 'ExpensesAllowance'),
-            'car_allowance': get_amount('elm:CarAllowance', 'CarAllowance'),
-            'other_allowances': get_amount('elm:OtherAllowances', 'OtherAllowances'),
+            'gross_salary': get_amount('GrossSalary', 'TotalGross'),
+            'net_salary': get_amount('NetSalary', 'NetPay'),
+            'bonuses': get_amount('Bonuses', 'BonusPayments'),
+            'overtime_pay': get_amount('OvertimePay'),
+            'expenses_allowance': get_amount('ExpensesAllowance'),
+            'car_allowance': get_amount('CarAllowance'),
+            'other_allowances': get_amount('OtherAllowances'),
 
             # Taxable amounts
-            'taxable_salary': get_amount('elm:TaxableSalary', 'TaxableSalary', 'elm:TaxableIncome', 'TaxableIncome'),
+            'taxable_salary': get_amount('TaxableSalary', 'TaxableIncome'),
         }
 
-    def _parse_deductions(self, elem: ET.Element, ns: dict) -> Dict[str, Any]:
-        """Parse deductions from XML."""
+    def _parse_deductions(self, fields: Dict[Tuple[str, ...], Optional[str]]) -> Dict[str, Any]:
+        """Parse deductions from the Deductions element's field texts."""
         def get_amount(*paths):
-            for path in paths:
-                found = elem.find(path, ns)
-                if found is not None and found.text:
-                    try:
-                        return float(found.text)
-                    except ValueError:
-                        pass
-                simple_path = path.split(':')[-1]
-                found = elem.find(simple_path)
-                if found is not None and found.text:
-                    try:
-                        return float(found.text)
-                    except ValueError:
-                        pass
-            return 0.0
+            return self._get_amount(fields, *paths)
 
         return {
-            'professional_expenses': get_amount('elm:ProfessionalExpenses', 'ProfessionalExpenses'),
-            'meal_deductions': get_amount('elm:MealDeductions', 'MealDeductions'),
-            'transport_deductions': get_amount('elm:TransportDeductions', 'TransportDeductions'),
+            'professional_expenses': get_amount('ProfessionalExpenses'),
+            'meal_deductions': get_amount('MealDeductions'),
+            'transport_deductions': get_amount('TransportDeductions'),
         }
 
-    def _parse_social_security(self, elem: ET.Element, ns: dict) -> Dict[str, Any]:
-        """Parse social security contributions from XML."""
+    def _parse_social_security(self, fields: Dict[Tuple[str, ...], Optional[str]]) -> Dict[str, Any]:
+        """Parse social security contributions from the SocialSecurity element's field texts."""
         def get_amount(*paths):
-            for path in paths:
-                found = elem.find(path, ns)
-                if found is not None and found.text:
-                    try:
-                        return float(found.text)
-                    except ValueError:
-                        pass
-                simple_path = path.split(':')[-1]
-                found = elem.find(simple_path)
-                if found is not None and found.text:
-                    try:
-                        return float(found.text)
-                    except ValueError:
-                        pass
-            return 0.0
+            return self._get_amount(fields, *paths)
 
         return {
-            'ahv_contribution': get_amount('elm:AHV', 'AHV', 'elm:AVS', 'AVS'),
-            'alv_contribution': get_amount('elm:ALV', 'ALV', 'elm:AC', 'AC'),
-            'pension_contribution': get_amount('elm:Pension', 'Pension', 'elm:BVG', 'BVG'),
-            'accident_insurance': get_amount('elm:AccidentInsurance', 'AccidentInsurance', 'elm:UVG', 'UVG'),
-            'total_contributions': get_amount('elm:TotalContributions', 'TotalContributions'),
+            'ahv_contribution': get_amount('AHV', 'AVS'),
+            'alv_contribution': get_amount('ALV', 'AC'),
+            'pension_contribution': get_amount('Pension', 'BVG'),
+            'accident_insurance': get_amount('AccidentInsurance', 'UVG'),
+            'total_contributions': get_amount('TotalContributions'),
         }
 
     def map_to_tax_profile(self, parsed_data: Dict[str, Any]) -> Dict[str, Any]:
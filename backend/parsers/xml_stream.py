@@ -0,0 +1,173 @@
+"""
+Streaming XML helpers for the structured document parsers
+
+Walks an XML document with a pull parser instead of building the whole
+ElementTree. Elements are addressed by the local names on the path from
+the root, so prefixed, default-namespaced and un-namespaced documents are
+read the same way. Every element is cleared and detached from its parent
+once its end event has been handled, so memory stays bounded by the
+nesting depth rather than the document size.
+"""
+
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Collection, Dict, Iterator, Optional, Tuple, Union
+
+XMLSource = Union[str, bytes, BinaryIO]
+
+# Feed size for the pull parser
+XML_CHUNK_SIZE = 64 * 1024
+
+Path = Tuple[str, ...]
+
+
+def local_name(tag: str) -> str:
+    """Tag without its '{namespace}' part."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _iter_chunks(source: XMLSource, chunk_size: int):
+    if hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+
+
+def iter_xml(
+    source: XMLSource,
+    chunk_size: int = XML_CHUNK_SIZE
+) -> Iterator[Tuple[str, Path, ET.Element]]:
+    """
+    Stream start and end events of an XML document.
+
+    Element text is only complete at the 'end' event. After the consumer
+    has handled an 'end' event the element is cleared, so it must not be
+    kept.
+
+    Args:
+        source: XML as str, bytes or a binary file object
+        chunk_size: Characters or bytes fed to the parser at a time
+
+    Yields:
+        (event, path of local names from the root, element) where event
+        is 'start' or 'end'
+
+    Raises:
+        ET.ParseError: If the document is not well-formed
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    path = []
+    elements = []
+
+    def drain():
+        for event, elem in parser.read_events():
+            if event == 'start':
+                path.append(local_name(elem.tag))
+                elements.append(elem)
+                yield event, tuple(path), elem
+            else:
+                yield event, tuple(path), elem
+                path.pop()
+                elements.pop()
+                elem.clear()
+                if elements:
+                    elements[-1].remove(elem)
+
+    for chunk in _iter_chunks(source, chunk_size):
+        parser.feed(chunk)
+        yield from drain()
+
+    parser.close()
+    yield from drain()
+
+
+def read_root(source: XMLSource, chunk_size: int = 4096) -> Tuple[str, Dict[str, str], Dict[str, str]]:
+    """
+    Read only the root element's start tag.
+
+    Args:
+        source: XML as str, bytes or a binary file object
+        chunk_size: Characters or bytes fed to the parser at a time
+
+    Returns:
+        (root local name, root attributes by local name,
+         namespaces declared on the root by prefix; '' for the default)
+
+    Raises:
+        ET.ParseError: If no root start tag can be read
+    """
+    parser = ET.XMLPullParser(events=('start-ns', 'start'))
+    namespaces = {}
+
+    for chunk in _iter_chunks(source, chunk_size):
+        parser.feed(chunk)
+        for event, value in parser.read_events():
+            if event == 'start-ns':
+                prefix, uri = value
+                namespaces[prefix] = uri
+            else:
+                attributes = {local_name(key): val for key, val in value.attrib.items()}
+                return local_name(value.tag), attributes, namespaces
+
+    parser.close()
+    raise ET.ParseError("no root element found")
+
+
+def collect_texts(
+    source: XMLSource,
+    wanted: Collection[Path] = (),
+    anywhere: Collection[Path] = (),
+    sections: Collection[str] = (),
+    chunk_size: int = XML_CHUNK_SIZE
+) -> Tuple[Dict[Path, Optional[str]], Dict[str, Dict[Path, Optional[str]]]]:
+    """
+    Collect element texts in one pass.
+
+    Args:
+        source: XML as str, bytes or a binary file object
+        wanted: Paths below the root (excluding the root name) whose text
+            is needed; the first occurrence wins
+        anywhere: Path endings whose text is needed wherever they occur,
+            e.g. ('Period', 'From'); the first occurrence wins
+        sections: Local names of elements found anywhere in the document
+            whose descendants' texts are collected by path relative to the
+            first occurrence of the section
+
+    Returns:
+        (texts by wanted path or path ending, {section: {relative path: text}})
+        with only the paths and sections that occur in the document
+
+    Raises:
+        ET.ParseError: If the document is not well-formed
+    """
+    texts = {}
+    section_texts = {}
+    # Depth at which each section's first occurrence started, while open
+    open_sections = {}
+
+    for event, path, elem in iter_xml(source, chunk_size):
+        name = path[-1]
+        if event == 'start':
+            if name in sections and name not in section_texts:
+                section_texts[name] = {}
+                open_sections[name] = len(path)
+            continue
+
+        relative = path[1:]
+        if relative in wanted and relative not in texts:
+            texts[relative] = elem.text
+        for ending in anywhere:
+            if path[-len(ending):] == ending and ending not in texts:
+                texts[ending] = elem.text
+
+        for section, depth in list(open_sections.items()):
+            if len(path) == depth:
+                del open_sections[section]
+            else:
+                section_texts[section].setdefault(path[depth:], elem.text)
+
+    return texts, section_texts
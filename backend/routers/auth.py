@@ -29,7 +29,6 @@ from services.user_service import (get_user_by_email, update_password,
                                    update_user)
 from utils.auth import check_user, get_flow, sign_jwt, sign_temp_2fa_jwt, verify_temp_2fa_jwt
 from utils.fastapi_rate_limiter import rate_limit
-from utils.rate_limiter import limiter
 from utils.router import Router
 from services.audit_log_service import log_login_success, log_logout
 
@@ -16,7 +16,7 @@ from sqlalchemy.orm import Session
 from db.session import get_db
 from services.ai_document_intelligence_service import (
     AIDocumentIntelligenceService, DocumentIntelligenceError,
-    UnsupportedDocumentError)
+    UnsupportedDocumentError, run_analysis)
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +51,7 @@ class BulkAnalysisResponse(BaseModel):
     failed: int
     by_type: dict
     documents: List[dict]
+    timings: Optional[dict] = None
 
 
 class SupportedDocumentsResponse(BaseModel):
@@ -128,8 +129,9 @@ async def analyze_document(
             api_key=api_key
         )
 
-        # Analyze document
-        result = service.analyze_document(
+        # Analyze document off the event loop; it blocks on AI calls and rate limiting
+        result = await run_analysis(
+            service.analyze_document,
             image_bytes=image_bytes,
             document_type=document_type
         )
@@ -196,8 +198,9 @@ async def analyze_and_map_document(
             api_key=api_key
         )
 
-        # Analyze document
-        result = service.analyze_document(
+        # Analyze document off the event loop; it blocks on AI calls and rate limiting
+        result = await run_analysis(
+            service.analyze_document,
             image_bytes=image_bytes,
             document_type=document_type
         )
@@ -284,8 +287,10 @@ async def analyze_multiple_documents(
                 'filename': file.filename
             })
 
-        # Analyze all documents
-        results = service.analyze_multiple_documents(documents)
+        # Analyze all documents concurrently, off the event loop
+        results = await run_analysis(
+            service.analyze_multiple_documents, documents, batch=True
+        )
 
         logger.info(
             f"Analyzed {len(documents)} documents: "
@@ -358,8 +363,9 @@ async def update_profile_from_document(
         if not filing:
             raise HTTPException(status_code=404, detail=f"Filing {filing_id} not found")
 
-        # Analyze document
-        result = doc_service.analyze_document(
+        # Analyze document off the event loop; it blocks on AI calls and rate limiting
+        result = await run_analysis(
+            doc_service.analyze_document,
             image_bytes=image_bytes,
             document_type=document_type
         )
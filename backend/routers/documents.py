@@ -14,8 +14,9 @@ from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from db.session import get_db
+from services.document_archive_jobs import get_archive_job_manager
 from services.document_service import DocumentService
-from services.ai_document_intelligence_service import AIDocumentIntelligenceService
+from services.ai_document_intelligence_service import AIDocumentIntelligenceService, run_analysis
 from core.security import get_current_user
 from database.connection import execute_query
 
@@ -122,13 +123,10 @@ async def process_document_background(document_id: str, s3_key: str, file_name:
 
         try:
             async with asyncio.timeout(30):  # 30 second AI processing timeout
-                loop = asyncio.get_event_loop()
-                analysis_result = await loop.run_in_executor(
-                    None,
-                    lambda: ai_service.analyze_document(
-                        image_bytes=image_bytes,
-                        document_type=None  # Auto-detect
-                    )
+                analysis_result = await run_analysis(
+                    ai_service.analyze_document,
+                    image_bytes=image_bytes,
+                    document_type=None  # Auto-detect
                 )
         except asyncio.TimeoutError:
             raise Exception("AI processing timeout after 30 seconds")
@@ -611,6 +609,53 @@ async def download_all_documents(
         )
 
 
+@router.post("/user/download-all/jobs", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+async def start_download_all_documents_job(
+    current_user = Depends(get_current_user)
+):
+    """
+    Start building a ZIP archive of all user documents in the background
+
+    - Returns a job ID immediately; poll GET /user/download-all/jobs/{job_id}
+    - A build already running for the user is returned instead of starting another
+    """
+    try:
+        user_id_str = str(current_user.id)
+        # Off the event loop: the job state is saved to shared storage
+        job = await asyncio.to_thread(
+            get_archive_job_manager().start, user_id_str, doc_service.create_documents_zip
+        )
+        return job.to_dict()
+
+    except Exception as e:
+        logger.error(f"Error starting document archive job for user {current_user.id}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start document archive: {str(e)}"
+        )
+
+
+@router.get("/user/download-all/jobs/{job_id}", response_model=dict)
+async def get_download_all_documents_job(
+    job_id: str,
+    current_user = Depends(get_current_user)
+):
+    """
+    Get progress of a document archive job
+
+    - progress: percentage of documents processed
+    - result: download URL and archive details once completed
+    """
+    # Jobs started on another instance are loaded from shared storage
+    job = await asyncio.to_thread(get_archive_job_manager().get, job_id, str(current_user.id))
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archive job not found"
+        )
+    return job.to_dict()
+
+
 @router.delete("/user/old", response_model=dict)
 async def delete_old_documents(
     current_user = Depends(get_current_user),
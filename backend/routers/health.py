@@ -54,6 +54,60 @@ async def health_scheduler():
         }
 
 
+@router.get("/db-pool")
+async def health_db_pool():
+    """
+    Database connection pool metrics endpoint
+    Returns pool sizing, checkout counts and wait times
+    """
+    try:
+        from database.connection_pool import get_pool_metrics
+
+        metrics = get_pool_metrics()
+        status = "healthy" if metrics['checkout_timeouts'] == 0 else "degraded"
+        return {
+            "status": status,
+            "metrics": metrics
+        }
+    except Exception as e:
+        logger.error(f"Database pool health check failed: {e}")
+        return {
+            "status": "down",
+            "details": f"Pool error: {str(e)[:100]}",
+            "metrics": {}
+        }
+
+
+@router.get("/session-refresh")
+async def health_session_refresh():
+    """
+    Sliding session refresh metrics endpoint
+    Returns how many token refreshes were issued and avoided
+    """
+    from core.session_refresh import get_session_refresh_metrics
+
+    return {
+        "status": "healthy",
+        "metrics": get_session_refresh_metrics()
+    }
+
+
+@router.get("/rate-limits")
+async def health_rate_limits():
+    """
+    Rate limiter metrics endpoint
+    Returns the counter backend and allowed/rejected counts per policy
+    """
+    from utils.rate_limiter import get_rate_limiter
+
+    limiter = get_rate_limiter()
+    return {
+        "status": "healthy",
+        "backend": type(limiter.backend).__name__,
+        "metrics": limiter.get_metrics()
+    }
+
+
 @router.get("/", response_model=SimpleHealthResponse)
 async def health_check():
     """
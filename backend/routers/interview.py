@@ -462,10 +462,8 @@ async def get_current_question(
         if not current_question_id:
             return {"message": "Interview completed", "current_question": None}
 
-        # Get the question details from the loader
-        from models.question import QuestionLoader
-        question_loader = QuestionLoader()
-        question = question_loader.get_question(current_question_id)
+        # Get the question details from the service's (shared) question graph
+        question = interview_service.question_loader.get_question(current_question_id)
 
         if question:
             return interview_service._format_question(question, session.get("language", "en"))
@@ -17,12 +17,20 @@ from sqlalchemy.orm import Session
 
 from db.session import get_db
 from services.filing_orchestration_service import FilingOrchestrationService
+from services.pdf_generators.pdf_cache import bundle_cache_key, get_pdf_cache
 from services.pdf_generators.unified_pdf_generator import UnifiedPDFGenerator
+from utils.streaming_zip import iter_zip
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/pdf", tags=["PDF Generation"])
 
+# Download filename suffix per PDF type
+PDF_FILENAME_SUFFIXES = {
+    'ech0196': 'ech0196',
+    'traditional': 'official'
+}
+
 
 # ============================================================================
 # Request/Response Models
@@ -112,32 +120,35 @@ def download_pdf(
     Returns:
     - PDF file as application/pdf
     """
+    if pdf_type not in PDF_FILENAME_SUFFIXES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid pdf_type: {pdf_type}. Use 'ech0196' or 'traditional'"
+        )
+
     try:
         generator = UnifiedPDFGenerator()
 
-        # Get filing info for filename
+        # Get filing info for filename and cache key
         filing_service = FilingOrchestrationService(db=db)
         filing = filing_service.get_filing(filing_id)
 
         if not filing:
             raise HTTPException(status_code=404, detail=f"Filing {filing_id} not found")
 
-        # Generate PDF
+        # Generate PDF, unless this version of the filing was generated before
         if pdf_type == 'ech0196':
-            pdf_buffer = generator.generate_ech0196_pdf(filing_id, language, db)
-            filename = f"tax_return_{filing.canton}_{filing.tax_year}_ech0196.pdf"
-        elif pdf_type == 'traditional':
-            pdf_buffer = generator.generate_traditional_pdf(filing_id, language, db)
-            filename = f"tax_return_{filing.canton}_{filing.tax_year}_official.pdf"
+            render = lambda: generator.generate_ech0196_pdf(filing_id, language, db)
         else:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid pdf_type: {pdf_type}. Use 'ech0196' or 'traditional'"
-            )
+            render = lambda: generator.generate_traditional_pdf(filing_id, language, db)
+
+        cache_key = generator.get_cache_key(filing, pdf_type, language)
+        pdf_data = get_pdf_cache().get_or_create(cache_key, lambda: render().getvalue())
+        filename = f"tax_return_{filing.canton}_{filing.tax_year}_{PDF_FILENAME_SUFFIXES[pdf_type]}.pdf"
 
         # Return PDF as download
         return StreamingResponse(
-            pdf_buffer,
+            io.BytesIO(pdf_data),
             media_type="application/pdf",
             headers={
                 "Content-Disposition": f"attachment; filename={filename}"
@@ -151,50 +162,30 @@ def download_pdf(
         raise HTTPException(status_code=500, detail=f"PDF generation failed: {e}")
 
 
-@router.get("/download-both/{filing_id}")
-def download_both_pdfs(
-    filing_id: str,
-    language: str = Query('de', description="Language: de, fr, it, or en"),
-    db: Session = Depends(get_db)
-):
+def _build_filing_zip(filing, pdfs: dict) -> bytes:
     """
-    Generate and return both PDF types as a ZIP archive.
+    Build the ZIP archive of one filing's PDFs with a README.
+
+    Args:
+        filing: TaxFilingSession
+        pdfs: PDF type -> PDF bytes (None for PDFs that failed)
 
     Returns:
-    - ZIP file containing both eCH-0196 and traditional PDFs
+        ZIP archive bytes
     """
     import zipfile
+    from datetime import datetime as dt
 
-    try:
-        generator = UnifiedPDFGenerator()
-
-        # Get filing info
-        filing_service = FilingOrchestrationService(db=db)
-        filing = filing_service.get_filing(filing_id)
-
-        if not filing:
-            raise HTTPException(status_code=404, detail=f"Filing {filing_id} not found")
-
-        # Generate both PDFs
-        pdfs = generator.generate_all_pdfs(filing_id, language, db)
-
-        # Create ZIP file in memory
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-
-            # Add eCH-0196 PDF
-            if pdfs.get('ech0196'):
-                ech_filename = f"tax_return_{filing.canton}_{filing.tax_year}_ech0196.pdf"
-                zip_file.writestr(ech_filename, pdfs['ech0196'].getvalue())
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
 
-            # Add traditional PDF
-            if pdfs.get('traditional'):
-                trad_filename = f"tax_return_{filing.canton}_{filing.tax_year}_official.pdf"
-                zip_file.writestr(trad_filename, pdfs['traditional'].getvalue())
+        for pdf_type, suffix in PDF_FILENAME_SUFFIXES.items():
+            if pdfs.get(pdf_type):
+                filename = f"tax_return_{filing.canton}_{filing.tax_year}_{suffix}.pdf"
+                zip_file.writestr(filename, pdfs[pdf_type])
 
-            # Add README
-            from datetime import datetime as dt
-            readme_content = f"""Swiss Tax Return PDFs
+        # Add README
+        readme_content = f"""Swiss Tax Return PDFs
 
 Canton: {filing.canton}
 Tax Year: {filing.tax_year}
@@ -215,14 +206,63 @@ Files:
 You can submit either PDF to the tax authority.
 The eCH-0196 format is recommended for faster processing.
 """
-            zip_file.writestr('README.txt', readme_content)
+        zip_file.writestr('README.txt', readme_content)
 
-        zip_buffer.seek(0)
+    return zip_buffer.getvalue()
+
+
+@router.get("/download-both/{filing_id}")
+def download_both_pdfs(
+    filing_id: str,
+    language: str = Query('de', description="Language: de, fr, it, or en"),
+    db: Session = Depends(get_db)
+):
+    """
+    Generate and return both PDF types as a ZIP archive.
+
+    Returns:
+    - ZIP file containing both eCH-0196 and traditional PDFs
+    """
+    try:
+        generator = UnifiedPDFGenerator()
+
+        # Get filing info
+        filing_service = FilingOrchestrationService(db=db)
+        filing = filing_service.get_filing(filing_id)
+
+        if not filing:
+            raise HTTPException(status_code=404, detail=f"Filing {filing_id} not found")
+
+        # The ZIP is cached under the keys of the PDFs it contains
+        pdf_cache = get_pdf_cache()
+        filing_data = filing.to_dict()
+        member_keys = {
+            pdf: generator.get_cache_key(filing, pdf, language, filing_data)
+            for pdf in PDF_FILENAME_SUFFIXES
+        }
+        zip_key = bundle_cache_key('download-both', [member_keys[pdf] for pdf in PDF_FILENAME_SUFFIXES])
+
+        zip_data = pdf_cache.get(zip_key)
+        if zip_data is None:
+            pdfs = {pdf: pdf_cache.get(key) for pdf, key in member_keys.items()}
+            if any(data is None for data in pdfs.values()):
+                # Generate both PDFs (reusing the filing loaded above)
+                generated = generator.generate_all_pdfs(filing_id, language, db, filing=filing)
+                for pdf in PDF_FILENAME_SUFFIXES:
+                    if pdfs[pdf] is None and generated.get(pdf):
+                        pdfs[pdf] = generated[pdf].getvalue()
+                        pdf_cache.put(member_keys[pdf], pdfs[pdf])
+
+            zip_data = _build_filing_zip(filing, pdfs)
+
+            # Only complete bundles are cached; a failed PDF is retried next time
+            if all(data is not None for data in pdfs.values()):
+                pdf_cache.put(zip_key, zip_data)
 
         # Return ZIP as download
         filename = f"tax_return_{filing.canton}_{filing.tax_year}.zip"
         return StreamingResponse(
-            zip_buffer,
+            io.BytesIO(zip_data),
             media_type="application/zip",
             headers={
                 "Content-Disposition": f"attachment; filename={filename}"
@@ -256,8 +296,6 @@ def download_all_user_pdfs(
     Returns:
     - ZIP file containing PDFs for all filings
     """
-    import zipfile
-
     try:
         generator = UnifiedPDFGenerator()
 
@@ -279,56 +317,46 @@ def download_all_user_pdfs(
         # Get filing info for each filing
         filing_service = FilingOrchestrationService(db=db)
 
-        # Create ZIP file
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-
-            for filing_id, pdfs in all_pdfs.items():
-                filing = filing_service.get_filing(filing_id)
-                if not filing:
-                    continue
-
-                filing_type = 'primary' if filing.is_primary else 'secondary'
-                prefix = f"{filing.canton}_{filing_type}"
+        # Collect the archive entries; the ZIP itself is streamed to the client
+        entries = []
+        for filing_id, pdfs in all_pdfs.items():
+            filing = filing_service.get_filing(filing_id)
+            if not filing:
+                continue
 
-                # Add eCH-0196 PDF
-                if pdfs.get('ech0196'):
-                    filename = f"{prefix}_ech0196.pdf"
-                    zip_file.writestr(filename, pdfs['ech0196'].getvalue())
+            filing_type = 'primary' if filing.is_primary else 'secondary'
+            prefix = f"{filing.canton}_{filing_type}"
 
-                # Add traditional PDF
-                if pdfs.get('traditional'):
-                    filename = f"{prefix}_official.pdf"
-                    zip_file.writestr(filename, pdfs['traditional'].getvalue())
+            for pdf_type, suffix in PDF_FILENAME_SUFFIXES.items():
+                if pdfs.get(pdf_type):
+                    entries.append((f"{prefix}_{suffix}.pdf", [pdfs[pdf_type].getbuffer()]))
 
-            # Add summary README
-            from datetime import datetime as dt
-            filings = filing_service.get_all_user_filings(user_id, tax_year)
-            readme = f"""Swiss Tax Returns - Tax Year {tax_year}
+        # Add summary README
+        from datetime import datetime as dt
+        filings = filing_service.get_all_user_filings(user_id, tax_year)
+        readme = f"""Swiss Tax Returns - Tax Year {tax_year}
 
 Total Filings: {len(filings)}
 
 Filings:
 """
-            for filing in filings:
-                filing_type = 'Primary' if filing.is_primary else 'Secondary'
-                readme += f"\n- {filing.canton} ({filing_type})"
+        for filing in filings:
+            filing_type = 'Primary' if filing.is_primary else 'Secondary'
+            readme += f"\n- {filing.canton} ({filing_type})"
 
-            readme += f"""
+        readme += f"""
 
 Generated: {dt.now().isoformat()}
 
 Note: If you have properties in multiple cantons, you must submit
 separate tax returns to each canton.
 """
-            zip_file.writestr('README.txt', readme)
-
-        zip_buffer.seek(0)
+        entries.append(('README.txt', [readme.encode('utf-8')]))
 
         # Return ZIP
         filename = f"tax_returns_{tax_year}.zip"
         return StreamingResponse(
-            zip_buffer,
+            iter_zip(entries),
             media_type="application/zip",
             headers={
                 "Content-Disposition": f"attachment; filename={filename}"
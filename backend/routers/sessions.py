@@ -10,6 +10,7 @@ import logging
 from core.security import get_current_user
 from db.session import get_db
 from models.swisstax import User
+from services.session_activity_tracker import get_session_activity_tracker
 from services.session_service import session_service
 from utils.router import Router
 from utils.fastapi_rate_limiter import rate_limit
@@ -286,6 +287,7 @@ async def cleanup_duplicate_sessions(
 
         # Find and remove duplicates
         duplicates_removed = 0
+        revoked_session_ids = []
         for key, group in session_groups.items():
             if len(group) > 1:
                 # Keep the most recent session (first in list, already sorted desc)
@@ -294,10 +296,12 @@ async def cleanup_duplicate_sessions(
                 # Revoke all older duplicate sessions
                 for duplicate in group[1:]:
                     duplicate.revoke()
+                    revoked_session_ids.append(duplicate.session_id)
                     duplicates_removed += 1
                     logger.info(f"Removed duplicate session {duplicate.id} for user {current_user.id}")
 
         db.commit()
+        get_session_activity_tracker().invalidate(*revoked_session_ids)
 
         logger.info(f"Cleaned up {duplicates_removed} duplicate sessions for user {current_user.id}")
 
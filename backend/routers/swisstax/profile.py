@@ -7,6 +7,7 @@ from models.swisstax import User, UserSettings
 from schemas.swisstax.profile import (PersonalInfoUpdate, ProfileResponse,
                                       TaxProfileUpdate)
 from core.security import get_current_user
+from services.user_principal_cache import invalidate_user_principal
 
 router = APIRouter()
 
@@ -37,4 +38,5 @@ async def update_personal(data: PersonalInfoUpdate, current_user: User = Depends
     if data.canton: current_user.canton = data.canton
     if data.municipality: current_user.municipality = data.municipality
     db.commit()
+    invalidate_user_principal(user_id=current_user.id)
     return {"message": "Profile updated successfully"}
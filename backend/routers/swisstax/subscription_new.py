@@ -28,6 +28,7 @@ from services.stripe_service import get_stripe_service
 from services.stripe_mock_service import get_stripe_service as get_mock_stripe_service
 from services.referral_service import ReferralService
 from services.discount_service import DiscountService
+from services.user_principal_cache import invalidate_user_principal
 
 router = APIRouter()
 
@@ -189,6 +190,7 @@ async def create_subscription(
 
         db.add(subscription)
         db.commit()
+        invalidate_user_principal(user_id=current_user.id)
         db.refresh(subscription)
 
         logger.info(f"[create_subscription] Successfully created free subscription for user_id: {current_user.id}, subscription_id: {subscription.id}")
@@ -333,6 +335,7 @@ async def create_subscription(
 
     db.add(subscription)
     db.commit()
+    invalidate_user_principal(user_id=current_user.id)
     db.refresh(subscription)
 
     # ========================================================================
@@ -489,6 +492,7 @@ async def cancel_subscription(
         subscription.canceled_at = datetime.utcnow()
 
     db.commit()
+    invalidate_user_principal(user_id=current_user.id)
     db.refresh(subscription)
 
     return _build_subscription_response(subscription)
@@ -577,6 +581,7 @@ async def switch_subscription_plan(
         )
 
     db.commit()
+    invalidate_user_principal(user_id=current_user.id)
     db.refresh(subscription)
 
     return _build_subscription_response(subscription)
@@ -622,6 +627,7 @@ async def request_pause_subscription(
     subscription.pause_reason = pause_data.reason
 
     db.commit()
+    invalidate_user_principal(user_id=current_user.id)
     db.refresh(subscription)
 
     # TODO: Send notification to support team
@@ -12,6 +12,7 @@ from config import settings
 from db.session import get_db
 from models.swisstax import Subscription, Payment, User
 from services.stripe_service import get_stripe_service
+from services.user_principal_cache import invalidate_user_principal
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -150,6 +151,7 @@ def handle_subscription_created(data: dict, db: Session):
         logger.info(f"Created new subscription {subscription_id}")
 
     db.commit()
+    invalidate_user_principal(user_id=user.id)
 
 
 def handle_subscription_updated(data: dict, db: Session):
@@ -183,6 +185,7 @@ def handle_subscription_updated(data: dict, db: Session):
                 subscription.commitment_start_date = datetime.utcnow()
 
     db.commit()
+    invalidate_user_principal(user_id=subscription.user_id)
     logger.info(f"Subscription {subscription_id} updated successfully")
 
 
@@ -205,6 +208,7 @@ def handle_subscription_deleted(data: dict, db: Session):
     subscription.canceled_at = datetime.utcnow()
 
     db.commit()
+    invalidate_user_principal(user_id=subscription.user_id)
     logger.info(f"Subscription {subscription_id} marked as canceled")
 
 
@@ -279,6 +283,7 @@ def handle_payment_succeeded(data: dict, db: Session):
                 logger.info(f"Subscription {subscription_id} activated after successful payment")
 
     db.commit()
+    invalidate_user_principal(user_id=user.id)
     logger.info(f"Payment record created for user {user.id}")
 
 
@@ -310,6 +315,7 @@ def handle_payment_failed(data: dict, db: Session):
         if subscription:
             subscription.status = 'past_due'
             db.commit()
+            invalidate_user_principal(user_id=user.id)
             logger.info(f"Subscription {subscription_id} marked as past_due")
 
     # TODO: Send email notification about failed payment
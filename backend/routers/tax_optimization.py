@@ -63,6 +63,7 @@ class CantonComparisonResponse(BaseModel):
     comparisons: List[dict]
     best_canton: Optional[str] = None
     max_savings: float
+    municipalities: Optional[List[dict]] = None
 
 
 class OptimizationCategoriesResponse(BaseModel):
@@ -164,6 +165,7 @@ def get_optimization_recommendations(
 def compare_canton_taxes(
     filing_id: str,
     comparison_cantons: Optional[List[str]] = Query(None),
+    include_municipalities: bool = Query(False),
     db: Session = Depends(get_db)
 ):
     """
@@ -173,7 +175,8 @@ def compare_canton_taxes(
 
     Parameters:
     - filing_id: Tax filing session ID
-    - comparison_cantons: Optional list of canton codes to compare
+    - comparison_cantons: Optional list of canton codes to compare (default: all 26)
+    - include_municipalities: Also rank the cheapest municipalities
 
     Returns:
     - Tax comparison across cantons with potential savings from relocation
@@ -198,7 +201,8 @@ def compare_canton_taxes(
         result = optimization_service.compare_cantons(
             filing.to_dict(),
             calculation,
-            comparison_cantons
+            comparison_cantons,
+            include_municipalities=include_municipalities
         )
 
         return CantonComparisonResponse(**result)
@@ -12,10 +12,17 @@ This service uses AI (GPT-4 Vision/Claude) to extract data from tax-related docu
 The service uses OCR and structured extraction to auto-fill tax forms.
 """
 
+import asyncio
 import base64
+import functools
 import io
 import json
 import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from decimal import Decimal
 from pathlib import Path
@@ -36,8 +43,23 @@ try:
 except ImportError:
     openai = None
 
+from services.extraction_cache import (ExtractionCache, content_hash,
+                                       extraction_cache_key,
+                                       get_extraction_cache)
+from utils.shared_state import Lazy
+
 logger = logging.getLogger(__name__)
 
+# Documents analyzed at the same time by analyze_multiple_documents(batch=True)
+DOCUMENT_ANALYSIS_CONCURRENCY = int(os.getenv('DOCUMENT_ANALYSIS_CONCURRENCY', '4'))
+# Vision API calls per minute across the process (0 disables the limit)
+DOCUMENT_ANALYSIS_REQUESTS_PER_MINUTE = int(os.getenv('DOCUMENT_ANALYSIS_REQUESTS_PER_MINUTE', '50'))
+# Threads running analyses for async endpoints. They may sleep waiting for the
+# vision rate limit, so they are kept out of the event loop's default executor
+DOCUMENT_ANALYSIS_WORKERS = int(os.getenv('DOCUMENT_ANALYSIS_WORKERS', '4'))
+# Longest image edge sent to the vision API; providers downscale larger images anyway
+DOCUMENT_ANALYSIS_MAX_IMAGE_DIMENSION = int(os.getenv('DOCUMENT_ANALYSIS_MAX_IMAGE_DIMENSION', '1568'))
+
 
 class DocumentIntelligenceError(Exception):
     """Base exception for document intelligence errors"""
@@ -54,6 +76,62 @@ class ExtractionError(DocumentIntelligenceError):
     pass
 
 
+class VisionRateLimiter:
+    """Token bucket limiting vision API calls; blocks until a call is allowed"""
+
+    def __init__(self, requests_per_minute: int = DOCUMENT_ANALYSIS_REQUESTS_PER_MINUTE):
+        self.requests_per_minute = requests_per_minute
+        self._tokens = float(max(requests_per_minute, 1))
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Wait for a free slot and take it."""
+        if self.requests_per_minute <= 0:
+            return
+
+        rate = self.requests_per_minute / 60.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    float(self.requests_per_minute),
+                    self._tokens + (now - self._updated) * rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / rate
+            time.sleep(wait)
+
+
+# Shared by all service instances: the provider quota is per API key, not per request
+_vision_rate_limiter = VisionRateLimiter()
+
+_analysis_executor = Lazy(lambda: ThreadPoolExecutor(
+    max_workers=DOCUMENT_ANALYSIS_WORKERS, thread_name_prefix='document-analysis-request'
+))
+
+
+async def run_analysis(func, *args, **kwargs):
+    """
+    Run a blocking analysis call from async code on the analysis thread pool.
+
+    Requests beyond DOCUMENT_ANALYSIS_WORKERS queue there instead of
+    occupying the default executor shared with other asyncio.to_thread users.
+
+    Args:
+        func: Blocking callable, e.g. service.analyze_document
+        *args, **kwargs: Its arguments
+
+    Returns:
+        What func returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_analysis_executor.get(), functools.partial(func, *args, **kwargs))
+
+
 class AIDocumentIntelligenceService:
     """
     AI-powered document intelligence for Swiss tax documents.
@@ -128,16 +206,31 @@ class AIDocumentIntelligenceService:
         }
     }
 
-    def __init__(self, ai_provider: str = 'anthropic', api_key: str = None):
+    # Vision models per provider; part of the extraction cache key
+    ANTHROPIC_MODEL = "claude-3-5-sonnet-20241022"
+    OPENAI_MODEL = "gpt-4-vision-preview"
+
+    def __init__(
+        self,
+        ai_provider: str = 'anthropic',
+        api_key: str = None,
+        result_cache: Optional[ExtractionCache] = None,
+        rate_limiter: Optional[VisionRateLimiter] = None
+    ):
         """
         Initialize AI document intelligence service.
 
         Args:
             ai_provider: 'anthropic' (Claude) or 'openai' (GPT-4)
             api_key: API key for chosen provider
+            result_cache: Cache of classifications and extracted fields
+                (defaults to the shared extraction cache)
+            rate_limiter: Limiter for vision API calls (defaults to the shared one)
         """
         self.ai_provider = ai_provider.lower()
         self.api_key = api_key
+        self.result_cache = result_cache if result_cache is not None else get_extraction_cache()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else _vision_rate_limiter
 
         if self.ai_provider == 'anthropic':
             if anthropic is None:
@@ -154,7 +247,8 @@ class AIDocumentIntelligenceService:
         self,
         image_path: Union[str, Path] = None,
         image_bytes: bytes = None,
-        document_type: str = None
+        document_type: str = None,
+        type_hint: str = None
     ) -> Dict[str, Any]:
         """
         Analyze a tax document and extract structured data.
@@ -163,10 +257,16 @@ class AIDocumentIntelligenceService:
             image_path: Path to document image
             image_bytes: Document image as bytes
             document_type: Optional document type hint
+            type_hint: Likely document type (e.g. from the file name); the
+                type is then confirmed in the extraction call instead of a
+                separate classification call
 
         Returns:
-            Dict with extracted data and metadata
+            Dict with extracted data, metadata and per-stage timings in seconds
         """
+        timings = {}
+        started = time.perf_counter()
+
         # Load image
         if image_path:
             with open(image_path, 'rb') as f:
@@ -174,9 +274,42 @@ class AIDocumentIntelligenceService:
         elif image_bytes is None:
             raise ValueError("Must provide either image_path or image_bytes")
 
+        # Results are cached by document content, so re-uploads skip the AI calls
+        document_hash = content_hash(image_bytes)
+        image_bytes = self._prepare_image(image_bytes)
+        timings['prepare'] = time.perf_counter() - started
+
+        extracted_data = None
+
+        if document_type is None and type_hint in self.DOCUMENT_TYPES:
+            # Classification and extraction in one call
+            stage_started = time.perf_counter()
+            extracted_data = self._cached_stage(
+                document_hash,
+                # Not shared with plain extractions: the result carries _document_type
+                f'extraction+verify:{type_hint}',
+                self.DOCUMENT_TYPES[type_hint]['fields'],
+                lambda: self._extract_document_data(image_bytes, type_hint, verify_type=True)
+            )
+            document_type = extracted_data.pop('_document_type', type_hint)
+            timings['extraction'] = time.perf_counter() - stage_started
+
+            if document_type != type_hint:
+                logger.info(f"Document hinted as {type_hint} identified as {document_type}")
+                extracted_data = None
+
         # Detect document type if not provided
         if document_type is None:
-            document_type = self._classify_document(image_bytes)
+            stage_started = time.perf_counter()
+            document_type = self._cached_stage(
+                document_hash,
+                'classification',
+                sorted(self.DOCUMENT_TYPES),
+                lambda: self._classify_document(image_bytes),
+                # 'unknown' may be a bad scan or a failed call; let a re-upload retry
+                cacheable=lambda doc_type: doc_type in self.DOCUMENT_TYPES
+            )
+            timings['classification'] = time.perf_counter() - stage_started
 
         if document_type not in self.DOCUMENT_TYPES:
             raise UnsupportedDocumentError(
@@ -185,10 +318,18 @@ class AIDocumentIntelligenceService:
             )
 
         # Extract data based on document type
-        extracted_data = self._extract_document_data(
-            image_bytes,
-            document_type
-        )
+        if extracted_data is None:
+            stage_started = time.perf_counter()
+            extracted_data = self._cached_stage(
+                document_hash,
+                f'extraction:{document_type}',
+                self.DOCUMENT_TYPES[document_type]['fields'],
+                lambda: self._extract_document_data(image_bytes, document_type)
+            )
+            extracted_data.pop('_document_type', None)
+            timings['extraction'] = timings.get('extraction', 0.0) + time.perf_counter() - stage_started
+
+        timings['total'] = time.perf_counter() - started
 
         return {
             'document_type': document_type,
@@ -196,9 +337,112 @@ class AIDocumentIntelligenceService:
             'extracted_data': extracted_data,
             'confidence': extracted_data.get('_confidence', 0.0),
             'timestamp': datetime.utcnow().isoformat(),
-            'ai_provider': self.ai_provider
+            'ai_provider': self.ai_provider,
+            'timings': timings
         }
 
+    def detect_type_hint(self, filename: Optional[str]) -> Optional[str]:
+        """
+        Guess the document type from a file name without calling the AI.
+
+        Args:
+            filename: Original file name, e.g. 'Lohnausweis_2024.jpg'
+
+        Returns:
+            Document type if exactly one type's keywords match, else None
+        """
+        if not filename:
+            return None
+
+        words = re.findall(r'[^\W_]+', Path(filename).stem.lower())
+        text = ' '.join(words)
+        matches = [
+            doc_type for doc_type, config in self.DOCUMENT_TYPES.items()
+            if any(
+                (' ' in keyword and keyword in text) or keyword in words
+                for keyword in config['keywords']
+            )
+        ]
+        return matches[0] if len(matches) == 1 else None
+
+    def _prepare_image(self, image_bytes: bytes) -> bytes:
+        """
+        Downscale an image larger than DOCUMENT_ANALYSIS_MAX_IMAGE_DIMENSION.
+
+        Args:
+            image_bytes: Document image
+
+        Returns:
+            Smaller re-encoded image, or the original bytes if it is already
+            small enough, not smaller after re-encoding or not an image
+        """
+        try:
+            img = Image.open(io.BytesIO(image_bytes))
+            if max(img.size) <= DOCUMENT_ANALYSIS_MAX_IMAGE_DIMENSION:
+                return image_bytes
+
+            original_size = img.size
+            image_format = 'PNG' if img.format == 'PNG' else 'JPEG'
+            img.thumbnail(
+                (DOCUMENT_ANALYSIS_MAX_IMAGE_DIMENSION, DOCUMENT_ANALYSIS_MAX_IMAGE_DIMENSION),
+                Image.LANCZOS
+            )
+            if image_format == 'JPEG' and img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+
+            buffer = io.BytesIO()
+            if image_format == 'JPEG':
+                img.save(buffer, format='JPEG', quality=85, optimize=True)
+            else:
+                img.save(buffer, format='PNG', optimize=True)
+            prepared = buffer.getvalue()
+        except Exception as e:
+            logger.debug(f"Sending image unchanged, could not downscale: {e}")
+            return image_bytes
+
+        if len(prepared) >= len(image_bytes):
+            return image_bytes
+
+        logger.info(
+            f"Downscaled document image {original_size[0]}x{original_size[1]} to "
+            f"{img.size[0]}x{img.size[1]} ({len(image_bytes)} -> {len(prepared)} bytes)"
+        )
+        return prepared
+
+    def _cached_stage(
+        self,
+        document_hash: str,
+        stage: str,
+        template_version: Any,
+        compute,
+        cacheable=None
+    ):
+        """
+        Return the cached result of an analysis stage, or compute and cache it.
+
+        Args:
+            document_hash: SHA-256 of the document content
+            stage: Stage name, e.g. 'classification'
+            template_version: Prompt inputs the result depends on
+            compute: Produces the result on a miss
+            cacheable: Whether a computed result may be cached (default: always)
+
+        Returns:
+            Stage result
+        """
+        model = self.ANTHROPIC_MODEL if self.ai_provider == 'anthropic' else self.OPENAI_MODEL
+        key = extraction_cache_key(document_hash, stage, f"{self.ai_provider}:{model}", template_version)
+
+        result = self.result_cache.get(key)
+        if result is not None:
+            logger.info(f"Extraction cache hit for {stage}")
+            return result
+
+        result = compute()
+        if cacheable is None or cacheable(result):
+            self.result_cache.put(key, result)
+        return result
+
     def _classify_document(self, image_bytes: bytes) -> str:
         """
         Classify document type using AI vision.
@@ -245,7 +489,8 @@ If the document doesn't match any type, respond with 'unknown'.
     def _extract_document_data(
         self,
         image_bytes: bytes,
-        document_type: str
+        document_type: str,
+        verify_type: bool = False
     ) -> Dict[str, Any]:
         """
         Extract structured data from document.
@@ -253,6 +498,8 @@ If the document doesn't match any type, respond with 'unknown'.
         Args:
             image_bytes: Document image
             document_type: Document type
+            verify_type: Also ask which document type it actually is,
+                returned as '_document_type'
 
         Returns:
             Extracted data dict
@@ -260,6 +507,14 @@ If the document doesn't match any type, respond with 'unknown'.
         doc_config = self.DOCUMENT_TYPES[document_type]
         expected_fields = doc_config['fields']
 
+        type_instruction = ''
+        if verify_type:
+            type_instruction = f"""
+8. Add "_document_type" with the key of the type this document actually is, one of:
+{json.dumps({k: v['name'] for k, v in self.DOCUMENT_TYPES.items()}, indent=2)}
+   or 'unknown' if it matches none of them
+"""
+
         prompt = f"""You are analyzing a {doc_config['name']}.
 
 Extract the following information from this document:
@@ -274,7 +529,7 @@ Important instructions:
 5. If a field is not found, use null
 6. Be precise with decimal numbers
 7. Identify the tax year from the document
-
+{type_instruction}
 Respond with a JSON object containing:
 {{
   "field_name": "extracted_value",
@@ -297,6 +552,9 @@ Respond ONLY with the JSON object, no additional text.
                 extracted_data,
                 expected_fields
             )
+            if verify_type:
+                actual_type = str(extracted_data.get('_document_type') or document_type).strip().lower()
+                validated_data['_document_type'] = actual_type
 
             logger.info(
                 f"Extracted {len(validated_data)} fields from {document_type} "
@@ -326,11 +584,13 @@ Respond ONLY with the JSON object, no additional text.
         # Determine image format
         image_format = self._detect_image_format(image_bytes)
 
+        self.rate_limiter.acquire()
+
         try:
             if self.ai_provider == 'anthropic':
                 # Claude API
                 message = self.client.messages.create(
-                    model="claude-3-5-sonnet-20241022",
+                    model=self.ANTHROPIC_MODEL,
                     max_tokens=2048,
                     messages=[
                         {
@@ -357,7 +617,7 @@ Respond ONLY with the JSON object, no additional text.
             elif self.ai_provider == 'openai':
                 # GPT-4 Vision API
                 response = self.client.chat.completions.create(
-                    model="gpt-4-vision-preview",
+                    model=self.OPENAI_MODEL,
                     messages=[
                         {
                             "role": "user",
@@ -482,17 +742,28 @@ Respond ONLY with the JSON object, no additional text.
 
     def analyze_multiple_documents(
         self,
-        documents: List[Dict[str, Any]]
+        documents: List[Dict[str, Any]],
+        batch: bool = False,
+        max_concurrency: int = DOCUMENT_ANALYSIS_CONCURRENCY
     ) -> Dict[str, Any]:
         """
         Analyze multiple documents and aggregate data.
 
+        In batch mode, documents are analyzed concurrently (vision calls
+        still go through the rate limiter), identical images are analyzed
+        once, and documents whose 'filename' names their type are
+        classified and extracted in a single call.
+
         Args:
             documents: List of documents, each with 'image_path' or 'image_bytes'
+                and optionally 'document_type' and 'filename'
+            batch: Use batch mode
+            max_concurrency: Documents analyzed at the same time in batch mode
 
         Returns:
             Aggregated analysis results
         """
+        started = time.perf_counter()
         results = {
             'total_documents': len(documents),
             'successful': 0,
@@ -501,14 +772,14 @@ Respond ONLY with the JSON object, no additional text.
             'documents': []
         }
 
-        for i, doc in enumerate(documents):
-            try:
-                analysis = self.analyze_document(
-                    image_path=doc.get('image_path'),
-                    image_bytes=doc.get('image_bytes'),
-                    document_type=doc.get('document_type')
-                )
+        if batch:
+            outcomes = self._analyze_batch(documents, max_concurrency)
+        else:
+            outcomes = [self._analyze_one(doc) for doc in documents]
 
+        stage_timings = {}
+        for i, (analysis, error, duplicate_of) in enumerate(outcomes):
+            if error is None:
                 results['successful'] += 1
                 doc_type = analysis['document_type']
 
@@ -516,28 +787,114 @@ Respond ONLY with the JSON object, no additional text.
                     results['by_type'][doc_type] = []
 
                 results['by_type'][doc_type].append(analysis)
-                results['documents'].append({
+                entry = {
                     'index': i,
                     'success': True,
                     'analysis': analysis
-                })
+                }
+                if duplicate_of is not None:
+                    entry['duplicate_of'] = duplicate_of
+                else:
+                    for stage, seconds in analysis.get('timings', {}).items():
+                        stage_timings[stage] = stage_timings.get(stage, 0.0) + seconds
+                results['documents'].append(entry)
 
                 logger.info(
                     f"✓ Document {i+1}/{len(documents)}: {doc_type} "
                     f"(confidence: {analysis['confidence']:.2f})"
                 )
 
-            except Exception as e:
+            else:
                 results['failed'] += 1
                 results['documents'].append({
                     'index': i,
                     'success': False,
-                    'error': str(e)
+                    'error': str(error)
                 })
-                logger.error(f"✗ Document {i+1}/{len(documents)}: {e}")
+                logger.error(f"✗ Document {i+1}/{len(documents)}: {error}")
+
+        # Stage times are summed over documents; wall time shows the gain from concurrency
+        results['timings'] = {
+            'stages': stage_timings,
+            'wall': time.perf_counter() - started
+        }
 
         return results
 
+    def _analyze_one(self, doc: Dict[str, Any], type_hint: str = None):
+        """
+        Analyze one document of a batch without raising.
+
+        Returns:
+            (analysis, error, duplicate_of) with either analysis or error set
+        """
+        try:
+            analysis = self.analyze_document(
+                image_path=doc.get('image_path'),
+                image_bytes=doc.get('image_bytes'),
+                document_type=doc.get('document_type'),
+                type_hint=type_hint
+            )
+            return analysis, None, None
+        except Exception as e:
+            return None, e, None
+
+    def _analyze_batch(self, documents: List[Dict[str, Any]], max_concurrency: int):
+        """
+        Analyze documents concurrently, each distinct image once.
+
+        Args:
+            documents: Documents as for analyze_multiple_documents
+            max_concurrency: Documents analyzed at the same time
+
+        Returns:
+            (analysis, error, duplicate_of) per document, in input order
+        """
+        outcomes = [None] * len(documents)
+        first_index = {}
+        duplicates = {}
+        unique = []
+
+        for i, doc in enumerate(documents):
+            # From the original entry: the path is dropped once the file is read
+            type_hint = self.detect_type_hint(doc.get('filename') or doc.get('image_path'))
+            try:
+                if doc.get('image_bytes') is None and doc.get('image_path'):
+                    with open(doc['image_path'], 'rb') as f:
+                        doc = {**doc, 'image_bytes': f.read(), 'image_path': None}
+                if doc.get('image_bytes') is None:
+                    raise ValueError("Must provide either image_path or image_bytes")
+            except Exception as e:
+                outcomes[i] = (None, e, None)
+                continue
+
+            key = (content_hash(doc['image_bytes']), doc.get('document_type'))
+            if key in first_index:
+                duplicates[i] = first_index[key]
+                continue
+
+            first_index[key] = i
+            unique.append((i, doc, type_hint))
+
+        if unique:
+            workers = max(1, min(max_concurrency, len(unique)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='document-analysis') as executor:
+                futures = [
+                    (i, executor.submit(self._analyze_one, doc, type_hint))
+                    for i, doc, type_hint in unique
+                ]
+                for i, future in futures:
+                    outcomes[i] = future.result()
+
+        for i, original in duplicates.items():
+            analysis, error, _ = outcomes[original]
+            outcomes[i] = (dict(analysis) if analysis is not None else None, error, original)
+
+        if duplicates:
+            logger.info(f"Analyzed {len(unique)} distinct images for {len(documents)} documents")
+
+        return outcomes
+
     def map_to_tax_profile(
         self,
         extracted_data: Dict[str, Any],
@@ -1,7 +1,10 @@
 """AI Document Extraction Service for Swiss Tax Documents"""
 
+import asyncio
+import hashlib
 import json
 import logging
+import os
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from decimal import Decimal
@@ -13,8 +16,10 @@ import boto3
 from openai import OpenAI
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
+from ..utils.concurrency import ConcurrencyLimiter, gather_and_store
 from ..utils.database_transaction import async_transaction_scope, retry_on_deadlock
 from .encryption_service import EncryptionService, SecureDataStore
+from .extraction_cache import extraction_cache_key, get_extraction_cache
 from .file_validation_service import FileValidationService
 
 from ..models.swisstax import (
@@ -29,6 +34,13 @@ from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+# Documents extracted at the same time per user and across the process.
+# OCR and AI calls are blocking and run in worker threads under these limits.
+EXTRACTION_USER_CONCURRENCY = int(os.getenv('EXTRACTION_USER_CONCURRENCY', '4'))
+EXTRACTION_GLOBAL_CONCURRENCY = int(os.getenv('EXTRACTION_GLOBAL_CONCURRENCY', '16'))
+
+_extraction_limiter = ConcurrencyLimiter(EXTRACTION_USER_CONCURRENCY, EXTRACTION_GLOBAL_CONCURRENCY)
+
 
 class ExtractionStatus(str, Enum):
     PENDING = "pending"
@@ -66,6 +78,17 @@ class ExtractionResult:
     metadata: Dict[str, Any]
 
 
+@dataclass
+class DocumentExtractionOutcome:
+    """OCR and AI output for one document, before it is stored"""
+    document: Any
+    document_type: str
+    ocr_text: str
+    extracted_fields: Dict[str, Any]
+    confidence_scores: Dict[str, float]
+    processing_time_ms: int
+
+
 @dataclass
 class ConflictInfo:
     """Information about a data conflict"""
@@ -87,6 +110,7 @@ class AIExtractionService:
         self.encryption_service = EncryptionService()
         self.secure_store = SecureDataStore(self.encryption_service)
         self.file_validator = FileValidationService()
+        self.result_cache = get_extraction_cache()
 
     def _init_openai(self) -> Optional[OpenAI]:
         """Initialize OpenAI client"""
@@ -169,13 +193,22 @@ class AIExtractionService:
             if not documents:
                 raise ValueError("No documents found or access denied")
 
-            # Process each document
-            all_extractions = []
-            for doc in documents:
-                extraction = await self._process_single_document(
-                    doc, session.id, user_context
-                )
-                all_extractions.append(extraction)
+            # Classify documents and load their extraction templates once
+            doc_types = {doc.id: self._classify_document(doc) for doc in documents}
+            templates = self._load_templates(set(doc_types.values()))
+
+            # Run OCR and AI extraction for all documents concurrently, then
+            # store the results in document order
+            all_extractions = await gather_and_store(
+                (
+                    self._extract_document(
+                        doc, doc_types[doc.id], templates.get(doc_types[doc.id]), user_id, user_context
+                    )
+                    for doc in documents
+                ),
+                store=lambda outcome: self._store_extraction(outcome, session.id),
+                commit=self.db.commit
+            )
 
             # Merge and reconcile results
             merged_data = self._merge_extractions(all_extractions)
@@ -233,41 +266,46 @@ class AIExtractionService:
             self.db.commit()
             raise
 
-    async def _process_single_document(
+    def _load_templates(self, doc_types: set) -> Dict[str, AIExtractionTemplate]:
+        """Load the active extraction template of each document type"""
+        templates = {}
+        for template in self.db.query(AIExtractionTemplate).filter(
+            AIExtractionTemplate.document_type.in_(doc_types),
+            AIExtractionTemplate.is_active == True
+        ).all():
+            templates.setdefault(template.document_type, template)
+        return templates
+
+    async def _extract_document(
         self,
         document: Document,
-        session_id: str,
+        doc_type: str,
+        template: Optional[AIExtractionTemplate],
+        user_id: str,
         user_context: Dict[str, Any]
-    ) -> DocumentExtraction:
-        """Process a single document"""
-        start_time = datetime.utcnow()
-
-        # Determine document type
-        doc_type = self._classify_document(document)
-
-        # Get extraction template
-        template = self.db.query(AIExtractionTemplate).filter_by(
-            document_type=doc_type,
-            is_active=True
-        ).first()
-
+    ) -> DocumentExtractionOutcome:
+        """Run OCR and AI extraction for a single document (no database access)"""
         if not template:
             logger.warning(f"No template found for document type: {doc_type}")
             template = self._get_default_template()
 
-        # Extract text using OCR
-        ocr_text = await self._extract_text_ocr(document)
+        # Wait for a per-user slot before taking a global one
+        async with _extraction_limiter.slot(user_id):
+            start_time = datetime.utcnow()
 
-        # Build AI prompt
-        prompt = self._build_extraction_prompt(
-            ocr_text,
-            template,
-            user_context,
-            doc_type
-        )
+            # Extract text using OCR
+            ocr_text = await self._extract_text_ocr(document)
+
+            # Build AI prompt
+            prompt = self._build_extraction_prompt(
+                ocr_text,
+                template,
+                user_context,
+                doc_type
+            )
 
-        # Call AI for extraction
-        extracted_fields = await self._call_ai_extraction(prompt)
+            # Call AI for extraction
+            extracted_fields = await self._call_ai_extraction(prompt)
 
         # Validate extraction
         validated_fields = self._validate_extraction(
@@ -275,33 +313,45 @@ class AIExtractionService:
             template.validation_rules if template else {}
         )
 
-        # Calculate confidence scores
-        confidence_scores = self._calculate_field_confidence(validated_fields)
+        return DocumentExtractionOutcome(
+            document=document,
+            document_type=doc_type,
+            ocr_text=ocr_text,
+            extracted_fields=validated_fields,
+            confidence_scores=self._calculate_field_confidence(validated_fields),
+            processing_time_ms=int(
+                (datetime.utcnow() - start_time).total_seconds() * 1000
+            )
+        )
+
+    def _store_extraction(
+        self,
+        outcome: DocumentExtractionOutcome,
+        session_id: str
+    ) -> DocumentExtraction:
+        """Add the extraction record and update the document (committed by the caller)"""
+        document = outcome.document
+        confidence_scores = outcome.confidence_scores
 
         # Create extraction record
         extraction = DocumentExtraction(
             document_id=document.id,
             extraction_session_id=session_id,
-            document_type=doc_type,
-            extracted_fields=validated_fields,
+            document_type=outcome.document_type,
+            extracted_fields=outcome.extracted_fields,
             confidence_scores=confidence_scores,
-            page_references=self._extract_page_references(ocr_text),
+            page_references=self._extract_page_references(outcome.ocr_text),
             ai_model_version=settings.AI_MODEL_VERSION,
             extraction_method="openai" if self.openai_client else "textract",
-            processing_time_ms=int(
-                (datetime.utcnow() - start_time).total_seconds() * 1000
-            ),
-            ocr_text=ocr_text[:10000]  # Store first 10k chars
+            processing_time_ms=outcome.processing_time_ms,
+            ocr_text=outcome.ocr_text[:10000]  # Store first 10k chars
         )
-
         self.db.add(extraction)
-        self.db.commit()
 
         # Update document metadata
         document.ai_processed = True
         document.extraction_confidence = sum(confidence_scores.values()) / len(confidence_scores) if confidence_scores else 0
-        document.extracted_metadata = validated_fields
-        self.db.commit()
+        document.extracted_metadata = outcome.extracted_fields
 
         return extraction
 
@@ -340,15 +390,26 @@ class AIExtractionService:
         try:
             # Download document from S3
             s3_key = document.s3_key or document.file_url
+            s3_object = await asyncio.to_thread(
+                self.s3_client.get_object,
+                Bucket=settings.S3_BUCKET_NAME,
+                Key=s3_key
+            )
+            content = await asyncio.to_thread(s3_object['Body'].read)
 
-            # Call Textract
-            response = self.textract_client.detect_document_text(
-                Document={
-                    'S3Object': {
-                        'Bucket': settings.S3_BUCKET_NAME,
-                        'Name': s3_key
-                    }
-                }
+            # The same file uploaded again reuses its OCR text
+            cache_key = extraction_cache_key(
+                self.file_validator.calculate_file_hash(content), 'ocr', 'textract:detect_document_text'
+            )
+            cached_text = self.result_cache.get(cache_key)
+            if cached_text is not None:
+                logger.info(f"OCR cache hit for document {document.id}")
+                return cached_text
+
+            # Call Textract (blocking client, run off the event loop)
+            response = await asyncio.to_thread(
+                self.textract_client.detect_document_text,
+                Document={'Bytes': content}
             )
 
             # Extract text from response
@@ -357,7 +418,9 @@ class AIExtractionService:
                 if block['BlockType'] == 'LINE':
                     text_lines.append(block.get('Text', ''))
 
-            return '\n'.join(text_lines)
+            ocr_text = '\n'.join(text_lines)
+            self.result_cache.put(cache_key, ocr_text)
+            return ocr_text
 
         except Exception as e:
             logger.error(f"OCR extraction failed: {e}")
@@ -421,8 +484,18 @@ Return only valid JSON, no explanations."""
             # Fallback to regex extraction
             return self._fallback_extraction(prompt)
 
+        # The prompt holds the OCR text and user context, so it identifies the result
+        cache_key = extraction_cache_key(
+            hashlib.sha256(prompt.encode('utf-8')).hexdigest(), 'fields', settings.AI_MODEL
+        )
+        cached_fields = self.result_cache.get(cache_key)
+        if cached_fields is not None:
+            return cached_fields
+
         try:
-            response = self.openai_client.chat.completions.create(
+            # Blocking client, run off the event loop
+            response = await asyncio.to_thread(
+                self.openai_client.chat.completions.create,
                 model=settings.AI_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a Swiss tax document extraction expert. Return only valid JSON."},
@@ -433,7 +506,9 @@ Return only valid JSON, no explanations."""
             )
 
             content = response.choices[0].message.content
-            return json.loads(content).get('extracted_fields', {})
+            extracted_fields = json.loads(content).get('extracted_fields', {})
+            self.result_cache.put(cache_key, extracted_fields)
+            return extracted_fields
 
         except Exception as e:
             logger.error(f"AI extraction failed: {e}")
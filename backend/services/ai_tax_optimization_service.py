@@ -21,6 +21,8 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
+from services.canton_comparison_service import CantonComparisonService, ComparisonProfile
+
 try:
     import anthropic
 except ImportError:
@@ -502,40 +504,66 @@ Respond ONLY with the JSON object, no additional text.
         self,
         filing_data: Dict[str, Any],
         calculation_data: Dict[str, Any],
-        comparison_cantons: List[str] = None
+        comparison_cantons: List[str] = None,
+        include_municipalities: bool = False
     ) -> Dict[str, Any]:
         """
         Compare tax burden across different Swiss cantons.
 
+        The taxable income, family situation, denomination and net wealth of
+        the filing are kept; only the place of residence changes.
+
         Args:
             filing_data: Current filing data
             calculation_data: Current tax calculation
-            comparison_cantons: Optional list of cantons to compare
+            comparison_cantons: Optional list of cantons to compare (default: all 26)
+            include_municipalities: Also rank individual municipalities
 
         Returns:
             Canton comparison analysis
         """
-        if comparison_cantons is None:
-            # Compare with major cantons
-            comparison_cantons = ['ZH', 'GE', 'BS', 'VD', 'BE', 'ZG', 'SZ', 'LU']
-
         current_canton = filing_data.get('canton')
         current_tax = calculation_data.get('total_tax', 0)
+        taxable_income = calculation_data.get('taxable_income')
+
+        if not current_canton or taxable_income is None:
+            # Nothing to recompute without a residence and an income
+            return {
+                'current_canton': current_canton,
+                'current_total_tax': current_tax,
+                'comparisons': [],
+                'best_canton': None,
+                'max_savings': 0
+            }
+
+        profile = filing_data.get('profile') or {}
+        denomination = profile.get('religious_denomination') or (
+            'reformed' if profile.get('church_member') else 'none'
+        )
 
-        # This would call the enhanced_tax_calculation_service for each canton
-        # For now, return structure
-        comparisons = {
-            'current_canton': current_canton,
-            'current_total_tax': current_tax,
-            'comparisons': [],
-            'best_canton': None,
-            'max_savings': 0
-        }
+        comparison_profile = ComparisonProfile(
+            taxable_income=Decimal(str(taxable_income)),
+            marital_status=profile.get('marital_status') or 'single',
+            num_children=int(profile.get('num_children') or 0),
+            denomination=denomination,
+            net_wealth=Decimal(str(profile.get('net_wealth', 0) or 0))
+        )
 
-        # TODO: Implement actual canton comparison
-        # Would need to recalculate taxes for same income in different cantons
+        # Filings without a year are compared with the engine's own tax year
+        tax_year = filing_data.get('tax_year')
+        comparison_service = (
+            CantonComparisonService(tax_year=int(tax_year)) if tax_year else CantonComparisonService()
+        )
+        result = comparison_service.compare(
+            comparison_profile,
+            current_canton=current_canton,
+            current_municipality=profile.get('municipality'),
+            cantons=comparison_cantons,
+            include_municipalities=include_municipalities
+        )
+        result['reported_total_tax'] = current_tax
 
-        return comparisons
+        return result
 
 
 def main():  # pragma: no cover
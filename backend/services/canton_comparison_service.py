@@ -0,0 +1,250 @@
+"""
+Canton Comparison Service
+
+Recomputes the tax burden of one taxpayer profile in every Swiss canton
+(and optionally every municipality) and ranks the results.
+
+The burden per location is federal + cantonal + municipal + church +
+wealth tax. Everything that depends only on the canton (cantonal tax,
+cantonal wealth tax base, church tax configuration) is computed once per
+canton with the shared calculators; municipalities then only differ by
+their multiplier and church rate, which come from the in-memory
+municipality index and church tax rate table. No database queries are
+made, so comparing all 26 cantons takes a few milliseconds.
+
+Municipal tax follows the convention of the tax calculation services:
+cantonal tax × municipal multiplier.
+"""
+
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from services.canton_tax_calculators import CANTON_CALCULATORS, get_canton_calculator
+from services.church_tax_rate_table import ChurchTaxRateTable, get_church_tax_rate_table
+from services.federal_tax_tariff import get_federal_tax_tariff
+from services.municipality_index import Municipality, get_municipality_index
+from services.wealth_tax_calculators import get_wealth_tax_calculator
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal('0.01')
+
+
+@dataclass
+class ComparisonProfile:
+    """Taxpayer profile that stays the same when moving between cantons"""
+    taxable_income: Decimal
+    marital_status: str = 'single'
+    num_children: int = 0
+    denomination: str = 'none'
+    net_wealth: Decimal = Decimal('0')
+
+
+@dataclass
+class _CantonBase:
+    """Per-canton amounts shared by all municipalities of the canton"""
+    canton: str
+    cantonal_tax: Decimal
+    wealth_base_tax: Decimal
+    wealth_has_municipal_multiplier: bool
+    church_config: Optional[Dict[str, Any]]
+
+
+class CantonComparisonService:
+    """Ranks the tax burden of a profile across cantons and municipalities"""
+
+    def __init__(self, tax_year: int = 2024, church_tax_year: Optional[int] = None):
+        """
+        Initialize the comparison service.
+
+        Args:
+            tax_year: Tax year for income and wealth tax
+            church_tax_year: Tax year of the church tax tables (default: tax_year)
+        """
+        self.tax_year = tax_year
+        self.church_tax_year = church_tax_year or tax_year
+
+    def compare(
+        self,
+        profile: ComparisonProfile,
+        current_canton: str,
+        current_municipality: Optional[str] = None,
+        cantons: Optional[List[str]] = None,
+        include_municipalities: bool = False,
+        municipality_limit: int = 20
+    ) -> Dict[str, Any]:
+        """
+        Compare the tax burden of a profile across cantons.
+
+        Each canton is evaluated at a typical municipality (the one with the
+        median multiplier), except the current canton, which uses the
+        taxpayer's own municipality when it is known.
+
+        Args:
+            profile: Taxpayer profile
+            current_canton: Canton of residence
+            current_municipality: Municipality of residence (optional)
+            cantons: Cantons to compare (default: all 26)
+            include_municipalities: Also rank individual municipalities
+            municipality_limit: Number of municipalities to return
+
+        Returns:
+            Dictionary with the current burden, ranked canton comparisons,
+            best canton, maximum savings and (optionally) ranked municipalities
+        """
+        current_canton = (current_canton or '').upper()
+        cantons = [canton.upper() for canton in (cantons or CANTON_CALCULATORS)]
+        if current_canton and current_canton not in cantons:
+            cantons.append(current_canton)
+
+        index = get_municipality_index(self.tax_year)
+        church_tables = get_church_tax_rate_table(self.church_tax_year)
+        federal_tax = self._federal_tax(profile)
+
+        bases = {}
+        for canton in cantons:
+            try:
+                bases[canton] = self._canton_base(canton, profile, church_tables)
+            except ValueError as e:
+                logger.warning(f"Skipping canton {canton} in comparison: {e}")
+
+        rows = []
+        for canton, base in bases.items():
+            if canton == current_canton and index and current_municipality:
+                municipality = index.find(canton, current_municipality)
+            else:
+                municipality = None
+            if municipality is None and index:
+                municipality = self._median_municipality(index.get_canton_municipalities(canton))
+            rows.append(self._burden(base, municipality, federal_tax, profile, church_tables))
+
+        current = next((row for row in rows if row['canton'] == current_canton), None)
+        current_total = current['total_tax'] if current else 0.0
+
+        rows = self._rank(rows, current_total)
+        best = rows[0] if rows else None
+
+        result = {
+            'current_canton': current_canton,
+            'current_municipality': current['municipality'] if current else None,
+            'current_total_tax': current_total,
+            'comparisons': rows,
+            'best_canton': best['canton'] if best else None,
+            'max_savings': max(best['savings'], 0.0) if best else 0.0,
+            'tax_year': self.tax_year
+        }
+
+        if include_municipalities:
+            municipality_rows = []
+            if index:
+                for base in bases.values():
+                    for municipality in index.get_canton_municipalities(base.canton):
+                        municipality_rows.append(
+                            self._burden(base, municipality, federal_tax, profile, church_tables)
+                        )
+            result['municipalities'] = self._rank(municipality_rows, current_total)[:municipality_limit]
+
+        return result
+
+    def _federal_tax(self, profile: ComparisonProfile) -> Decimal:
+        """Federal tax does not depend on the place of residence."""
+        if profile.taxable_income <= 0:
+            return Decimal('0')
+        return get_federal_tax_tariff(self.tax_year).calculate(
+            profile.taxable_income, profile.marital_status
+        )
+
+    def _canton_base(
+        self,
+        canton: str,
+        profile: ComparisonProfile,
+        church_tables: Optional[ChurchTaxRateTable]
+    ) -> _CantonBase:
+        """Compute the amounts that all municipalities of a canton share."""
+        calculator = get_canton_calculator(canton, self.tax_year)
+        cantonal_tax = calculator.calculate_many(
+            [profile.taxable_income], profile.marital_status, profile.num_children
+        )[0]
+
+        wealth_base_tax = Decimal('0')
+        wealth_has_municipal_multiplier = False
+        if profile.net_wealth > 0:
+            wealth_calculator = get_wealth_tax_calculator(canton, self.tax_year)
+            wealth_base_tax = wealth_calculator.calculate(
+                profile.net_wealth, profile.marital_status
+            )['canton_wealth_tax']
+            wealth_has_municipal_multiplier = wealth_calculator.has_municipal_multiplier
+
+        church_config = None
+        if church_tables and profile.denomination != 'none':
+            church_config = church_tables.get_config(canton)
+
+        return _CantonBase(
+            canton=canton,
+            cantonal_tax=cantonal_tax,
+            wealth_base_tax=wealth_base_tax,
+            wealth_has_municipal_multiplier=wealth_has_municipal_multiplier,
+            church_config=church_config
+        )
+
+    @staticmethod
+    def _median_municipality(municipalities: List[Municipality]) -> Optional[Municipality]:
+        """Pick the municipality with the median multiplier as the canton's typical case."""
+        if not municipalities:
+            return None
+        ordered = sorted(municipalities, key=lambda municipality: municipality.tax_multiplier)
+        return ordered[(len(ordered) - 1) // 2]
+
+    def _burden(
+        self,
+        base: _CantonBase,
+        municipality: Optional[Municipality],
+        federal_tax: Decimal,
+        profile: ComparisonProfile,
+        church_tables: Optional[ChurchTaxRateTable]
+    ) -> Dict[str, Any]:
+        """Total tax burden for one municipality (or the canton without one)."""
+        multiplier = municipality.tax_multiplier if municipality else Decimal('1.0')
+        municipal_tax = base.cantonal_tax * multiplier
+
+        church_tax = Decimal('0')
+        config = base.church_config
+        if config and config['has_church_tax'] and profile.denomination in config['recognized_denominations']:
+            rate = church_tables.get_rate(
+                base.canton, profile.denomination, municipality.id if municipality else None
+            )
+            if rate:
+                church_tax = base.cantonal_tax * Decimal(str(rate['rate_percentage']))
+
+        wealth_tax = base.wealth_base_tax
+        if base.wealth_has_municipal_multiplier and municipality:
+            wealth_tax += base.wealth_base_tax * multiplier
+
+        total_tax = federal_tax + base.cantonal_tax + municipal_tax + church_tax + wealth_tax
+
+        return {
+            'canton': base.canton,
+            'municipality': municipality.name if municipality else None,
+            'municipality_id': municipality.id if municipality else None,
+            'municipal_multiplier': float(multiplier),
+            'federal_tax': float(federal_tax.quantize(CENT)),
+            'cantonal_tax': float(base.cantonal_tax.quantize(CENT)),
+            'municipal_tax': float(municipal_tax.quantize(CENT)),
+            'church_tax': float(church_tax.quantize(CENT)),
+            'wealth_tax': float(wealth_tax.quantize(CENT)),
+            'total_tax': float(total_tax.quantize(CENT))
+        }
+
+    @staticmethod
+    def _rank(rows: List[Dict[str, Any]], current_total: float) -> List[Dict[str, Any]]:
+        """Sort by total tax and add rank and savings against the current burden."""
+        rows = sorted(rows, key=lambda row: (row['total_tax'], row['canton'], row['municipality'] or ''))
+        for rank, row in enumerate(rows, start=1):
+            row['rank'] = rank
+            row['savings'] = round(current_total - row['total_tax'], 2)
+            row['savings_percentage'] = (
+                round(row['savings'] / current_total * 100, 2) if current_total else 0.0
+            )
+        return rows
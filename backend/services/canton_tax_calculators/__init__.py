@@ -3,8 +3,15 @@ Canton Tax Calculators Package
 
 This package contains tax calculation engines for all 26 Swiss cantons.
 Each canton has its own progressive tax rate system and deduction rules.
+
+Calculators are stateless after construction, so one instance per
+(canton, tax year) is built once and shared process-wide.
 """
 
+from typing import Iterable, Tuple
+
+from utils.shared_state import LazyMap
+
 from .aargau import AargauTaxCalculator
 from .appenzell_ausserrhoden import AppenzellAusserrhodenTaxCalculator
 from .appenzell_innerrhoden import AppenzellInnerrhodenTaxCalculator
@@ -64,9 +71,27 @@ CANTON_CALCULATORS = {
 }
 
 
+def _build_canton_calculator(key: Tuple[str, int]) -> CantonTaxCalculator:
+    """Instantiate a calculator class with the constructor signature it defines."""
+    canton_code, tax_year = key
+    calculator_class = CANTON_CALCULATORS[canton_code]
+    # Calculators inheriting the base constructor need the canton code;
+    # canton-specific constructors take the tax year only
+    if calculator_class.__init__ is CantonTaxCalculator.__init__:
+        return calculator_class(canton_code, tax_year)
+    return calculator_class(tax_year)
+
+
+# Process-wide registry of calculator instances per (canton code, tax year)
+_calculators: LazyMap[Tuple[str, int], CantonTaxCalculator] = LazyMap(_build_canton_calculator)
+
+
 def get_canton_calculator(canton_code: str, tax_year: int) -> CantonTaxCalculator:
     """
-    Get calculator instance for specified canton.
+    Get the shared calculator instance for specified canton.
+
+    Instances are built once per (canton, tax year) and must be treated
+    as read-only by callers.
 
     Args:
         canton_code: Canton code (e.g., 'ZH', 'BE', 'GE')
@@ -78,21 +103,40 @@ def get_canton_calculator(canton_code: str, tax_year: int) -> CantonTaxCalculato
     Raises:
         ValueError: If canton code is invalid
     """
-    calculator_class = CANTON_CALCULATORS.get(canton_code)
-
-    if not calculator_class:
+    if canton_code not in CANTON_CALCULATORS:
         raise ValueError(f"No calculator available for canton {canton_code}")
 
-    # Try to instantiate with tax_year only (for custom calculators)
-    # If that fails, use canton_code and tax_year (for base class)
-    try:
-        return calculator_class(tax_year)
-    except TypeError:
-        return calculator_class(canton_code, tax_year)
+    return _calculators.get((canton_code, tax_year))
+
+
+def warm_up_canton_calculators(tax_years: Iterable[int]) -> int:
+    """
+    Build all canton calculators and their common batch plans ahead of traffic.
+
+    Args:
+        tax_years: Tax years to prepare
+
+    Returns:
+        Number of calculators in the registry
+    """
+    for tax_year in tax_years:
+        for canton_code in CANTON_CALCULATORS:
+            calculator = get_canton_calculator(canton_code, tax_year)
+            for marital_status in ('single', 'married'):
+                calculator._get_batch_plan(marital_status, 0)
+
+    return len(_calculators)
+
+
+def clear_canton_calculator_cache() -> None:
+    """Drop all cached calculator instances (e.g. after tariff data changes or in tests)."""
+    _calculators.clear()
 
 
 __all__ = [
     'CantonTaxCalculator',
     'get_canton_calculator',
+    'warm_up_canton_calculators',
+    'clear_canton_calculator_cache',
     'CANTON_CALCULATORS'
 ]
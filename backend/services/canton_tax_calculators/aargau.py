@@ -19,7 +19,7 @@ Reference:
 from decimal import Decimal
 from typing import Dict, List
 
-from .base import CantonTaxCalculator, TaxBracket
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule, TaxBracket
 
 
 class AargauTaxCalculator(CantonTaxCalculator):
@@ -254,6 +254,14 @@ class AargauTaxCalculator(CantonTaxCalculator):
         # Ensure non-negative
         return max(cantonal_tax, Decimal('0'))
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate(): simple tax × canton multiplier, then family adjustments."""
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets['single'])
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_tax_brackets(brackets),
+            tax_factor=self._apply_family_adjustments(self.CANTON_MULTIPLIER, num_children)
+        )
+
     def _apply_family_adjustments(self, base_tax: Decimal, num_children: int) -> Decimal:
         """
         Aargau provides tax relief for families with children.
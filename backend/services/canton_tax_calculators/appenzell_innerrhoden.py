@@ -7,7 +7,7 @@ Municipalities: 5 districts (Bezirke)
 """
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 class AppenzellInnerrhodenTaxCalculator(CantonTaxCalculator):
     CANTON_CODE = "AI"
@@ -126,6 +126,15 @@ class AppenzellInnerrhodenTaxCalculator(CantonTaxCalculator):
             'canton_multiplier': self.CANTON_MULTIPLIER
         }
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate(): simple tax × canton multiplier."""
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets['single'])
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(brackets, Decimal('200000'), Decimal('0.08')),
+            tax_factor=self.CANTON_MULTIPLIER,
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single',
                                    num_children: int = 0, canton_multiplier: Decimal = None,
                                    municipal_multiplier: Decimal = Decimal('0.56')) -> Dict[str, Decimal]:
@@ -7,11 +7,26 @@ Each canton inherits from this and implements canton-specific logic.
 
 import logging
 from abc import ABC, abstractmethod
-from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+CENT = Decimal('0.01')
+
+
+def round_to_cents(amounts: np.ndarray) -> List[Decimal]:
+    """
+    Round float amounts to Decimal cents like Decimal.quantize (half-even).
+
+    Float noise is snapped first so exact half-cent ties round the same way
+    the Decimal path does; the shortest repr keeps 0.1 as Decimal('0.10').
+    """
+    cents = np.rint(np.round(np.asarray(amounts, dtype=float) * 100, 6)) / 100
+    return [Decimal(repr(amount)).quantize(CENT, rounding=ROUND_HALF_EVEN) for amount in cents.tolist()]
+
 
 class TaxBracket:
     """Represents a single tax bracket"""
@@ -42,6 +57,139 @@ class TaxBracket:
         return self.fixed_amount + (bracket_income * self.rate)
 
 
+class CompiledTaxSchedule:
+    """
+    Piecewise-linear tax schedule compiled into NumPy arrays.
+
+    Segment ``i`` covers incomes in ``(upper_bounds[i-1], upper_bounds[i]]`` and
+    its tax is ``intercepts[i] + slopes[i] * income``. A single
+    ``searchsorted`` locates the segment for every income at once.
+    """
+
+    def __init__(self, segments: List[Tuple[Decimal, Decimal, Decimal]]):
+        """
+        Args:
+            segments: Ascending (upper_bound, intercept, slope) tuples; the
+                last upper bound must be Decimal('inf')
+        """
+        if not segments or segments[-1][0] != Decimal('inf'):
+            raise ValueError("Compiled schedule must end with an unbounded segment")
+
+        self.upper_bounds = np.array([float(upper) for upper, _, _ in segments])
+        self.intercepts = np.array([float(intercept) for _, intercept, _ in segments])
+        self.slopes = np.array([float(slope) for _, _, slope in segments])
+
+    @classmethod
+    def from_tax_brackets(cls, brackets: List[TaxBracket]) -> 'CompiledTaxSchedule':
+        """
+        Compile TaxBracket lists evaluated like CantonTaxCalculator._apply_progressive_rates.
+
+        The highest bracket whose min_income is exceeded determines the tax.
+        """
+        segments = []
+        previous_max = None
+
+        for index, bracket in enumerate(brackets):
+            # Income between the previous cap and this bracket's start stays flat
+            if previous_max is not None and previous_max < bracket.min_income:
+                segments.append((bracket.min_income, segments[-1][1] + segments[-1][2] * previous_max, Decimal('0')))
+
+            if index == 0:
+                segments.append((bracket.min_income, Decimal('0'), Decimal('0')))
+
+            next_min = brackets[index + 1].min_income if index + 1 < len(brackets) else Decimal('inf')
+            upper = min(bracket.max_income, next_min) if bracket.max_income else next_min
+            segments.append((upper, bracket.fixed_amount - bracket.min_income * bracket.rate, bracket.rate))
+            previous_max = upper
+
+        if segments[-1][0] != Decimal('inf'):
+            segments.append((Decimal('inf'), segments[-1][1] + segments[-1][2] * segments[-1][0], Decimal('0')))
+
+        return cls(segments)
+
+    @classmethod
+    def from_marginal_rates(
+        cls,
+        brackets: List[Tuple[Decimal, Decimal]],
+        flat_threshold: Optional[Decimal] = None,
+        flat_rate: Optional[Decimal] = None
+    ) -> 'CompiledTaxSchedule':
+        """
+        Compile (upper_limit, marginal_rate) brackets starting at zero income.
+
+        Args:
+            brackets: Ascending (upper_limit, rate) tuples
+            flat_threshold: Income above which flat_rate applies to the entire income
+            flat_rate: Flat rate used above flat_threshold
+        """
+        segments = []
+        cumulative_tax = Decimal('0')
+        previous_limit = Decimal('0')
+        cap = flat_threshold if flat_threshold is not None else Decimal('inf')
+
+        for upper_limit, rate in brackets:
+            upper_limit = min(upper_limit, cap)
+            if upper_limit <= previous_limit:
+                continue
+
+            segments.append((upper_limit, cumulative_tax - previous_limit * rate, rate))
+            if upper_limit != Decimal('inf'):
+                cumulative_tax += (upper_limit - previous_limit) * rate
+            previous_limit = upper_limit
+
+        if flat_threshold is not None:
+            segments.append((Decimal('inf'), Decimal('0'), flat_rate))
+        elif not segments or segments[-1][0] != Decimal('inf'):
+            # Income above the last bracket is not taxed further
+            segments.append((Decimal('inf'), cumulative_tax, Decimal('0')))
+
+        return cls(segments)
+
+    @classmethod
+    def from_flat_rates(cls, brackets: List[Tuple[Decimal, Decimal]]) -> 'CompiledTaxSchedule':
+        """Compile (upper_limit, rate) brackets where the rate applies to the entire income."""
+        segments = [(upper_limit, Decimal('0'), rate) for upper_limit, rate in brackets]
+        if segments[-1][0] != Decimal('inf'):
+            segments.append((Decimal('inf'), Decimal('0'), Decimal('0')))
+        return cls(segments)
+
+    def evaluate(self, incomes: np.ndarray) -> np.ndarray:
+        """Evaluate the schedule for an array of incomes."""
+        index = np.searchsorted(self.upper_bounds, incomes, side='left')
+        return self.intercepts[index] + self.slopes[index] * incomes
+
+
+class BatchTaxPlan:
+    """
+    Vectorized description of a canton's tax for one (marital status, children) group.
+
+    cantonal_tax = schedule(income × income_scale ÷ income_divisor), optionally
+    rounded to cents like the scalar Decimal path, then × tax_factor.
+    """
+
+    def __init__(
+        self,
+        schedule: CompiledTaxSchedule,
+        income_scale: Decimal = Decimal('1'),
+        income_divisor: Decimal = Decimal('1'),
+        tax_factor: Decimal = Decimal('1'),
+        round_simple_tax: bool = False
+    ):
+        self.schedule = schedule
+        self.income_scale = float(income_scale)
+        self.income_divisor = float(income_divisor)
+        self.tax_factor = float(tax_factor)
+        self.round_simple_tax = round_simple_tax
+
+    def evaluate(self, incomes: np.ndarray) -> np.ndarray:
+        """Evaluate cantonal tax for an array of incomes."""
+        simple_tax = self.schedule.evaluate(incomes * self.income_scale / self.income_divisor)
+        if self.round_simple_tax:
+            # Snap float noise first so exact half-cent ties round half-even like Decimal.quantize
+            simple_tax = np.rint(np.round(simple_tax * 100, 6)) / 100
+        return simple_tax * self.tax_factor
+
+
 class CantonTaxCalculator(ABC):
     """
     Base class for canton-specific tax calculators.
@@ -53,6 +201,7 @@ class CantonTaxCalculator(ABC):
         self.canton = canton_code
         self.tax_year = tax_year
         self.tax_brackets = self._load_tax_brackets()
+        self._batch_plans: Dict[Tuple[str, int], Optional[BatchTaxPlan]] = {}
 
     @abstractmethod
     def _load_tax_brackets(self) -> Dict[str, List[TaxBracket]]:
@@ -98,6 +247,104 @@ class CantonTaxCalculator(ABC):
         # Ensure non-negative
         return max(total_tax, Decimal('0'))
 
+    def calculate_many(
+        self,
+        incomes: Sequence[Union[Decimal, float]],
+        marital_statuses: Union[str, Sequence[str]] = 'single',
+        num_children: Union[int, Sequence[int]] = 0
+    ) -> List[Decimal]:
+        """
+        Calculate cantonal tax for many taxpayers in one vectorized pass.
+
+        Rows are grouped by (marital status, children); each group is
+        evaluated with the canton's compiled batch plan, or row by row with
+        calculate() when the canton has no plan. Results are rounded to the
+        cent and agree with calculate() to the cent.
+
+        Args:
+            incomes: Taxable incomes
+            marital_statuses: One status for all rows or one per row
+            num_children: One child count for all rows or one per row
+
+        Returns:
+            Cantonal tax per row, in input order
+        """
+        incomes = list(incomes)
+        income_array = np.asarray([float(income) for income in incomes], dtype=float)
+        row_count = len(income_array)
+
+        if isinstance(marital_statuses, str):
+            marital_statuses = [marital_statuses] * row_count
+        if isinstance(num_children, int):
+            num_children = [num_children] * row_count
+        if len(marital_statuses) != row_count or len(num_children) != row_count:
+            raise ValueError("incomes, marital_statuses and num_children must have the same length")
+
+        groups: Dict[Tuple[str, int], List[int]] = {}
+        for row, group_key in enumerate(zip(marital_statuses, num_children)):
+            groups.setdefault((group_key[0], int(group_key[1])), []).append(row)
+
+        taxes = np.zeros(row_count, dtype=float)
+        for (marital_status, children), rows in groups.items():
+            rows = np.asarray(rows)
+            plan = self._get_batch_plan(marital_status, children)
+
+            if plan is None:
+                taxes[rows] = [
+                    float(self._calculate_cantonal_tax(Decimal(str(incomes[row])), marital_status, children))
+                    for row in rows
+                ]
+                continue
+
+            group_incomes = income_array[rows]
+            group_taxes = plan.evaluate(group_incomes)
+            taxes[rows] = np.where(group_incomes > 0, np.maximum(group_taxes, 0.0), 0.0)
+
+        return round_to_cents(taxes)
+
+    def _get_batch_plan(self, marital_status: str, num_children: int) -> Optional[BatchTaxPlan]:
+        """Return the memoized batch plan for a (marital status, children) group."""
+        key = (marital_status, num_children)
+        if key not in self._batch_plans:
+            self._batch_plans[key] = self._batch_plan(marital_status, num_children)
+        return self._batch_plans[key]
+
+    def _batch_plan(self, marital_status: str, num_children: int) -> Optional[BatchTaxPlan]:
+        """
+        Build the vectorized plan mirroring calculate() for one group.
+
+        Default implementation covers calculators that use the base
+        calculate() with TaxBracket lists. Cantons with a custom calculate()
+        override this; returning None falls back to row-by-row calculation.
+
+        Args:
+            marital_status: Marital status of the group
+            num_children: Number of children of the group
+
+        Returns:
+            BatchTaxPlan or None
+        """
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets.get('single'))
+        if not brackets or not all(isinstance(bracket, TaxBracket) for bracket in brackets):
+            return None
+
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_tax_brackets(brackets),
+            tax_factor=self._apply_family_adjustments(Decimal('1'), num_children)
+        )
+
+    def _calculate_cantonal_tax(
+        self,
+        taxable_income: Decimal,
+        marital_status: str,
+        num_children: int
+    ) -> Decimal:
+        """Run calculate() and normalize dict results to the cantonal tax amount."""
+        result = self.calculate(taxable_income, marital_status, num_children)
+        if isinstance(result, dict):
+            return Decimal(str(result['cantonal_tax']))
+        return Decimal(str(result))
+
     def _apply_progressive_rates(
         self,
         taxable_income: Decimal,
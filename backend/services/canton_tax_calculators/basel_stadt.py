@@ -14,7 +14,7 @@ IMPORTANT: Basel-Stadt has a UNIQUE tax system:
 
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 
 class BaselStadtTaxCalculator(CantonTaxCalculator):
@@ -159,6 +159,15 @@ class BaselStadtTaxCalculator(CantonTaxCalculator):
             'canton_multiplier': self.CANTON_MULTIPLIER
         }
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate(): flat rate on the entire income × canton multiplier."""
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets['single'])
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_flat_rates(brackets),
+            tax_factor=self._apply_family_adjustments(self.CANTON_MULTIPLIER, num_children),
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(
         self,
         taxable_income: Decimal,
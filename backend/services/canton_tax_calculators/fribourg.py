@@ -10,7 +10,7 @@ Progressive tax system with canton and municipal multipliers
 """
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 class FribourgTaxCalculator(CantonTaxCalculator):
     CANTON_CODE = "FR"
@@ -92,6 +92,14 @@ class FribourgTaxCalculator(CantonTaxCalculator):
             'canton_multiplier': Decimal('1.0')  # 100%
         }
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate()."""
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets['single'])
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(brackets),
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single',
                                    num_children: int = 0, canton_multiplier: Decimal = Decimal('1.0'),
                                    municipal_multiplier: Decimal = Decimal('1.05')) -> Dict[str, Decimal]:
@@ -14,7 +14,7 @@ UNIQUE SYSTEM: Geneva uses "centimes additionnels" (additional centimes)
 """
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 class GenevaTaxCalculator(CantonTaxCalculator):
     CANTON_CODE = "GE"
@@ -117,6 +117,17 @@ class GenevaTaxCalculator(CantonTaxCalculator):
 
         return tax.quantize(Decimal('0.01'))
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate(), including splitting for married couples."""
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets['single'])
+        is_married = marital_status == 'married'
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(brackets),
+            income_scale=Decimal('0.5') if is_married else Decimal('1'),
+            tax_factor=Decimal('2') if is_married else Decimal('1'),
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single',
                                    num_children: int = 0, canton_multiplier: Decimal = None,
                                    municipal_multiplier: Decimal = Decimal('0.4549')) -> Dict[str, Decimal]:
@@ -1,7 +1,7 @@
 """Glarus Canton Tax Calculator"""
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 class GlarusTaxCalculator(CantonTaxCalculator):
     CANTON_CODE = "GL"
@@ -44,6 +44,15 @@ class GlarusTaxCalculator(CantonTaxCalculator):
         cantonal_tax = simple_tax * self.CANTON_MULTIPLIER
         return {'simple_tax': simple_tax, 'cantonal_tax': cantonal_tax, 'canton_multiplier': self.CANTON_MULTIPLIER}
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate(): simple tax × canton multiplier."""
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets['single'])
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(brackets),
+            tax_factor=self.CANTON_MULTIPLIER,
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single', num_children: int = 0,
                                    canton_multiplier: Decimal = None, municipal_multiplier: Decimal = Decimal('0.60')) -> Dict[str, Decimal]:
         if canton_multiplier is None: canton_multiplier = self.CANTON_MULTIPLIER
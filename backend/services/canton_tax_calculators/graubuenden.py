@@ -12,7 +12,7 @@ UNIQUE: 20 progressive brackets with flat rate rule above CHF 716,000
 """
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 class GraubuendenTaxCalculator(CantonTaxCalculator):
     CANTON_CODE = "GR"
@@ -133,6 +133,17 @@ class GraubuendenTaxCalculator(CantonTaxCalculator):
             'canton_multiplier': Decimal('0.95')  # 95%
         }
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate(): married income ÷ 1.9 without multiplying back."""
+        divisor = Decimal('1.9') if marital_status == 'married' else Decimal('1')
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(
+                self.tax_brackets['single'], Decimal('780440'), Decimal('0.110')
+            ),
+            income_divisor=divisor,
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single',
                                    num_children: int = 0, canton_multiplier: Decimal = Decimal('0.95'),
                                    municipal_multiplier: Decimal = Decimal('0.90')) -> Dict[str, Decimal]:
@@ -14,7 +14,7 @@ Tax rate reductions implemented for 2024-2025
 """
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 class JuraTaxCalculator(CantonTaxCalculator):
     CANTON_CODE = "JU"
@@ -103,6 +103,14 @@ class JuraTaxCalculator(CantonTaxCalculator):
             'canton_multiplier': self.CANTON_QUOTITE_2024
         }
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate()."""
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets['single'])
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(brackets),
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single',
                                    num_children: int = 0, canton_multiplier: Decimal = None,
                                    municipal_multiplier: Decimal = Decimal('1.15')) -> Dict[str, Decimal]:
@@ -11,7 +11,7 @@ Special high-income rule: Over CHF 2,067,800 = flat 5.7% on entire income
 """
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 class LucerneTaxCalculator(CantonTaxCalculator):
     CANTON_CODE = "LU"
@@ -110,6 +110,15 @@ class LucerneTaxCalculator(CantonTaxCalculator):
             'canton_multiplier': self.CANTON_MULTIPLIER
         }
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate(): simple tax × canton multiplier."""
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets['single'])
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(brackets, Decimal('2067800'), Decimal('0.057')),
+            tax_factor=self.CANTON_MULTIPLIER,
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single',
                                    num_children: int = 0, canton_multiplier: Decimal = None,
                                    municipal_multiplier: Decimal = Decimal('1.65')) -> Dict[str, Decimal]:
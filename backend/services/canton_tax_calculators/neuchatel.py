@@ -15,7 +15,7 @@ OFFICIAL CALCULATION METHOD:
 """
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 class NeuchatelTaxCalculator(CantonTaxCalculator):
     CANTON_CODE = "NE"
@@ -109,6 +109,14 @@ class NeuchatelTaxCalculator(CantonTaxCalculator):
             'canton_multiplier': self.CANTON_MULTIPLIER_2024
         }
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate(), including the married income coefficient."""
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(self.tax_brackets['single']),
+            income_scale=self.MARRIED_COEFFICIENT if marital_status == 'married' else Decimal('1'),
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single',
                                    num_children: int = 0, canton_multiplier: Decimal = None,
                                    municipal_multiplier: Decimal = Decimal('0.65')) -> Dict[str, Decimal]:
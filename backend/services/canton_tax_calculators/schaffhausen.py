@@ -9,7 +9,7 @@ Official sources:
 
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 
 class SchaffhausenTaxCalculator(CantonTaxCalculator):
@@ -91,6 +91,15 @@ class SchaffhausenTaxCalculator(CantonTaxCalculator):
         
         return {'simple_tax': simple_tax, 'cantonal_tax': cantonal_tax, 'canton_multiplier': self.CANTON_MULTIPLIER}
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate(): simple tax × canton multiplier."""
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets['single'])
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(brackets),
+            tax_factor=self._apply_family_adjustments(self.CANTON_MULTIPLIER, num_children),
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single', 
                                    num_children: int = 0, canton_multiplier: Decimal = None,
                                    municipal_multiplier: Decimal = Decimal('0.90')) -> Dict[str, Decimal]:
@@ -12,7 +12,7 @@ UNIQUE DUAL-TARIFF SYSTEM:
 """
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 class SchwyzTaxCalculator(CantonTaxCalculator):
     CANTON_CODE = "SZ"
@@ -150,6 +150,18 @@ class SchwyzTaxCalculator(CantonTaxCalculator):
             'canton_multiplier': None  # No simple multiplier in Schwyz
         }
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate(): canton tariff with the 1.9 married divisor."""
+        divisor = Decimal('1.9') if marital_status == 'married' else Decimal('1')
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(
+                self._load_canton_brackets(), Decimal('385900'), Decimal('0.05')
+            ),
+            income_divisor=divisor,
+            tax_factor=divisor,
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single',
                                    num_children: int = 0, canton_multiplier: Decimal = None,
                                    municipal_multiplier: Decimal = Decimal('3.25')) -> Dict[str, Decimal]:
@@ -12,7 +12,7 @@ Married: Use half income for rate calculation (splitting)
 """
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 class StGallenTaxCalculator(CantonTaxCalculator):
     CANTON_CODE = "SG"
@@ -79,6 +79,18 @@ class StGallenTaxCalculator(CantonTaxCalculator):
             'canton_multiplier': self.CANTON_MULTIPLIER
         }
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate(), including splitting for married couples."""
+        is_married = marital_status == 'married'
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(
+                self.tax_brackets['single'], Decimal('264200'), Decimal('0.085')
+            ),
+            income_scale=Decimal('0.5') if is_married else Decimal('1'),
+            tax_factor=(Decimal('2') if is_married else Decimal('1')) * self.CANTON_MULTIPLIER,
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single',
                                    num_children: int = 0, canton_multiplier: Decimal = None,
                                    municipal_multiplier: Decimal = Decimal('1.16')) -> Dict[str, Decimal]:
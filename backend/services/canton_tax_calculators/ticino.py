@@ -10,7 +10,7 @@ NO canton multiplier - only municipal multipliers apply
 """
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 class TicinoTaxCalculator(CantonTaxCalculator):
     CANTON_CODE = "TI"
@@ -98,6 +98,14 @@ class TicinoTaxCalculator(CantonTaxCalculator):
             'canton_multiplier': None  # TI has no canton multiplier
         }
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate()."""
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets['single'])
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(brackets),
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single',
                                    num_children: int = 0, canton_multiplier: Decimal = None,
                                    municipal_multiplier: Decimal = Decimal('0.77')) -> Dict[str, Decimal]:
@@ -20,15 +20,15 @@ https://www.ur.ch/dienstleistungen/3196 - "Steuersätze Kantons- und Gemeindeste
 """
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 class UriTaxCalculator(CantonTaxCalculator):
     CANTON_CODE = "UR"
     CANTON_NAME = "Uri"
     CANTON_MULTIPLIER = Decimal('1.00')  # 100%
 
-    def __init__(self, canton_code: str = "UR", tax_year: int = 2024):
-        super().__init__(canton_code=canton_code, tax_year=tax_year)
+    def __init__(self, tax_year: int = 2024):
+        super().__init__(canton_code="UR", tax_year=tax_year)
 
     def _load_tax_brackets(self) -> Dict:
         """
@@ -105,6 +105,14 @@ class UriTaxCalculator(CantonTaxCalculator):
             'canton_multiplier': self.CANTON_MULTIPLIER
         }
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate()."""
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets['single'])
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(brackets),
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single',
                                    num_children: int = 0, canton_multiplier: Decimal = None,
                                    municipal_multiplier: Decimal = Decimal('0.95')) -> Dict[str, Decimal]:
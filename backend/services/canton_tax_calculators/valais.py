@@ -32,7 +32,7 @@ Example (Sion: coefficient 1.10, indexation 173%):
 """
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 class ValaisTaxCalculator(CantonTaxCalculator):
     CANTON_CODE = "VS"
@@ -130,6 +130,15 @@ class ValaisTaxCalculator(CantonTaxCalculator):
             'canton_indexation': self.CANTON_INDEXATION_2024
         }
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate(): base tax × canton indexation."""
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets['single'])
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(brackets),
+            tax_factor=self.CANTON_INDEXATION_2024,
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single',
                                    num_children: int = 0,
                                    canton_multiplier: Decimal = None,  # Not used - fixed indexation
@@ -25,8 +25,8 @@ OFFICIAL CALCULATION METHOD (Family Quotient System):
 5. Apply municipal coefficient
 """
 from decimal import Decimal
-from typing import Dict
-from .base import CantonTaxCalculator
+from typing import Dict, Optional
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 class VaudTaxCalculator(CantonTaxCalculator):
     CANTON_CODE = "VD"
@@ -167,6 +167,18 @@ class VaudTaxCalculator(CantonTaxCalculator):
 
         return base_tax.quantize(Decimal('0.01'))
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> Optional[BatchTaxPlan]:
+        """Vectorized plan for a family quotient of 1; other quotients are calculated row by row."""
+        quotient = self._get_family_quotient(marital_status, num_children)
+        if quotient != 1:
+            # calculate() rounds the tax on the Decimal quotient income to the cent
+            # before multiplying it back; float division can land on the other side
+            return None
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(self.tax_brackets['single']),
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(self, taxable_income: Decimal, marital_status: str = 'single',
                                    num_children: int = 0, canton_multiplier: Decimal = None,
                                    municipal_multiplier: Decimal = Decimal('0.785')) -> Dict[str, Decimal]:
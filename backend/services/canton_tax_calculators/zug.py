@@ -9,7 +9,7 @@ Official sources:
 
 from decimal import Decimal
 from typing import Dict
-from .base import CantonTaxCalculator
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule
 
 
 class ZugTaxCalculator(CantonTaxCalculator):
@@ -166,6 +166,15 @@ class ZugTaxCalculator(CantonTaxCalculator):
             'canton_multiplier': self.CANTON_MULTIPLIER
         }
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate(): simple tax × canton multiplier."""
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets['single'])
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_marginal_rates(brackets),
+            tax_factor=self._apply_family_adjustments(self.CANTON_MULTIPLIER, num_children),
+            round_simple_tax=True
+        )
+
     def calculate_with_multiplier(
         self,
         taxable_income: Decimal,
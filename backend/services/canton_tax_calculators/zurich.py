@@ -16,7 +16,7 @@ Reference: https://www.zh.ch/de/steuern-finanzen/steuern/steuerrechner.html
 from decimal import Decimal
 from typing import Dict, List
 
-from .base import CantonTaxCalculator, TaxBracket
+from .base import BatchTaxPlan, CantonTaxCalculator, CompiledTaxSchedule, TaxBracket
 
 
 class ZurichTaxCalculator(CantonTaxCalculator):
@@ -200,6 +200,14 @@ class ZurichTaxCalculator(CantonTaxCalculator):
         # Ensure non-negative
         return max(cantonal_tax, Decimal('0'))
 
+    def _batch_plan(self, marital_status: str, num_children: int) -> BatchTaxPlan:
+        """Vectorized plan mirroring calculate(): simple tax × canton multiplier, then family adjustments."""
+        brackets = self.tax_brackets.get(marital_status, self.tax_brackets['single'])
+        return BatchTaxPlan(
+            CompiledTaxSchedule.from_tax_brackets(brackets),
+            tax_factor=self._apply_family_adjustments(self.CANTON_MULTIPLIER, num_children)
+        )
+
     def _apply_family_adjustments(self, base_tax: Decimal, num_children: int) -> Decimal:
         """
         Zurich applies a 2% tax reduction per child.
@@ -0,0 +1,272 @@
+"""
+Church Tax Rate Table
+
+In-process copy of swisstax.church_tax_config and swisstax.church_tax_rates,
+one snapshot per tax year. The tables change about once a year, so church
+tax calculations, canton comparisons and canton info read from here instead
+of querying Postgres.
+
+Rates are indexed by (canton, municipality_id, denomination). Canton-level
+rows (municipality_id IS NULL) are indexed separately, so a municipality
+without its own rate falls back to the canton average without a second
+lookup.
+
+Snapshots are versioned by a fingerprint of both tables (row counts, latest
+change and rate checksum), re-checked at most every
+TABLE_CHECK_INTERVAL_SECONDS. invalidate_church_tax_rate_table() forces a
+reload.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from database.connection import execute_one, execute_query
+
+logger = logging.getLogger(__name__)
+
+# How often a loaded snapshot compares its fingerprint with the tables
+TABLE_CHECK_INTERVAL_SECONDS = 300
+
+# How long to wait before retrying after a failed load
+TABLE_RETRY_INTERVAL_SECONDS = 60
+
+
+def _source_rank(rate: Dict[str, Any]) -> str:
+    """Rank canton-level rows of one denomination, highest source first ('official_parish' over 'canton_average')."""
+    return rate.get('source') or ''
+
+
+class ChurchTaxRateTable:
+    """Immutable snapshot of church tax configuration and rates for one tax year"""
+
+    def __init__(
+        self,
+        tax_year: int,
+        configs: Iterable[Dict[str, Any]],
+        rates: Iterable[Dict[str, Any]],
+        version: Tuple = ()
+    ):
+        self.tax_year = tax_year
+        self.version = version
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self._rates: Dict[Tuple[str, int, str], Dict[str, Any]] = {}
+        self._canton_averages: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+        for config in configs:
+            canton = config['canton'].upper()
+            self._configs[canton] = {
+                'canton': canton,
+                'has_church_tax': config['has_church_tax'],
+                'recognized_denominations': list(config['recognized_denominations'] or []),
+                'calculation_method': config['calculation_method'],
+                'notes': config['notes'],
+                'official_source': config['official_source']
+            }
+
+        for row in rates:
+            canton = row['canton'].upper()
+            rate = {
+                'canton': canton,
+                'municipality_id': row['municipality_id'],
+                'municipality_name': row['municipality_name'],
+                'denomination': row['denomination'],
+                'rate_percentage': row['rate_percentage'],
+                'source': row['source'],
+                'parish_name': row['parish_name'],
+                'official_source': row['official_source']
+            }
+
+            if rate['municipality_id'] is None:
+                key = (canton, rate['denomination'])
+                current = self._canton_averages.get(key)
+                if current is None or _source_rank(rate) > _source_rank(current):
+                    self._canton_averages[key] = rate
+            else:
+                self._rates[(canton, rate['municipality_id'], rate['denomination'])] = rate
+
+    def get_config(self, canton_code: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the church tax configuration of a canton.
+
+        Args:
+            canton_code: Canton code
+
+        Returns:
+            Configuration dictionary or None if the canton is unknown
+        """
+        config = self._configs.get(canton_code.upper())
+        if config is None:
+            return None
+        # Callers hand configs out in API responses; keep the snapshot unshared
+        return dict(config, recognized_denominations=list(config['recognized_denominations']))
+
+    def get_rate(
+        self,
+        canton_code: str,
+        denomination: str,
+        municipality_id: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the church tax rate for a municipality, falling back to the canton average.
+
+        Args:
+            canton_code: Canton code
+            denomination: Religious denomination
+            municipality_id: Optional municipality id
+
+        Returns:
+            Rate dictionary or None if neither rate exists
+        """
+        canton_code = canton_code.upper()
+
+        if municipality_id:
+            try:
+                rate = self._rates.get((canton_code, int(municipality_id), denomination))
+            except (TypeError, ValueError):
+                rate = None
+            if rate:
+                return dict(rate)
+
+        rate = self._canton_averages.get((canton_code, denomination))
+        return dict(rate) if rate else None
+
+    def get_canton_rates(self, canton_code: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the canton-level rate of every denomination in a canton.
+
+        Args:
+            canton_code: Canton code
+
+        Returns:
+            Dictionary of denomination to rate dictionary, sorted by denomination
+        """
+        canton_code = canton_code.upper()
+        return {
+            denomination: rate
+            for (canton, denomination), rate in sorted(self._canton_averages.items())
+            if canton == canton_code
+        }
+
+    def get_all_configs(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the configuration of every canton.
+
+        Returns:
+            Dictionary of canton code to configuration, sorted by canton
+        """
+        return {canton: self._configs[canton] for canton in sorted(self._configs)}
+
+
+def _fetch_version(tax_year: int) -> Tuple:
+    """Fingerprint the church tax tables of a tax year without loading them."""
+    result = execute_one(
+        """
+            SELECT
+                (SELECT COUNT(*) FROM swisstax.church_tax_config
+                 WHERE tax_year = %(tax_year)s) AS config_count,
+                (SELECT MAX(created_at) FROM swisstax.church_tax_config
+                 WHERE tax_year = %(tax_year)s) AS config_created,
+                (SELECT COUNT(*) FROM swisstax.church_tax_rates
+                 WHERE tax_year = %(tax_year)s) AS rate_count,
+                (SELECT MAX(created_at) FROM swisstax.church_tax_rates
+                 WHERE tax_year = %(tax_year)s) AS rate_created,
+                (SELECT SUM(rate_percentage) FROM swisstax.church_tax_rates
+                 WHERE tax_year = %(tax_year)s) AS rate_checksum
+        """,
+        {'tax_year': tax_year}
+    )
+    if not result:
+        return ()
+    return (
+        result['config_count'], result['config_created'],
+        result['rate_count'], result['rate_created'], result['rate_checksum']
+    )
+
+
+def _load_table(tax_year: int) -> ChurchTaxRateTable:
+    """Load church tax configuration and rates of a tax year into a new snapshot."""
+    version = _fetch_version(tax_year)
+    configs: List[Dict[str, Any]] = execute_query(
+        """
+            SELECT canton, has_church_tax, recognized_denominations,
+                   calculation_method, notes, official_source
+            FROM swisstax.church_tax_config
+            WHERE tax_year = %s
+        """,
+        (tax_year,)
+    ) or []
+    rates: List[Dict[str, Any]] = execute_query(
+        """
+            SELECT canton, municipality_id, municipality_name, denomination,
+                   rate_percentage, source, parish_name, official_source
+            FROM swisstax.church_tax_rates
+            WHERE tax_year = %s
+        """,
+        (tax_year,)
+    ) or []
+    logger.info(
+        f"Loaded church tax data for tax year {tax_year} "
+        f"({len(configs)} cantons, {len(rates)} rates)"
+    )
+    return ChurchTaxRateTable(tax_year, configs, rates, version)
+
+
+# Registry state: snapshot per tax year and when to next check it
+_table_cache: Dict[int, ChurchTaxRateTable] = {}
+_next_check: Dict[int, float] = {}
+_table_lock = threading.Lock()
+
+
+def get_church_tax_rate_table(tax_year: int) -> Optional[ChurchTaxRateTable]:
+    """
+    Get the shared church tax snapshot for a tax year.
+
+    Loads the snapshot on first use and reloads it when the table
+    fingerprint changes. If the database is unreachable, the last loaded
+    snapshot keeps being served; without one, None is returned and the
+    load is retried after TABLE_RETRY_INTERVAL_SECONDS.
+
+    Args:
+        tax_year: Tax year
+
+    Returns:
+        ChurchTaxRateTable or None if it could not be loaded
+    """
+    now = time.monotonic()
+    table = _table_cache.get(tax_year)
+    if now < _next_check.get(tax_year, 0):
+        return table
+
+    with _table_lock:
+        table = _table_cache.get(tax_year)
+        if now < _next_check.get(tax_year, 0):
+            return table
+
+        try:
+            if table is None or _fetch_version(tax_year) != table.version:
+                table = _load_table(tax_year)
+                _table_cache[tax_year] = table
+            _next_check[tax_year] = now + TABLE_CHECK_INTERVAL_SECONDS
+        except Exception as e:
+            logger.warning(f"Could not refresh church tax rates for tax year {tax_year}: {e}")
+            _next_check[tax_year] = now + TABLE_RETRY_INTERVAL_SECONDS
+
+    return table
+
+
+def invalidate_church_tax_rate_table(tax_year: Optional[int] = None) -> None:
+    """
+    Drop cached snapshots so the next lookup reloads them.
+
+    Args:
+        tax_year: Tax year to invalidate, or None for all years
+    """
+    with _table_lock:
+        if tax_year is None:
+            _table_cache.clear()
+            _next_check.clear()
+        else:
+            _table_cache.pop(tax_year, None)
+            _next_check.pop(tax_year, None)
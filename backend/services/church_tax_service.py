@@ -6,11 +6,14 @@ Handles Swiss church tax calculations for all 26 cantons.
 
 Church tax is calculated as: Church Tax = Cantonal Tax × Church Tax Rate
 Rates vary by canton, municipality/parish, and denomination (Catholic/Reformed/Christian Catholic/Jewish).
+
+Configuration and rates are read from the in-memory church tax rate table
+(services.church_tax_rate_table), so lookups and comparisons don't query the database.
 """
 
 from decimal import Decimal
 from typing import Dict, List, Optional, Any
-from database.connection import execute_one, execute_query
+from services.church_tax_rate_table import ChurchTaxRateTable, get_church_tax_rate_table
 import logging
 
 logger = logging.getLogger(__name__)
@@ -72,91 +75,126 @@ class ChurchTaxService:
             # Get canton configuration
             canton_config = self._get_canton_config(canton_code)
 
-            if not canton_config:
-                logger.warning(f"No church tax config found for canton {canton_code}")
-                return self._no_church_tax_response(
-                    canton_code, cantonal_tax, denomination, "canton_not_found"
-                )
-
-            # Check if canton levies church tax
-            if not canton_config['has_church_tax']:
-                return self._no_church_tax_response(
-                    canton_code, cantonal_tax, denomination, "canton_no_tax",
-                    canton_info=canton_config
-                )
-
-            # Check if denomination is recognized
-            if denomination not in canton_config['recognized_denominations']:
-                logger.info(
-                    f"Denomination {denomination} not recognized in canton {canton_code}"
-                )
-                return self._no_church_tax_response(
-                    canton_code, cantonal_tax, denomination, "denomination_not_recognized",
-                    canton_info=canton_config
+            # Get church tax rate (municipality-specific or canton-level), only
+            # when the canton levies church tax for this denomination
+            rate_data = None
+            if (
+                canton_config
+                and canton_config['has_church_tax']
+                and denomination in canton_config['recognized_denominations']
+            ):
+                rate_data = self._get_church_tax_rate(
+                    canton_code, denomination, municipality_id
                 )
 
-            # Get church tax rate (municipality-specific or canton-level)
-            rate_data = self._get_church_tax_rate(
-                canton_code, denomination, municipality_id
+            return self.calculate_church_tax_from_data(
+                canton_code, cantonal_tax, denomination,
+                canton_config, rate_data, municipality_name
             )
 
-            if not rate_data:
-                logger.warning(
-                    f"No church tax rate found for {canton_code}/{denomination}"
-                )
-                return self._no_church_tax_response(
-                    canton_code, cantonal_tax, denomination, "rate_not_found",
-                    canton_info=canton_config
-                )
-
-            # Calculate church tax
-            rate_percentage = Decimal(str(rate_data['rate_percentage']))
-            church_tax = cantonal_tax * rate_percentage
-
-            return {
-                'applies': True,
-                'canton': canton_code,
-                'denomination': denomination,
-                'cantonal_tax': float(cantonal_tax),
-                'rate_percentage': float(rate_percentage),
-                'church_tax': float(church_tax),
-                'municipality_id': rate_data.get('municipality_id'),
-                'municipality_name': rate_data.get('municipality_name') or municipality_name,
-                'parish_name': rate_data.get('parish_name'),
-                'source': rate_data['source'],
-                'official_source': rate_data.get('official_source'),
-                'canton_info': canton_config
-            }
-
         except Exception as e:
             logger.error(f"Error calculating church tax: {str(e)}")
             return self._no_church_tax_response(
                 canton_code, cantonal_tax, denomination, "calculation_error"
             )
 
-    def _get_canton_config(self, canton_code: str) -> Optional[Dict]:
-        """Get canton church tax configuration."""
-        query = """
-            SELECT canton, has_church_tax, recognized_denominations,
-                   calculation_method, notes, official_source
-            FROM swisstax.church_tax_config
-            WHERE canton = %s AND tax_year = %s
+    def calculate_church_tax_from_data(
+        self,
+        canton_code: str,
+        cantonal_tax: Decimal,
+        denomination: str,
+        canton_config: Optional[Dict],
+        rate_data: Optional[Dict],
+        municipality_name: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
+        Calculate church tax from already loaded configuration and rate.
 
-        result = execute_one(query, (canton_code, self.tax_year))
+        Used by callers that load church tax data together with their other
+        inputs (see services.tax_calculation_context).
 
-        if not result:
-            return None
+        Args:
+            canton_code: Swiss canton code (e.g., 'ZH', 'BE')
+            cantonal_tax: Cantonal tax amount (base for church tax calculation)
+            denomination: Religious denomination
+            canton_config: Canton configuration as returned by _get_canton_config
+            rate_data: Rate as returned by _get_church_tax_rate
+            municipality_name: Optional municipality name
+
+        Returns:
+            Dictionary with church tax breakdown (see calculate_church_tax)
+        """
+        canton_code = canton_code.upper()
+
+        if denomination == 'none':
+            return self._no_church_tax_response(
+                canton_code, cantonal_tax, denomination, "user_not_member"
+            )
+
+        if not canton_config:
+            logger.warning(f"No church tax config found for canton {canton_code}")
+            return self._no_church_tax_response(
+                canton_code, cantonal_tax, denomination, "canton_not_found"
+            )
+
+        # Check if canton levies church tax
+        if not canton_config['has_church_tax']:
+            return self._no_church_tax_response(
+                canton_code, cantonal_tax, denomination, "canton_no_tax",
+                canton_info=canton_config
+            )
+
+        # Check if denomination is recognized
+        if denomination not in canton_config['recognized_denominations']:
+            logger.info(
+                f"Denomination {denomination} not recognized in canton {canton_code}"
+            )
+            return self._no_church_tax_response(
+                canton_code, cantonal_tax, denomination, "denomination_not_recognized",
+                canton_info=canton_config
+            )
+
+        if not rate_data:
+            logger.warning(
+                f"No church tax rate found for {canton_code}/{denomination}"
+            )
+            return self._no_church_tax_response(
+                canton_code, cantonal_tax, denomination, "rate_not_found",
+                canton_info=canton_config
+            )
+
+        # Calculate church tax
+        rate_percentage = Decimal(str(rate_data['rate_percentage']))
+        church_tax = cantonal_tax * rate_percentage
 
         return {
-            'canton': result['canton'],
-            'has_church_tax': result['has_church_tax'],
-            'recognized_denominations': result['recognized_denominations'] or [],
-            'calculation_method': result['calculation_method'],
-            'notes': result['notes'],
-            'official_source': result['official_source']
+            'applies': True,
+            'canton': canton_code,
+            'denomination': denomination,
+            'cantonal_tax': float(cantonal_tax),
+            'rate_percentage': float(rate_percentage),
+            'church_tax': float(church_tax),
+            'municipality_id': rate_data.get('municipality_id'),
+            'municipality_name': rate_data.get('municipality_name') or municipality_name,
+            'parish_name': rate_data.get('parish_name'),
+            'source': rate_data['source'],
+            'official_source': rate_data.get('official_source'),
+            'canton_info': canton_config
         }
 
+    def _get_rate_table(self) -> ChurchTaxRateTable:
+        """Get the in-memory church tax tables for this tax year."""
+        table = get_church_tax_rate_table(self.tax_year)
+
+        if table is None:
+            raise RuntimeError(f"Church tax data for {self.tax_year} is not available")
+
+        return table
+
+    def _get_canton_config(self, canton_code: str) -> Optional[Dict]:
+        """Get canton church tax configuration."""
+        return self._get_rate_table().get_config(canton_code)
+
     def _get_church_tax_rate(
         self,
         canton_code: str,
@@ -168,67 +206,7 @@ class ChurchTaxService:
 
         Tries municipality-specific rate first, falls back to canton-level average.
         """
-        # Try municipality-specific rate first
-        if municipality_id:
-            query = """
-                SELECT canton, municipality_id, municipality_name, denomination,
-                       rate_percentage, source, parish_name, official_source
-                FROM swisstax.church_tax_rates
-                WHERE canton = %s
-                  AND municipality_id = %s
-                  AND denomination = %s
-                  AND tax_year = %s
-                ORDER BY source DESC  -- Prefer 'official_parish' over 'canton_average'
-                LIMIT 1
-            """
-
-            result = execute_one(
-                query,
-                (canton_code, municipality_id, denomination, self.tax_year)
-            )
-
-            if result:
-                return {
-                    'canton': result['canton'],
-                    'municipality_id': result['municipality_id'],
-                    'municipality_name': result['municipality_name'],
-                    'denomination': result['denomination'],
-                    'rate_percentage': result['rate_percentage'],
-                    'source': result['source'],
-                    'parish_name': result['parish_name'],
-                    'official_source': result['official_source']
-                }
-
-        # Fall back to canton-level average
-        query = """
-            SELECT canton, municipality_id, municipality_name, denomination,
-                   rate_percentage, source, parish_name, official_source
-            FROM swisstax.church_tax_rates
-            WHERE canton = %s
-              AND municipality_id IS NULL
-              AND denomination = %s
-              AND tax_year = %s
-            LIMIT 1
-        """
-
-        result = execute_one(
-            query,
-            (canton_code, denomination, self.tax_year)
-        )
-
-        if not result:
-            return None
-
-        return {
-            'canton': result['canton'],
-            'municipality_id': result['municipality_id'],
-            'municipality_name': result['municipality_name'],
-            'denomination': result['denomination'],
-            'rate_percentage': result['rate_percentage'],
-            'source': result['source'],
-            'parish_name': result['parish_name'],
-            'official_source': result['official_source']
-        }
+        return self._get_rate_table().get_rate(canton_code, denomination, municipality_id)
 
     def _no_church_tax_response(
         self,
@@ -272,22 +250,11 @@ class ChurchTaxService:
                 }
 
             # Get all rates for this canton
-            query = """
-                SELECT denomination, rate_percentage, source, municipality_name
-                FROM swisstax.church_tax_rates
-                WHERE canton = %s
-                  AND tax_year = %s
-                  AND municipality_id IS NULL
-                ORDER BY denomination
-            """
-
-            results = execute_query(query, (canton_code, self.tax_year))
-
             rates = {}
-            for row in results:
-                rates[row['denomination']] = {
-                    'rate_percentage': float(row['rate_percentage']),
-                    'source': row['source']
+            for denomination, rate in self._get_rate_table().get_canton_rates(canton_code).items():
+                rates[denomination] = {
+                    'rate_percentage': float(rate['rate_percentage']),
+                    'source': rate['source']
                 }
 
             return {
@@ -315,25 +282,14 @@ class ChurchTaxService:
             Dictionary with canton codes as keys and info as values
         """
         try:
-            query = """
-                SELECT canton, has_church_tax, recognized_denominations,
-                       calculation_method, notes, official_source
-                FROM swisstax.church_tax_config
-                WHERE tax_year = %s
-                ORDER BY canton
-            """
-
-            results = execute_query(query, (self.tax_year,))
-
             cantons = {}
-            for row in results:
-                canton_code = row['canton']
+            for canton_code, config in self._get_rate_table().get_all_configs().items():
                 cantons[canton_code] = {
-                    'has_church_tax': row['has_church_tax'],
-                    'recognized_denominations': row['recognized_denominations'] or [],
-                    'calculation_method': row['calculation_method'],
-                    'notes': row['notes'],
-                    'official_source': row['official_source']
+                    'has_church_tax': config['has_church_tax'],
+                    'recognized_denominations': config['recognized_denominations'],
+                    'calculation_method': config['calculation_method'],
+                    'notes': config['notes'],
+                    'official_source': config['official_source']
                 }
 
             return cantons
@@ -414,7 +370,7 @@ class ChurchTaxService:
                 'applies': result['applies'],
                 'church_tax': result['church_tax'],
                 'rate_percentage': result.get('rate_percentage', 0.0),
-                'notes': result.get('canton_info', {}).get('notes', '')
+                'notes': (result.get('canton_info') or {}).get('notes', '')
             }
 
         return comparisons
@@ -0,0 +1,346 @@
+"""
+Document Archive Jobs
+
+Runs "download all documents" archive builds in the background so the HTTP
+request returns immediately with a job ID. Clients poll the job for
+progress (documents processed out of total) and, once completed, the
+presigned download URL of the archive.
+
+Builds run on the instance that started them. Their state is also saved
+as a small JSON object in shared storage (ARCHIVE_JOB_STORE: 's3', the
+default, next to the archives under exports/<user>/jobs/, or 'none'), so a
+poll that reaches another instance behind the load balancer still finds
+the job. Progress is saved at most every ARCHIVE_JOB_SAVE_INTERVAL_SECONDS.
+A build whose state stops changing for ARCHIVE_JOB_STALE_SECONDS (e.g. its
+instance was replaced) is reported as failed. Finished jobs are forgotten
+after ARCHIVE_JOB_TTL_SECONDS (the lifetime of the download URL).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from utils.shared_state import Lazy
+
+logger = logging.getLogger(__name__)
+
+# Archives built at the same time (each one also runs its own S3 download pool)
+ARCHIVE_JOB_WORKERS = int(os.getenv('ARCHIVE_JOB_WORKERS', '2'))
+ARCHIVE_JOB_TTL_SECONDS = int(os.getenv('ARCHIVE_JOB_TTL_SECONDS', '3600'))
+ARCHIVE_JOB_STORE = os.getenv('ARCHIVE_JOB_STORE', 's3')
+ARCHIVE_JOB_SAVE_INTERVAL_SECONDS = float(os.getenv('ARCHIVE_JOB_SAVE_INTERVAL_SECONDS', '2'))
+ARCHIVE_JOB_STALE_SECONDS = int(os.getenv('ARCHIVE_JOB_STALE_SECONDS', '900'))
+
+PENDING = 'pending'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+@dataclass
+class ArchiveJob:
+    """State of one archive build"""
+    job_id: str
+    user_id: str
+    status: str = PENDING
+    processed: int = 0
+    total: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Job status as returned by the API"""
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'processed': self.processed,
+            'total': self.total,
+            'progress': int(self.processed * 100 / self.total) if self.total else (100 if self.is_finished else 0),
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def to_json(self) -> str:
+        """Serialize the full state for the job store"""
+        return json.dumps(asdict(self), default=lambda value: value.isoformat())
+
+    @classmethod
+    def from_json(cls, data: str) -> 'ArchiveJob':
+        """Restore a job saved with to_json"""
+        values = json.loads(data)
+        for name in ('created_at', 'updated_at', 'finished_at'):
+            if values.get(name):
+                values[name] = datetime.fromisoformat(values[name])
+        return cls(**values)
+
+
+# ============================================================================
+# JOB STORES
+# ============================================================================
+
+class ArchiveJobStore(ABC):
+    """Job state shared by all instances"""
+
+    @abstractmethod
+    def save(self, job: ArchiveJob) -> None:
+        """Save a job's current state."""
+
+    @abstractmethod
+    def load(self, job_id: str, user_id: str) -> Optional[ArchiveJob]:
+        """Load a user's job, or None if unknown."""
+
+    @abstractmethod
+    def delete(self, job_id: str, user_id: str) -> None:
+        """Forget a job."""
+
+
+class NullArchiveJobStore(ArchiveJobStore):
+    """Store used when jobs are not shared (single instance)"""
+
+    def save(self, job: ArchiveJob) -> None:
+        pass
+
+    def load(self, job_id: str, user_id: str) -> Optional[ArchiveJob]:
+        return None
+
+    def delete(self, job_id: str, user_id: str) -> None:
+        pass
+
+
+class S3ArchiveJobStore(ArchiveJobStore):
+    """Job state as JSON objects next to the user's archives"""
+
+    def __init__(self, client, bucket: str, prefix: str = 'exports/'):
+        """
+        Initialize the store.
+
+        Args:
+            client: boto3 S3 client
+            bucket: Bucket name
+            prefix: Key prefix; objects go to <prefix><user>/jobs/<job>.json
+        """
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _key(self, job_id: str, user_id: str) -> str:
+        # Job IDs come from the URL; only accept what start() creates
+        return f"{self.prefix}{user_id}/jobs/{uuid.UUID(job_id)}.json"
+
+    def save(self, job: ArchiveJob) -> None:
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._key(job.job_id, job.user_id),
+            Body=job.to_json().encode('utf-8'),
+            ContentType='application/json',
+            ServerSideEncryption='AES256'
+        )
+
+    def load(self, job_id: str, user_id: str) -> Optional[ArchiveJob]:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(job_id, user_id))
+        except ValueError:
+            return None  # Not a job ID
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+                return None
+            raise
+        return ArchiveJob.from_json(response['Body'].read().decode('utf-8'))
+
+    def delete(self, job_id: str, user_id: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(job_id, user_id))
+
+
+class DocumentArchiveJobManager:
+    """Starts archive builds on a bounded thread pool and tracks their progress"""
+
+    def __init__(
+        self,
+        max_workers: int = ARCHIVE_JOB_WORKERS,
+        ttl_seconds: int = ARCHIVE_JOB_TTL_SECONDS,
+        store: Optional[ArchiveJobStore] = None
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            max_workers: Archives built at the same time
+            ttl_seconds: How long finished jobs can be polled
+            store: Shared job state (default: jobs visible on this instance only)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.store = store if store is not None else NullArchiveJobStore()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='archive-job')
+        self._jobs: Dict[str, ArchiveJob] = {}
+        self._lock = threading.Lock()
+
+    def start(
+        self,
+        user_id: str,
+        create_archive: Callable[..., Dict[str, Any]]
+    ) -> ArchiveJob:
+        """
+        Start building a user's archive, or return the build already running
+        on this instance.
+
+        Args:
+            user_id: User ID
+            create_archive: Builds the archive, called as
+                create_archive(user_id, progress_callback=...)
+
+        Returns:
+            ArchiveJob
+        """
+        with self._lock:
+            self._purge_expired()
+            for job in self._jobs.values():
+                if job.user_id == user_id and not job.is_finished:
+                    return job
+
+            job = ArchiveJob(job_id=str(uuid.uuid4()), user_id=user_id)
+            self._jobs[job.job_id] = job
+
+        # Saved before the build is queued, so other instances can answer polls at once
+        self._save(job)
+        self._executor.submit(self._run, job, create_archive)
+        logger.info(f"Started document archive job {job.job_id} for user {user_id}")
+        return job
+
+    def get(self, job_id: str, user_id: str) -> Optional[ArchiveJob]:
+        """
+        Get a job owned by a user, started on this or another instance.
+
+        Args:
+            job_id: Job ID
+            user_id: User ID the job must belong to
+
+        Returns:
+            ArchiveJob or None if unknown, expired or owned by someone else
+        """
+        with self._lock:
+            self._purge_expired()
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job if job.user_id == user_id else None
+
+        try:
+            job = self.store.load(job_id, user_id)
+        except Exception as e:
+            logger.warning(f"Could not load document archive job {job_id}: {e}")
+            return None
+        if job is None or job.user_id != user_id:
+            return None
+
+        now = datetime.utcnow()
+        if job.is_finished and job.finished_at < now - timedelta(seconds=self.ttl_seconds):
+            try:
+                self.store.delete(job_id, user_id)
+            except Exception as e:
+                logger.warning(f"Could not delete expired document archive job {job_id}: {e}")
+            return None
+        if not job.is_finished and job.updated_at < now - timedelta(seconds=ARCHIVE_JOB_STALE_SECONDS):
+            job.status = FAILED
+            job.error = 'Archive build was interrupted, please start a new one'
+        return job
+
+    def _run(self, job: ArchiveJob, create_archive: Callable[..., Dict[str, Any]]) -> None:
+        """Build the archive and record the outcome on the job."""
+        last_saved = time.monotonic()
+
+        def report_progress(processed: int, total: int) -> None:
+            nonlocal last_saved
+            job.processed = processed
+            job.total = total
+            if time.monotonic() - last_saved >= ARCHIVE_JOB_SAVE_INTERVAL_SECONDS:
+                last_saved = time.monotonic()
+                self._save(job)
+
+        job.status = RUNNING
+        self._save(job)
+        try:
+            result = create_archive(job.user_id, progress_callback=report_progress)
+            if result.get('error'):
+                job.error = result['error']
+                job.status = FAILED
+            else:
+                job.result = result
+                job.status = COMPLETED
+        except Exception as e:
+            logger.error(f"Document archive job {job.job_id} failed: {e}", exc_info=True)
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = datetime.utcnow()
+            self._save(job)
+
+    def _save(self, job: ArchiveJob) -> None:
+        """Save a job's state to the shared store; failures only cost other instances the update."""
+        job.updated_at = datetime.utcnow()
+        try:
+            self.store.save(job)
+        except Exception as e:
+            logger.warning(f"Could not save document archive job {job.job_id}: {e}")
+
+    def _purge_expired(self) -> None:
+        """Forget finished jobs older than the TTL (caller holds the lock)."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+def _create_store() -> ArchiveJobStore:
+    """Create the store selected by ARCHIVE_JOB_STORE."""
+    store = ARCHIVE_JOB_STORE.lower()
+    if store == 's3':
+        try:
+            from services.document_service import S3_BUCKET, s3_client
+            return S3ArchiveJobStore(s3_client, S3_BUCKET)
+        except Exception as e:
+            logger.error(f"Could not initialize S3 archive job store, jobs are per instance: {e}")
+            return NullArchiveJobStore()
+
+    if store != 'none':
+        logger.warning(f"Unknown ARCHIVE_JOB_STORE '{store}', jobs are per instance")
+    return NullArchiveJobStore()
+
+
+def _create_job_manager() -> DocumentArchiveJobManager:
+    job_manager = DocumentArchiveJobManager(store=_create_store())
+    logger.info(f"Document archive jobs using {type(job_manager.store).__name__}")
+    return job_manager
+
+
+_job_manager = Lazy(_create_job_manager)
+
+
+def get_archive_job_manager() -> DocumentArchiveJobManager:
+    """
+    Get the process-wide archive job manager.
+
+    Returns:
+        Shared DocumentArchiveJobManager
+    """
+    return _job_manager.get()
@@ -1,12 +1,16 @@
 """Document service for handling file uploads and S3 operations"""
 
 import json
+import os
+import time
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import boto3
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
 
 from database.connection import execute_insert, execute_one, execute_query
 
@@ -44,6 +48,28 @@ endpoint_url = f'https://s3.{S3_REGION}.amazonaws.com'
 s3_client = boto3.client('s3', region_name=S3_REGION, endpoint_url=endpoint_url)
 print(f"[S3 Config] S3 client initialized with region: {s3_client.meta.region_name}, endpoint: {endpoint_url}")
 
+# Concurrent S3 downloads when building document archives. Documents up to
+# ARCHIVE_BUFFER_MAX_BYTES are downloaded ahead of the ZIP writer, so at most
+# ARCHIVE_FETCH_WORKERS * ARCHIVE_BUFFER_MAX_BYTES are held in memory; larger
+# ones are opened only when the writer reaches them and streamed in chunks
+ARCHIVE_FETCH_WORKERS = int(os.getenv('ARCHIVE_FETCH_WORKERS', '8'))
+ARCHIVE_FETCH_RETRIES = int(os.getenv('ARCHIVE_FETCH_RETRIES', '3'))
+ARCHIVE_BUFFER_MAX_BYTES = int(os.getenv('ARCHIVE_BUFFER_MAX_BYTES', str(16 * 1024 * 1024)))
+
+# S3 error codes worth retrying; anything else (NoSuchKey, AccessDenied) fails at once
+_RETRYABLE_S3_ERRORS = {
+    'RequestTimeout', 'SlowDown', 'Throttling', 'ThrottlingException',
+    'InternalError', 'ServiceUnavailable', '500', '503'
+}
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether an S3 request or body read may succeed if tried again"""
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code') in _RETRYABLE_S3_ERRORS
+    # Connection resets and read timeouts, also while reading a body
+    return isinstance(error, (BotoCoreError, ConnectionError))
+
 
 class DocumentService:
     """Service for managing document uploads and processing"""
@@ -243,11 +269,26 @@ class DocumentService:
 
         return documents
 
-    def create_documents_zip(self, user_id: str) -> Dict[str, Any]:
-        """Create a ZIP archive of all user documents"""
-        import io
-        import zipfile
+    def create_documents_zip(
+        self,
+        user_id: str,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
+        """Create a ZIP archive of all user documents
+
+        Documents are downloaded from S3 by a bounded worker pool and added
+        to the archive in their original order; the archive is streamed
+        back to S3 (multipart for large archives), so memory use does not
+        grow with the number of documents.
+
+        Args:
+            user_id: User ID
+            progress_callback: Called with (processed, total) documents
+        """
         from datetime import datetime
+        from itertools import chain
+
+        from utils.streaming_zip import iter_zip, upload_stream_to_s3
 
         # Get all user documents
         query = """
@@ -270,52 +311,26 @@ class DocumentService:
                 'document_count': 0
             }
 
-        # Create ZIP file in memory
-        zip_buffer = io.BytesIO()
-
         try:
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                successful_count = 0
-                for doc in documents:
-                    try:
-                        # Download file from S3
-                        response = s3_client.get_object(
-                            Bucket=S3_BUCKET,
-                            Key=doc['s3_key']
-                        )
-                        file_content = response['Body'].read()
-
-                        # Organize by year and document type
-                        year = int(doc['upload_year']) if doc['upload_year'] else 'unknown'
-                        doc_type = doc['document_type'] or 'other'
-                        zip_path = f"{year}/{doc_type}/{doc['file_name']}"
-
-                        # Add to ZIP
-                        zip_file.writestr(zip_path, file_content)
-                        successful_count += 1
-
-                    except ClientError as e:
-                        print(f"Error downloading document {doc['id']}: {e}")
-                        # Continue with other documents
-                    except Exception as e:
-                        print(f"Unexpected error processing document {doc['id']}: {e}")
-                        # Continue with other documents
-
-                if successful_count == 0:
-                    return {
-                        'error': 'Failed to add any documents to archive',
-                        'document_count': 0
-                    }
-
-            # Upload ZIP to S3
-            zip_buffer.seek(0)
+            entries = self._iter_archive_entries(documents, progress_callback)
+
+            # Only start the upload once at least one document could be fetched
+            first_entry = next(entries, None)
+            if first_entry is None:
+                return {
+                    'error': 'Failed to add any documents to archive',
+                    'document_count': 0
+                }
+
+            # Stream ZIP to S3
             timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
             zip_key = f"exports/{user_id}/documents_{timestamp}.zip"
 
-            s3_client.put_object(
-                Bucket=S3_BUCKET,
-                Key=zip_key,
-                Body=zip_buffer.getvalue(),
+            file_size = upload_stream_to_s3(
+                s3_client,
+                S3_BUCKET,
+                zip_key,
+                iter_zip(chain([first_entry], entries)),
                 ContentType='application/zip',
                 ServerSideEncryption='AES256'
             )
@@ -334,7 +349,7 @@ class DocumentService:
             return {
                 'download_url': download_url,
                 'document_count': len(documents),
-                'file_size_bytes': len(zip_buffer.getvalue()),
+                'file_size_bytes': file_size,
                 'expires_in': 3600,
                 'message': 'Document archive created successfully'
             }
@@ -343,6 +358,108 @@ class DocumentService:
             print(f"Error creating document archive: {e}")
             raise
 
+    def _iter_archive_entries(
+        self,
+        documents: List[Dict[str, Any]],
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ):
+        """Yield (zip path, content chunks) for each document that can be fetched from S3
+
+        Documents are downloaded ahead of the ZIP writer on ARCHIVE_FETCH_WORKERS
+        threads and consumed in document order. Documents that still fail
+        after retries are logged and left out; only a streamed document that
+        fails partway, after its first bytes were written, fails the archive.
+        """
+        total = len(documents)
+        workers = max(1, min(ARCHIVE_FETCH_WORKERS, total))
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='archive-fetch') as executor:
+            pending = deque()
+            remaining = iter(documents)
+
+            def submit_next() -> None:
+                doc = next(remaining, None)
+                if doc is not None:
+                    pending.append((doc, executor.submit(self._fetch_document, doc['s3_key'])))
+
+            # Keep one download per worker in flight
+            for _ in range(workers):
+                submit_next()
+
+            processed = 0
+            while pending:
+                doc, future = pending.popleft()
+                try:
+                    file_content = future.result()
+                    if file_content is None:
+                        # Too large to buffer; streamed once the writer gets here
+                        file_content = self._iter_document_chunks(doc['s3_key'])
+                except ClientError as e:
+                    print(f"Error downloading document {doc['id']}: {e}")
+                    file_content = None
+                except Exception as e:
+                    print(f"Unexpected error processing document {doc['id']}: {e}")
+                    file_content = None
+                submit_next()
+
+                processed += 1
+                if progress_callback is not None:
+                    progress_callback(processed, total)
+
+                if file_content is None:
+                    # Continue with other documents
+                    continue
+
+                # Organize by year and document type
+                year = int(doc['upload_year']) if doc['upload_year'] else 'unknown'
+                doc_type = doc['document_type'] or 'other'
+                zip_path = f"{year}/{doc_type}/{doc['file_name']}"
+
+                yield zip_path, [file_content] if isinstance(file_content, bytes) else file_content
+
+    def _fetch_document(self, s3_key: str) -> Optional[bytes]:
+        """Download a document from S3, retrying the whole object on throttling and transient errors
+
+        Returns:
+            Document content, or None if it is larger than ARCHIVE_BUFFER_MAX_BYTES
+        """
+        for attempt in range(ARCHIVE_FETCH_RETRIES + 1):
+            try:
+                response = s3_client.get_object(Bucket=S3_BUCKET, Key=s3_key)
+                body = response['Body']
+                if response.get('ContentLength', 0) > ARCHIVE_BUFFER_MAX_BYTES:
+                    body.close()
+                    return None
+                try:
+                    return body.read()
+                finally:
+                    body.close()
+            except Exception as e:
+                if not _is_retryable(e) or attempt == ARCHIVE_FETCH_RETRIES:
+                    raise
+
+            time.sleep(0.2 * 2 ** attempt)
+
+    def _iter_document_chunks(self, s3_key: str):
+        """Stream a document from S3 in chunks, resuming with a range request after transient errors"""
+        from utils.streaming_zip import iter_file_chunks
+
+        offset = 0
+        for attempt in range(ARCHIVE_FETCH_RETRIES + 1):
+            try:
+                params = {'Bucket': S3_BUCKET, 'Key': s3_key}
+                if offset:
+                    params['Range'] = f'bytes={offset}-'
+                for chunk in iter_file_chunks(s3_client.get_object(**params)['Body']):
+                    offset += len(chunk)
+                    yield chunk
+                return
+            except Exception as e:
+                if not _is_retryable(e) or attempt == ARCHIVE_FETCH_RETRIES:
+                    raise
+
+            time.sleep(0.2 * 2 ** attempt)
+
     def delete_old_documents(self, user_id: str, years: int = 7) -> Dict[str, Any]:
         """Delete documents older than specified years"""
         from datetime import datetime, timedelta
@@ -15,7 +15,9 @@ from sqlalchemy.orm import Session
 from db.session import get_db
 from models.tax_filing_session import TaxFilingSession
 from services.canton_tax_calculators import get_canton_calculator
+from services.federal_tax_tariff import get_federal_tax_tariff
 from services.filing_orchestration_service import FilingOrchestrationService
+from services.municipality_index import get_municipality_index
 
 logger = logging.getLogger(__name__)
 
@@ -327,7 +329,7 @@ class EnhancedTaxCalculationService:
         marital_status: str
     ) -> Decimal:
         """
-        Calculate Swiss federal tax using 2024 rates.
+        Calculate Swiss federal tax using the tariff for the service's tax year.
 
         Args:
             taxable_income: Taxable income after deductions
@@ -339,63 +341,7 @@ class EnhancedTaxCalculationService:
         if taxable_income <= 0:
             return Decimal('0')
 
-        # Federal tax brackets for 2024
-        if marital_status == 'married':
-            # Married rates
-            if taxable_income <= 30800:
-                return Decimal('0')
-            elif taxable_income <= 50900:
-                return (taxable_income - Decimal('30800')) * Decimal('0.01')
-            elif taxable_income <= 58400:
-                return Decimal('201') + (taxable_income - Decimal('50900')) * Decimal('0.02')
-            elif taxable_income <= 75300:
-                return Decimal('351') + (taxable_income - Decimal('58400')) * Decimal('0.03')
-            elif taxable_income <= 90300:
-                return Decimal('858') + (taxable_income - Decimal('75300')) * Decimal('0.04')
-            elif taxable_income <= 103400:
-                return Decimal('1458') + (taxable_income - Decimal('90300')) * Decimal('0.05')
-            elif taxable_income <= 114700:
-                return Decimal('2113') + (taxable_income - Decimal('103400')) * Decimal('0.06')
-            elif taxable_income <= 124200:
-                return Decimal('2791') + (taxable_income - Decimal('114700')) * Decimal('0.07')
-            elif taxable_income <= 131700:
-                return Decimal('3456') + (taxable_income - Decimal('124200')) * Decimal('0.08')
-            elif taxable_income <= 137300:
-                return Decimal('4056') + (taxable_income - Decimal('131700')) * Decimal('0.09')
-            elif taxable_income <= 141200:
-                return Decimal('4560') + (taxable_income - Decimal('137300')) * Decimal('0.10')
-            elif taxable_income <= 143100:
-                return Decimal('4950') + (taxable_income - Decimal('141200')) * Decimal('0.11')
-            elif taxable_income <= 145000:
-                return Decimal('5159') + (taxable_income - Decimal('143100')) * Decimal('0.12')
-            elif taxable_income <= 895900:
-                return Decimal('5387') + (taxable_income - Decimal('145000')) * Decimal('0.13')
-            else:
-                return Decimal('103004') + (taxable_income - Decimal('895900')) * Decimal('0.115')
-        else:
-            # Single rates
-            if taxable_income <= 17800:
-                return Decimal('0')
-            elif taxable_income <= 31600:
-                return (taxable_income - Decimal('17800')) * Decimal('0.01')
-            elif taxable_income <= 41400:
-                return Decimal('138') + (taxable_income - Decimal('31600')) * Decimal('0.02')
-            elif taxable_income <= 55200:
-                return Decimal('334') + (taxable_income - Decimal('41400')) * Decimal('0.03')
-            elif taxable_income <= 72500:
-                return Decimal('748') + (taxable_income - Decimal('55200')) * Decimal('0.04')
-            elif taxable_income <= 78100:
-                return Decimal('1440') + (taxable_income - Decimal('72500')) * Decimal('0.05')
-            elif taxable_income <= 103600:
-                return Decimal('1720') + (taxable_income - Decimal('78100')) * Decimal('0.06')
-            elif taxable_income <= 134600:
-                return Decimal('3250') + (taxable_income - Decimal('103600')) * Decimal('0.07')
-            elif taxable_income <= 176000:
-                return Decimal('5420') + (taxable_income - Decimal('134600')) * Decimal('0.08')
-            elif taxable_income <= 755200:
-                return Decimal('8732') + (taxable_income - Decimal('176000')) * Decimal('0.11')
-            else:
-                return Decimal('72444') + (taxable_income - Decimal('755200')) * Decimal('0.13')
+        return get_federal_tax_tariff(self.tax_year).calculate(taxable_income, marital_status)
 
     def _calculate_cantonal_tax(
         self,
@@ -440,7 +386,7 @@ class EnhancedTaxCalculationService:
         municipality: str
     ) -> Decimal:
         """
-        Get municipal tax multiplier from database or fallback to hardcoded values.
+        Get municipal tax multiplier from the municipality index or fallback to hardcoded values.
 
         Args:
             canton: Canton code
@@ -452,26 +398,11 @@ class EnhancedTaxCalculationService:
         if not municipality:
             return Decimal('1.0')
 
-        try:
-            # Try to get from database first
-            from sqlalchemy import text
-            result = self.db.execute(
-                text("""
-                    SELECT tax_multiplier
-                    FROM swisstax.municipalities
-                    WHERE canton = :canton
-                      AND name = :municipality
-                      AND tax_year = :tax_year
-                    LIMIT 1
-                """),
-                {"canton": canton, "municipality": municipality, "tax_year": self.tax_year}
-            ).fetchone()
-
-            if result:
-                return Decimal(str(result[0]))
-
-        except Exception as e:
-            logger.warning(f"Could not query municipality {municipality} from database: {e}")
+        index = get_municipality_index(self.tax_year)
+        if index:
+            multiplier = index.get_multiplier(canton, municipality)
+            if multiplier is not None:
+                return multiplier
 
         # Fallback to hardcoded values
         multiplier = MUNICIPAL_MULTIPLIERS.get(municipality, Decimal('1.0'))
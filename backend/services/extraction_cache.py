@@ -0,0 +1,185 @@
+"""
+Extraction Cache
+
+Persistent cache of document OCR text, classifications and extracted
+fields, so re-uploading the same document or re-running an extraction
+does not pay for Textract or the AI model again.
+
+Keys are derived from the SHA-256 of the document content, the stage
+('ocr', 'classification', 'extraction:<type>', ...), the model and the
+template or prompt version. Changing any of them (e.g. a new model or
+different expected fields) yields a new key; stale entries age out.
+
+Entries hold personal tax data and are encrypted with the application
+encryption key before they reach the storage backend. Storage uses the
+same backends as the PDF cache (EXTRACTION_CACHE_BACKEND 'local', 's3'
+or 'none'), with their own directory, S3 prefix, size limit and TTL.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Optional
+
+from services.pdf_generators.pdf_cache import (LocalPDFCacheBackend,
+                                               NullPDFCacheBackend, PDFCache,
+                                               PDFCacheBackend,
+                                               S3PDFCacheBackend)
+from utils.shared_state import Lazy
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached value format changes
+EXTRACTION_CACHE_VERSION = '1'
+
+EXTRACTION_CACHE_BACKEND = os.getenv('EXTRACTION_CACHE_BACKEND', 'local')
+EXTRACTION_CACHE_DIR = os.getenv(
+    'EXTRACTION_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'swissai-extraction-cache')
+)
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv('EXTRACTION_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+EXTRACTION_CACHE_TTL_SECONDS = int(os.getenv('EXTRACTION_CACHE_TTL_SECONDS', str(30 * 24 * 3600)))
+EXTRACTION_CACHE_S3_PREFIX = os.getenv('EXTRACTION_CACHE_S3_PREFIX', 'extraction-cache/')
+
+
+def content_hash(content: bytes) -> str:
+    """SHA-256 hex digest of document content (as FileValidationService.calculate_file_hash)"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def extraction_cache_key(
+    document_hash: str,
+    stage: str,
+    model: str,
+    template_version: Any = None
+) -> str:
+    """
+    Derive the cache key of one extraction stage of a document.
+
+    Args:
+        document_hash: SHA-256 of the document content
+        stage: Extraction stage, e.g. 'ocr', 'classification', 'extraction:lohnausweis'
+        model: OCR engine or AI model producing the result
+        template_version: Version of the prompt/template the result depends on
+
+    Returns:
+        Hex digest
+    """
+    canonical = json.dumps(
+        [EXTRACTION_CACHE_VERSION, document_hash, stage, model, template_version],
+        default=str,
+        separators=(',', ':')
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ExtractionCache:
+    """Encrypted JSON values on top of a cache backend; failures behave as misses"""
+
+    def __init__(self, backend: PDFCacheBackend, encryption_service=None):
+        self._store = PDFCache(backend)
+        self._encryption_service = encryption_service
+
+    @property
+    def backend(self) -> PDFCacheBackend:
+        return self._store.backend
+
+    @property
+    def encryption_service(self):
+        if self._encryption_service is None:
+            from utils.encryption import get_encryption_service
+            self._encryption_service = get_encryption_service()
+        return self._encryption_service
+
+    @property
+    def enabled(self) -> bool:
+        """Whether lookups can hit at all"""
+        return not isinstance(self.backend, NullPDFCacheBackend)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Decrypted value, or None on a miss or when the entry cannot be decrypted
+        """
+        if not self.enabled:
+            return None
+
+        data = self._store.get(key)
+        if data is None:
+            return None
+
+        try:
+            return json.loads(self.encryption_service.decrypt(data.decode('ascii')))
+        except Exception as e:
+            # E.g. written with a rotated key; regenerate
+            logger.warning(f"Discarding unreadable extraction cache entry {key[:12]}: {e}")
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Encrypt and store a JSON-serializable value.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if not self.enabled:
+            return
+
+        try:
+            encrypted = self.encryption_service.encrypt(json.dumps(value, default=str))
+        except Exception as e:
+            logger.warning(f"Could not encrypt extraction cache entry {key[:12]}: {e}")
+            return
+        self._store.put(key, encrypted.encode('ascii'))
+
+
+def _create_backend() -> PDFCacheBackend:
+    """Create the backend selected by EXTRACTION_CACHE_BACKEND."""
+    backend = EXTRACTION_CACHE_BACKEND.lower()
+    try:
+        if backend == 's3':
+            from config import settings
+            return S3PDFCacheBackend(
+                settings.AWS_S3_BUCKET_NAME,
+                prefix=EXTRACTION_CACHE_S3_PREFIX,
+                ttl_seconds=EXTRACTION_CACHE_TTL_SECONDS
+            )
+        if backend == 'local':
+            return LocalPDFCacheBackend(
+                EXTRACTION_CACHE_DIR,
+                max_bytes=EXTRACTION_CACHE_MAX_BYTES,
+                ttl_seconds=EXTRACTION_CACHE_TTL_SECONDS
+            )
+    except Exception as e:
+        logger.error(f"Could not initialize extraction cache backend '{backend}', caching disabled: {e}")
+        return NullPDFCacheBackend()
+
+    if backend != 'none':
+        logger.warning(f"Unknown EXTRACTION_CACHE_BACKEND '{backend}', caching disabled")
+    return NullPDFCacheBackend()
+
+
+def _create_extraction_cache() -> ExtractionCache:
+    extraction_cache = ExtractionCache(_create_backend())
+    logger.info(f"Extraction cache using {type(extraction_cache.backend).__name__}")
+    return extraction_cache
+
+
+_extraction_cache = Lazy(_create_extraction_cache)
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """
+    Get the process-wide extraction cache.
+
+    Returns:
+        Shared ExtractionCache
+    """
+    return _extraction_cache.get()
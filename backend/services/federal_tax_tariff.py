@@ -0,0 +1,162 @@
+"""
+Federal Tax Tariff
+
+Direct federal tax (DBG Art. 36) schedules as data, one entry per tax year.
+Each schedule row is (income_threshold, base_tax, marginal_rate): income above
+the threshold is taxed base_tax + (income - threshold) × marginal_rate, up to
+the next row's threshold. Income at or below the first threshold is tax-free.
+
+Tariffs are compiled once per tax year and shared by all tax services:
+scalar lookups use a binary search over the thresholds, batch evaluation
+reuses the NumPy schedule of the canton calculators.
+
+To add a tax year, add its schedules to FEDERAL_TAX_SCHEDULES.
+"""
+
+import logging
+from bisect import bisect_left
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from services.canton_tax_calculators.base import CompiledTaxSchedule, round_to_cents
+
+logger = logging.getLogger(__name__)
+
+TariffRow = Tuple[Decimal, Decimal, Decimal]
+
+FEDERAL_TAX_SCHEDULES: Dict[int, Dict[str, List[TariffRow]]] = {
+    2024: {
+        'single': [
+            (Decimal('17800'), Decimal('0'), Decimal('0.01')),
+            (Decimal('31600'), Decimal('138'), Decimal('0.02')),
+            (Decimal('41400'), Decimal('334'), Decimal('0.03')),
+            (Decimal('55200'), Decimal('748'), Decimal('0.04')),
+            (Decimal('72500'), Decimal('1440'), Decimal('0.05')),
+            (Decimal('78100'), Decimal('1720'), Decimal('0.06')),
+            (Decimal('103600'), Decimal('3250'), Decimal('0.07')),
+            (Decimal('134600'), Decimal('5420'), Decimal('0.08')),
+            (Decimal('176000'), Decimal('8732'), Decimal('0.11')),
+            (Decimal('755200'), Decimal('72444'), Decimal('0.13')),
+        ],
+        'married': [
+            (Decimal('30800'), Decimal('0'), Decimal('0.01')),
+            (Decimal('50900'), Decimal('201'), Decimal('0.02')),
+            (Decimal('58400'), Decimal('351'), Decimal('0.03')),
+            (Decimal('75300'), Decimal('858'), Decimal('0.04')),
+            (Decimal('90300'), Decimal('1458'), Decimal('0.05')),
+            (Decimal('103400'), Decimal('2113'), Decimal('0.06')),
+            (Decimal('114700'), Decimal('2791'), Decimal('0.07')),
+            (Decimal('124200'), Decimal('3456'), Decimal('0.08')),
+            (Decimal('131700'), Decimal('4056'), Decimal('0.09')),
+            (Decimal('137300'), Decimal('4560'), Decimal('0.10')),
+            (Decimal('141200'), Decimal('4950'), Decimal('0.11')),
+            (Decimal('143100'), Decimal('5159'), Decimal('0.12')),
+            (Decimal('145000'), Decimal('5387'), Decimal('0.13')),
+            (Decimal('895900'), Decimal('103004'), Decimal('0.115')),
+        ],
+    },
+}
+
+
+class FederalTaxTariff:
+    """Compiled federal tax tariff for one tax year"""
+
+    def __init__(self, tax_year: int, schedules: Dict[str, List[TariffRow]]):
+        self.tax_year = tax_year
+        self._rows = {status: list(rows) for status, rows in schedules.items()}
+        self._thresholds = {
+            status: [threshold for threshold, _, _ in rows]
+            for status, rows in self._rows.items()
+        }
+        self._compiled = {
+            status: self._compile(rows) for status, rows in self._rows.items()
+        }
+
+    @staticmethod
+    def _compile(rows: List[TariffRow]) -> CompiledTaxSchedule:
+        """Compile tariff rows into a vectorized schedule."""
+        segments = [(rows[0][0], Decimal('0'), Decimal('0'))]
+        for index, (threshold, base_tax, rate) in enumerate(rows):
+            upper = rows[index + 1][0] if index + 1 < len(rows) else Decimal('inf')
+            segments.append((upper, base_tax - threshold * rate, rate))
+        return CompiledTaxSchedule(segments)
+
+    def _status(self, marital_status: str) -> str:
+        """Married couples use the married tariff, everyone else the single tariff."""
+        return 'married' if marital_status == 'married' else 'single'
+
+    def calculate(self, taxable_income: Decimal, marital_status: str = 'single') -> Decimal:
+        """
+        Calculate federal tax for one taxpayer.
+
+        Args:
+            taxable_income: Taxable income after deductions
+            marital_status: 'married' uses the married tariff, anything else the single tariff
+
+        Returns:
+            Federal tax amount
+        """
+        status = self._status(marital_status)
+        index = bisect_left(self._thresholds[status], taxable_income) - 1
+        if index < 0:
+            return Decimal('0')
+
+        threshold, base_tax, rate = self._rows[status][index]
+        return base_tax + (taxable_income - threshold) * rate
+
+    def calculate_many(
+        self,
+        incomes: Sequence[Union[Decimal, float]],
+        marital_statuses: Union[str, Sequence[str]] = 'single'
+    ) -> List[Decimal]:
+        """
+        Calculate federal tax for many taxpayers in one vectorized pass.
+
+        Args:
+            incomes: Taxable incomes
+            marital_statuses: One status for all rows or one per row
+
+        Returns:
+            Federal tax per row rounded to the cent, in input order
+        """
+        income_array = np.asarray([float(income) for income in incomes], dtype=float)
+        if isinstance(marital_statuses, str):
+            marital_statuses = [marital_statuses] * len(income_array)
+        if len(marital_statuses) != len(income_array):
+            raise ValueError("incomes and marital_statuses must have the same length")
+
+        statuses = np.asarray([self._status(status) for status in marital_statuses])
+        taxes = np.zeros(len(income_array), dtype=float)
+        for status, schedule in self._compiled.items():
+            rows = statuses == status
+            if rows.any():
+                taxes[rows] = schedule.evaluate(income_array[rows])
+
+        return round_to_cents(taxes)
+
+
+@lru_cache(maxsize=None)
+def get_federal_tax_tariff(tax_year: int) -> FederalTaxTariff:
+    """
+    Get the compiled federal tariff for a tax year.
+
+    Years without a published schedule use the most recent earlier schedule
+    (or the earliest one for years before it).
+
+    Args:
+        tax_year: Tax year
+
+    Returns:
+        Shared FederalTaxTariff instance
+    """
+    available_years = sorted(FEDERAL_TAX_SCHEDULES)
+    earlier_years = [year for year in available_years if year <= tax_year]
+    schedule_year = earlier_years[-1] if earlier_years else available_years[0]
+
+    if schedule_year != tax_year:
+        logger.warning(f"No federal tax schedule for {tax_year}, using {schedule_year} schedule")
+
+    return FederalTaxTariff(tax_year, FEDERAL_TAX_SCHEDULES[schedule_year])
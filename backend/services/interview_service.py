@@ -254,6 +254,11 @@ class InterviewService:
         else:
             session['answers'][question_id] = answer
 
+        # Keep document rule results current; only rules reading this answer are re-evaluated
+        session_context['document_rules'] = self.question_loader.evaluate_document_rules(
+            session['answers'], [question_id], session_context.get('document_rules')
+        )
+
         # Handle postal code auto-lookup
         if hasattr(question, 'auto_lookup') and question.auto_lookup:
             postal_code_service = get_postal_code_service()
@@ -487,7 +492,9 @@ class InterviewService:
 
             # Generate profile and document requirements
             profile = self._generate_profile(session['answers'])
-            document_requirements = self.question_loader.get_document_requirements(session['answers'])
+            document_requirements = self.question_loader.get_document_requirements(
+                session['answers'], session_context.get('document_rules')
+            )
 
             return {
                 'complete': True,
@@ -515,7 +522,9 @@ class InterviewService:
 
             # Generate profile and document requirements with existing answers
             profile = self._generate_profile(session['answers'])
-            document_requirements = self.question_loader.get_document_requirements(session['answers'])
+            document_requirements = self.question_loader.get_document_requirements(
+                session['answers'], session_context.get('document_rules')
+            )
 
             return {
                 'complete': True,
@@ -1060,6 +1069,12 @@ class InterviewService:
             if db_session.answers is None:
                 db_session.answers = {}
             db_session.answers.update(answers)
+            # Answers changed outside submit_answer: rebuild document rule results on next use
+            if db_session.session_context and 'document_rules' in db_session.session_context:
+                db_session.session_context = {
+                    key: value for key, value in db_session.session_context.items()
+                    if key != 'document_rules'
+                }
 
         if progress is not None:
             db_session.progress = progress
@@ -0,0 +1,253 @@
+"""
+Municipality Index
+
+In-process index of swisstax.municipalities, one snapshot per tax year.
+Municipal, wealth and church calculations resolve tax multipliers from
+here instead of querying Postgres on every calculation.
+
+Each snapshot is keyed by municipality id and by canton + name. Name
+lookups try the exact spelling first, then an accent/case-insensitive
+match, so "Zurich", "ZÜRICH" and "Zürich" resolve to the same row.
+
+Snapshots are versioned by a cheap fingerprint query (row count, latest
+update and multiplier checksum). The fingerprint is re-checked at most
+every INDEX_CHECK_INTERVAL_SECONDS, and the snapshot is reloaded when the
+table has changed. invalidate_municipality_index() forces a reload.
+"""
+
+import logging
+import threading
+import time
+import unicodedata
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from database.connection import execute_one, execute_query
+
+logger = logging.getLogger(__name__)
+
+# How often a loaded snapshot compares its fingerprint with the table
+INDEX_CHECK_INTERVAL_SECONDS = 300
+
+# How long to wait before retrying after a failed load
+INDEX_RETRY_INTERVAL_SECONDS = 60
+
+
+def normalize_municipality_name(name: str) -> str:
+    """
+    Normalize a municipality name for accent- and case-insensitive matching.
+
+    Args:
+        name: Municipality name as entered or stored
+
+    Returns:
+        Name without diacritics, casefolded, with collapsed whitespace
+    """
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
+
+
+@dataclass(frozen=True)
+class Municipality:
+    """One row of swisstax.municipalities"""
+    id: int
+    canton: str
+    name: str
+    tax_multiplier: Decimal
+    tax_year: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the row as a plain dictionary"""
+        return asdict(self)
+
+
+class MunicipalityIndex:
+    """Immutable snapshot of all municipalities for one tax year"""
+
+    def __init__(self, tax_year: int, municipalities: Iterable[Municipality], version: Tuple = ()):
+        self.tax_year = tax_year
+        self.version = version
+        self._by_id: Dict[int, Municipality] = {}
+        self._by_name: Dict[Tuple[str, str], Municipality] = {}
+        self._by_normalized_name: Dict[Tuple[str, str], Municipality] = {}
+        self._by_canton: Dict[str, List[Municipality]] = {}
+
+        for municipality in municipalities:
+            canton = municipality.canton.upper()
+            self._by_id[municipality.id] = municipality
+            self._by_canton.setdefault(canton, []).append(municipality)
+            self._by_name[(canton, municipality.name)] = municipality
+            # Keep the first row if two names collapse to the same normalized form
+            self._by_normalized_name.setdefault(
+                (canton, normalize_municipality_name(municipality.name)),
+                municipality
+            )
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get_by_id(self, municipality_id: int, canton: Optional[str] = None) -> Optional[Municipality]:
+        """
+        Look up a municipality by id.
+
+        Args:
+            municipality_id: Municipality id
+            canton: Optional canton code the municipality must belong to
+
+        Returns:
+            Municipality or None if not found
+        """
+        municipality = self._by_id.get(municipality_id)
+        if municipality and canton and municipality.canton.upper() != canton.upper():
+            return None
+        return municipality
+
+    def find(self, canton: str, name: str) -> Optional[Municipality]:
+        """
+        Look up a municipality by name within a canton.
+
+        Args:
+            canton: Canton code
+            name: Municipality name (exact or differing only in accents/case)
+
+        Returns:
+            Municipality or None if not found
+        """
+        if not canton or not name:
+            return None
+
+        canton = canton.upper()
+        municipality = self._by_name.get((canton, name))
+        if municipality:
+            return municipality
+        return self._by_normalized_name.get((canton, normalize_municipality_name(name)))
+
+    def get_canton_municipalities(self, canton: str) -> List[Municipality]:
+        """
+        Get all municipalities of a canton.
+
+        Args:
+            canton: Canton code
+
+        Returns:
+            Municipalities in load order (by name), empty if the canton is unknown
+        """
+        return list(self._by_canton.get(canton.upper(), []))
+
+    def get_multiplier(self, canton: str, name: str) -> Optional[Decimal]:
+        """
+        Get the tax multiplier of a municipality by name.
+
+        Args:
+            canton: Canton code
+            name: Municipality name
+
+        Returns:
+            Tax multiplier or None if the municipality is unknown
+        """
+        municipality = self.find(canton, name)
+        return municipality.tax_multiplier if municipality else None
+
+
+def _fetch_version(tax_year: int) -> Tuple:
+    """Fingerprint the municipalities of a tax year without loading them."""
+    result = execute_one(
+        """
+            SELECT COUNT(*) AS row_count,
+                   MAX(updated_at) AS last_updated,
+                   SUM(tax_multiplier) AS multiplier_checksum
+            FROM swisstax.municipalities
+            WHERE tax_year = %s
+        """,
+        (tax_year,)
+    )
+    if not result:
+        return ()
+    return (result['row_count'], result['last_updated'], result['multiplier_checksum'])
+
+
+def _load_index(tax_year: int) -> MunicipalityIndex:
+    """Load all municipalities of a tax year into a new snapshot."""
+    version = _fetch_version(tax_year)
+    rows = execute_query(
+        """
+            SELECT id, canton, name, tax_multiplier, tax_year
+            FROM swisstax.municipalities
+            WHERE tax_year = %s
+            ORDER BY canton, name
+        """,
+        (tax_year,)
+    )
+    municipalities: List[Municipality] = [
+        Municipality(
+            id=row['id'],
+            canton=row['canton'],
+            name=row['name'],
+            tax_multiplier=Decimal(str(row['tax_multiplier'])),
+            tax_year=row['tax_year']
+        )
+        for row in rows or []
+    ]
+    logger.info(f"Loaded {len(municipalities)} municipalities for tax year {tax_year}")
+    return MunicipalityIndex(tax_year, municipalities, version)
+
+
+# Registry state: snapshot per tax year and when to next check it
+_index_cache: Dict[int, MunicipalityIndex] = {}
+_next_check: Dict[int, float] = {}
+_index_lock = threading.Lock()
+
+
+def get_municipality_index(tax_year: int) -> Optional[MunicipalityIndex]:
+    """
+    Get the shared municipality snapshot for a tax year.
+
+    Loads the snapshot on first use and reloads it when the table
+    fingerprint changes. If the database is unreachable, the last loaded
+    snapshot keeps being served; without one, None is returned and the
+    load is retried after INDEX_RETRY_INTERVAL_SECONDS.
+
+    Args:
+        tax_year: Tax year
+
+    Returns:
+        MunicipalityIndex or None if it could not be loaded
+    """
+    now = time.monotonic()
+    index = _index_cache.get(tax_year)
+    if now < _next_check.get(tax_year, 0):
+        return index
+
+    with _index_lock:
+        index = _index_cache.get(tax_year)
+        if now < _next_check.get(tax_year, 0):
+            return index
+
+        try:
+            if index is None or _fetch_version(tax_year) != index.version:
+                index = _load_index(tax_year)
+                _index_cache[tax_year] = index
+            _next_check[tax_year] = now + INDEX_CHECK_INTERVAL_SECONDS
+        except Exception as e:
+            logger.warning(f"Could not refresh municipality index for tax year {tax_year}: {e}")
+            _next_check[tax_year] = now + INDEX_RETRY_INTERVAL_SECONDS
+
+    return index
+
+
+def invalidate_municipality_index(tax_year: Optional[int] = None) -> None:
+    """
+    Drop cached snapshots so the next lookup reloads them.
+
+    Args:
+        tax_year: Tax year to invalidate, or None for all years
+    """
+    with _index_lock:
+        if tax_year is None:
+            _index_cache.clear()
+            _next_check.clear()
+        else:
+            _index_cache.pop(tax_year, None)
+            _next_check.pop(tax_year, None)
@@ -24,6 +24,8 @@ from services.enhanced_tax_calculation_service import \
     EnhancedTaxCalculationService
 from services.filing_orchestration_service import FilingOrchestrationService
 
+from .filing_snapshot import FilingSnapshot
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,6 +42,9 @@ class ECH0196PDFGenerator:
     - Page 8: eCH-0196 Barcode
     """
 
+    # Bump when the layout changes; part of the generated PDF cache key
+    TEMPLATE_VERSION = '1'
+
     def __init__(self):
         self.page_width, self.page_height = A4
         self.margin = 50
@@ -49,7 +54,8 @@ class ECH0196PDFGenerator:
         self,
         filing_id: str,
         language: str = 'en',
-        db=None
+        db=None,
+        snapshot: Optional[FilingSnapshot] = None
     ) -> io.BytesIO:
         """
         Generate complete eCH-0196 PDF for a filing.
@@ -58,20 +64,25 @@ class ECH0196PDFGenerator:
             filing_id: Tax filing session ID
             language: Language code ('en', 'de', 'fr', 'it')
             db: Database session
+            snapshot: Already loaded filing and calculation (optional)
 
         Returns:
             BytesIO buffer with PDF data
         """
-        # Get filing and calculation data
-        filing_service = FilingOrchestrationService(db=db)
-        tax_service = EnhancedTaxCalculationService(db=db)
+        if snapshot is None:
+            # Get filing and calculation data
+            filing_service = FilingOrchestrationService(db=db)
+            tax_service = EnhancedTaxCalculationService(db=db)
+
+            filing = filing_service.get_filing(filing_id)
+            if not filing:
+                raise ValueError(f"Filing {filing_id} not found")
 
-        filing = filing_service.get_filing(filing_id)
-        if not filing:
-            raise ValueError(f"Filing {filing_id} not found")
+            # Calculate taxes
+            snapshot = FilingSnapshot.from_filing(filing, tax_service.calculate_single_filing(filing))
 
-        # Calculate taxes
-        calculation = tax_service.calculate_single_filing(filing)
+        filing = snapshot.filing
+        calculation = snapshot.calculation
 
         # Get translations
         texts = self._get_translations(language)
@@ -82,7 +93,7 @@ class ECH0196PDFGenerator:
 
         # Generate barcode data
         barcode_data = self.ech_service.generate_barcode_data(
-            filing.to_dict(),
+            snapshot.filing_data,
             calculation
         )
 
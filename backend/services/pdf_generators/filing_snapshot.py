@@ -0,0 +1,55 @@
+"""
+Filing Snapshot
+
+Everything the PDF renderers read about a filing: the filing itself, its
+decrypted dictionary form and one tax calculation. Loading the filing and
+calculating (which also persists a calculation row) happen once per
+download; the eCH-0196 generator and the traditional form filler then
+render from the same snapshot.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict
+
+
+@dataclass(frozen=True)
+class FilingSnapshot:
+    """Read-only inputs shared by all PDF renderers of one filing"""
+    filing: Any
+    filing_data: Dict[str, Any]
+    calculation: Dict[str, Any]
+
+    @classmethod
+    def from_filing(cls, filing: Any, calculation: Dict[str, Any]) -> 'FilingSnapshot':
+        """Build a snapshot from a loaded filing and its calculation"""
+        return cls(filing=filing, filing_data=filing.to_dict(), calculation=calculation)
+
+
+def load_filing_snapshot(filing_id: str, db=None, filing: Any = None) -> FilingSnapshot:
+    """
+    Load a filing and calculate its taxes once.
+
+    Args:
+        filing_id: Tax filing session ID
+        db: Database session (optional)
+        filing: Already loaded filing, skips the lookup (optional)
+
+    Returns:
+        FilingSnapshot
+
+    Raises:
+        ValueError: If the filing does not exist
+    """
+    # Import here to avoid circular imports
+    from services.enhanced_tax_calculation_service import \
+        EnhancedTaxCalculationService
+    from services.filing_orchestration_service import \
+        FilingOrchestrationService
+
+    if filing is None:
+        filing = FilingOrchestrationService(db=db).get_filing(filing_id)
+        if not filing:
+            raise ValueError(f"Filing {filing_id} not found")
+
+    calculation = EnhancedTaxCalculationService(db=db).calculate_single_filing(filing)
+    return FilingSnapshot.from_filing(filing, calculation)
@@ -0,0 +1,171 @@
+"""
+Form Template Cache
+
+Keeps parsed official canton forms in memory, one per template file (that
+is, per canton, tax year and language), bounded by an LRU.
+
+Each cached template holds the PDF bytes, a PdfReader over them and an
+index of form field name -> page numbers built from the widget
+annotations, so filling a form no longer re-reads and re-parses the file
+or searches every page for every field. Templates are re-read when the
+file's mtime or size changes (e.g. after download_canton_forms.py).
+"""
+
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from pypdf import PdfReader, PdfWriter
+
+from utils.shared_state import Lazy
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of parsed templates kept in memory
+FORM_TEMPLATE_CACHE_SIZE = int(os.getenv('FORM_TEMPLATE_CACHE_SIZE', '16'))
+
+
+def _field_names(annotation) -> List[str]:
+    """Return the partial (/T) and fully qualified names of a widget's field."""
+    field = annotation if '/T' in annotation else annotation.get('/Parent')
+    if field is None:
+        return []
+    field = field.get_object()
+
+    parts = []
+    node = field
+    while node is not None:
+        if '/T' in node:
+            parts.append(str(node['/T']))
+        parent = node.get('/Parent')
+        node = parent.get_object() if parent is not None else None
+
+    if not parts:
+        return []
+    qualified = '.'.join(reversed(parts))
+    return [parts[0]] if qualified == parts[0] else [parts[0], qualified]
+
+
+class FormTemplate:
+    """A parsed PDF form template with its field -> page index"""
+
+    def __init__(self, path: Path, data: bytes, stat_key: Tuple[int, int] = (0, 0)):
+        self.path = path
+        self.data = data
+        self.stat_key = stat_key
+        self.reader = PdfReader(io.BytesIO(data))
+        # PdfReader reads lazily from its stream, so cloning is serialized per template
+        self._lock = threading.Lock()
+
+        field_pages: Dict[str, Set[int]] = {}
+        for page_number, page in enumerate(self.reader.pages):
+            for annotation in page.get('/Annots') or []:
+                annotation = annotation.get_object()
+                if annotation.get('/Subtype') != '/Widget':
+                    continue
+                for name in _field_names(annotation):
+                    field_pages.setdefault(name, set()).add(page_number)
+        self.field_pages: Dict[str, Tuple[int, ...]] = {
+            name: tuple(sorted(pages)) for name, pages in field_pages.items()
+        }
+
+    @property
+    def has_fields(self) -> bool:
+        """Whether the form has any fillable fields"""
+        return bool(self.field_pages)
+
+    def new_writer(self) -> PdfWriter:
+        """Create a writer holding a copy of the complete form, including its AcroForm."""
+        with self._lock:
+            return PdfWriter(clone_from=self.reader)
+
+    def group_by_page(self, values: Dict[str, str]) -> Tuple[Dict[int, Dict[str, str]], List[str]]:
+        """
+        Split field values by the pages their fields are on.
+
+        Args:
+            values: Field name -> value
+
+        Returns:
+            (page number -> field values, names of fields not in the form)
+        """
+        by_page: Dict[int, Dict[str, str]] = {}
+        unknown = []
+        for name, value in values.items():
+            pages = self.field_pages.get(name)
+            if not pages:
+                unknown.append(name)
+                continue
+            for page_number in pages:
+                by_page.setdefault(page_number, {})[name] = value
+        return by_page, unknown
+
+
+class FormTemplateCache:
+    """LRU cache of parsed form templates keyed by file path"""
+
+    def __init__(self, max_size: int = FORM_TEMPLATE_CACHE_SIZE):
+        self.max_size = max_size
+        self._templates: 'OrderedDict[str, FormTemplate]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> FormTemplate:
+        """
+        Get the parsed template for a form file, parsing it on first use.
+
+        Args:
+            path: Path to the PDF form
+
+        Returns:
+            FormTemplate
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        key = str(path)
+        stat = os.stat(key)
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None and template.stat_key == stat_key:
+                self._templates.move_to_end(key)
+                return template
+
+        # Parse outside the lock; a concurrent miss on the same form parses twice at worst
+        with open(key, 'rb') as f:
+            template = FormTemplate(Path(path), f.read(), stat_key)
+        logger.info(f"Parsed form template {path} ({len(template.field_pages)} fields)")
+
+        with self._lock:
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.max_size:
+                evicted, _ = self._templates.popitem(last=False)
+                logger.debug(f"Evicted form template {evicted}")
+        return template
+
+    def clear(self) -> None:
+        """Drop all cached templates."""
+        with self._lock:
+            self._templates.clear()
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+
+_template_cache = Lazy(FormTemplateCache)
+
+
+def get_form_template_cache() -> FormTemplateCache:
+    """
+    Get the process-wide form template cache.
+
+    Returns:
+        Shared FormTemplateCache
+    """
+    return _template_cache.get()
@@ -0,0 +1,349 @@
+"""
+PDF Cache
+
+Content-addressed cache for generated tax return PDFs and ZIP bundles.
+
+Cache keys are SHA-256 digests of everything a document is rendered from:
+the filing (profile, canton, tax year, last update), the PDF type, the
+language, the template version and the municipality index version the
+calculation reads. Editing a filing changes its key, so stale documents are
+never served; old entries simply age out through eviction.
+
+Backends (PDF_CACHE_BACKEND):
+- 'local' (default): files in PDF_CACHE_DIR, evicted least recently used
+  once PDF_CACHE_MAX_BYTES is exceeded, and after PDF_CACHE_TTL_SECONDS
+- 's3': objects under PDF_CACHE_S3_PREFIX in the documents bucket,
+  encrypted at rest; entries older than PDF_CACHE_TTL_SECONDS are ignored
+  (pair with a bucket lifecycle rule on the prefix to delete them)
+- 'none': caching disabled
+
+Cached documents contain personal tax data; the local directory is created
+owner-only and S3 objects use server-side encryption.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from utils.shared_state import Lazy
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendering code changes in a way that alters generated documents
+PDF_CACHE_VERSION = '1'
+
+PDF_CACHE_BACKEND = os.getenv('PDF_CACHE_BACKEND', 'local')
+PDF_CACHE_DIR = os.getenv('PDF_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'swissai-pdf-cache'))
+PDF_CACHE_MAX_BYTES = int(os.getenv('PDF_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+PDF_CACHE_TTL_SECONDS = int(os.getenv('PDF_CACHE_TTL_SECONDS', str(14 * 24 * 3600)))
+PDF_CACHE_S3_PREFIX = os.getenv('PDF_CACHE_S3_PREFIX', 'pdf-cache/')
+
+# Keys are SHA-256 hex digests; anything else is never used as a file or object name
+_KEY_PATTERN = re.compile(r'[0-9a-f]{64}')
+
+# Filing fields that determine the rendered documents
+_KEY_FILING_FIELDS = (
+    'id', 'user_id', 'name', 'tax_year', 'canton', 'is_primary',
+    'parent_filing_id', 'profile', 'updated_at'
+)
+
+
+def pdf_cache_key(
+    filing_data: Dict[str, Any],
+    document_type: str,
+    language: str,
+    template_version: Any = None,
+    calculation_version: Any = None
+) -> str:
+    """
+    Derive the cache key of a generated document.
+
+    Args:
+        filing_data: Filing dictionary (TaxFilingSession.to_dict())
+        document_type: 'ech0196', 'traditional', or a bundle name
+        language: Document language
+        template_version: Version of the form template the document is rendered from
+        calculation_version: Version of the calculation inputs outside the filing
+
+    Returns:
+        Hex digest identifying the document content
+    """
+    payload = {
+        'version': PDF_CACHE_VERSION,
+        'filing': {field: filing_data.get(field) for field in _KEY_FILING_FIELDS},
+        'document_type': document_type,
+        'language': language,
+        'template_version': template_version,
+        'calculation_version': calculation_version
+    }
+    canonical = json.dumps(payload, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def bundle_cache_key(name: str, member_keys: Iterable[str]) -> str:
+    """
+    Derive the cache key of a bundle (e.g. a ZIP) from the keys of its members.
+
+    Args:
+        name: Bundle name, e.g. 'download-both'
+        member_keys: Cache keys of the bundled documents
+
+    Returns:
+        Hex digest identifying the bundle content
+    """
+    canonical = json.dumps([PDF_CACHE_VERSION, name, list(member_keys)], default=str, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class PDFCacheBackend(ABC):
+    """Storage for cached documents"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached bytes for a key, or None"""
+        pass
+
+    @abstractmethod
+    def put(self, key: str, data: bytes) -> None:
+        """Store bytes under a key"""
+        pass
+
+
+class NullPDFCacheBackend(PDFCacheBackend):
+    """Backend that caches nothing"""
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def put(self, key: str, data: bytes) -> None:
+        pass
+
+
+class LocalPDFCacheBackend(PDFCacheBackend):
+    """Cache on local disk with size-bounded LRU eviction and a TTL"""
+
+    def __init__(
+        self,
+        directory: str = PDF_CACHE_DIR,
+        max_bytes: int = PDF_CACHE_MAX_BYTES,
+        ttl_seconds: int = PDF_CACHE_TTL_SECONDS
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.bin"
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if time.time() - stat.st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        # Access time drives LRU eviction; mtime stays the creation time for the TTL
+        os.utime(path, (time.time(), stat.st_mtime))
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        # Write to a temporary file first so readers never see a partial document
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove expired entries and, above max_bytes, the least recently used ones.
+
+        Returns:
+            Number of removed entries
+        """
+        with self._lock:
+            now = time.time()
+            entries = []
+            for path in self.directory.glob('*.bin'):
+                try:
+                    entries.append((path, path.stat()))
+                except FileNotFoundError:
+                    continue
+
+            removed = 0
+            total = 0
+            live = []
+            for path, stat in entries:
+                if now - stat.st_mtime > self.ttl_seconds:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+                else:
+                    live.append((path, stat))
+                    total += stat.st_size
+
+            for path, stat in sorted(live, key=lambda entry: entry[1].st_atime):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= stat.st_size
+                removed += 1
+
+        return removed
+
+
+class S3PDFCacheBackend(PDFCacheBackend):
+    """Cache in S3 under a prefix, encrypted at rest"""
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = PDF_CACHE_S3_PREFIX,
+        ttl_seconds: int = PDF_CACHE_TTL_SECONDS,
+        s3_client=None
+    ):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        if s3_client is None:
+            import boto3
+            from config import settings
+            s3_client = boto3.client('s3', region_name=settings.AWS_S3_REGION)
+        self.s3_client = s3_client
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=f"{self.prefix}{key}")
+        except self.s3_client.exceptions.NoSuchKey:
+            return None
+
+        age = datetime.now(timezone.utc) - response['LastModified']
+        if age.total_seconds() > self.ttl_seconds:
+            return None
+        return response['Body'].read()
+
+    def put(self, key: str, data: bytes) -> None:
+        self.s3_client.put_object(
+            Bucket=self.bucket,
+            Key=f"{self.prefix}{key}",
+            Body=data,
+            ContentType='application/octet-stream',
+            ServerSideEncryption='AES256'
+        )
+
+
+class PDFCache:
+    """Get-or-generate access to cached documents; backend errors never fail a download"""
+
+    def __init__(self, backend: PDFCacheBackend):
+        self.backend = backend
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a cached document.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Document bytes, or None on a miss or backend error
+        """
+        if not isinstance(key, str) or not _KEY_PATTERN.fullmatch(key):
+            return None
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"PDF cache read failed for {key[:12]}: {e}")
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Store a document, logging (not raising) backend errors.
+
+        Args:
+            key: Cache key
+            data: Document bytes
+        """
+        if not isinstance(key, str) or not _KEY_PATTERN.fullmatch(key):
+            logger.warning("Refusing to cache a document under a malformed key")
+            return
+        try:
+            self.backend.put(key, data)
+        except Exception as e:
+            logger.warning(f"PDF cache write failed for {key[:12]}: {e}")
+
+    def get_or_create(self, key: str, factory: Callable[[], bytes]) -> bytes:
+        """
+        Return the cached document or generate and store it.
+
+        Args:
+            key: Cache key
+            factory: Generates the document bytes on a miss
+
+        Returns:
+            Document bytes
+        """
+        data = self.get(key)
+        if data is not None:
+            logger.info(f"PDF cache hit {key[:12]}")
+            return data
+
+        data = factory()
+        self.put(key, data)
+        return data
+
+
+def _create_backend() -> PDFCacheBackend:
+    """Create the backend selected by PDF_CACHE_BACKEND."""
+    backend = PDF_CACHE_BACKEND.lower()
+    try:
+        if backend == 's3':
+            from config import settings
+            return S3PDFCacheBackend(settings.AWS_S3_BUCKET_NAME)
+        if backend == 'local':
+            return LocalPDFCacheBackend()
+    except Exception as e:
+        logger.error(f"Could not initialize PDF cache backend '{backend}', caching disabled: {e}")
+        return NullPDFCacheBackend()
+
+    if backend != 'none':
+        logger.warning(f"Unknown PDF_CACHE_BACKEND '{backend}', caching disabled")
+    return NullPDFCacheBackend()
+
+
+def _create_pdf_cache() -> PDFCache:
+    pdf_cache = PDFCache(_create_backend())
+    logger.info(f"PDF cache using {type(pdf_cache.backend).__name__}")
+    return pdf_cache
+
+
+_pdf_cache = Lazy(_create_pdf_cache)
+
+
+def get_pdf_cache() -> PDFCache:
+    """
+    Get the process-wide PDF cache.
+
+    Returns:
+        Shared PDFCache
+    """
+    return _pdf_cache.get()
@@ -18,7 +18,7 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 
 try:
-    from pypdf import PdfReader, PdfWriter
+    from pypdf import PdfReader
 except ImportError:
     raise ImportError("pypdf not installed. Run: pip install pypdf")
 
@@ -27,6 +27,9 @@ from data.canton_form_mappings import (FormFieldType, get_canton_mapping,
                                        map_filing_data_to_canton_form)
 from data.canton_form_metadata import get_canton_form_metadata
 
+from .filing_snapshot import FilingSnapshot, load_filing_snapshot
+from .form_template_cache import get_form_template_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -69,7 +72,8 @@ class TraditionalPDFFiller:
         self,
         filing_id: str,
         language: str = 'de',
-        db = None
+        db = None,
+        snapshot: Optional[FilingSnapshot] = None
     ) -> io.BytesIO:
         """
         Fill canton form with filing data.
@@ -78,6 +82,7 @@ class TraditionalPDFFiller:
             filing_id: Tax filing session ID
             language: Form language ('de', 'fr', 'it', 'en')
             db: Database session (optional)
+            snapshot: Already loaded filing and calculation (optional)
 
         Returns:
             BytesIO buffer with filled PDF
@@ -86,22 +91,12 @@ class TraditionalPDFFiller:
             FormTemplateNotFoundError: If form template not found
             FieldMappingError: If field mapping fails
         """
-        # Import here to avoid circular imports
-        from services.enhanced_tax_calculation_service import \
-            EnhancedTaxCalculationService
-        from services.filing_orchestration_service import \
-            FilingOrchestrationService
-
-        filing_service = FilingOrchestrationService(db=db)
-        tax_service = EnhancedTaxCalculationService(db=db)
-
-        # Get filing data
-        filing = filing_service.get_filing(filing_id)
-        if not filing:
-            raise ValueError(f"Filing {filing_id} not found")
+        if snapshot is None:
+            # Get filing data and tax calculation
+            snapshot = load_filing_snapshot(filing_id, db)
 
-        # Get tax calculation
-        calculation = tax_service.calculate_single_filing(filing)
+        filing = snapshot.filing
+        calculation = snapshot.calculation
 
         # Get canton form template
         template_path = self._get_form_template_path(
@@ -117,9 +112,8 @@ class TraditionalPDFFiller:
             )
 
         # Map data to canton form fields
-        filing_dict = filing.to_dict()
         mapped_data = map_filing_data_to_canton_form(
-            filing_dict,
+            snapshot.filing_data,
             calculation,
             filing.canton
         )
@@ -182,45 +176,47 @@ class TraditionalPDFFiller:
             BytesIO buffer with filled PDF
         """
         try:
-            # Read template PDF
-            reader = PdfReader(str(template_path))
-            writer = PdfWriter()
-
-            # Clone all pages
-            for page in reader.pages:
-                writer.add_page(page)
+            # Parsed once per template and kept in the shared LRU cache
+            template = get_form_template_cache().get(template_path)
 
-            # Get form fields
-            if reader.get_fields() is None:
+            if not template.has_fields:
                 logger.warning(f"PDF {template_path} has no fillable fields")
                 # Return original PDF if no fields
-                with open(template_path, 'rb') as f:
-                    return io.BytesIO(f.read())
+                return io.BytesIO(template.data)
 
-            # Fill fields
-            filled_count = 0
+            # Format values based on field type
+            formatted_values = {}
             for field_name, value in field_data.items():
                 try:
-                    # Format value based on field type
-                    formatted_value = self._format_field_value(
+                    formatted_values[field_name] = self._format_field_value(
                         value,
                         self._get_field_type_from_name(field_name)
                     )
-
-                    # Update field
-                    writer.update_page_form_field_values(
-                        writer.pages[0],  # Most forms have fields on first page
-                        {field_name: formatted_value}
+                except Exception as e:
+                    logger.warning(
+                        f"Failed to format field {field_name} in {canton}: {e}"
                     )
 
-                    filled_count += 1
+            values_by_page, unknown_fields = template.group_by_page(formatted_values)
+            if unknown_fields:
+                logger.warning(
+                    f"{len(unknown_fields)} mapped fields not found in {canton} form: "
+                    f"{', '.join(sorted(unknown_fields)[:10])}"
+                )
 
+            # One bulk update per page that has fields to fill
+            writer = template.new_writer()
+            filled_fields = set()
+            for page_number, page_values in sorted(values_by_page.items()):
+                try:
+                    writer.update_page_form_field_values(writer.pages[page_number], page_values)
+                    filled_fields.update(page_values)
                 except Exception as e:
                     logger.warning(
-                        f"Failed to fill field {field_name} in {canton}: {e}"
+                        f"Failed to fill page {page_number + 1} of {canton} form: {e}"
                     )
 
-            logger.info(f"Filled {filled_count}/{len(field_data)} fields")
+            logger.info(f"Filled {len(filled_fields)}/{len(field_data)} fields")
 
             # Write to buffer
             pdf_buffer = io.BytesIO()
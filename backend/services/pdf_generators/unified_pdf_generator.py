@@ -10,10 +10,13 @@ Users can download both PDFs or choose their preferred format.
 
 import io
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from .ech0196_pdf_generator import ECH0196PDFGenerator
+from .filing_snapshot import FilingSnapshot, load_filing_snapshot
+from .pdf_cache import PDFCache, get_pdf_cache, pdf_cache_key
 from .traditional_pdf_filler import TraditionalPDFFiller
 
 logger = logging.getLogger(__name__)
@@ -41,61 +44,151 @@ class UnifiedPDFGenerator:
         trad_pdf = generator.generate_traditional_pdf(filing_id, language='de')
     """
 
-    def __init__(self, forms_dir: str = None):
+    def __init__(self, forms_dir: str = None, pdf_cache: Optional[PDFCache] = None):
         """
         Initialize unified generator.
 
         Args:
             forms_dir: Directory containing canton form templates
+            pdf_cache: Cache for generated PDFs (defaults to the shared cache)
         """
         self.ech_generator = ECH0196PDFGenerator()
         self.traditional_filler = TraditionalPDFFiller(forms_dir=forms_dir)
+        self.pdf_cache = pdf_cache if pdf_cache is not None else get_pdf_cache()
+
+    def get_cache_key(
+        self,
+        filing: Any,
+        pdf_type: str,
+        language: str,
+        filing_data: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Get the cache key of a generated PDF.
+
+        The key changes whenever the filing is edited, the form template
+        is replaced or the municipality data used by the calculation
+        changes.
+
+        Args:
+            filing: TaxFilingSession
+            pdf_type: 'ech0196' or 'traditional'
+            language: PDF language
+            filing_data: filing.to_dict(), if already available
+
+        Returns:
+            Cache key
+        """
+        if pdf_type == 'ech0196':
+            template_version = ECH0196PDFGenerator.TEMPLATE_VERSION
+        else:
+            template_path = self.traditional_filler._get_form_template_path(
+                filing.canton, language, filing.tax_year
+            )
+            try:
+                stat = template_path.stat()
+                template_version = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                template_version = None
+
+        # Import here to avoid circular imports
+        from services.municipality_index import get_municipality_index
+
+        index = get_municipality_index(filing.tax_year)
+        calculation_version = index.version if index is not None else None
+
+        return pdf_cache_key(
+            filing_data if filing_data is not None else filing.to_dict(),
+            pdf_type,
+            language,
+            template_version,
+            calculation_version
+        )
 
     def generate_all_pdfs(
         self,
         filing_id: str,
         language: str = 'de',
-        db = None
+        db = None,
+        filing = None
     ) -> Dict[str, io.BytesIO]:
         """
         Generate both PDF types for a filing.
 
+        The taxes are calculated once; both PDFs are rendered concurrently
+        from that snapshot.
+
         Args:
             filing_id: Tax filing session ID
             language: PDF language
             db: Database session (optional)
+            filing: Already loaded filing, skips the lookup (optional)
 
         Returns:
             Dict with 'ech0196' and 'traditional' PDF buffers
         """
-        results = {}
-
-        # Generate eCH-0196 PDF
+        pdf_types = ('ech0196', 'traditional')
         try:
-            ech_pdf = self.ech_generator.generate(filing_id, language, db)
-            results['ech0196'] = ech_pdf
-            logger.info(f"✓ Generated eCH-0196 PDF for filing {filing_id}")
+            snapshot = load_filing_snapshot(filing_id, db, filing=filing)
         except Exception as e:
-            logger.error(f"✗ Failed to generate eCH-0196 PDF: {e}")
-            results['ech0196'] = None
-            results['ech0196_error'] = str(e)
+            logger.error(f"✗ Failed to load filing {filing_id} for PDF generation: {e}")
+            return self._failed_results(pdf_types, e)
 
-        # Generate traditional canton form
-        try:
-            trad_pdf = self.traditional_filler.fill_canton_form(
-                filing_id,
-                language,
-                db
-            )
-            results['traditional'] = trad_pdf
-            logger.info(f"✓ Generated traditional PDF for filing {filing_id}")
-        except Exception as e:
-            logger.error(f"✗ Failed to generate traditional PDF: {e}")
-            results['traditional'] = None
-            results['traditional_error'] = str(e)
+        return self._render_pdfs(filing_id, language, pdf_types, db, snapshot)
+
+    def _render_pdfs(
+        self,
+        filing_id: str,
+        language: str,
+        pdf_types: tuple,
+        db,
+        snapshot: FilingSnapshot
+    ) -> Dict[str, Optional[io.BytesIO]]:
+        """
+        Render the requested PDF types of one filing concurrently from a shared snapshot.
+
+        Args:
+            filing_id: Tax filing session ID
+            language: PDF language
+            pdf_types: PDF types to render ('ech0196', 'traditional')
+            db: Database session
+            snapshot: Loaded filing and calculation
+
+        Returns:
+            Dict with a buffer (or None and an '<type>_error' entry) per type
+        """
+        results = {}
+
+        renderers = {
+            'ech0196': lambda: self.ech_generator.generate(filing_id, language, db, snapshot=snapshot),
+            'traditional': lambda: self.traditional_filler.fill_canton_form(
+                filing_id, language, db, snapshot=snapshot
+            ),
+        }
+
+        with ThreadPoolExecutor(max_workers=len(pdf_types), thread_name_prefix='pdf-render') as executor:
+            futures = {pdf_type: executor.submit(renderers[pdf_type]) for pdf_type in pdf_types}
+
+            for pdf_type, future in futures.items():
+                try:
+                    results[pdf_type] = future.result()
+                    logger.info(f"✓ Generated {pdf_type} PDF for filing {filing_id}")
+                except Exception as e:
+                    logger.error(f"✗ Failed to generate {pdf_type} PDF: {e}")
+                    results[pdf_type] = None
+                    results[f'{pdf_type}_error'] = str(e)
 
         return results
 
+    @staticmethod
+    def _failed_results(pdf_types: tuple, error: Exception) -> Dict[str, Optional[str]]:
+        """Result dict for PDF types that could not be rendered"""
+        results = {}
+        for pdf_type in pdf_types:
+            results[pdf_type] = None
+            results[f'{pdf_type}_error'] = str(error)
+        return results
+
     def generate_ech0196_pdf(
         self,
         filing_id: str,
@@ -175,35 +268,46 @@ class UnifiedPDFGenerator:
 
         results = {}
 
+        pdf_types = tuple(
+            pdf for pdf in ('ech0196', 'traditional') if pdf_type in ('both', pdf)
+        )
+
         for filing in filings:
             filing_id = filing.id
-            filing_pdfs = {}
+
+            # Unchanged filings are served from the cache without recalculating
+            filing_data = filing.to_dict()
+            cache_keys = {
+                pdf: self.get_cache_key(filing, pdf, language, filing_data) for pdf in pdf_types
+            }
+            cached = {pdf: self.pdf_cache.get(key) for pdf, key in cache_keys.items()}
+            missing = tuple(pdf for pdf in pdf_types if cached[pdf] is None)
+
+            filing_results = {
+                pdf: io.BytesIO(data) for pdf, data in cached.items() if data is not None
+            }
+            results[filing_id] = filing_results
+            if not missing:
+                continue
 
             logger.info(
                 f"Generating PDFs for {filing.canton} "
                 f"({'primary' if filing.is_primary else 'secondary'})"
             )
 
-            # Generate requested PDF types
-            if pdf_type in ('both', 'ech0196'):
-                try:
-                    ech_pdf = self.generate_ech0196_pdf(filing_id, language, db)
-                    filing_pdfs['ech0196'] = ech_pdf
-                except Exception as e:
-                    logger.error(f"Failed to generate eCH-0196 for {filing.canton}: {e}")
-                    filing_pdfs['ech0196'] = None
-                    filing_pdfs['ech0196_error'] = str(e)
-
-            if pdf_type in ('both', 'traditional'):
-                try:
-                    trad_pdf = self.generate_traditional_pdf(filing_id, language, db)
-                    filing_pdfs['traditional'] = trad_pdf
-                except Exception as e:
-                    logger.error(f"Failed to generate traditional for {filing.canton}: {e}")
-                    filing_pdfs['traditional'] = None
-                    filing_pdfs['traditional_error'] = str(e)
+            # One calculation per filing, shared by the requested PDF types
+            try:
+                snapshot = load_filing_snapshot(filing_id, db, filing=filing)
+            except Exception as e:
+                logger.error(f"Failed to calculate taxes for {filing.canton}: {e}")
+                filing_results.update(self._failed_results(missing, e))
+                continue
 
-            results[filing_id] = filing_pdfs
+            rendered = self._render_pdfs(filing_id, language, missing, db, snapshot)
+            for pdf in missing:
+                if rendered.get(pdf) is not None:
+                    self.pdf_cache.put(cache_keys[pdf], rendered[pdf].getvalue())
+            filing_results.update(rendered)
 
         return results
 
@@ -246,36 +350,31 @@ class UnifiedPDFGenerator:
         filing_type = 'primary' if filing.is_primary else 'secondary'
         base_name = f"tax_return_{filing.canton}_{filing.tax_year}_{filing_type}"
 
-        # Generate and save requested types
-        if pdf_type in ('both', 'ech0196'):
-            try:
-                ech_pdf = self.generate_ech0196_pdf(filing_id, language, db)
-                ech_path = output_path / f"{base_name}_ech0196.pdf"
+        # Generate requested types from one calculation
+        pdf_types = tuple(
+            pdf for pdf in ('ech0196', 'traditional') if pdf_type in ('both', pdf)
+        )
+        snapshot = load_filing_snapshot(filing_id, db, filing=filing)
+        pdfs = self._render_pdfs(filing_id, language, pdf_types, db, snapshot)
 
-                with open(ech_path, 'wb') as f:
-                    f.write(ech_pdf.getvalue())
-
-                saved_files['ech0196'] = str(ech_path)
-                logger.info(f"✓ Saved eCH-0196 PDF: {ech_path}")
-
-            except Exception as e:
-                logger.error(f"✗ Failed to save eCH-0196 PDF: {e}")
-                saved_files['ech0196_error'] = str(e)
+        file_suffixes = {'ech0196': 'ech0196', 'traditional': 'official'}
+        for generated_type in pdf_types:
+            if pdfs.get(generated_type) is None:
+                saved_files[f'{generated_type}_error'] = pdfs.get(f'{generated_type}_error')
+                continue
 
-        if pdf_type in ('both', 'traditional'):
             try:
-                trad_pdf = self.generate_traditional_pdf(filing_id, language, db)
-                trad_path = output_path / f"{base_name}_official.pdf"
+                pdf_path = output_path / f"{base_name}_{file_suffixes[generated_type]}.pdf"
 
-                with open(trad_path, 'wb') as f:
-                    f.write(trad_pdf.getvalue())
+                with open(pdf_path, 'wb') as f:
+                    f.write(pdfs[generated_type].getvalue())
 
-                saved_files['traditional'] = str(trad_path)
-                logger.info(f"✓ Saved traditional PDF: {trad_path}")
+                saved_files[generated_type] = str(pdf_path)
+                logger.info(f"✓ Saved {generated_type} PDF: {pdf_path}")
 
             except Exception as e:
-                logger.error(f"✗ Failed to save traditional PDF: {e}")
-                saved_files['traditional_error'] = str(e)
+                logger.error(f"✗ Failed to save {generated_type} PDF: {e}")
+                saved_files[f'{generated_type}_error'] = str(e)
 
         return saved_files
 
@@ -0,0 +1,194 @@
+"""
+Session Activity Tracker
+Keeps session validation and last_active updates off the request path
+
+Authentication only needs to know whether a session is still valid, and
+the sessions page only needs last_active to be roughly current. Instead of
+looking a session up, validating it and committing an UPDATE on every
+request, this tracker:
+
+- caches each session's validity for SESSION_VALIDITY_TTL_SECONDS (never
+  past the session's expiry); revoking a session invalidates its entry
+- buffers last_active timestamps in memory and writes them every
+  SESSION_ACTIVITY_FLUSH_SECONDS in one batched UPDATE
+
+Entries are per process, so a revocation made on another instance is
+picked up when the cached entry expires.
+"""
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from utils.shared_state import Lazy, TTLMap
+
+logger = logging.getLogger(__name__)
+
+SESSION_VALIDITY_TTL_SECONDS = float(os.getenv('SESSION_VALIDITY_TTL_SECONDS', '30'))
+SESSION_ACTIVITY_FLUSH_SECONDS = float(os.getenv('SESSION_ACTIVITY_FLUSH_SECONDS', '5'))
+SESSION_VALIDITY_MAX_ENTRIES = int(os.getenv('SESSION_VALIDITY_MAX_ENTRIES', '50000'))
+
+# Session states
+VALID = 'valid'
+INVALID = 'invalid'  # Revoked or expired
+UNKNOWN = 'unknown'  # No session row, e.g. tokens issued before session tracking
+
+
+class SessionActivityTracker:
+    """Cached session validity plus a write-behind buffer for last_active"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = SESSION_VALIDITY_TTL_SECONDS,
+        flush_interval: float = SESSION_ACTIVITY_FLUSH_SECONDS,
+        session_factory: Optional[Callable] = None
+    ):
+        """
+        Initialize the tracker.
+
+        Args:
+            ttl_seconds: How long a looked-up session state is trusted
+            flush_interval: Seconds between batched last_active writes
+            session_factory: Creates database sessions (defaults to SessionLocal)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval = flush_interval
+        self._session_factory = session_factory
+        self._states: TTLMap[str, str] = TTLMap(SESSION_VALIDITY_MAX_ENTRIES, 'session states')
+        self._activity: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def _new_db_session(self):
+        if self._session_factory is None:
+            from db.session import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def check(self, session_id: str) -> str:
+        """
+        Get a session's state, from the cache or with one lookup.
+
+        Args:
+            session_id: Session identifier (from the JWT)
+
+        Returns:
+            VALID, INVALID or UNKNOWN
+        """
+        state = self._states.get(session_id)
+        if state is not None:
+            return state
+
+        state, expires_at = self._load(session_id)
+
+        ttl = self.ttl_seconds
+        if state == VALID and expires_at is not None:
+            ttl = min(ttl, (expires_at - datetime.utcnow()).total_seconds())
+
+        self._states.set(session_id, state, ttl)
+        return state
+
+    def _load(self, session_id: str) -> Tuple[str, Optional[datetime]]:
+        """Look a session up in the database."""
+        from services.session_service import session_service
+
+        db = self._new_db_session()
+        try:
+            session = session_service.get_session_by_id(db, session_id)
+            if session is None:
+                return UNKNOWN, None
+            return (VALID if session.is_valid() else INVALID), session.expires_at
+        finally:
+            db.close()
+
+    def invalidate(self, *session_ids: str) -> None:
+        """
+        Forget cached states, e.g. after revoking sessions.
+
+        Args:
+            *session_ids: Session identifiers
+        """
+        for session_id in session_ids:
+            self._states.pop(session_id)
+
+    def touch(self, session_id: str) -> None:
+        """
+        Record activity on a session; written on the next flush.
+
+        Args:
+            session_id: Session identifier
+        """
+        with self._lock:
+            self._activity[session_id] = datetime.utcnow()
+        self._ensure_flusher()
+
+    def flush(self) -> int:
+        """
+        Write buffered last_active timestamps in one batched UPDATE.
+
+        Returns:
+            Number of sessions written
+        """
+        with self._lock:
+            pending, self._activity = self._activity, {}
+        if not pending:
+            return 0
+
+        from services.session_service import session_service
+
+        db = self._new_db_session()
+        try:
+            session_service.update_last_active_batch(db, pending)
+            return len(pending)
+        except Exception as e:
+            logger.warning(f"Failed to flush last_active for {len(pending)} sessions: {e}")
+            # Keep them for the next flush unless newer activity arrived meanwhile
+            with self._lock:
+                for session_id, last_active in pending.items():
+                    self._activity.setdefault(session_id, last_active)
+            return 0
+        finally:
+            db.close()
+
+    def _ensure_flusher(self) -> None:
+        """Start the background flush thread on first use."""
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._stop_event.clear()
+            self._flusher = threading.Thread(
+                target=self._run, name='session-activity-flush', daemon=True
+            )
+            self._flusher.start()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Session activity flush failed: {e}", exc_info=True)
+
+    def stop(self) -> None:
+        """Stop the flush thread and write what is still buffered (call on shutdown)."""
+        self._stop_event.set()
+        flusher = self._flusher
+        if flusher is not None:
+            flusher.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+
+_tracker = Lazy(SessionActivityTracker)
+
+
+def get_session_activity_tracker() -> SessionActivityTracker:
+    """
+    Get the process-wide session activity tracker.
+
+    Returns:
+        Shared SessionActivityTracker
+    """
+    return _tracker.get()
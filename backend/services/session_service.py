@@ -2,14 +2,15 @@
 Session Service
 Manages user sessions including creation, validation, and revocation
 """
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, case, or_
 import uuid
 import logging
 
 from models.user_session import UserSession
+from services.session_activity_tracker import get_session_activity_tracker
 from utils.device_parser import DeviceParser
 
 logger = logging.getLogger(__name__)
@@ -103,6 +104,7 @@ class SessionService:
             # Clean up old sessions from the same device using hybrid approach:
             # 1. Same device + same IP: Always revoke (immediate duplicate)
             # 2. Same device + different IP: Only revoke if inactive > 30 min (stale session)
+            old_sessions = []
             try:
                 # Criterion 1: Same device AND same IP (definite duplicate)
                 exact_duplicates = db.query(UserSession).filter(
@@ -142,6 +144,9 @@ class SessionService:
             db.add(new_session)
             db.commit()
             db.refresh(new_session)
+            get_session_activity_tracker().invalidate(
+                session_id, *(old_session.session_id for old_session in old_sessions)
+            )
 
             logger.info(f"Created session {session_id} for user {user_id}")
             return new_session
@@ -240,6 +245,32 @@ class SessionService:
             logger.warning(f"Failed to update last_active for session {session_id}: {e}", exc_info=True)
             db.rollback()
 
+    @staticmethod
+    def update_last_active_batch(db: Session, last_active_by_session: Dict[str, datetime]) -> int:
+        """
+        Update the last_active timestamps of many sessions in one statement
+
+        Args:
+            db: Database session
+            last_active_by_session: Timestamp per session identifier
+
+        Returns:
+            Number of rows updated
+        """
+        try:
+            result = db.query(UserSession).filter(
+                UserSession.session_id.in_(list(last_active_by_session))
+            ).update(
+                {UserSession.last_active: case(last_active_by_session, value=UserSession.session_id)},
+                synchronize_session=False
+            )
+            db.commit()
+            logger.debug(f"Updated last_active for {result} of {len(last_active_by_session)} sessions")
+            return result
+        except Exception:
+            db.rollback()
+            raise
+
     @staticmethod
     def revoke_session(db: Session, session_uuid: str, user_id: str) -> bool:
         """
@@ -267,6 +298,7 @@ class SessionService:
 
             session.revoke()
             db.commit()
+            get_session_activity_tracker().invalidate(session.session_id)
 
             logger.info(f"Revoked session {session_uuid} for user {user_id}")
             return True
@@ -293,6 +325,7 @@ class SessionService:
             if session:
                 session.revoke()
                 db.commit()
+                get_session_activity_tracker().invalidate(session_id)
                 logger.info(f"Revoked session {session_id}")
                 return True
             return False
@@ -334,6 +367,7 @@ class SessionService:
                 count += 1
 
             db.commit()
+            get_session_activity_tracker().invalidate(*(session.session_id for session in sessions))
 
             logger.info(f"Revoked {count} sessions for user {user_id}")
             return count
@@ -0,0 +1,95 @@
+"""
+Tax Calculation Context
+
+Loads everything a tax calculation reads from the database in a single
+round trip: the session's interview answers. The church tax configuration
+and rate for the canton, denomination and municipality those answers
+select come from the in-memory church tax rate table, and municipal
+multipliers from the in-memory municipality index, so neither needs a
+query.
+
+The result is a TaxCalculationContext that the sub-calculations of
+TaxCalculationService read from instead of querying on their own.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from database.connection import execute_one
+from services.church_tax_rate_table import get_church_tax_rate_table
+
+DEFAULT_CANTON = 'ZH'
+DEFAULT_MUNICIPALITY = 'Zurich'
+
+# Answers are aggregated into a single JSON object row
+CONTEXT_QUERY = """
+    SELECT COALESCE(json_object_agg(question_id, answer_value), '{}'::json) AS answers
+    FROM swisstax.interview_answers
+    WHERE session_id = %(session_id)s
+"""
+
+
+@dataclass
+class TaxCalculationContext:
+    """Inputs of one tax calculation, loaded up front"""
+    session_id: str
+    tax_year: int
+    answers: Dict[str, Any] = field(default_factory=dict)
+    church_config: Optional[Dict[str, Any]] = None
+    church_rate: Optional[Dict[str, Any]] = None
+
+    @property
+    def canton(self) -> str:
+        """Canton code selected in the interview"""
+        return self.answers.get('canton', DEFAULT_CANTON)
+
+    @property
+    def municipality(self) -> str:
+        """Municipality name selected in the interview"""
+        return self.answers.get('municipality', DEFAULT_MUNICIPALITY)
+
+    @property
+    def municipality_id(self) -> Optional[int]:
+        """Municipality id selected in the interview, if any"""
+        return self.answers.get('municipality_id')
+
+    @property
+    def denomination(self) -> str:
+        """Religious denomination, 'none' if not specified"""
+        return self.answers.get('religious_denomination', 'none')
+
+
+def load_tax_calculation_context(
+    session_id: str,
+    tax_year: int,
+    church_tax_year: Optional[int] = None
+) -> TaxCalculationContext:
+    """
+    Load the inputs of a tax calculation in one query.
+
+    Church tax data stays None when the church tax tables are unavailable.
+
+    Args:
+        session_id: Interview session ID
+        tax_year: Tax year of the calculation
+        church_tax_year: Tax year of the church tax tables (default: tax_year)
+
+    Returns:
+        TaxCalculationContext with answers and church tax data
+    """
+    result = execute_one(CONTEXT_QUERY, {'session_id': session_id})
+
+    context = TaxCalculationContext(
+        session_id=session_id,
+        tax_year=tax_year,
+        answers=dict(result['answers'] or {}) if result else {}
+    )
+
+    church_tables = get_church_tax_rate_table(church_tax_year or tax_year)
+    if church_tables is not None:
+        context.church_config = church_tables.get_config(context.canton)
+        context.church_rate = church_tables.get_rate(
+            context.canton, context.denomination, context.municipality_id
+        )
+
+    return context
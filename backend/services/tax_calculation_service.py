@@ -5,11 +5,15 @@ from decimal import Decimal, InvalidOperation
 import decimal
 from typing import Any, Dict, List, Optional
 
-from database.connection import execute_insert, execute_one, execute_query
+from database.connection import execute_insert, execute_one
 from services.social_security_calculators import SocialSecurityCalculator
 from services.wealth_tax_service import WealthTaxService
 from services.church_tax_service import ChurchTaxService
 from services.canton_tax_calculators import get_canton_calculator
+from services.federal_tax_tariff import get_federal_tax_tariff
+from services.municipality_index import get_municipality_index
+from services.tax_calculation_context import (TaxCalculationContext,
+                                              load_tax_calculation_context)
 
 
 class TaxCalculationService:
@@ -23,12 +27,15 @@ class TaxCalculationService:
 
     def calculate_taxes(self, session_id: str) -> Dict[str, Any]:
         """Calculate all taxes based on session data"""
-        # Get session answers
-        answers = self._get_session_answers(session_id)
+        # Load answers and church tax data in one round trip
+        context = load_tax_calculation_context(
+            session_id, self.tax_year, church_tax_year=self.church_tax_service.tax_year
+        )
+        answers = self._apply_answer_defaults(context.answers)
 
         # Get user's canton and municipality
-        canton = answers.get('canton', 'ZH')
-        municipality = answers.get('municipality', 'Zurich')
+        canton = context.canton
+        municipality = context.municipality
 
         # Calculate income components
         income_data = self._calculate_income(answers)
@@ -52,7 +59,7 @@ class TaxCalculationService:
         municipal_tax = self._calculate_municipal_tax(cantonal_tax, canton, municipality)
 
         # Calculate church tax (optional) - returns full breakdown
-        church_tax_data = self._calculate_church_tax(cantonal_tax, canton, answers)
+        church_tax_data = self._calculate_church_tax(cantonal_tax, canton, answers, context)
         church_tax = Decimal(str(church_tax_data.get('church_tax', 0)))
 
         # Calculate wealth tax (if applicable)
@@ -89,19 +96,8 @@ class TaxCalculationService:
             'monthly_tax': float(total_tax / Decimal('12'))
         }
 
-    def _get_session_answers(self, session_id: str) -> Dict[str, Any]:
-        """Get all answers for a session"""
-        query = """
-            SELECT question_id, answer_value
-            FROM swisstax.interview_answers
-            WHERE session_id = %s
-        """
-        results = execute_query(query, (session_id,))
-
-        # Include some defaults for testing
-        answers = {row['question_id']: row['answer_value'] for row in results}
-
-        # Add default values if not present
+    def _apply_answer_defaults(self, answers: Dict[str, Any]) -> Dict[str, Any]:
+        """Add default values if not present"""
         if 'income_employment' not in answers:
             answers['income_employment'] = 100000  # Default income for testing
 
@@ -355,65 +351,7 @@ class TaxCalculationService:
     def _calculate_federal_tax(self, taxable_income: Decimal, answers: Dict[str, Any]) -> Decimal:
         """Calculate Swiss federal tax"""
         marital_status = answers.get('Q01', 'single')
-
-        if marital_status == 'married':
-            # Married tax rates for 2024
-            if taxable_income <= 30800:
-                tax = 0
-            elif taxable_income <= 50900:
-                tax = (taxable_income - 30800) * Decimal('0.01')
-            elif taxable_income <= 58400:
-                tax = 201 + (taxable_income - 50900) * Decimal('0.02')
-            elif taxable_income <= 75300:
-                tax = 351 + (taxable_income - 58400) * Decimal('0.03')
-            elif taxable_income <= 90300:
-                tax = 858 + (taxable_income - 75300) * Decimal('0.04')
-            elif taxable_income <= 103400:
-                tax = 1458 + (taxable_income - 90300) * Decimal('0.05')
-            elif taxable_income <= 114700:
-                tax = 2113 + (taxable_income - 103400) * Decimal('0.06')
-            elif taxable_income <= 124200:
-                tax = 2791 + (taxable_income - 114700) * Decimal('0.07')
-            elif taxable_income <= 131700:
-                tax = 3456 + (taxable_income - 124200) * Decimal('0.08')
-            elif taxable_income <= 137300:
-                tax = 4056 + (taxable_income - 131700) * Decimal('0.09')
-            elif taxable_income <= 141200:
-                tax = 4560 + (taxable_income - 137300) * Decimal('0.10')
-            elif taxable_income <= 143100:
-                tax = 4950 + (taxable_income - 141200) * Decimal('0.11')
-            elif taxable_income <= 145000:
-                tax = 5159 + (taxable_income - 143100) * Decimal('0.12')
-            elif taxable_income <= 895900:
-                tax = 5387 + (taxable_income - 145000) * Decimal('0.13')
-            else:
-                tax = 103004 + (taxable_income - 895900) * Decimal('0.115')
-        else:
-            # Single tax rates for 2024
-            if taxable_income <= 17800:
-                tax = 0
-            elif taxable_income <= 31600:
-                tax = (taxable_income - 17800) * Decimal('0.01')
-            elif taxable_income <= 41400:
-                tax = 138 + (taxable_income - 31600) * Decimal('0.02')
-            elif taxable_income <= 55200:
-                tax = 334 + (taxable_income - 41400) * Decimal('0.03')
-            elif taxable_income <= 72500:
-                tax = 748 + (taxable_income - 55200) * Decimal('0.04')
-            elif taxable_income <= 78100:
-                tax = 1440 + (taxable_income - 72500) * Decimal('0.05')
-            elif taxable_income <= 103600:
-                tax = 1720 + (taxable_income - 78100) * Decimal('0.06')
-            elif taxable_income <= 134600:
-                tax = 3250 + (taxable_income - 103600) * Decimal('0.07')
-            elif taxable_income <= 176000:
-                tax = 5420 + (taxable_income - 134600) * Decimal('0.08')
-            elif taxable_income <= 755200:
-                tax = 8732 + (taxable_income - 176000) * Decimal('0.11')
-            else:
-                tax = 72444 + (taxable_income - 755200) * Decimal('0.13')
-
-        return tax
+        return get_federal_tax_tariff(self.tax_year).calculate(taxable_income, marital_status)
 
     def _calculate_cantonal_tax(self, taxable_income: Decimal, canton: str,
                                 answers: Dict[str, Any]) -> Decimal:
@@ -443,44 +381,19 @@ class TaxCalculationService:
     def _calculate_municipal_tax(self, cantonal_tax: Decimal, canton: str,
                                  municipality: str) -> Decimal:
         """Calculate municipal tax as percentage of cantonal tax"""
-        try:
-            # Query database for municipality tax multiplier
-            query = """
-                SELECT tax_multiplier
-                FROM swisstax.municipalities
-                WHERE canton = %s AND name = %s AND tax_year = %s
-                LIMIT 1
-            """
-            result = execute_one(query, (canton, municipality, self.tax_year))
-
-            if result and 'tax_multiplier' in result:
-                multiplier = Decimal(str(result['tax_multiplier']))
-                return cantonal_tax * multiplier
-            else:
-                # Fallback: try case-insensitive search
-                query_fuzzy = """
-                    SELECT tax_multiplier
-                    FROM swisstax.municipalities
-                    WHERE canton = %s AND LOWER(name) = LOWER(%s) AND tax_year = %s
-                    LIMIT 1
-                """
-                result = execute_one(query_fuzzy, (canton, municipality, self.tax_year))
-
-                if result and 'tax_multiplier' in result:
-                    multiplier = Decimal(str(result['tax_multiplier']))
-                    return cantonal_tax * multiplier
-                else:
-                    # No multiplier found - use default 1.0 (100%)
-                    print(f"Warning: No tax multiplier found for {municipality}, {canton}. Using 1.0")
-                    return cantonal_tax * Decimal('1.0')
+        index = get_municipality_index(self.tax_year)
+        multiplier = index.get_multiplier(canton, municipality) if index else None
 
-        except Exception as e:
-            # Fallback to 1.0 multiplier if query fails
-            print(f"Warning: Municipal tax query failed for {municipality}, {canton}: {str(e)}")
-            return cantonal_tax * Decimal('1.0')
+        if multiplier is None:
+            # No multiplier found - use default 1.0 (100%)
+            print(f"Warning: No tax multiplier found for {municipality}, {canton}. Using 1.0")
+            multiplier = Decimal('1.0')
+
+        return cantonal_tax * multiplier
 
     def _calculate_church_tax(self, cantonal_tax: Decimal, canton: str,
-                              answers: Dict[str, Any]) -> Dict[str, Any]:
+                              answers: Dict[str, Any],
+                              context: Optional[TaxCalculationContext] = None) -> Dict[str, Any]:
         """Calculate church tax (optional) using ChurchTaxService"""
         # Check if person pays church tax
         pays_church_tax = answers.get('pays_church_tax', False)
@@ -510,6 +423,17 @@ class TaxCalculationService:
         municipality_id = answers.get('municipality_id')
         municipality_name = answers.get('municipality')
 
+        # Use the church tax data loaded with the answers when available
+        if context is not None:
+            return self.church_tax_service.calculate_church_tax_from_data(
+                canton_code=canton,
+                cantonal_tax=cantonal_tax,
+                denomination=denomination,
+                canton_config=context.church_config,
+                rate_data=context.church_rate,
+                municipality_name=municipality_name
+            )
+
         # Calculate church tax using the service
         result = self.church_tax_service.calculate_church_tax(
             canton_code=canton,
@@ -0,0 +1,211 @@
+"""
+User Principal Cache
+Per-process cache of what authorization needs to know about a user
+
+Every authenticated request used to look the user up by email, and every
+feature check queried the user's subscription again. A UserPrincipal keeps
+the id, active flag, grandfathered flag and plan type keyed by the JWT
+subject (the email) for USER_PRINCIPAL_TTL_SECONDS, so:
+
+- authentication loads the user by primary key, and rejects inactive
+  users without loading them
+- plan and feature checks need no subscription query
+
+The plan type is filled in by the first plan check after authentication.
+Every invalidation moves the user to a new generation, and a plan looked up
+before an invalidation is not recorded, so a stale plan never outlives it.
+Profile, account, subscription and Stripe webhook handlers invalidate the
+affected user; changes made by other instances are picked up once the
+entry expires.
+"""
+import logging
+import os
+import itertools
+import threading
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+
+from utils.shared_state import Lazy, TTLMap
+
+logger = logging.getLogger(__name__)
+
+USER_PRINCIPAL_TTL_SECONDS = float(os.getenv('USER_PRINCIPAL_TTL_SECONDS', '60'))
+USER_PRINCIPAL_MAX_ENTRIES = int(os.getenv('USER_PRINCIPAL_MAX_ENTRIES', '10000'))
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Compact view of a user for authorization"""
+    id: Any
+    email: str
+    is_active: bool
+    is_grandfathered: bool
+    plan_type: Optional[str] = None  # None until the first plan check
+
+
+class UserPrincipalCache:
+    """TTL cache of user principals keyed by JWT subject"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = USER_PRINCIPAL_TTL_SECONDS,
+        max_entries: int = USER_PRINCIPAL_MAX_ENTRIES
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: How long a principal is trusted
+            max_entries: Entries kept before expired ones are purged
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: TTLMap[str, UserPrincipal] = TTLMap(max_entries, 'user principals')
+        self._emails_by_id: TTLMap[Any, str] = TTLMap(max_entries, 'user principal ids')
+        # Generation of each recently invalidated user; others are at 0
+        self._generations: TTLMap[Any, int] = TTLMap(max_entries, 'user principal generations')
+        self._next_generation = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def get(self, email: str) -> Optional[UserPrincipal]:
+        """
+        Get the cached principal for a JWT subject.
+
+        Args:
+            email: JWT subject
+
+        Returns:
+            UserPrincipal, or None if not cached or expired
+        """
+        return self._entries.get(email)
+
+    def get_by_user_id(self, user_id: Any) -> Optional[UserPrincipal]:
+        """
+        Get the cached principal for a user id.
+
+        Args:
+            user_id: User id
+
+        Returns:
+            UserPrincipal, or None if not cached or expired
+        """
+        email = self._emails_by_id.get(user_id)
+        return self.get(email) if email is not None else None
+
+    def put(self, user) -> UserPrincipal:
+        """
+        Cache the principal of a freshly loaded user.
+
+        Args:
+            user: User model instance
+
+        Returns:
+            The cached UserPrincipal
+        """
+        from utils.plan_features import is_grandfathered
+
+        principal = UserPrincipal(
+            id=user.id,
+            email=user.email,
+            is_active=bool(user.is_active),
+            is_grandfathered=is_grandfathered(user)
+        )
+        self._store(principal)
+        return principal
+
+    def generation(self, user_id: Any) -> int:
+        """
+        Get a user's generation, to be read before looking up their plan.
+
+        Args:
+            user_id: User id
+
+        Returns:
+            Value that changes whenever the user is invalidated
+        """
+        return self._generations.get(user_id) or 0
+
+    def set_plan_type(self, user_id: Any, plan_type: str, generation: int) -> None:
+        """
+        Record a user's plan type if the user's principal is cached.
+
+        Nothing is recorded if the user was invalidated since `generation`
+        was read, as the plan may predate the change.
+
+        Args:
+            user_id: User id
+            plan_type: Resolved plan type
+            generation: The user's generation read before the plan lookup
+        """
+        with self._lock:
+            if self.generation(user_id) != generation:
+                return
+            principal = self.get_by_user_id(user_id)
+            if principal is not None and principal.plan_type != plan_type:
+                self._store_locked(replace(principal, plan_type=plan_type))
+
+    def _store(self, principal: UserPrincipal) -> None:
+        with self._lock:
+            self._store_locked(principal)
+
+    def _store_locked(self, principal: UserPrincipal) -> None:
+        self._entries.set(principal.email, principal, self.ttl_seconds)
+        self._emails_by_id.set(principal.id, principal.email, self.ttl_seconds)
+
+    def _bump_generation_locked(self, user_id: Any) -> None:
+        # Kept past the TTL of any principal that could carry a stale plan
+        self._generations.set(user_id, next(self._next_generation), 2 * self.ttl_seconds)
+
+    def invalidate(self, email: Optional[str] = None, user_id: Any = None) -> None:
+        """
+        Forget a user's principal, e.g. after a profile or subscription change.
+
+        Args:
+            email: JWT subject
+            user_id: User id
+        """
+        with self._lock:
+            if user_id is not None:
+                self._bump_generation_locked(user_id)
+                cached_email = self._emails_by_id.pop(user_id)
+                if cached_email is not None:
+                    self._entries.pop(cached_email)
+            if email is not None:
+                principal = self._entries.pop(email)
+                if principal is not None:
+                    self._bump_generation_locked(principal.id)
+                    self._emails_by_id.pop(principal.id)
+
+    def clear(self) -> None:
+        """Forget all principals."""
+        with self._lock:
+            self._entries.clear()
+            self._emails_by_id.clear()
+            self._generations.clear()
+
+
+_cache = Lazy(UserPrincipalCache)
+
+
+def get_user_principal_cache() -> UserPrincipalCache:
+    """
+    Get the process-wide user principal cache.
+
+    Returns:
+        Shared UserPrincipalCache
+    """
+    return _cache.get()
+
+
+def invalidate_user_principal(email: Optional[str] = None, user_id: Any = None) -> None:
+    """
+    Forget a user's cached principal. Never raises.
+
+    Args:
+        email: JWT subject
+        user_id: User id
+    """
+    try:
+        get_user_principal_cache().invalidate(email=email, user_id=user_id)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate user principal: {e}")
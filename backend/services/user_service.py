@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 
 from models.swisstax import User
 from schemas.user import UserCreate, UserProfileUpdate
+from services.user_principal_cache import get_user_principal_cache, invalidate_user_principal
 from utils.password import get_password_hash, verify_password
 
 
@@ -12,6 +13,35 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
 
+def get_user_for_subject(db: Session, email: str) -> Optional[User]:
+    """
+    Get the user a JWT subject refers to.
+
+    Uses the user principal cache to load the user by primary key (free
+    if the session already holds it) and caches the principal on a miss.
+
+    Args:
+        db: Database session
+        email: JWT subject
+
+    Returns:
+        User or None
+    """
+    cache = get_user_principal_cache()
+    principal = cache.get(email)
+    if principal is not None:
+        user = db.get(User, principal.id)
+        if user is not None and user.email == email:
+            return user
+        # Deleted or email changed since the principal was cached
+        cache.invalidate(email=email)
+
+    user = get_user_by_email(db, email)
+    if user is not None:
+        cache.put(user)
+    return user
+
+
 def get_user_by_id(db: Session, user_id: str) -> Optional[User]:
     """Get user by ID"""
     return db.query(User).filter(User.id == user_id).first()
@@ -42,6 +72,7 @@ def update_user(db: Session, user: User, profile_data: UserProfileUpdate):
         user.preferred_language = profile_data.preferred_language
 
     db.commit()
+    invalidate_user_principal(user_id=user.id)
     db.refresh(user)
     return user
 
@@ -58,6 +89,7 @@ def deactivate_user(db: Session, user_id: str):
     if user:
         user.is_active = False
         db.commit()
+        invalidate_user_principal(email=user.email, user_id=user.id)
 
 
 def update_avatar(db: Session, file, user: User):
@@ -6,8 +6,14 @@ Wealth tax is levied annually by cantons and municipalities on net worth (assets
 as of December 31st. Each canton has its own rate structure and tax-free thresholds.
 
 Tax Year: 2024
+
+Calculators are built once per (canton, tax year) and shared process-wide.
 """
 
+from typing import Iterable, Tuple
+
+from utils.shared_state import LazyMap
+
 from .base import WealthTaxCalculator, ProgressiveWealthTaxCalculator, ProportionalWealthTaxCalculator
 
 # Import all 26 canton calculators
@@ -69,9 +75,21 @@ WEALTH_TAX_CALCULATORS = {
 }
 
 
+def _build_wealth_tax_calculator(key: Tuple[str, int]) -> WealthTaxCalculator:
+    canton_code, tax_year = key
+    return WEALTH_TAX_CALCULATORS[canton_code](tax_year=tax_year)
+
+
+# Process-wide registry of calculator instances per (canton code, tax year)
+_calculators: LazyMap[Tuple[str, int], WealthTaxCalculator] = LazyMap(_build_wealth_tax_calculator)
+
+
 def get_wealth_tax_calculator(canton_code: str, tax_year: int = 2024) -> WealthTaxCalculator:
     """
-    Get wealth tax calculator instance for specified canton.
+    Get the shared wealth tax calculator instance for specified canton.
+
+    Instances are built once per (canton, tax year) and must be treated
+    as read-only by callers.
 
     Args:
         canton_code: Canton code (e.g., 'ZH', 'BE', 'GE')
@@ -83,15 +101,37 @@ def get_wealth_tax_calculator(canton_code: str, tax_year: int = 2024) -> WealthT
     Raises:
         ValueError: If canton code is invalid or calculator not available
     """
-    calculator_class = WEALTH_TAX_CALCULATORS.get(canton_code.upper())
+    canton_code = canton_code.upper()
 
-    if not calculator_class:
+    if canton_code not in WEALTH_TAX_CALCULATORS:
         raise ValueError(
             f"Wealth tax calculator not available for canton {canton_code}. "
             f"Available cantons: {', '.join(sorted(WEALTH_TAX_CALCULATORS.keys()))}"
         )
 
-    return calculator_class(tax_year=tax_year)
+    return _calculators.get((canton_code, tax_year))
+
+
+def warm_up_wealth_tax_calculators(tax_years: Iterable[int]) -> int:
+    """
+    Build all wealth tax calculators ahead of traffic.
+
+    Args:
+        tax_years: Tax years to prepare
+
+    Returns:
+        Number of calculators in the registry
+    """
+    for tax_year in tax_years:
+        for canton_code in WEALTH_TAX_CALCULATORS:
+            get_wealth_tax_calculator(canton_code, tax_year)
+
+    return len(_calculators)
+
+
+def clear_wealth_tax_calculator_cache() -> None:
+    """Drop all cached calculator instances (e.g. after rate data changes or in tests)."""
+    _calculators.clear()
 
 
 __all__ = [
@@ -99,5 +139,7 @@ __all__ = [
     'ProgressiveWealthTaxCalculator',
     'ProportionalWealthTaxCalculator',
     'get_wealth_tax_calculator',
+    'warm_up_wealth_tax_calculators',
+    'clear_wealth_tax_calculator_cache',
     'WEALTH_TAX_CALCULATORS'
 ]
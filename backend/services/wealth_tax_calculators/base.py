@@ -201,6 +201,8 @@ class ProgressiveWealthTaxCalculator(WealthTaxCalculator):
     def __init__(self, canton_code: str, tax_year: int = 2024):
         self.brackets = None  # Will be loaded in subclass
         super().__init__(canton_code, tax_year)
+        # Load eagerly so shared instances are never mutated while calculating
+        self.brackets = self._load_brackets()
 
     @abstractmethod
     def _load_brackets(self) -> list:
@@ -252,6 +254,8 @@ class ProportionalWealthTaxCalculator(WealthTaxCalculator):
     def __init__(self, canton_code: str, tax_year: int = 2024):
         self.rate_per_mille = None  # Will be loaded in subclass
         super().__init__(canton_code, tax_year)
+        # Load eagerly so shared instances are never mutated while calculating
+        self.rate_per_mille = self._load_proportional_rate()
 
     @abstractmethod
     def _load_proportional_rate(self) -> Decimal:
@@ -10,7 +10,8 @@ Tax Year: 2024
 
 from decimal import Decimal
 from typing import Dict, Any, Optional
-from database.connection import execute_one, execute_query
+from database.connection import execute_query
+from services.municipality_index import get_municipality_index
 from services.wealth_tax_calculators import get_wealth_tax_calculator, WEALTH_TAX_CALCULATORS
 
 
@@ -249,24 +250,18 @@ class WealthTaxService:
         Returns:
             Municipality data or None if not found
         """
+        index = get_municipality_index(self.tax_year)
+        if index is None:
+            return None
+
         if municipality_id:
-            query = """
-                SELECT id, name, canton, tax_multiplier
-                FROM swisstax.municipalities
-                WHERE id = %s AND canton = %s
-            """
-            result = execute_one(query, (municipality_id, canton_code))
+            municipality = index.get_by_id(municipality_id, canton_code)
         elif municipality_name:
-            query = """
-                SELECT id, name, canton, tax_multiplier
-                FROM swisstax.municipalities
-                WHERE LOWER(name) = LOWER(%s) AND canton = %s
-            """
-            result = execute_one(query, (municipality_name, canton_code))
+            municipality = index.find(canton_code, municipality_name)
         else:
             return None
 
-        return result
+        return municipality.to_dict() if municipality else None
 
     def _get_session_answers(self, session_id: str) -> Dict[str, Any]:
         """
@@ -2,11 +2,23 @@
 Pytest configuration and fixtures for backend tests.
 Provides mocked database, common test fixtures, and utilities.
 """
+import os
+
 import pytest
 from datetime import datetime
 from unittest.mock import MagicMock, Mock, patch
 from fastapi.testclient import TestClient
 
+# Tests must not share generated PDFs or AI results through the on-disk caches
+os.environ.setdefault('PDF_CACHE_BACKEND', 'none')
+os.environ.setdefault('EXTRACTION_CACHE_BACKEND', 'none')
+# Mocked vision calls must not wait for the API rate limiter
+os.environ.setdefault('DOCUMENT_ANALYSIS_REQUESTS_PER_MINUTE', '0')
+# Endpoint tests call rate limited routes repeatedly from one client
+os.environ.setdefault('RATE_LIMIT_BACKEND', 'none')
+# Archive job state must not be written to S3
+os.environ.setdefault('ARCHIVE_JOB_STORE', 'none')
+
 # Import main app
 from main import app
 
@@ -367,6 +379,17 @@ def reset_app_dependency_overrides():
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def reset_user_principal_cache():
+    """
+    Clear cached user principals after each test.
+    Mock users share emails across tests, so a cached principal must not leak.
+    """
+    yield
+    from services.user_principal_cache import get_user_principal_cache
+    get_user_principal_cache().clear()
+
+
 @pytest.fixture(autouse=True)
 def mock_database_for_all_tests(mock_db_session, monkeypatch):
     """
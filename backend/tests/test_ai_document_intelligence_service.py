@@ -3,9 +3,11 @@ Unit tests for AIDocumentIntelligenceService
 Tests document classification, data extraction, and error handling
 Target: 90% coverage
 """
+import asyncio
 import base64
 import io
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import MagicMock, Mock, patch, mock_open
@@ -17,7 +19,8 @@ from services.ai_document_intelligence_service import (
     AIDocumentIntelligenceService,
     DocumentIntelligenceError,
     ExtractionError,
-    UnsupportedDocumentError
+    UnsupportedDocumentError,
+    VisionRateLimiter
 )
 
 
@@ -1391,5 +1394,220 @@ class TestAIDocumentIntelligenceService:
         assert result['documents'][2]['index'] == 2
 
 
+
+def _image_bytes(color, size=(100, 100), image_format='PNG'):
+    img = Image.new('RGB', size, color=color)
+    img_buffer = io.BytesIO()
+    img.save(img_buffer, format=image_format)
+    return img_buffer.getvalue()
+
+
+def _anthropic_response(text):
+    mock_response = MagicMock()
+    mock_response.content = [MagicMock(text=text)]
+    return mock_response
+
+
+class TestBatchDocumentAnalysis:
+    """Test suite for batch mode of analyze_multiple_documents"""
+
+    @pytest.fixture
+    def client(self):
+        """Mock Anthropic client answering by prompt, safe for concurrent calls"""
+        def respond(**kwargs):
+            prompt = kwargs['messages'][0]['content'][1]['text']
+            if 'classify it into ONE of these types' in prompt:
+                return _anthropic_response('lohnausweis')
+            if 'AHV/IV Pension Statement' in prompt.split('\n', 2)[0]:
+                return _anthropic_response('{"annual_pension": 24000, "_confidence": 0.85}')
+            data = {'gross_salary': 85000, '_confidence': 0.9}
+            if '_document_type' in prompt:
+                data['_document_type'] = 'lohnausweis'
+            return _anthropic_response(json.dumps(data))
+
+        mock_client = MagicMock()
+        mock_client.messages.create.side_effect = respond
+        return mock_client
+
+    @pytest.fixture
+    def service(self, client):
+        with patch('services.ai_document_intelligence_service.anthropic') as mock_anthropic_module:
+            mock_anthropic_module.Anthropic.return_value = client
+            yield AIDocumentIntelligenceService(ai_provider='anthropic', api_key='test-key')
+
+    def test_batch_preserves_order(self, service, client):
+        """Test that concurrently analyzed documents come back in input order"""
+        documents = [{'image_bytes': _image_bytes(color)} for color in ('white', 'black', 'red', 'blue')]
+
+        result = service.analyze_multiple_documents(documents, batch=True, max_concurrency=4)
+
+        assert result['successful'] == 4
+        assert [doc['index'] for doc in result['documents']] == [0, 1, 2, 3]
+        assert client.messages.create.call_count == 8
+        assert result['timings']['wall'] >= 0
+        assert set(result['timings']['stages']) >= {'classification', 'extraction'}
+
+    def test_batch_analyzes_identical_images_once(self, service, client):
+        """Test that duplicate images reuse the first document's analysis"""
+        image = _image_bytes('white')
+        documents = [{'image_bytes': image}, {'image_bytes': _image_bytes('black')}, {'image_bytes': image}]
+
+        result = service.analyze_multiple_documents(documents, batch=True)
+
+        assert result['successful'] == 3
+        assert client.messages.create.call_count == 4
+        assert result['documents'][2]['duplicate_of'] == 0
+        assert 'duplicate_of' not in result['documents'][1]
+        assert len(result['by_type']['lohnausweis']) == 3
+
+    def test_batch_merges_calls_for_hinted_type(self, service, client):
+        """Test that a type named in the file name is confirmed in the extraction call"""
+        documents = [{'image_bytes': _image_bytes('white'), 'filename': 'Lohnausweis_2024.png'}]
+
+        result = service.analyze_multiple_documents(documents, batch=True)
+
+        assert client.messages.create.call_count == 1
+        analysis = result['documents'][0]['analysis']
+        assert analysis['document_type'] == 'lohnausweis'
+        assert '_document_type' not in analysis['extracted_data']
+        assert 'classification' not in analysis['timings']
+
+    def test_wrong_hint_falls_back_to_actual_type(self, service, client):
+        """Test that a contradicted hint is followed by extraction for the actual type"""
+        result = service.analyze_document(image_bytes=_image_bytes('white'), type_hint='ahv_statement')
+
+        assert result['document_type'] == 'ahv_statement'
+        assert client.messages.create.call_count == 1
+
+        client.messages.create.side_effect = [
+            _anthropic_response('{"annual_pension": 24000, "_document_type": "lohnausweis"}'),
+            _anthropic_response('{"gross_salary": 85000, "_confidence": 0.9}')
+        ]
+        result = service.analyze_document(image_bytes=_image_bytes('black'), type_hint='ahv_statement')
+
+        assert result['document_type'] == 'lohnausweis'
+        assert result['extracted_data']['gross_salary'] == 85000.0
+
+    def test_batch_hints_type_from_image_path(self, service, client, tmp_path):
+        """Test that a file read from disk keeps the type hint of its path"""
+        image_file = tmp_path / 'Lohnausweis_2024.png'
+        image_file.write_bytes(_image_bytes('white'))
+
+        result = service.analyze_multiple_documents([{'image_path': str(image_file)}], batch=True)
+
+        assert result['successful'] == 1
+        assert client.messages.create.call_count == 1
+
+    def test_batch_reports_unreadable_documents(self, service):
+        """Test that documents without content fail without stopping the batch"""
+        documents = [{'filename': 'empty.png'}, {'image_bytes': _image_bytes('white')}]
+
+        result = service.analyze_multiple_documents(documents, batch=True)
+
+        assert result['failed'] == 1
+        assert result['successful'] == 1
+        assert result['documents'][0]['success'] is False
+
+    @pytest.mark.parametrize('filename,expected', [
+        ('Lohnausweis_2024.pdf', 'lohnausweis'),
+        ('saeule-3a vorsorge.jpg', 'pillar_3a_statement'),
+        ('AHV rente.png', 'ahv_statement'),
+        ('archive.png', None),
+        ('bank versicherung.png', None),
+        (None, None),
+    ])
+    def test_detect_type_hint(self, service, filename, expected):
+        """Test file name hints match whole keywords of exactly one type"""
+        assert service.detect_type_hint(filename) == expected
+
+    def test_prepare_image_downscales_large_images(self, service):
+        """Test that oversized images are downscaled before the vision call"""
+        large = _image_bytes('white', size=(4000, 3000), image_format='JPEG')
+
+        prepared = service._prepare_image(large)
+
+        assert len(prepared) < len(large)
+        assert max(Image.open(io.BytesIO(prepared)).size) == 1568
+
+    def test_prepare_image_keeps_small_and_non_images(self, service):
+        """Test that small images and non-image content are sent unchanged"""
+        small = _image_bytes('white')
+
+        assert service._prepare_image(small) is small
+        assert service._prepare_image(b'%PDF-1.4') == b'%PDF-1.4'
+
+    def test_rate_limiter_waits_when_exhausted(self):
+        """Test that calls beyond the per-minute budget wait"""
+        limiter = VisionRateLimiter(requests_per_minute=2)
+
+        with patch('services.ai_document_intelligence_service.time.sleep',
+                   side_effect=InterruptedError) as mock_sleep:
+            limiter.acquire()
+            limiter.acquire()
+            with pytest.raises(InterruptedError):
+                limiter.acquire()
+
+        assert mock_sleep.call_args[0][0] > 0
+
+
+class TestDocumentIntelligenceRouter:
+    """Test that document analysis endpoints keep the event loop free"""
+
+    async def test_throttled_analysis_does_not_block_event_loop(self, monkeypatch):
+        """Test that other requests progress while /analyze waits for the vision rate limit"""
+        from fastapi import UploadFile
+
+        from routers import document_intelligence
+
+        limiter = VisionRateLimiter(requests_per_minute=120)
+        limiter._tokens = 0.0  # Exhausted: the next call waits half a second
+
+        class ThrottledService:
+            def __init__(self, **kwargs):
+                pass
+
+            def analyze_document(self, **kwargs):
+                analysis_threads.append(threading.current_thread().name)
+                limiter.acquire()
+                return {
+                    'document_type': 'lohnausweis',
+                    'document_type_name': 'Swiss Salary Certificate (Lohnausweis)',
+                    'extracted_data': {},
+                    'confidence': 0.9,
+                    'timestamp': datetime.utcnow().isoformat(),
+                    'ai_provider': 'anthropic'
+                }
+
+        monkeypatch.setattr(document_intelligence, 'AIDocumentIntelligenceService', ThrottledService)
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'test-key')
+        analysis_threads = []
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        try:
+            analysis = asyncio.create_task(document_intelligence.analyze_document(
+                file=UploadFile(file=io.BytesIO(_image_bytes('white')), filename='scan.png'),
+                document_type=None,
+                ai_provider='anthropic',
+                db=None
+            ))
+            await asyncio.sleep(0.05)
+            # The default executor is still free for other asyncio.to_thread users
+            assert await asyncio.wait_for(asyncio.to_thread(lambda: 'free'), timeout=0.2) == 'free'
+            response = await analysis
+        finally:
+            ticker.cancel()
+
+        assert response.document_type == 'lohnausweis'
+        assert ticks >= 10
+        assert analysis_threads[0].startswith('document-analysis-request')
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
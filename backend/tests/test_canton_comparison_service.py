@@ -0,0 +1,207 @@
+"""
+Unit Tests for Canton Comparison Service
+
+Tests the multi-canton comparison engine against fixture snapshots:
+- Ranking and savings across cantons
+- Representative municipality per canton
+- Church and wealth tax components
+- Municipality ranking
+- AITaxOptimizationService delegation
+"""
+
+import sys
+import unittest
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.ai_tax_optimization_service import AITaxOptimizationService
+from services.canton_comparison_service import CantonComparisonService, ComparisonProfile
+from services.church_tax_rate_table import ChurchTaxRateTable
+from services.municipality_index import Municipality, MunicipalityIndex
+
+
+def _municipality(municipality_id, canton, name, multiplier):
+    return Municipality(municipality_id, canton, name, Decimal(multiplier), 2024)
+
+
+INDEX = MunicipalityIndex(2024, [
+    _municipality(1, 'ZH', 'Zürich', '1.19'),
+    _municipality(2, 'ZH', 'Winterthur', '1.25'),
+    _municipality(3, 'ZH', 'Küsnacht', '0.73'),
+    _municipality(10, 'ZG', 'Zug', '0.50'),
+    _municipality(11, 'ZG', 'Baar', '0.53'),
+])
+
+CHURCH_TABLE = ChurchTaxRateTable(
+    2024,
+    configs=[
+        {'canton': 'ZH', 'has_church_tax': True, 'recognized_denominations': ['catholic', 'reformed'],
+         'calculation_method': 'percentage_of_cantonal', 'notes': None, 'official_source': None},
+        {'canton': 'ZG', 'has_church_tax': True, 'recognized_denominations': ['catholic', 'reformed'],
+         'calculation_method': 'percentage_of_cantonal', 'notes': None, 'official_source': None},
+    ],
+    rates=[
+        {'canton': 'ZH', 'municipality_id': None, 'municipality_name': None, 'denomination': 'reformed',
+         'rate_percentage': 0.10, 'source': 'canton_average', 'parish_name': None, 'official_source': None},
+        {'canton': 'ZG', 'municipality_id': None, 'municipality_name': None, 'denomination': 'reformed',
+         'rate_percentage': 0.08, 'source': 'canton_average', 'parish_name': None, 'official_source': None},
+    ]
+)
+
+
+class TestCantonComparisonService(unittest.TestCase):
+    """Test suite for CantonComparisonService"""
+
+    def setUp(self):
+        """Serve fixture snapshots instead of the database"""
+        self.patchers = [
+            patch('services.canton_comparison_service.get_municipality_index', return_value=INDEX),
+            patch('services.canton_comparison_service.get_church_tax_rate_table', return_value=CHURCH_TABLE),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        self.service = CantonComparisonService(tax_year=2024)
+        self.profile = ComparisonProfile(taxable_income=Decimal('100000'))
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def test_compares_all_cantons_by_default(self):
+        """Test that every canton is ranked by total tax"""
+        result = self.service.compare(self.profile, 'ZH', 'Zürich')
+
+        self.assertEqual(len(result['comparisons']), 26)
+        totals = [row['total_tax'] for row in result['comparisons']]
+        self.assertEqual(totals, sorted(totals))
+        self.assertEqual([row['rank'] for row in result['comparisons']], list(range(1, 27)))
+        self.assertEqual(result['best_canton'], result['comparisons'][0]['canton'])
+
+    def test_current_canton_uses_own_municipality(self):
+        """Test that the current canton is evaluated at the taxpayer's municipality"""
+        result = self.service.compare(self.profile, 'ZH', 'zurich', cantons=['ZH', 'ZG'])
+
+        current = next(row for row in result['comparisons'] if row['canton'] == 'ZH')
+        self.assertEqual(current['municipality'], 'Zürich')
+        self.assertEqual(current['savings'], 0.0)
+        self.assertEqual(result['current_total_tax'], current['total_tax'])
+
+    def test_other_cantons_use_median_municipality(self):
+        """Test that other cantons are evaluated at their median multiplier"""
+        result = self.service.compare(self.profile, 'ZG', 'Zug', cantons=['ZH', 'ZG'])
+
+        zurich = next(row for row in result['comparisons'] if row['canton'] == 'ZH')
+        self.assertEqual(zurich['municipality'], 'Zürich')
+        self.assertAlmostEqual(zurich['municipal_tax'], zurich['cantonal_tax'] * 1.19, places=1)
+
+    def test_savings_against_current_canton(self):
+        """Test that savings and max_savings are measured against the current canton"""
+        result = self.service.compare(self.profile, 'ZH', 'Winterthur', cantons=['ZH', 'ZG'])
+
+        self.assertEqual(result['best_canton'], 'ZG')
+        best = result['comparisons'][0]
+        self.assertAlmostEqual(best['savings'], result['current_total_tax'] - best['total_tax'], places=2)
+        self.assertEqual(result['max_savings'], best['savings'])
+        self.assertGreater(best['savings_percentage'], 0)
+
+    def test_no_negative_max_savings(self):
+        """Test that max_savings is zero when the current canton is already the cheapest"""
+        result = self.service.compare(self.profile, 'ZG', 'Zug', cantons=['ZH', 'ZG'])
+
+        self.assertEqual(result['best_canton'], 'ZG')
+        self.assertEqual(result['max_savings'], 0.0)
+
+    def test_current_canton_added_to_list(self):
+        """Test that the current canton is always part of the comparison"""
+        result = self.service.compare(self.profile, 'ZH', cantons=['ZG'])
+
+        self.assertEqual({row['canton'] for row in result['comparisons']}, {'ZH', 'ZG'})
+
+    def test_church_tax_for_members(self):
+        """Test that church tax applies the canton rate to the cantonal tax"""
+        profile = ComparisonProfile(taxable_income=Decimal('100000'), denomination='reformed')
+        result = self.service.compare(profile, 'ZH', 'Zürich', cantons=['ZH', 'ZG'])
+
+        zurich = next(row for row in result['comparisons'] if row['canton'] == 'ZH')
+        self.assertAlmostEqual(zurich['church_tax'], zurich['cantonal_tax'] * 0.10, places=1)
+
+        result = self.service.compare(self.profile, 'ZH', 'Zürich', cantons=['ZH'])
+        self.assertEqual(result['comparisons'][0]['church_tax'], 0.0)
+
+    def test_wealth_tax_included(self):
+        """Test that net wealth adds wealth tax to the burden"""
+        without_wealth = self.service.compare(self.profile, 'ZH', 'Zürich', cantons=['ZH'])
+        profile = ComparisonProfile(taxable_income=Decimal('100000'), net_wealth=Decimal('2000000'))
+        with_wealth = self.service.compare(profile, 'ZH', 'Zürich', cantons=['ZH'])
+
+        self.assertGreater(with_wealth['comparisons'][0]['wealth_tax'], 0)
+        self.assertGreater(with_wealth['current_total_tax'], without_wealth['current_total_tax'])
+
+    def test_municipality_ranking(self):
+        """Test that include_municipalities ranks individual municipalities"""
+        result = self.service.compare(
+            self.profile, 'ZH', 'Zürich', cantons=['ZH', 'ZG'],
+            include_municipalities=True, municipality_limit=3
+        )
+
+        municipalities = result['municipalities']
+        self.assertEqual(len(municipalities), 3)
+        self.assertEqual(municipalities[0]['municipality'], 'Zug')
+        self.assertNotIn('municipalities', self.service.compare(self.profile, 'ZH', cantons=['ZH']))
+
+    def test_without_municipality_index(self):
+        """Test that cantons are still compared when the index is unavailable"""
+        with patch('services.canton_comparison_service.get_municipality_index', return_value=None):
+            result = self.service.compare(self.profile, 'ZH', 'Zürich', cantons=['ZH', 'ZG'])
+
+        self.assertEqual(len(result['comparisons']), 2)
+        self.assertTrue(all(row['municipal_multiplier'] == 1.0 for row in result['comparisons']))
+
+
+class TestAITaxOptimizationCompareCantons(unittest.TestCase):
+    """Test that AITaxOptimizationService delegates to the comparison engine"""
+
+    @patch('services.canton_comparison_service.get_church_tax_rate_table', return_value=CHURCH_TABLE)
+    @patch('services.canton_comparison_service.get_municipality_index', return_value=INDEX)
+    @patch('services.ai_tax_optimization_service.anthropic')
+    def test_compare_cantons_uses_filing_profile(self, mock_anthropic, mock_index, mock_church):
+        """Test that the filing's income and profile drive the comparison"""
+        service = AITaxOptimizationService(ai_provider='anthropic', api_key='test-key')
+
+        result = service.compare_cantons(
+            {'canton': 'ZH', 'tax_year': 2024,
+             'profile': {'marital_status': 'married', 'num_children': 2, 'municipality': 'Zürich'}},
+            {'taxable_income': 120000, 'total_tax': 18000},
+            ['ZG']
+        )
+
+        self.assertEqual(result['current_canton'], 'ZH')
+        self.assertEqual(result['current_municipality'], 'Zürich')
+        self.assertEqual(result['reported_total_tax'], 18000)
+        self.assertEqual(len(result['comparisons']), 2)
+        self.assertEqual(result['best_canton'], 'ZG')
+        self.assertGreater(result['max_savings'], 0)
+
+    @patch('services.canton_comparison_service.get_church_tax_rate_table', return_value=CHURCH_TABLE)
+    @patch('services.canton_comparison_service.get_municipality_index', return_value=INDEX)
+    @patch('services.ai_tax_optimization_service.anthropic')
+    def test_compare_cantons_with_unset_profile_fields(self, mock_anthropic, mock_index, mock_church):
+        """Test that unset children, marital status and year fall back to defaults"""
+        service = AITaxOptimizationService(ai_provider='anthropic', api_key='test-key')
+
+        result = service.compare_cantons(
+            {'canton': 'ZH', 'tax_year': None,
+             'profile': {'marital_status': None, 'num_children': None}},
+            {'taxable_income': 120000, 'total_tax': 18000},
+            ['ZG']
+        )
+
+        self.assertEqual(len(result['comparisons']), 2)
+        self.assertEqual(result['best_canton'], 'ZG')
+
+
+if __name__ == '__main__':
+    unittest.main()
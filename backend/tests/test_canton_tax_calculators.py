@@ -24,13 +24,15 @@ from unittest.mock import MagicMock, Mock, patch
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from services.canton_tax_calculators.aargau import AargauTaxCalculator
-from services.canton_tax_calculators.base import TaxBracket, CantonTaxCalculator
+from services.canton_tax_calculators.base import CompiledTaxSchedule, TaxBracket, CantonTaxCalculator
 from services.canton_tax_calculators.zurich import ZurichTaxCalculator
 from services.canton_tax_calculators.geneva import GenevaTaxCalculator
 from services.canton_tax_calculators.bern import BernTaxCalculator
 from services.canton_tax_calculators.vaud import VaudTaxCalculator
 from services.canton_tax_calculators.basel_stadt import BaselStadtTaxCalculator
-from services.canton_tax_calculators import get_canton_calculator, CANTON_CALCULATORS
+from services.canton_tax_calculators import (
+    get_canton_calculator, warm_up_canton_calculators, clear_canton_calculator_cache, CANTON_CALCULATORS
+)
 
 
 class TestTaxBracket(unittest.TestCase):
@@ -584,6 +586,117 @@ class TestBaselStadtTaxCalculator(unittest.TestCase):
         self.assertGreater(result['simple_tax'], Decimal('0'))
 
 
+class TestCalculateMany(unittest.TestCase):
+    """Test suite for the vectorized batch API"""
+
+    INCOMES = [
+        Decimal('-500'), Decimal('0'), Decimal('5000'), Decimal('18250.50'),
+        Decimal('45000'), Decimal('87654.30'), Decimal('150000'), Decimal('209800'),
+        Decimal('264200.01'), Decimal('412345'), Decimal('900000'), Decimal('2500000')
+    ]
+    STATUSES = ['single', 'married', 'divorced']
+    CHILDREN = [0, 1, 3]
+
+    def _scalar(self, calculator, income, marital_status, num_children):
+        """Scalar reference rounded like the batch API"""
+        if income <= 0:
+            return Decimal('0.00')
+        tax = calculator._calculate_cantonal_tax(income, marital_status, num_children)
+        if calculator._get_batch_plan(marital_status, num_children) is not None:
+            tax = max(tax, Decimal('0'))
+        return tax.quantize(Decimal('0.01'))
+
+    def test_batch_matches_scalar_for_all_cantons(self):
+        """Test that calculate_many agrees with calculate to the cent in every canton"""
+        rows = [
+            (income, status, children)
+            for income in self.INCOMES
+            for status in self.STATUSES
+            for children in self.CHILDREN
+        ]
+        incomes, statuses, children = zip(*rows)
+
+        for canton_code in CANTON_CALCULATORS:
+            calculator = get_canton_calculator(canton_code, 2024)
+            batch = calculator.calculate_many(incomes, statuses, children)
+
+            expected = [self._scalar(calculator, *row) for row in rows]
+            self.assertEqual(batch, expected, f"Batch mismatch for {canton_code}")
+
+    def test_scalar_arguments_are_broadcast(self):
+        """Test that a single status and child count apply to all rows"""
+        calculator = ZurichTaxCalculator('ZH', 2024)
+        batch = calculator.calculate_many([Decimal('50000'), Decimal('120000')], 'married', 2)
+
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch[0], calculator.calculate(Decimal('50000'), 'married', 2).quantize(Decimal('0.01')))
+
+    def test_mismatched_lengths_raise(self):
+        """Test that per-row arguments must match the number of incomes"""
+        calculator = ZurichTaxCalculator('ZH', 2024)
+
+        with self.assertRaises(ValueError):
+            calculator.calculate_many([Decimal('50000'), Decimal('60000')], ['single'], 0)
+
+    def test_empty_input(self):
+        """Test batch calculation with no rows"""
+        calculator = GenevaTaxCalculator()
+        self.assertEqual(calculator.calculate_many([]), [])
+
+    def test_fallback_for_cantons_without_plan(self):
+        """Test that cantons without a batch plan are evaluated row by row"""
+        calculator = get_canton_calculator('BL', 2024)
+        self.assertIsNone(calculator._batch_plan('single', 0))
+
+        batch = calculator.calculate_many([Decimal('80000')])
+        expected = calculator.calculate(Decimal('80000'))['cantonal_tax'].quantize(Decimal('0.01'))
+        self.assertEqual(batch, [expected])
+
+    def test_vaud_family_quotients_match_scalar(self):
+        """Test that VD agrees with calculate for every family quotient"""
+        import random
+
+        calculator = get_canton_calculator('VD', 2024)
+        rng = random.Random(2024)
+        incomes = [Decimal(rng.randint(1, 400000)) for _ in range(500)]
+        # Incomes where rounding the quotient tax decides the last cent
+        incomes += [Decimal('49465'), Decimal('50835'), Decimal('82225'), Decimal('39390'), Decimal('9825')]
+
+        for marital_status in ('single', 'married', 'divorced', 'single_parent'):
+            for num_children in range(5):
+                batch = calculator.calculate_many(incomes, marital_status, num_children)
+                expected = [
+                    calculator.calculate(income, marital_status, num_children).quantize(Decimal('0.01'))
+                    for income in incomes
+                ]
+                self.assertEqual(batch, expected, f"VD mismatch for {marital_status} with {num_children} children")
+
+    def test_compiled_marginal_schedule_flat_threshold(self):
+        """Test that the flat rate applies to the entire income above the threshold"""
+        import numpy as np
+
+        schedule = CompiledTaxSchedule.from_marginal_rates(
+            [(Decimal('10000'), Decimal('0.01')), (Decimal('inf'), Decimal('0.05'))],
+            flat_threshold=Decimal('50000'),
+            flat_rate=Decimal('0.04')
+        )
+        result = schedule.evaluate(np.array([5000.0, 10000.0, 50000.0, 60000.0]))
+
+        self.assertEqual(result.tolist(), [50.0, 100.0, 2100.0, 2400.0])
+
+    def test_compiled_tax_brackets_match_progressive_rates(self):
+        """Test that compiled TaxBracket schedules follow _apply_progressive_rates"""
+        import numpy as np
+
+        calculator = BernTaxCalculator('BE', 2024)
+        brackets = calculator.tax_brackets['single']
+        schedule = CompiledTaxSchedule.from_tax_brackets(brackets)
+
+        for income in [Decimal('9000'), Decimal('25000'), Decimal('120000'), Decimal('300000')]:
+            expected = calculator._apply_progressive_rates(income, brackets)
+            self.assertAlmostEqual(schedule.evaluate(np.array([float(income)]))[0], float(expected), places=6)
+
+
 class TestGetCantonCalculator(unittest.TestCase):
     """Test suite for get_canton_calculator factory function"""
 
@@ -652,6 +765,28 @@ class TestGetCantonCalculator(unittest.TestCase):
         self.assertEqual(calc_2024.tax_year, 2024)
         self.assertEqual(calc_2023.tax_year, 2023)
 
+    def test_calculator_instances_are_shared(self):
+        """Test that calculators are built once per canton and tax year"""
+        self.assertIs(get_canton_calculator('ZH', 2024), get_canton_calculator('ZH', 2024))
+        self.assertIsNot(get_canton_calculator('ZH', 2024), get_canton_calculator('ZH', 2023))
+
+    def test_constructor_signatures(self):
+        """Test that base-constructor and canton-specific calculators both get the right canton"""
+        for canton_code in CANTON_CALCULATORS:
+            self.assertEqual(get_canton_calculator(canton_code, 2024).canton, canton_code)
+
+    def test_warm_up_and_clear_cache(self):
+        """Test warming up the registry and clearing it again"""
+        clear_canton_calculator_cache()
+        calculator = get_canton_calculator('GE', 2024)
+
+        self.assertGreaterEqual(warm_up_canton_calculators([2024]), len(CANTON_CALCULATORS))
+        self.assertIs(get_canton_calculator('GE', 2024), calculator)
+        self.assertIsNotNone(calculator._batch_plans[('married', 0)])
+
+        clear_canton_calculator_cache()
+        self.assertIsNot(get_canton_calculator('GE', 2024), calculator)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,175 @@
+"""
+Unit Tests for Church Tax Rate Table
+
+Tests the in-memory church tax configuration and rates:
+- Lookup by (canton, municipality_id, denomination)
+- Canton-average fallback
+- Canton and all-canton listings used by ChurchTaxService
+- Loading, sharing and invalidation per tax year
+"""
+
+import sys
+import unittest
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.church_tax_rate_table import (ChurchTaxRateTable,
+                                            get_church_tax_rate_table,
+                                            invalidate_church_tax_rate_table)
+from services.church_tax_service import ChurchTaxService
+
+CONFIGS = [
+    {'canton': 'ZH', 'has_church_tax': True, 'recognized_denominations': ['catholic', 'reformed'],
+     'calculation_method': 'percentage_of_cantonal', 'notes': 'Zurich', 'official_source': None},
+    {'canton': 'GE', 'has_church_tax': False, 'recognized_denominations': None,
+     'calculation_method': None, 'notes': 'Voluntary', 'official_source': None},
+]
+
+
+def _rate(canton, denomination, rate, municipality_id=None, source='canton_average', name=None):
+    """Build a church_tax_rates row"""
+    return {
+        'canton': canton, 'municipality_id': municipality_id, 'municipality_name': name,
+        'denomination': denomination, 'rate_percentage': Decimal(rate), 'source': source,
+        'parish_name': name, 'official_source': None
+    }
+
+
+RATES = [
+    _rate('ZH', 'catholic', '0.13'),
+    _rate('ZH', 'reformed', '0.10'),
+    _rate('ZH', 'reformed', '0.08', municipality_id=261, source='official_parish', name='Zürich'),
+]
+
+
+class TestChurchTaxRateTable(unittest.TestCase):
+    """Test suite for ChurchTaxRateTable lookups"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.table = ChurchTaxRateTable(2024, CONFIGS, RATES)
+
+    def test_get_config(self):
+        """Test canton configuration lookup"""
+        self.assertTrue(self.table.get_config('zh')['has_church_tax'])
+        self.assertEqual(self.table.get_config('GE')['recognized_denominations'], [])
+        self.assertIsNone(self.table.get_config('XX'))
+
+    def test_municipality_rate(self):
+        """Test that a municipality-specific rate wins"""
+        rate = self.table.get_rate('ZH', 'reformed', 261)
+        self.assertEqual(rate['rate_percentage'], Decimal('0.08'))
+        self.assertEqual(rate['source'], 'official_parish')
+
+    def test_canton_average_fallback(self):
+        """Test fallback to the canton average"""
+        self.assertEqual(self.table.get_rate('ZH', 'reformed', 999)['rate_percentage'], Decimal('0.10'))
+        self.assertEqual(self.table.get_rate('ZH', 'catholic', 261)['rate_percentage'], Decimal('0.13'))
+        self.assertEqual(self.table.get_rate('ZH', 'reformed')['rate_percentage'], Decimal('0.10'))
+        self.assertIsNone(self.table.get_rate('ZH', 'jewish'))
+
+    def test_string_municipality_id(self):
+        """Test that municipality ids from interview answers may be strings"""
+        self.assertEqual(self.table.get_rate('ZH', 'reformed', '261')['rate_percentage'], Decimal('0.08'))
+
+    def test_returned_data_is_not_shared(self):
+        """Test that callers cannot modify the snapshot"""
+        self.table.get_config('ZH')['recognized_denominations'].append('jewish')
+        self.table.get_rate('ZH', 'catholic')['rate_percentage'] = Decimal('1')
+
+        self.assertEqual(self.table.get_config('ZH')['recognized_denominations'], ['catholic', 'reformed'])
+        self.assertEqual(self.table.get_rate('ZH', 'catholic')['rate_percentage'], Decimal('0.13'))
+
+    def test_canton_rates(self):
+        """Test canton-level rates per denomination"""
+        rates = self.table.get_canton_rates('ZH')
+        self.assertEqual(list(rates), ['catholic', 'reformed'])
+        self.assertEqual(self.table.get_canton_rates('GE'), {})
+
+    def test_all_configs_sorted(self):
+        """Test all configurations sorted by canton"""
+        self.assertEqual(list(self.table.get_all_configs()), ['GE', 'ZH'])
+
+
+class TestChurchTaxServiceInMemory(unittest.TestCase):
+    """Test that ChurchTaxService reads from the rate table"""
+
+    def setUp(self):
+        """Serve the fixture table to the service"""
+        patcher = patch(
+            'services.church_tax_service.get_church_tax_rate_table',
+            return_value=ChurchTaxRateTable(2024, CONFIGS, RATES)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = ChurchTaxService(tax_year=2024)
+
+    def test_calculate_church_tax(self):
+        """Test church tax with municipality rate"""
+        result = self.service.calculate_church_tax('ZH', Decimal('10000'), 'reformed', municipality_id=261)
+        self.assertTrue(result['applies'])
+        self.assertEqual(result['church_tax'], 800.0)
+
+    def test_compare_cantons(self):
+        """Test canton comparison without database access"""
+        result = self.service.compare_cantons(Decimal('10000'), 'catholic', ['ZH', 'GE', 'BE'])
+
+        self.assertEqual(result['ZH']['church_tax'], 1300.0)
+        self.assertFalse(result['GE']['applies'])
+        self.assertFalse(result['BE']['applies'])
+
+    def test_get_canton_info(self):
+        """Test canton info rates"""
+        info = self.service.get_canton_info('ZH')
+        self.assertEqual(info['rates']['catholic'], {'rate_percentage': 0.13, 'source': 'canton_average'})
+
+    def test_get_all_cantons_info(self):
+        """Test all-canton info"""
+        self.assertEqual(set(self.service.get_all_cantons_info()), {'ZH', 'GE'})
+
+    def test_tables_unavailable(self):
+        """Test that missing tables surface as a calculation error"""
+        with patch('services.church_tax_service.get_church_tax_rate_table', return_value=None):
+            result = self.service.calculate_church_tax('ZH', Decimal('10000'), 'catholic')
+
+        self.assertFalse(result['applies'])
+        self.assertEqual(result['reason'], 'calculation_error')
+
+
+@patch('services.church_tax_rate_table.execute_query')
+@patch('services.church_tax_rate_table.execute_one')
+class TestGetChurchTaxRateTable(unittest.TestCase):
+    """Test suite for the shared per-year table registry"""
+
+    def setUp(self):
+        invalidate_church_tax_rate_table()
+
+    def tearDown(self):
+        invalidate_church_tax_rate_table()
+
+    def test_loads_once_and_shares_instance(self, mock_execute_one, mock_execute_query):
+        """Test that both tables are loaded once and shared"""
+        mock_execute_one.return_value = {
+            'config_count': 2, 'config_created': None,
+            'rate_count': 3, 'rate_created': None, 'rate_checksum': Decimal('0.31')
+        }
+        mock_execute_query.side_effect = [CONFIGS, RATES]
+
+        table = get_church_tax_rate_table(2024)
+
+        self.assertEqual(table.get_rate('ZH', 'catholic')['rate_percentage'], Decimal('0.13'))
+        self.assertIs(get_church_tax_rate_table(2024), table)
+        self.assertEqual(mock_execute_query.call_count, 2)
+
+    def test_database_unavailable(self, mock_execute_one, mock_execute_query):
+        """Test that a failed load returns None"""
+        mock_execute_one.side_effect = Exception("connection refused")
+
+        self.assertIsNone(get_church_tax_rate_table(2024))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -312,3 +312,74 @@ class TestChurchTaxRateComparison:
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
+
+
+class TestChurchTaxFromData:
+    """Test church tax calculation from preloaded config and rate (no database)."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.service = ChurchTaxService(tax_year=2024)
+        self.config = {
+            'canton': 'ZH',
+            'has_church_tax': True,
+            'recognized_denominations': ['catholic', 'reformed', 'christian_catholic'],
+            'calculation_method': 'percentage_of_cantonal',
+            'notes': None,
+            'official_source': None
+        }
+        self.rate = {
+            'canton': 'ZH',
+            'municipality_id': None,
+            'municipality_name': None,
+            'denomination': 'catholic',
+            'rate_percentage': Decimal('0.13'),
+            'source': 'canton_average',
+            'parish_name': None,
+            'official_source': None
+        }
+
+    def test_applies_rate(self):
+        """Test church tax is cantonal tax times the preloaded rate."""
+        result = self.service.calculate_church_tax_from_data(
+            'zh', Decimal('10000'), 'catholic', self.config, self.rate, 'Zürich'
+        )
+
+        assert result['applies'] is True
+        assert result['canton'] == 'ZH'
+        assert result['church_tax'] == 1300.0
+        assert result['municipality_name'] == 'Zürich'
+
+    def test_missing_config(self):
+        """Test missing canton config means no church tax."""
+        result = self.service.calculate_church_tax_from_data(
+            'ZH', Decimal('10000'), 'catholic', None, None
+        )
+
+        assert result['applies'] is False
+        assert result['reason'] == 'canton_not_found'
+
+    def test_canton_without_church_tax(self):
+        """Test canton without church tax."""
+        config = dict(self.config, canton='GE', has_church_tax=False)
+        result = self.service.calculate_church_tax_from_data(
+            'GE', Decimal('10000'), 'catholic', config, None
+        )
+
+        assert result['reason'] == 'canton_no_tax'
+
+    def test_denomination_not_recognized(self):
+        """Test denomination not recognized in canton."""
+        result = self.service.calculate_church_tax_from_data(
+            'ZH', Decimal('10000'), 'jewish', self.config, None
+        )
+
+        assert result['reason'] == 'denomination_not_recognized'
+
+    def test_missing_rate(self):
+        """Test recognized denomination without a rate."""
+        result = self.service.calculate_church_tax_from_data(
+            'ZH', Decimal('10000'), 'catholic', self.config, None
+        )
+
+        assert result['reason'] == 'rate_not_found'
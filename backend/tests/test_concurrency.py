@@ -0,0 +1,118 @@
+"""
+Unit tests for the async concurrency helpers
+Tests per-key and global caps, result ordering and error propagation
+"""
+
+import asyncio
+import gc
+
+import pytest
+
+from utils.concurrency import ConcurrencyLimiter, gather_and_store
+
+
+class ConcurrencyProbe:
+    """Records how many tasks run at once, overall and per key"""
+
+    def __init__(self):
+        self.running = {}
+        self.peak = {}
+        self.total_running = 0
+        self.total_peak = 0
+
+    async def run(self, limiter, key, result=None):
+        async with limiter.slot(key):
+            self.running[key] = self.running.get(key, 0) + 1
+            self.total_running += 1
+            self.peak[key] = max(self.peak.get(key, 0), self.running[key])
+            self.total_peak = max(self.total_peak, self.total_running)
+            await asyncio.sleep(0.01)
+            self.running[key] -= 1
+            self.total_running -= 1
+        return result
+
+
+class TestConcurrencyLimiter:
+    """Test per-key and global caps"""
+
+    async def test_per_key_cap(self):
+        limiter = ConcurrencyLimiter(per_key=2, total=10)
+        probe = ConcurrencyProbe()
+
+        await asyncio.gather(*(probe.run(limiter, 'user-1') for _ in range(6)))
+
+        assert probe.peak['user-1'] == 2
+
+    async def test_global_cap(self):
+        limiter = ConcurrencyLimiter(per_key=2, total=3)
+        probe = ConcurrencyProbe()
+
+        await asyncio.gather(*(probe.run(limiter, f'user-{i % 4}') for i in range(12)))
+
+        assert probe.total_peak == 3
+        assert all(peak <= 2 for peak in probe.peak.values())
+
+    async def test_keys_do_not_share_caps(self):
+        limiter = ConcurrencyLimiter(per_key=1, total=10)
+        probe = ConcurrencyProbe()
+
+        await asyncio.gather(*(probe.run(limiter, f'user-{i}') for i in range(4)))
+
+        assert probe.total_peak == 4
+
+    async def test_idle_keys_are_dropped(self):
+        limiter = ConcurrencyLimiter(per_key=1, total=10)
+
+        async with limiter.slot('user-1'):
+            assert len(limiter._key_semaphores) == 1
+        gc.collect()
+
+        assert len(limiter._key_semaphores) == 0
+
+
+class TestGatherAndStore:
+    """Test concurrent runs stored in input order"""
+
+    async def test_results_stored_in_input_order(self):
+        stored = []
+        commits = []
+
+        async def task(index, delay):
+            await asyncio.sleep(delay)
+            return index
+
+        result = await gather_and_store(
+            (task(index, delay) for index, delay in enumerate([0.03, 0.0, 0.02, 0.01])),
+            store=lambda outcome: stored.append(outcome) or f'stored-{outcome}',
+            commit=lambda: commits.append(list(stored))
+        )
+
+        assert result == ['stored-0', 'stored-1', 'stored-2', 'stored-3']
+        assert commits == [[0, 1, 2, 3]]
+
+    async def test_first_exception_propagates(self):
+        stored = []
+        commits = []
+        finished = []
+
+        async def task(index, delay, error=None):
+            await asyncio.sleep(delay)
+            finished.append(index)
+            if error:
+                raise error
+            return index
+
+        with pytest.raises(ValueError, match='first'):
+            await gather_and_store(
+                [
+                    task(0, 0.02),
+                    task(1, 0.03, ValueError('first')),
+                    task(2, 0.0, KeyError('second')),
+                    task(3, 0.01),
+                ],
+                store=stored.append,
+                commit=lambda: commits.append(True)
+            )
+
+        assert sorted(finished) == [0, 1, 2, 3]  # Other tasks were not abandoned
+        assert stored == [] and commits == []
@@ -0,0 +1,226 @@
+"""
+Unit Tests for Database Connection Pool
+
+Tests the pooled execute_* helpers without a real database:
+- Connection reuse across queries
+- Health checks (closed and broken connections are discarded)
+- Per-statement timeouts
+- Pool metrics
+- database.connection helpers delegating to the pool
+"""
+
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import connection, connection_pool
+
+
+def _make_connection():
+    """Create a fake psycopg2 connection whose cursor returns one row"""
+    conn = MagicMock()
+    conn.closed = 0
+    cursor = MagicMock()
+    cursor.fetchone.return_value = {'health': 1}
+    cursor.fetchall.return_value = [{'id': 1}]
+    conn.cursor.return_value = cursor
+    return conn
+
+
+class FakePool:
+    """Minimal stand-in for psycopg2 ThreadedConnectionPool"""
+
+    def __init__(self, *args, **kwargs):
+        self.kwargs = kwargs
+        self.idle = []
+        self.created = 0
+        self.closed_connections = []
+
+    def getconn(self):
+        if self.idle:
+            return self.idle.pop()
+        self.created += 1
+        return _make_connection()
+
+    def putconn(self, conn, close=False):
+        if close:
+            self.closed_connections.append(conn)
+        else:
+            self.idle.append(conn)
+
+    def closeall(self):
+        self.idle.clear()
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Test suite for pooled connections"""
+
+    def setUp(self):
+        """Set up a fake pool for each test"""
+        connection_pool._pool.reset()
+        connection_pool._last_used.clear()
+        for metric in connection_pool._metrics:
+            connection_pool._metrics[metric] = 0
+
+        self.patchers = [
+            patch.object(connection_pool.pg_pool, 'ThreadedConnectionPool', FakePool),
+            patch.object(connection_pool, 'get_db_config', return_value={
+                'host': 'localhost', 'port': 5432, 'database': 'test',
+                'user': 'test', 'password': '', 'options': '-csearch_path=swisstax'
+            }),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        self.pool = connection_pool.get_connection_pool()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        connection_pool._pool.reset()
+        connection_pool._last_used.clear()
+
+    def test_pool_sets_default_statement_timeout(self):
+        """Test that pooled sessions get a default statement timeout"""
+        self.assertIn(
+            f"statement_timeout={connection_pool.STATEMENT_TIMEOUT_MS}",
+            self.pool.kwargs['options']
+        )
+
+    def test_connections_are_reused(self):
+        """Test that consecutive queries share one connection"""
+        connection_pool.execute_one("SELECT 1 as health")
+        connection_pool.execute_query("SELECT id FROM users")
+
+        self.assertEqual(self.pool.created, 1)
+
+    def test_closed_connection_is_discarded(self):
+        """Test that a connection closed by the server is not handed out"""
+        connection_pool.execute_one("SELECT 1 as health")
+        stale = self.pool.idle[0]
+        stale.closed = 1
+
+        connection_pool.execute_one("SELECT 1 as health")
+
+        self.assertIn(stale, self.pool.closed_connections)
+        self.assertEqual(self.pool.created, 2)
+
+    def test_idle_connection_is_pinged(self):
+        """Test that connections idle past the threshold are pinged before reuse"""
+        connection_pool.execute_one("SELECT 1 as health")
+        idle = self.pool.idle[0]
+        idle.cursor.return_value.__enter__.return_value.execute.side_effect = psycopg2.OperationalError("gone")
+        connection_pool._last_used[id(idle)] -= connection_pool.POOL_PING_AFTER_IDLE_SECONDS + 1
+
+        connection_pool.execute_one("SELECT 1 as health")
+
+        self.assertIn(idle, self.pool.closed_connections)
+        self.assertEqual(connection_pool.get_pool_metrics()['failed_pings'], 1)
+
+    def test_operational_error_discards_connection(self):
+        """Test that a connection failing mid-query is closed, not returned"""
+        with self.assertRaises(psycopg2.OperationalError):
+            with connection_pool.get_db_connection() as conn:
+                raise psycopg2.OperationalError("server closed the connection")
+
+        self.assertIn(conn, self.pool.closed_connections)
+        self.assertEqual(self.pool.idle, [])
+
+    def test_per_statement_timeout(self):
+        """Test that timeout_ms sets a transaction-local statement timeout"""
+        connection_pool.execute_one("SELECT pg_sleep(1)", timeout_ms=500)
+
+        cursor = self.pool.idle[0].cursor.return_value
+        cursor.execute.assert_any_call("SET LOCAL statement_timeout = %s", (500,))
+
+    def test_pool_metrics(self):
+        """Test that checkouts are counted and released"""
+        connection_pool.execute_one("SELECT 1 as health")
+        connection_pool.execute_one("SELECT 1 as health")
+
+        metrics = connection_pool.get_pool_metrics()
+        self.assertTrue(metrics['pool_created'])
+        self.assertEqual(metrics['checkouts'], 2)
+        self.assertEqual(metrics['in_use'], 0)
+        self.assertEqual(metrics['checkout_timeouts'], 0)
+
+    def test_checkout_timeout_when_exhausted(self):
+        """Test that checkout fails after waiting when all connections are in use"""
+        with patch.object(connection_pool._pool.peek()[1], 'acquire', return_value=False):
+            with self.assertRaises(connection_pool.pg_pool.PoolError):
+                connection_pool.execute_one("SELECT 1 as health")
+
+        self.assertEqual(connection_pool.get_pool_metrics()['checkout_timeouts'], 1)
+
+    def test_connection_module_uses_pool(self):
+        """Test that database.connection helpers run on the shared pool"""
+        self.assertEqual(connection.execute_one("SELECT 1 as health"), {'health': 1})
+        self.assertEqual(connection.execute_query("SELECT id FROM users"), [{'id': 1}])
+        self.assertTrue(connection.check_db_health())
+
+        self.assertEqual(self.pool.created, 1)
+        self.assertEqual(connection_pool.get_pool_metrics()['checkouts'], 3)
+
+    def test_concurrent_first_use(self):
+        """Test that callers racing pool creation all get a usable pool"""
+        connection_pool._pool.reset()
+        created = []
+
+        class SlowPool(FakePool):
+            def __init__(self, *args, **kwargs):
+                created.append(self)
+                time.sleep(0.05)
+                super().__init__(*args, **kwargs)
+
+        barrier = threading.Barrier(8)
+
+        def query():
+            barrier.wait()
+            return connection_pool.execute_one("SELECT 1 as health")
+
+        with patch.object(connection_pool.pg_pool, 'ThreadedConnectionPool', SlowPool):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: query(), range(8)))
+
+        self.assertEqual(results, [{'health': 1}] * 8)
+        self.assertEqual(len(created), 1)
+
+    def test_close_resets_pool(self):
+        """Test that closing the pool lets the next query create a new one"""
+        connection_pool.close_connection_pool()
+        self.assertFalse(connection_pool.get_pool_metrics()['pool_created'])
+
+        connection_pool.execute_one("SELECT 1 as health")
+
+        self.assertIsNot(connection_pool.get_connection_pool(), self.pool)
+
+
+class TestDatabaseConfig(unittest.TestCase):
+    """Test the database configuration shared by the pool and database.connection"""
+
+    def test_environment_defaults(self):
+        """Test that the user defaults to postgres"""
+        with patch.dict('os.environ', {'DATABASE_HOST': 'db.local'}, clear=True):
+            config = connection.get_db_config()
+
+        self.assertEqual(config['user'], 'postgres')
+        self.assertEqual(config['database'], 'swissai_tax')
+
+    def test_missing_parameter_fails(self):
+        """Test that Parameter Store errors are raised, not replaced by defaults"""
+        with patch.dict('os.environ', {}, clear=True), \
+                patch.dict(connection_pool._param_cache, clear=True), \
+                patch.object(connection_pool.ssm, 'get_parameter', side_effect=Exception('ParameterNotFound')):
+            with self.assertRaises(Exception):
+                connection_pool.get_db_config()
+
+
+if __name__ == '__main__':
+    unittest.main()
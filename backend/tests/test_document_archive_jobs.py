@@ -0,0 +1,180 @@
+"""
+Unit Tests for Document Archive Jobs
+
+Tests the background archive job manager:
+- Progress and result reporting
+- Failed builds
+- One running build per user and owner checks
+- Expiry of finished jobs
+- Polls answered by another instance through the shared store
+"""
+
+import io
+import sys
+import threading
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.document_archive_jobs import (COMPLETED, FAILED, RUNNING,
+                                            ArchiveJob, DocumentArchiveJobManager,
+                                            S3ArchiveJobStore)
+
+
+class SharedBucketStandIn:
+    """Local stand-in for the S3 object calls of the job store"""
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = Body
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({'Error': {'Code': 'NoSuchKey', 'Message': 'Not found'}}, 'GetObject')
+        return {'Body': io.BytesIO(self.objects[Key])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+
+class TestDocumentArchiveJobManager(unittest.TestCase):
+    """Test suite for DocumentArchiveJobManager"""
+
+    def setUp(self):
+        self.manager = DocumentArchiveJobManager(max_workers=1)
+
+    def tearDown(self):
+        self.manager._executor.shutdown(wait=True)
+
+    def _wait(self):
+        # Jobs run on the manager's single worker; an empty task runs after them
+        self.manager._executor.submit(lambda: None).result(timeout=5)
+
+    def test_completed_job_reports_progress_and_result(self):
+        """Test that progress callbacks and the result are recorded"""
+        def create_archive(user_id, progress_callback):
+            for done in range(1, 5):
+                progress_callback(done, 4)
+            return {'download_url': 'https://s3/archive.zip', 'document_count': 4}
+
+        job = self.manager.start('user-1', create_archive)
+        self._wait()
+
+        status = self.manager.get(job.job_id, 'user-1').to_dict()
+        self.assertEqual(status['status'], COMPLETED)
+        self.assertEqual(status['progress'], 100)
+        self.assertEqual(status['result']['download_url'], 'https://s3/archive.zip')
+
+    def test_failed_job(self):
+        """Test that errors and error results mark the job failed"""
+        def raise_error(user_id, progress_callback):
+            raise RuntimeError("S3 unavailable")
+
+        failing = self.manager.start('user-1', raise_error)
+        self._wait()
+        empty = self.manager.start('user-2', lambda user_id, progress_callback: {'error': 'No documents found'})
+        self._wait()
+
+        self.assertEqual(failing.status, FAILED)
+        self.assertIn('S3 unavailable', failing.error)
+        self.assertEqual(empty.status, FAILED)
+        self.assertEqual(empty.error, 'No documents found')
+
+    def test_running_job_is_reused(self):
+        """Test that a second request while building returns the same job"""
+        release = threading.Event()
+
+        def create_archive(user_id, progress_callback):
+            release.wait(timeout=5)
+            return {'document_count': 1}
+
+        first = self.manager.start('user-1', create_archive)
+        second = self.manager.start('user-1', create_archive)
+        release.set()
+        self._wait()
+
+        self.assertIs(first, second)
+
+    def test_job_is_private_to_its_user(self):
+        """Test that other users cannot read a job"""
+        job = self.manager.start('user-1', lambda user_id, progress_callback: {'document_count': 1})
+        self._wait()
+
+        self.assertIsNone(self.manager.get(job.job_id, 'user-2'))
+        self.assertIsNone(self.manager.get('unknown', 'user-1'))
+
+    def test_finished_jobs_expire(self):
+        """Test that finished jobs are forgotten after the TTL"""
+        self.manager.ttl_seconds = 0
+        job = self.manager.start('user-1', lambda user_id, progress_callback: {'document_count': 1})
+        self._wait()
+        job.finished_at -= timedelta(seconds=1)
+
+        self.assertIsNone(self.manager.get(job.job_id, 'user-1'))
+
+
+class TestSharedArchiveJobs(unittest.TestCase):
+    """Test that jobs can be polled on any instance"""
+
+    def setUp(self):
+        self.bucket = SharedBucketStandIn()
+        self.instance_a = DocumentArchiveJobManager(max_workers=1, store=S3ArchiveJobStore(self.bucket, 'bucket'))
+        self.instance_b = DocumentArchiveJobManager(max_workers=1, store=S3ArchiveJobStore(self.bucket, 'bucket'))
+
+    def tearDown(self):
+        self.instance_a._executor.shutdown(wait=True)
+        self.instance_b._executor.shutdown(wait=True)
+
+    def test_poll_on_other_instance(self):
+        """Test that progress and the result are visible on an instance that did not start the job"""
+        release = threading.Event()
+        started = threading.Event()
+
+        def create_archive(user_id, progress_callback):
+            started.set()
+            release.wait(timeout=5)
+            progress_callback(2, 2)
+            return {'download_url': 'https://s3/archive.zip', 'document_count': 2}
+
+        job = self.instance_a.start('user-1', create_archive)
+        started.wait(timeout=5)
+
+        self.assertEqual(self.instance_b.get(job.job_id, 'user-1').status, RUNNING)
+        self.assertIsNone(self.instance_b.get(job.job_id, 'user-2'))
+
+        release.set()
+        self.instance_a._executor.submit(lambda: None).result(timeout=5)
+
+        status = self.instance_b.get(job.job_id, 'user-1').to_dict()
+        self.assertEqual(status['status'], COMPLETED)
+        self.assertEqual(status['progress'], 100)
+        self.assertEqual(status['result']['download_url'], 'https://s3/archive.zip')
+
+    def test_unknown_and_malformed_job_ids(self):
+        """Test that unknown IDs and IDs that are not job IDs are not found"""
+        self.assertIsNone(self.instance_b.get('00000000-0000-0000-0000-000000000000', 'user-1'))
+        self.assertIsNone(self.instance_b.get('../../other-user/archive', 'user-1'))
+
+    def test_stale_job_is_reported_failed(self):
+        """Test that a build whose instance went away is not reported as running forever"""
+        job = ArchiveJob(
+            job_id=str(uuid.uuid4()), user_id='user-1', status=RUNNING,
+            updated_at=datetime.utcnow() - timedelta(days=1)
+        )
+        self.instance_a.store.save(job)
+
+        status = self.instance_b.get(job.job_id, 'user-1')
+
+        self.assertEqual(status.status, FAILED)
+        self.assertIn('interrupted', status.error)
+
+
+if __name__ == '__main__':
+    unittest.main()
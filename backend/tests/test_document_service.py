@@ -204,6 +204,111 @@ class TestCreateDocumentsZip:
         assert result['document_count'] == 0
 
 
+    @patch('services.document_service.time.sleep')
+    @patch('services.document_service.s3_client')
+    @patch('services.document_service.execute_query')
+    def test_create_zip_parallel_fetch_keeps_order(self, mock_execute_query, mock_s3_client, mock_sleep, document_service, mock_user_id, mock_documents):
+        """Test that concurrently fetched documents keep their order, with retries and progress"""
+        documents = [
+            dict(mock_documents[0], id=f'doc-{i}', file_name=f'doc_{i}.pdf', s3_key=f'documents/doc-{i}.pdf')
+            for i in range(6)
+        ]
+        mock_execute_query.return_value = documents
+        throttled = set()
+
+        def get_object(Bucket, Key):
+            # First request for doc-2 is throttled
+            if Key == 'documents/doc-2.pdf' and Key not in throttled:
+                throttled.add(Key)
+                raise ClientError({'Error': {'Code': 'SlowDown', 'Message': 'Slow down'}}, 'GetObject')
+            return {'Body': io.BytesIO(Key.encode())}
+
+        mock_s3_client.get_object.side_effect = get_object
+        mock_s3_client.generate_presigned_url.return_value = 'https://s3.aws.com/download-url'
+        progress = []
+
+        result = document_service.create_documents_zip(
+            mock_user_id, progress_callback=lambda done, total: progress.append((done, total))
+        )
+
+        assert 'download_url' in result
+        archive = zipfile.ZipFile(io.BytesIO(mock_s3_client.put_object.call_args.kwargs['Body']))
+        assert archive.namelist() == [f'2024/lohnausweis/doc_{i}.pdf' for i in range(6)]
+        assert archive.read('2024/lohnausweis/doc_2.pdf') == b'documents/doc-2.pdf'
+        assert progress[-1] == (6, 6)
+        assert mock_s3_client.get_object.call_count == 7
+
+    @patch('services.document_service.time.sleep')
+    @patch('services.document_service.s3_client')
+    @patch('services.document_service.execute_query')
+    def test_create_zip_retries_failed_body_reads(self, mock_execute_query, mock_s3_client, mock_sleep, document_service, mock_user_id, mock_documents):
+        """Test that a body failing partway is downloaded again, and a document that keeps failing is left out"""
+        mock_execute_query.return_value = mock_documents
+        first_key, second_key = mock_documents[0]['s3_key'], mock_documents[1]['s3_key']
+        attempts = {first_key: 0, second_key: 0}
+
+        class FailingBody(io.BytesIO):
+            def read(self, size=-1):
+                super().read(3)
+                raise ConnectionResetError('connection reset by peer')
+
+        def get_object(Bucket, Key):
+            attempts[Key] += 1
+            if Key == second_key or attempts[Key] == 1:
+                return {'Body': FailingBody(b'PDF content')}
+            return {'Body': io.BytesIO(b'PDF content 1')}
+
+        mock_s3_client.get_object.side_effect = get_object
+        mock_s3_client.generate_presigned_url.return_value = 'https://s3.aws.com/download-url'
+
+        result = document_service.create_documents_zip(mock_user_id)
+
+        assert 'download_url' in result
+        archive = zipfile.ZipFile(io.BytesIO(mock_s3_client.put_object.call_args.kwargs['Body']))
+        assert [archive.read(name) for name in archive.namelist()] == [b'PDF content 1']
+        assert attempts == {first_key: 2, second_key: 4}
+
+    @patch('services.document_service.time.sleep')
+    @patch('services.document_service.ARCHIVE_BUFFER_MAX_BYTES', 1000)
+    @patch('services.document_service.s3_client')
+    @patch('services.document_service.execute_query')
+    def test_create_zip_streams_large_documents(self, mock_execute_query, mock_s3_client, mock_sleep, document_service, mock_user_id, mock_documents):
+        """Test that documents over the buffer cap are streamed, resuming after a failed read"""
+        mock_execute_query.return_value = mock_documents[:1]
+        content = bytes(range(256)) * 1000
+        requests = []
+
+        class Body(io.BytesIO):
+            def __init__(self, data, fail_after=None):
+                super().__init__(data)
+                self.fail_after = fail_after
+
+            def read(self, size=-1):
+                assert size > 0, 'body read whole'
+                if self.fail_after is not None and self.tell() >= self.fail_after:
+                    raise ConnectionResetError('connection reset by peer')
+                return super().read(size)
+
+        def get_object(Bucket, Key, Range=None):
+            requests.append(Range)
+            if Range is None and len(requests) == 1:
+                return {'Body': Body(content), 'ContentLength': len(content)}  # Size check only
+            if Range is None:
+                return {'Body': Body(content, fail_after=64 * 1024), 'ContentLength': len(content)}
+            offset = int(Range[len('bytes='):-1])
+            return {'Body': Body(content[offset:]), 'ContentLength': len(content) - offset}
+
+        mock_s3_client.get_object.side_effect = get_object
+        mock_s3_client.generate_presigned_url.return_value = 'https://s3.aws.com/download-url'
+
+        result = document_service.create_documents_zip(mock_user_id)
+
+        assert 'download_url' in result
+        archive = zipfile.ZipFile(io.BytesIO(mock_s3_client.put_object.call_args.kwargs['Body']))
+        assert archive.read(archive.namelist()[0]) == content
+        assert requests == [None, None, f'bytes={64 * 1024}-']
+
+
 class TestDeleteOldDocuments:
     """Tests for delete_old_documents method"""
 
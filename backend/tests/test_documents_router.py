@@ -144,6 +144,39 @@ class TestDownloadAllDocuments:
         assert response.status_code == 500
 
 
+class TestDownloadAllDocumentsJob:
+    """Tests for the background document archive job endpoints"""
+
+    def test_start_and_poll_job(self, authenticated_client, mock_current_user, mock_doc_service):
+        """Test that a started job can be polled by its owner"""
+        job = Mock()
+        job.to_dict.return_value = {'job_id': 'job-1', 'status': 'pending', 'progress': 0}
+
+        with patch('routers.documents.get_archive_job_manager') as mock_manager:
+            mock_manager.return_value.start.return_value = job
+            mock_manager.return_value.get.return_value = job
+
+            response = authenticated_client.post('/api/documents/user/download-all/jobs')
+            assert response.status_code == 202
+            assert response.json()['job_id'] == 'job-1'
+            mock_manager.return_value.start.assert_called_once_with(
+                str(mock_current_user.id), mock_doc_service.create_documents_zip
+            )
+
+            response = authenticated_client.get('/api/documents/user/download-all/jobs/job-1')
+            assert response.status_code == 200
+            mock_manager.return_value.get.assert_called_once_with('job-1', str(mock_current_user.id))
+
+    def test_poll_unknown_job(self, authenticated_client, mock_current_user):
+        """Test polling a job that does not exist"""
+        with patch('routers.documents.get_archive_job_manager') as mock_manager:
+            mock_manager.return_value.get.return_value = None
+
+            response = authenticated_client.get('/api/documents/user/download-all/jobs/unknown')
+
+            assert response.status_code == 404
+
+
 class TestDeleteOldDocuments:
     """Tests for DELETE /api/documents/user/old endpoint"""
 
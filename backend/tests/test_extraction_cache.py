@@ -0,0 +1,167 @@
+"""
+Unit Tests for Extraction Cache
+
+Tests the encrypted OCR/AI result cache:
+- Keys depend on content, stage, model and template version
+- Values are encrypted at rest and survive a round trip
+- Unreadable entries and disabled backends behave as misses
+- AIDocumentIntelligenceService skips AI calls for known documents
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from cryptography.fernet import Fernet
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.extraction_cache import (ExtractionCache, content_hash,
+                                       extraction_cache_key)
+from services.pdf_generators.pdf_cache import (LocalPDFCacheBackend,
+                                               NullPDFCacheBackend)
+from utils.encryption import EncryptionService
+
+
+class TestExtractionCache(unittest.TestCase):
+    """Test suite for ExtractionCache"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.encryption = EncryptionService(key=Fernet.generate_key().decode())
+        self.cache = ExtractionCache(LocalPDFCacheBackend(self.tmp_dir.name), self.encryption)
+        self.document_hash = content_hash(b'%PDF-1.4 Lohnausweis')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_key_depends_on_all_inputs(self):
+        """Test that content, stage, model and template version change the key"""
+        base = extraction_cache_key(self.document_hash, 'ocr', 'textract')
+        variants = {
+            extraction_cache_key(content_hash(b'other'), 'ocr', 'textract'),
+            extraction_cache_key(self.document_hash, 'classification', 'textract'),
+            extraction_cache_key(self.document_hash, 'ocr', 'other-model'),
+            extraction_cache_key(self.document_hash, 'ocr', 'textract', ['gross_salary']),
+        }
+
+        self.assertEqual(base, extraction_cache_key(self.document_hash, 'ocr', 'textract'))
+        self.assertNotIn(base, variants)
+        self.assertEqual(len(variants), 4)
+
+    def test_round_trip_is_encrypted_at_rest(self):
+        """Test that values come back intact and are not stored in plain text"""
+        key = extraction_cache_key(self.document_hash, 'extraction:lohnausweis', 'model')
+        value = {'employee_ssn': '756.1234.5678.97', 'gross_salary': 85000.0}
+
+        self.cache.put(key, value)
+
+        self.assertEqual(self.cache.get(key), value)
+        stored = Path(self.tmp_dir.name, f'{key}.bin').read_bytes()
+        self.assertNotIn(b'756.1234.5678.97', stored)
+
+    def test_entry_from_other_key_is_a_miss(self):
+        """Test that entries encrypted with another key are ignored"""
+        key = extraction_cache_key(self.document_hash, 'ocr', 'textract')
+        self.cache.put(key, 'Lohnausweis 2024')
+
+        rotated = ExtractionCache(
+            LocalPDFCacheBackend(self.tmp_dir.name),
+            EncryptionService(key=Fernet.generate_key().decode())
+        )
+
+        self.assertIsNone(rotated.get(key))
+
+    def test_disabled_cache(self):
+        """Test that the null backend never hits"""
+        cache = ExtractionCache(NullPDFCacheBackend(), self.encryption)
+        key = extraction_cache_key(self.document_hash, 'ocr', 'textract')
+
+        cache.put(key, 'text')
+
+        self.assertIsNone(cache.get(key))
+
+
+class TestDocumentIntelligenceCaching(unittest.TestCase):
+    """Test that analyze_document reuses cached results"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ExtractionCache(
+            LocalPDFCacheBackend(self.tmp_dir.name),
+            EncryptionService(key=Fernet.generate_key().decode())
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @patch('services.ai_document_intelligence_service.anthropic')
+    def test_second_analysis_skips_ai_calls(self, mock_anthropic_module):
+        """Test that the same document is classified and extracted once"""
+        from services.ai_document_intelligence_service import \
+            AIDocumentIntelligenceService
+
+        client = mock_anthropic_module.Anthropic.return_value
+        classification = MagicMock()
+        classification.content = [MagicMock(text='lohnausweis')]
+        extraction = MagicMock()
+        extraction.content = [MagicMock(text='{"gross_salary": 85000, "_confidence": 0.9}')]
+        client.messages.create.side_effect = [classification, extraction]
+
+        service = AIDocumentIntelligenceService(api_key='test-key', result_cache=self.cache)
+        first = service.analyze_document(image_bytes=b'fake image')
+        second = service.analyze_document(image_bytes=b'fake image')
+
+        self.assertEqual(client.messages.create.call_count, 2)
+        self.assertEqual(second['document_type'], 'lohnausweis')
+        self.assertEqual(second['extracted_data'], first['extracted_data'])
+
+    @patch('services.ai_document_intelligence_service.anthropic')
+    def test_unknown_classification_is_not_cached(self, mock_anthropic_module):
+        """Test that a document classified as unknown is classified again on re-upload"""
+        from services.ai_document_intelligence_service import (
+            AIDocumentIntelligenceService, UnsupportedDocumentError)
+
+        client = mock_anthropic_module.Anthropic.return_value
+        unknown = MagicMock()
+        unknown.content = [MagicMock(text='unknown')]
+        classification = MagicMock()
+        classification.content = [MagicMock(text='lohnausweis')]
+        extraction = MagicMock()
+        extraction.content = [MagicMock(text='{"gross_salary": 85000, "_confidence": 0.9}')]
+        client.messages.create.side_effect = [unknown, classification, extraction]
+
+        service = AIDocumentIntelligenceService(api_key='test-key', result_cache=self.cache)
+        with self.assertRaises(UnsupportedDocumentError):
+            service.analyze_document(image_bytes=b'fake image')
+        result = service.analyze_document(image_bytes=b'fake image')
+
+        self.assertEqual(result['document_type'], 'lohnausweis')
+
+    @patch('services.ai_document_intelligence_service.anthropic')
+    def test_verified_extraction_is_cached_apart(self, mock_anthropic_module):
+        """Test that a hinted extraction does not reuse a plain extraction of the hinted type"""
+        from services.ai_document_intelligence_service import \
+            AIDocumentIntelligenceService
+
+        client = mock_anthropic_module.Anthropic.return_value
+        plain = MagicMock()
+        plain.content = [MagicMock(text='{"annual_pension": 0, "_confidence": 0.2}')]
+        verified = MagicMock()
+        verified.content = [MagicMock(text='{"gross_salary": 85000, "_document_type": "lohnausweis"}')]
+        extraction = MagicMock()
+        extraction.content = [MagicMock(text='{"gross_salary": 85000, "_confidence": 0.9}')]
+        client.messages.create.side_effect = [plain, verified, extraction]
+
+        service = AIDocumentIntelligenceService(api_key='test-key', result_cache=self.cache)
+        service.analyze_document(image_bytes=b'fake image', document_type='ahv_statement')
+        result = service.analyze_document(image_bytes=b'fake image', type_hint='ahv_statement')
+
+        self.assertEqual(client.messages.create.call_count, 3)
+        self.assertEqual(result['document_type'], 'lohnausweis')
+
+
+if __name__ == '__main__':
+    unittest.main()
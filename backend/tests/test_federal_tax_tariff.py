@@ -0,0 +1,91 @@
+"""
+Unit Tests for Federal Tax Tariff
+
+Tests the data-driven direct federal tax schedules:
+- Scalar lookups at and around bracket thresholds
+- Single vs married tariffs
+- Vectorized batch evaluation
+- Tax year resolution and instance sharing
+"""
+
+import sys
+import unittest
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.federal_tax_tariff import (FEDERAL_TAX_SCHEDULES,
+                                         get_federal_tax_tariff)
+
+
+class TestFederalTaxTariff(unittest.TestCase):
+    """Test suite for FederalTaxTariff"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tariff = get_federal_tax_tariff(2024)
+
+    def test_tax_free_up_to_first_threshold(self):
+        """Test that income up to the first threshold is tax-free"""
+        self.assertEqual(self.tariff.calculate(Decimal('0'), 'single'), Decimal('0'))
+        self.assertEqual(self.tariff.calculate(Decimal('-500'), 'single'), Decimal('0'))
+        self.assertEqual(self.tariff.calculate(Decimal('17800'), 'single'), Decimal('0'))
+        self.assertEqual(self.tariff.calculate(Decimal('30800'), 'married'), Decimal('0'))
+
+    def test_single_brackets(self):
+        """Test single tariff inside and at the edges of brackets"""
+        self.assertEqual(self.tariff.calculate(Decimal('31600'), 'single'), Decimal('138'))
+        self.assertEqual(self.tariff.calculate(Decimal('100000'), 'single'), Decimal('3034'))
+        self.assertEqual(self.tariff.calculate(Decimal('755200'), 'single'), Decimal('72444'))
+        self.assertEqual(self.tariff.calculate(Decimal('800000'), 'single'), Decimal('78268'))
+
+    def test_married_brackets(self):
+        """Test married tariff inside and at the edges of brackets"""
+        self.assertEqual(self.tariff.calculate(Decimal('50900'), 'married'), Decimal('201'))
+        self.assertEqual(self.tariff.calculate(Decimal('100000'), 'married'), Decimal('1943'))
+        self.assertEqual(self.tariff.calculate(Decimal('1000000'), 'married'), Decimal('114975.5'))
+
+    def test_other_statuses_use_single_tariff(self):
+        """Test that non-married statuses use the single tariff"""
+        income = Decimal('90000')
+        single_tax = self.tariff.calculate(income, 'single')
+
+        self.assertEqual(self.tariff.calculate(income, 'divorced'), single_tax)
+        self.assertEqual(self.tariff.calculate(income, 'widowed'), single_tax)
+
+    def test_calculate_many_matches_scalar(self):
+        """Test that batch evaluation agrees with scalar lookups to the cent"""
+        incomes = [Decimal(value) for value in ['0', '17800', '25000.55', '100000', '176000.01', '1000000']]
+        statuses = ['single', 'married', 'single', 'married', 'single', 'married']
+
+        batch = self.tariff.calculate_many(incomes, statuses)
+        expected = [
+            self.tariff.calculate(income, status).quantize(Decimal('0.01'))
+            for income, status in zip(incomes, statuses)
+        ]
+        self.assertEqual(batch, expected)
+
+    def test_calculate_many_mismatched_lengths(self):
+        """Test that per-row statuses must match the number of incomes"""
+        with self.assertRaises(ValueError):
+            self.tariff.calculate_many([Decimal('50000')], ['single', 'married'])
+
+    def test_tariff_is_shared_per_year(self):
+        """Test that the compiled tariff is built once per tax year"""
+        self.assertIs(get_federal_tax_tariff(2024), self.tariff)
+
+    def test_unknown_year_uses_latest_earlier_schedule(self):
+        """Test fallback to the most recent earlier schedule"""
+        latest_year = max(FEDERAL_TAX_SCHEDULES)
+        tariff = get_federal_tax_tariff(latest_year + 1)
+
+        self.assertEqual(tariff.tax_year, latest_year + 1)
+        self.assertEqual(
+            tariff.calculate(Decimal('100000'), 'single'),
+            get_federal_tax_tariff(latest_year).calculate(Decimal('100000'), 'single')
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Unit Tests for Form Template Cache
+
+Tests the parsed canton form cache used by TraditionalPDFFiller:
+- Field -> page index
+- Template reuse, reload on file change and LRU eviction
+- Filling fields on every page in one pass
+"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.pdf_generators import form_template_cache
+from services.pdf_generators.form_template_cache import FormTemplateCache
+from services.pdf_generators.traditional_pdf_filler import TraditionalPDFFiller
+
+
+def _write_form(path, pages):
+    """Write a PDF with one text field per name on each page"""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer)
+    for field_names in pages:
+        for offset, name in enumerate(field_names):
+            c.acroForm.textfield(name=name, x=50, y=700 - offset * 40, width=200, height=20)
+        c.showPage()
+    c.save()
+    with open(path, 'wb') as f:
+        f.write(buffer.getvalue())
+
+
+class TestFormTemplateCache(unittest.TestCase):
+    """Test suite for FormTemplateCache"""
+
+    def setUp(self):
+        """Create a temporary forms directory"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / 'ZH_2024_de.pdf'
+        _write_form(self.path, [['name', 'vorname'], ['einkommen_betrag']])
+        self.cache = FormTemplateCache(max_size=2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_field_page_index(self):
+        """Test that fields are indexed by the pages they appear on"""
+        template = self.cache.get(self.path)
+
+        self.assertTrue(template.has_fields)
+        self.assertEqual(template.field_pages, {'name': (0,), 'vorname': (0,), 'einkommen_betrag': (1,)})
+
+    def test_group_by_page(self):
+        """Test that values are split per page and unknown fields reported"""
+        template = self.cache.get(self.path)
+
+        by_page, unknown = template.group_by_page({'name': 'Muster', 'einkommen_betrag': '1', 'other': 'x'})
+
+        self.assertEqual(by_page, {0: {'name': 'Muster'}, 1: {'einkommen_betrag': '1'}})
+        self.assertEqual(unknown, ['other'])
+
+    def test_template_is_reused(self):
+        """Test that a template is parsed once"""
+        with patch.object(form_template_cache, 'PdfReader', wraps=form_template_cache.PdfReader) as reader:
+            first = self.cache.get(self.path)
+            second = self.cache.get(self.path)
+
+        self.assertIs(first, second)
+        self.assertEqual(reader.call_count, 1)
+
+    def test_reload_when_file_changes(self):
+        """Test that a replaced form file is parsed again"""
+        first = self.cache.get(self.path)
+        _write_form(self.path, [['name']])
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        second = self.cache.get(self.path)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(second.field_pages, {'name': (0,)})
+
+    def test_lru_eviction(self):
+        """Test that the least recently used template is evicted"""
+        paths = []
+        for language in ('fr', 'it'):
+            path = Path(self.tmp_dir.name) / f'ZH_2024_{language}.pdf'
+            _write_form(path, [['name']])
+            paths.append(path)
+
+        first = self.cache.get(self.path)
+        self.cache.get(paths[0])
+        self.cache.get(self.path)
+        self.cache.get(paths[1])
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIs(self.cache.get(self.path), first)
+
+    def test_missing_file(self):
+        """Test that a missing template raises FileNotFoundError"""
+        with self.assertRaises(FileNotFoundError):
+            self.cache.get(Path(self.tmp_dir.name) / 'missing.pdf')
+
+
+class TestTraditionalPDFFillerFill(unittest.TestCase):
+    """Test filling forms through the template cache"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / 'ZH_2024_de.pdf'
+        _write_form(self.path, [['name'], ['einkommen_betrag']])
+        self.filler = TraditionalPDFFiller(forms_dir=self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_fills_fields_on_all_pages(self):
+        """Test that fields beyond the first page are filled"""
+        pdf = self.filler._fill_pdf_fields(self.path, {'name': 'Muster', 'einkommen_betrag': 85000}, 'ZH')
+
+        fields = PdfReader(pdf).get_fields()
+        self.assertEqual(fields['name'].get('/V'), 'Muster')
+        self.assertEqual(fields['einkommen_betrag'].get('/V'), "85'000.00")
+
+    def test_repeated_fills_do_not_share_values(self):
+        """Test that each fill starts from the pristine template"""
+        self.filler._fill_pdf_fields(self.path, {'name': 'First'}, 'ZH')
+        pdf = self.filler._fill_pdf_fields(self.path, {'einkommen_betrag': 1}, 'ZH')
+
+        fields = PdfReader(pdf).get_fields()
+        self.assertNotEqual(fields['name'].get('/V'), 'First')
+
+
+if __name__ == '__main__':
+    unittest.main()
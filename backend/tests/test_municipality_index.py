@@ -0,0 +1,171 @@
+"""
+Unit Tests for Municipality Index
+
+Tests the in-process municipality multiplier index:
+- Name normalization (accents, case, whitespace)
+- Lookup by id and by exact or normalized name
+- Loading, sharing and fingerprint-based reloading per tax year
+- Behaviour when the database is unavailable
+"""
+
+import sys
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services import municipality_index
+from services.municipality_index import (Municipality, MunicipalityIndex,
+                                         get_municipality_index,
+                                         invalidate_municipality_index,
+                                         normalize_municipality_name)
+
+ROWS = [
+    {'id': 261, 'canton': 'ZH', 'name': 'Zürich', 'tax_multiplier': Decimal('1.1900'), 'tax_year': 2024},
+    {'id': 230, 'canton': 'ZH', 'name': 'Winterthur', 'tax_multiplier': Decimal('1.2200'), 'tax_year': 2024},
+    {'id': 6621, 'canton': 'GE', 'name': 'Genève', 'tax_multiplier': Decimal('0.4549'), 'tax_year': 2024},
+]
+
+VERSION = {'row_count': 3, 'last_updated': datetime(2024, 1, 1), 'multiplier_checksum': Decimal('2.8649')}
+
+
+class TestNormalizeMunicipalityName(unittest.TestCase):
+    """Test suite for normalize_municipality_name"""
+
+    def test_strips_accents_and_case(self):
+        """Test that accents and case are ignored"""
+        self.assertEqual(normalize_municipality_name('Zürich'), 'zurich')
+        self.assertEqual(normalize_municipality_name('GENÈVE'), 'geneve')
+
+    def test_collapses_whitespace(self):
+        """Test that surrounding and repeated whitespace is removed"""
+        self.assertEqual(normalize_municipality_name('  St.   Gallen '), 'st. gallen')
+
+
+class TestMunicipalityIndex(unittest.TestCase):
+    """Test suite for MunicipalityIndex lookups"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.index = MunicipalityIndex(2024, [
+            Municipality(261, 'ZH', 'Zürich', Decimal('1.19'), 2024),
+            Municipality(6621, 'GE', 'Genève', Decimal('0.4549'), 2024),
+            Municipality(9999, 'GE', 'Geneve', Decimal('0.50'), 2024),
+        ])
+
+    def test_find_exact_name(self):
+        """Test that the exact spelling wins over a normalized match"""
+        self.assertEqual(self.index.find('GE', 'Geneve').id, 9999)
+        self.assertEqual(self.index.find('GE', 'Genève').id, 6621)
+
+    def test_find_normalized_name(self):
+        """Test accent- and case-insensitive lookups"""
+        self.assertEqual(self.index.find('ZH', 'zurich').id, 261)
+        self.assertEqual(self.index.find('zh', 'ZÜRICH').id, 261)
+
+    def test_find_respects_canton(self):
+        """Test that names only match within their canton"""
+        self.assertIsNone(self.index.find('BE', 'Zürich'))
+
+    def test_find_unknown(self):
+        """Test that unknown or empty names return None"""
+        self.assertIsNone(self.index.find('ZH', 'Atlantis'))
+        self.assertIsNone(self.index.find('ZH', ''))
+        self.assertIsNone(self.index.find('ZH', None))
+
+    def test_get_by_id(self):
+        """Test lookup by id with optional canton check"""
+        self.assertEqual(self.index.get_by_id(261).name, 'Zürich')
+        self.assertEqual(self.index.get_by_id(261, 'zh').name, 'Zürich')
+        self.assertIsNone(self.index.get_by_id(261, 'GE'))
+        self.assertIsNone(self.index.get_by_id(1))
+
+    def test_get_multiplier(self):
+        """Test multiplier lookup by name"""
+        self.assertEqual(self.index.get_multiplier('ZH', 'Zurich'), Decimal('1.19'))
+        self.assertIsNone(self.index.get_multiplier('ZH', 'Atlantis'))
+
+    def test_to_dict(self):
+        """Test that rows convert to the dictionary shape of the database row"""
+        self.assertEqual(
+            self.index.get_by_id(261).to_dict(),
+            {'id': 261, 'canton': 'ZH', 'name': 'Zürich', 'tax_multiplier': Decimal('1.19'), 'tax_year': 2024}
+        )
+
+
+@patch('services.municipality_index.execute_query')
+@patch('services.municipality_index.execute_one')
+class TestGetMunicipalityIndex(unittest.TestCase):
+    """Test suite for the shared per-year index registry"""
+
+    def setUp(self):
+        invalidate_municipality_index()
+
+    def tearDown(self):
+        invalidate_municipality_index()
+
+    def test_loads_once_and_shares_instance(self, mock_execute_one, mock_execute_query):
+        """Test that the index is loaded once and shared"""
+        mock_execute_one.return_value = VERSION
+        mock_execute_query.return_value = ROWS
+
+        index = get_municipality_index(2024)
+
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.get_multiplier('GE', 'Geneve'), Decimal('0.4549'))
+        self.assertIs(get_municipality_index(2024), index)
+        mock_execute_query.assert_called_once()
+
+    def test_reloads_when_table_changes(self, mock_execute_one, mock_execute_query):
+        """Test that a changed fingerprint triggers a reload after the check interval"""
+        mock_execute_one.return_value = VERSION
+        mock_execute_query.return_value = ROWS
+        first = get_municipality_index(2024)
+
+        mock_execute_one.return_value = dict(VERSION, multiplier_checksum=Decimal('2.9000'))
+        mock_execute_query.return_value = [dict(ROWS[0], tax_multiplier=Decimal('1.2500'))]
+        with patch.object(municipality_index.time, 'monotonic',
+                          return_value=municipality_index.time.monotonic() + 3600):
+            second = get_municipality_index(2024)
+
+        self.assertIsNot(second, first)
+        self.assertEqual(second.get_multiplier('ZH', 'Zürich'), Decimal('1.25'))
+
+    def test_keeps_index_when_table_unchanged(self, mock_execute_one, mock_execute_query):
+        """Test that an unchanged fingerprint keeps the loaded snapshot"""
+        mock_execute_one.return_value = VERSION
+        mock_execute_query.return_value = ROWS
+        first = get_municipality_index(2024)
+
+        with patch.object(municipality_index.time, 'monotonic',
+                          return_value=municipality_index.time.monotonic() + 3600):
+            second = get_municipality_index(2024)
+
+        self.assertIs(second, first)
+        mock_execute_query.assert_called_once()
+
+    def test_database_unavailable(self, mock_execute_one, mock_execute_query):
+        """Test that a failed load returns None without retrying on every call"""
+        mock_execute_one.side_effect = Exception("connection refused")
+
+        self.assertIsNone(get_municipality_index(2024))
+        self.assertIsNone(get_municipality_index(2024))
+        mock_execute_one.assert_called_once()
+
+    def test_invalidate_forces_reload(self, mock_execute_one, mock_execute_query):
+        """Test that invalidation drops the cached snapshot"""
+        mock_execute_one.return_value = VERSION
+        mock_execute_query.return_value = ROWS
+        first = get_municipality_index(2024)
+
+        invalidate_municipality_index(2024)
+
+        self.assertIsNot(get_municipality_index(2024), first)
+        self.assertEqual(mock_execute_query.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+"""
+Unit Tests for PDF Cache
+
+Tests the content-addressed cache for generated PDFs:
+- Cache keys change when the filing, language or template change
+- Local disk backend with TTL and LRU eviction
+- S3 backend
+- Get-or-create and tolerance of backend errors
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.pdf_generators.pdf_cache import (LocalPDFCacheBackend, PDFCache,
+                                               S3PDFCacheBackend,
+                                               bundle_cache_key, pdf_cache_key)
+
+FILING_DATA = {
+    'id': 'filing-123',
+    'user_id': 'user-456',
+    'tax_year': 2024,
+    'canton': 'ZH',
+    'is_primary': True,
+    'profile': {'income_employment': 85000},
+    'updated_at': '2025-03-01T10:00:00',
+    'completion_percentage': 100
+}
+
+
+class TestPDFCacheKey(unittest.TestCase):
+    """Test cache key derivation"""
+
+    def test_key_is_stable(self):
+        """Test that the same inputs give the same key"""
+        first = pdf_cache_key(dict(FILING_DATA), 'ech0196', 'de', '1', (2024, 10))
+        second = pdf_cache_key(dict(FILING_DATA), 'ech0196', 'de', '1', (2024, 10))
+
+        self.assertEqual(first, second)
+        self.assertRegex(first, r'^[0-9a-f]{64}$')
+
+    def test_key_changes_with_inputs(self):
+        """Test that edits, language, template and calculation data change the key"""
+        base = pdf_cache_key(FILING_DATA, 'ech0196', 'de', '1', (2024, 10))
+        edited = dict(FILING_DATA, profile={'income_employment': 90000})
+
+        variants = [
+            pdf_cache_key(edited, 'ech0196', 'de', '1', (2024, 10)),
+            pdf_cache_key(dict(FILING_DATA, updated_at='2025-03-02T10:00:00'), 'ech0196', 'de', '1', (2024, 10)),
+            pdf_cache_key(FILING_DATA, 'traditional', 'de', '1', (2024, 10)),
+            pdf_cache_key(FILING_DATA, 'ech0196', 'fr', '1', (2024, 10)),
+            pdf_cache_key(FILING_DATA, 'ech0196', 'de', '2', (2024, 10)),
+            pdf_cache_key(FILING_DATA, 'ech0196', 'de', '1', (2024, 11)),
+        ]
+
+        self.assertNotIn(base, variants)
+        self.assertEqual(len(set(variants)), len(variants))
+
+    def test_key_ignores_unrelated_fields(self):
+        """Test that fields not rendered into the PDF do not change the key"""
+        changed = dict(FILING_DATA, completion_percentage=50)
+
+        self.assertEqual(
+            pdf_cache_key(FILING_DATA, 'ech0196', 'de'),
+            pdf_cache_key(changed, 'ech0196', 'de')
+        )
+
+    def test_bundle_key_depends_on_members(self):
+        """Test that a bundle key changes with any member key"""
+        a = pdf_cache_key(FILING_DATA, 'ech0196', 'de')
+        b = pdf_cache_key(FILING_DATA, 'traditional', 'de')
+
+        self.assertEqual(bundle_cache_key('download-both', [a, b]), bundle_cache_key('download-both', [a, b]))
+        self.assertNotEqual(bundle_cache_key('download-both', [a, b]), bundle_cache_key('download-both', [a, a]))
+
+
+class TestLocalPDFCacheBackend(unittest.TestCase):
+    """Test the local disk backend"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_put_and_get(self):
+        """Test that stored bytes are returned"""
+        backend = LocalPDFCacheBackend(self.tmp_dir.name, max_bytes=1024, ttl_seconds=60)
+        backend.put('a' * 64, b'%PDF-1.4')
+
+        self.assertEqual(backend.get('a' * 64), b'%PDF-1.4')
+        self.assertIsNone(backend.get('b' * 64))
+
+    def test_expired_entry_is_ignored(self):
+        """Test that entries older than the TTL are dropped"""
+        backend = LocalPDFCacheBackend(self.tmp_dir.name, max_bytes=1024, ttl_seconds=60)
+        backend.put('a' * 64, b'%PDF-1.4')
+        old = time.time() - 120
+        os.utime(backend._path('a' * 64), (old, old))
+
+        self.assertIsNone(backend.get('a' * 64))
+        self.assertFalse(backend._path('a' * 64).exists())
+
+    def test_lru_eviction(self):
+        """Test that the least recently read entries are evicted above max_bytes"""
+        backend = LocalPDFCacheBackend(self.tmp_dir.name, max_bytes=250, ttl_seconds=3600)
+        now = time.time()
+        for offset, key in enumerate(('a', 'b')):
+            backend.put(key * 64, b'x' * 100)
+            os.utime(backend._path(key * 64), (now - 100 + offset, now))
+
+        # Reading 'a' makes 'b' the least recently used entry
+        backend.get('a' * 64)
+        backend.put('c' * 64, b'x' * 100)
+
+        self.assertIsNotNone(backend.get('a' * 64))
+        self.assertIsNone(backend.get('b' * 64))
+        self.assertIsNotNone(backend.get('c' * 64))
+
+
+class TestS3PDFCacheBackend(unittest.TestCase):
+    """Test the S3 backend"""
+
+    def setUp(self):
+        self.s3_client = MagicMock()
+        self.s3_client.exceptions.NoSuchKey = KeyError
+        self.backend = S3PDFCacheBackend('bucket', prefix='pdf-cache/', ttl_seconds=60, s3_client=self.s3_client)
+
+    def test_put_is_encrypted(self):
+        """Test that objects are written under the prefix with server-side encryption"""
+        self.backend.put('a' * 64, b'%PDF-1.4')
+
+        kwargs = self.s3_client.put_object.call_args.kwargs
+        self.assertEqual(kwargs['Key'], 'pdf-cache/' + 'a' * 64)
+        self.assertEqual(kwargs['ServerSideEncryption'], 'AES256')
+
+    def test_get(self):
+        """Test hits, misses and expired objects"""
+        body = MagicMock()
+        body.read.return_value = b'%PDF-1.4'
+        self.s3_client.get_object.return_value = {
+            'Body': body, 'LastModified': datetime.now(timezone.utc)
+        }
+        self.assertEqual(self.backend.get('a' * 64), b'%PDF-1.4')
+
+        self.s3_client.get_object.return_value = {
+            'Body': body, 'LastModified': datetime.now(timezone.utc) - timedelta(seconds=120)
+        }
+        self.assertIsNone(self.backend.get('a' * 64))
+
+        self.s3_client.get_object.side_effect = KeyError('missing')
+        self.assertIsNone(self.backend.get('a' * 64))
+
+
+class TestPDFCache(unittest.TestCase):
+    """Test get-or-create access"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = PDFCache(LocalPDFCacheBackend(self.tmp_dir.name))
+        self.key = pdf_cache_key(FILING_DATA, 'ech0196', 'de')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_or_create_generates_once(self):
+        """Test that the factory only runs on a miss"""
+        factory = MagicMock(return_value=b'%PDF-1.4')
+
+        self.assertEqual(self.cache.get_or_create(self.key, factory), b'%PDF-1.4')
+        self.assertEqual(self.cache.get_or_create(self.key, factory), b'%PDF-1.4')
+        factory.assert_called_once()
+
+    def test_malformed_key_is_not_cached(self):
+        """Test that keys that are not digests never reach the backend"""
+        factory = MagicMock(return_value=b'%PDF-1.4')
+
+        self.cache.get_or_create('../../etc/passwd', factory)
+        self.cache.get_or_create('../../etc/passwd', factory)
+
+        self.assertEqual(factory.call_count, 2)
+        self.assertEqual(list(Path(self.tmp_dir.name).iterdir()), [])
+
+    def test_backend_errors_do_not_fail(self):
+        """Test that a failing backend falls back to generating"""
+        backend = MagicMock()
+        backend.get.side_effect = ConnectionError('S3 unavailable')
+        backend.put.side_effect = ConnectionError('S3 unavailable')
+        cache = PDFCache(backend)
+
+        self.assertEqual(cache.get_or_create(self.key, lambda: b'%PDF-1.4'), b'%PDF-1.4')
+
+
+if __name__ == '__main__':
+    unittest.main()
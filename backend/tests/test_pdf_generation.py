@@ -268,9 +268,10 @@ class TestTraditionalPDFFiller(unittest.TestCase):
 class TestUnifiedPDFGenerator(unittest.TestCase):
     """Test unified PDF generator"""
 
+    @patch('services.pdf_generators.unified_pdf_generator.load_filing_snapshot')
     @patch('services.pdf_generators.unified_pdf_generator.ECH0196PDFGenerator')
     @patch('services.pdf_generators.unified_pdf_generator.TraditionalPDFFiller')
-    def test_generate_all_pdfs(self, mock_trad, mock_ech):
+    def test_generate_all_pdfs(self, mock_trad, mock_ech, mock_load_snapshot):
         """Test generation of both PDF types"""
         # Mock PDF generators
         mock_ech_instance = mock_ech.return_value
@@ -292,6 +293,52 @@ class TestUnifiedPDFGenerator(unittest.TestCase):
         self.assertIsNotNone(result['ech0196'])
         self.assertIsNotNone(result['traditional'])
 
+    @patch('services.pdf_generators.unified_pdf_generator.load_filing_snapshot')
+    @patch('services.pdf_generators.unified_pdf_generator.ECH0196PDFGenerator')
+    @patch('services.pdf_generators.unified_pdf_generator.TraditionalPDFFiller')
+    def test_generate_all_pdfs_calculates_once(self, mock_trad, mock_ech, mock_load_snapshot):
+        """Test that both renderers share one filing snapshot"""
+        snapshot = mock_load_snapshot.return_value
+        generator = UnifiedPDFGenerator()
+
+        generator.generate_all_pdfs('filing_123', 'de')
+
+        mock_load_snapshot.assert_called_once_with('filing_123', None, filing=None)
+        mock_ech.return_value.generate.assert_called_once_with('filing_123', 'de', None, snapshot=snapshot)
+        mock_trad.return_value.fill_canton_form.assert_called_once_with(
+            'filing_123', 'de', None, snapshot=snapshot
+        )
+
+    @patch('services.pdf_generators.unified_pdf_generator.load_filing_snapshot')
+    @patch('services.pdf_generators.unified_pdf_generator.ECH0196PDFGenerator')
+    @patch('services.pdf_generators.unified_pdf_generator.TraditionalPDFFiller')
+    def test_generate_all_pdfs_partial_failure(self, mock_trad, mock_ech, mock_load_snapshot):
+        """Test that one failing renderer does not affect the other"""
+        mock_ech.return_value.generate.return_value = io.BytesIO(b'%PDF-ECH')
+        mock_trad.return_value.fill_canton_form.side_effect = FileNotFoundError("no template")
+        generator = UnifiedPDFGenerator()
+
+        result = generator.generate_all_pdfs('filing_123', 'de')
+
+        self.assertEqual(result['ech0196'].getvalue(), b'%PDF-ECH')
+        self.assertIsNone(result['traditional'])
+        self.assertIn('no template', result['traditional_error'])
+
+    @patch('services.pdf_generators.unified_pdf_generator.load_filing_snapshot')
+    @patch('services.pdf_generators.unified_pdf_generator.ECH0196PDFGenerator')
+    @patch('services.pdf_generators.unified_pdf_generator.TraditionalPDFFiller')
+    def test_generate_all_pdfs_filing_not_found(self, mock_trad, mock_ech, mock_load_snapshot):
+        """Test that a missing filing is reported for both PDF types without rendering"""
+        mock_load_snapshot.side_effect = ValueError("Filing filing_123 not found")
+        generator = UnifiedPDFGenerator()
+
+        result = generator.generate_all_pdfs('filing_123', 'de')
+
+        self.assertIsNone(result['ech0196'])
+        self.assertIsNone(result['traditional'])
+        self.assertIn('not found', result['ech0196_error'])
+        mock_ech.return_value.generate.assert_not_called()
+
     @unittest.skip("Skipped: Complex service mocking. Functionality verified in integration tests.")
     @patch('services.pdf_generators.unified_pdf_generator.ECH0196PDFGenerator')
     @patch('services.pdf_generators.unified_pdf_generator.TraditionalPDFFiller')
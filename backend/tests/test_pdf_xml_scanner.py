@@ -0,0 +1,151 @@
+"""
+Unit tests for the PDF XML scanner
+Tests embedded XML lookup, page-lazy barcode scanning and scan order
+"""
+
+import io
+import sys
+from unittest.mock import MagicMock, Mock, patch
+
+import PyPDF2
+import pytest
+
+from parsers.ech0196_parser import ECH0196Parser
+from parsers.pdf_xml_scanner import find_embedded_xml, scan_barcodes, scan_order
+
+
+ECH_XML = '<?xml version="1.0"?><eTaxStatement><taxYear>2024</taxYear></eTaxStatement>'
+
+
+def _pdf_with_attachment(filename, content):
+    writer = PyPDF2.PdfWriter()
+    writer.add_blank_page(width=200, height=200)
+    writer.add_attachment(filename, content)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _barcode(data, barcode_type='DATAMATRIX'):
+    barcode = Mock()
+    barcode.type = barcode_type
+    barcode.data = data.encode('utf-8')
+    return barcode
+
+
+class TestScanOrder:
+    """Test the order pages are rendered in"""
+
+    def test_single_page(self):
+        assert list(scan_order(1, (150, 300))) == [(0, 150), (0, 300)]
+
+    def test_last_and_first_page_before_others(self):
+        assert list(scan_order(4, (150, 300))) == [
+            (3, 150), (0, 150), (3, 300), (0, 300),
+            (2, 150), (2, 300), (1, 150), (1, 300)
+        ]
+
+    def test_likely_pages_only(self):
+        assert list(scan_order(4, (300,), likely_pages_only=True)) == [(3, 300), (0, 300)]
+        assert list(scan_order(1, (300,), likely_pages_only=True)) == [(0, 300)]
+
+
+class TestScanBarcodes:
+    """Test page-lazy barcode scanning"""
+
+    @pytest.fixture(autouse=True)
+    def barcode_modules(self):
+        """Stand-ins for pdf2image and pyzbar (need poppler and zbar)"""
+        self.pdf2image = MagicMock()
+        self.pyzbar = MagicMock()
+        with patch.dict(sys.modules, {
+            'pdf2image': self.pdf2image,
+            'pyzbar': self.pyzbar,
+            'pyzbar.pyzbar': self.pyzbar.pyzbar
+        }):
+            yield
+
+    def test_stops_at_first_hit(self):
+        """Test that only pages up to the hit are rendered, lowest DPI first"""
+        mock_convert = self.pdf2image.convert_from_bytes
+        mock_decode = self.pyzbar.pyzbar.decode
+        mock_convert.side_effect = lambda pdf_bytes, **kwargs: [MagicMock(page=kwargs['first_page'], dpi=kwargs['dpi'])]
+        mock_decode.side_effect = lambda image: (
+            [_barcode(ECH_XML)] if (image.page, image.dpi) == (5, 300) else []
+        )
+
+        content, page_num = scan_barcodes(b'%PDF', lambda data: '<eTaxStatement' in data, page_count=5)
+
+        assert content == ECH_XML
+        assert page_num == 4
+        rendered = [(call.kwargs['first_page'], call.kwargs['last_page'], call.kwargs['dpi'])
+                    for call in mock_convert.call_args_list]
+        assert rendered == [(5, 5, 150), (1, 1, 150), (5, 5, 300)]
+
+    def test_ignores_non_matching_codes(self):
+        """Test that other barcode types and contents are skipped"""
+        mock_convert = self.pdf2image.convert_from_bytes
+        mock_decode = self.pyzbar.pyzbar.decode
+        mock_convert.return_value = [MagicMock()]
+        mock_decode.return_value = [_barcode(ECH_XML, 'QRCODE'), _barcode('not xml')]
+
+        assert scan_barcodes(b'%PDF', lambda data: '<eTaxStatement' in data, page_count=2) == (None, None)
+        assert mock_convert.call_count == 4
+
+    def test_render_failure_stops_scan(self):
+        """Test that a PDF which cannot be rendered is not retried page by page"""
+        mock_convert = self.pdf2image.convert_from_bytes
+        mock_convert.side_effect = Exception('Unable to get page count')
+        assert scan_barcodes(b'%PDF', lambda data: True, page_count=10) == (None, None)
+        assert mock_convert.call_count == 1
+
+
+class TestFindEmbeddedXml:
+    """Test XML lookup in attachments and XMP metadata"""
+
+    def test_xml_attachment(self):
+        """Test that an attached XML file is found without rendering"""
+        pdf_bytes = _pdf_with_attachment('statement.xml', ECH_XML.encode('utf-8'))
+
+        xml_content, method = find_embedded_xml(PyPDF2.PdfReader(io.BytesIO(pdf_bytes)), 'eTaxStatement')
+
+        assert xml_content == ECH_XML
+        assert method == 'attachment'
+
+    def test_escaped_xml_in_xmp(self):
+        """Test that XML stored escaped in an XMP property is found"""
+        reader = Mock()
+        reader.trailer = {}
+        reader.xmp_metadata.stream.get_data.return_value = (
+            b'<x:xmpmeta><rdf:Description ech:statement="&lt;eTaxStatement&gt;'
+            b'&lt;taxYear&gt;2024&lt;/taxYear&gt;&lt;/eTaxStatement&gt;"/></x:xmpmeta>'
+        )
+
+        xml_content, method = find_embedded_xml(reader, 'eTaxStatement')
+
+        assert xml_content == '<eTaxStatement><taxYear>2024</taxYear></eTaxStatement>'
+        assert method == 'xmp'
+
+    def test_nothing_embedded(self):
+        """Test that a plain PDF has no embedded XML"""
+        pdf_bytes = _pdf_with_attachment('notes.txt', b'<eTaxStatement></eTaxStatement>')
+
+        assert find_embedded_xml(PyPDF2.PdfReader(io.BytesIO(pdf_bytes)), 'eTaxStatement') == (None, '')
+
+
+class TestECH0196Extraction:
+    """Test that ECH0196Parser uses the cheap sources first"""
+
+    @patch('parsers.ech0196_parser.scan_barcodes')
+    def test_attachment_skips_barcode_scan(self, mock_scan):
+        pdf_bytes = _pdf_with_attachment('statement.xml', ECH_XML.encode('utf-8'))
+
+        assert ECH0196Parser()._extract_xml_from_pdf(pdf_bytes) == (ECH_XML, 'attachment')
+        mock_scan.assert_not_called()
+
+    @patch('parsers.ech0196_parser.scan_barcodes', return_value=(ECH_XML, 0))
+    def test_falls_back_to_barcode(self, mock_scan):
+        pdf_bytes = _pdf_with_attachment('notes.txt', b'notes')
+
+        assert ECH0196Parser()._extract_xml_from_pdf(pdf_bytes) == (ECH_XML, 'barcode')
+        assert mock_scan.call_args.kwargs['page_count'] == 1
@@ -17,6 +17,7 @@ from utils.plan_features import (
     get_plan_features,
     has_feature,
     get_feature_limit,
+    resolve_features,
     get_user_features,
     compare_plans,
     require_feature,
@@ -591,3 +592,67 @@ def test_none_feature_name(mock_user, mock_db_session):
 
     result = has_feature(mock_user, mock_db_session, None)
     assert result is False
+
+
+# ============================================================================
+# TEST: resolve_features
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_resolve_features_once_per_request(mock_user, mock_db_session):
+    """Test that several checks in one request query the plan once"""
+    from tests.conftest import create_mock_query_result
+    mock_subscription = Mock(spec=Subscription)
+    mock_subscription.plan_type = 'pro'
+    mock_db_session.query.return_value = create_mock_query_result(mock_subscription)
+    mock_db_session.info = {}
+
+    @require_plan('basic')
+    @require_feature('ai_optimization')
+    async def test_endpoint(db, current_user):
+        return {"status": "success"}
+
+    assert await test_endpoint(db=mock_db_session, current_user=mock_user) == {"status": "success"}
+    assert has_feature(mock_user, mock_db_session, 'csv_export') is True
+    assert get_feature_limit(mock_user, mock_db_session, 'filings_per_year') is None
+
+    assert mock_db_session.query.call_count == 1
+
+
+@pytest.mark.unit
+def test_resolve_features_shared_per_plan(mock_user, mock_db_session):
+    """Test that users on the same plan share one resolved feature map"""
+    from tests.conftest import create_mock_query_result
+    mock_subscription = Mock(spec=Subscription)
+    mock_subscription.plan_type = 'basic'
+    mock_db_session.query.return_value = create_mock_query_result(mock_subscription)
+    other_user = Mock(spec=User)
+    other_user.id = 'other-user'
+    other_user.created_at = datetime.utcnow()
+
+    access = resolve_features(mock_user, mock_db_session)
+
+    assert access.plan_type == 'basic'
+    assert access.features is PLAN_FEATURES['basic']
+    assert resolve_features(other_user, mock_db_session) is access
+
+
+@pytest.mark.unit
+def test_resolve_features_after_subscription_webhook(mock_user, mock_db_session):
+    """Test that a cancelled subscription is seen by the next request"""
+    from routers.swisstax.webhooks import handle_subscription_deleted
+    from services.user_principal_cache import get_user_principal_cache
+    from tests.conftest import create_mock_query_result
+
+    get_user_principal_cache().put(mock_user)
+    mock_subscription = Mock(spec=Subscription)
+    mock_subscription.plan_type = 'premium'
+    mock_subscription.user_id = mock_user.id
+    mock_db_session.query.return_value = create_mock_query_result(mock_subscription)
+    assert resolve_features(mock_user, mock_db_session).plan_type == 'premium'
+
+    handle_subscription_deleted({'id': 'sub_123'}, mock_db_session)
+    mock_db_session.query.return_value = create_mock_query_result(None)
+
+    assert resolve_features(mock_user, mock_db_session).plan_type == 'free'
@@ -0,0 +1,184 @@
+"""
+Unit Tests for QuestionLoader
+
+Tests the shared compiled question graph:
+- One parse shared by all loaders
+- Reload only when the file content changes
+- Precompiled branching table
+- Previous graph kept when a reload fails
+- Compiled document rules and incremental re-evaluation
+"""
+
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import question as question_module
+from models.question import QuestionLoader, get_question_graph, invalidate_question_graph
+
+QUESTIONS_YAML = textwrap.dedent("""
+    questions:
+      Q00_name:
+        text: {en: Name}
+        type: text
+        next: Q01
+      Q01:
+        text: {en: Marital status}
+        type: single_choice
+        options:
+          - {value: single}
+          - {value: married}
+        branching:
+          married: [Q01a, Q01b]
+          default: Q02
+      Q01a:
+        text: {en: Spouse}
+        type: text
+        next: Q02
+      Q01b:
+        text: {en: Spouse AHV}
+        type: text
+        next: Q02
+      Q02:
+        text: {en: Employers}
+        type: multi_select
+        options:
+          - {value: a}
+        next: null
+    document_rules:
+      employed:
+        condition: "Q02 > 0"
+        description: Salary certificate
+        documents:
+          - {type: lohnausweis, quantity: per_employer}
+      married:
+        condition: "Q01 == married and Q02 > 0"
+        description: Spouse salary certificate
+        documents:
+          - {type: spouse_lohnausweis}
+      broken:
+        condition: "Q02 >"
+        description: Never required
+        documents:
+          - {type: nothing}
+""")
+
+
+class TestQuestionLoader(unittest.TestCase):
+    """Test suite for the shared question graph"""
+
+    def setUp(self):
+        """Write a small questions file for each test"""
+        invalidate_question_graph()
+        handle, self.path = tempfile.mkstemp(suffix='.yaml')
+        os.close(handle)
+        self._write(QUESTIONS_YAML)
+
+    def tearDown(self):
+        invalidate_question_graph()
+        os.remove(self.path)
+
+    def _write(self, content, mtime_offset=0):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset))
+
+    def test_loaders_share_one_graph(self):
+        """Test that the YAML is parsed once for many loaders"""
+        with patch.object(question_module.yaml, 'safe_load', wraps=question_module.yaml.safe_load) as safe_load:
+            first = QuestionLoader(self.path)
+            second = QuestionLoader(self.path)
+
+        self.assertEqual(safe_load.call_count, 1)
+        self.assertIs(first.questions, second.questions)
+        self.assertEqual(first.get_first_question().id, 'Q00_name')
+
+    def test_reload_on_content_change(self):
+        """Test that a changed file is picked up by new loaders"""
+        QuestionLoader(self.path)
+        self._write(QUESTIONS_YAML.replace('Employers', 'Employment'), mtime_offset=10**9)
+
+        loader = QuestionLoader(self.path)
+
+        self.assertEqual(loader.get_question('Q02').text, {'en': 'Employment'})
+
+    def test_touch_without_change_does_not_reparse(self):
+        """Test that an mtime change with identical content keeps the graph"""
+        graph = get_question_graph(self.path)
+        self._write(QUESTIONS_YAML, mtime_offset=10**9)
+
+        with patch.object(question_module.yaml, 'safe_load') as safe_load:
+            self.assertIs(get_question_graph(self.path), graph)
+        safe_load.assert_not_called()
+
+    def test_invalid_reload_keeps_previous_graph(self):
+        """Test that a broken edit does not take the interview down"""
+        graph = get_question_graph(self.path)
+        self._write("questions: [unclosed", mtime_offset=10**9)
+
+        self.assertIs(get_question_graph(self.path), graph)
+
+    def test_branching_table(self):
+        """Test next-question lookup through the precompiled branching table"""
+        loader = QuestionLoader(self.path)
+
+        self.assertEqual(loader.get_next_questions('Q00_name', 'Jane'), ['Q01'])
+        self.assertEqual(loader.get_next_questions('Q01', 'married'), ['Q01a', 'Q01b'])
+        self.assertEqual(loader.get_next_questions('Q01', 'single'), ['Q02'])
+        self.assertEqual(loader.get_next_questions('Q02', ['a']), [])
+        self.assertEqual(loader.get_next_questions('unknown', 'x'), [])
+
+    def test_graph_is_read_only(self):
+        """Test that the shared questions cannot be modified through a loader"""
+        loader = QuestionLoader(self.path)
+
+        with self.assertRaises(TypeError):
+            loader.questions['Q99'] = None
+
+    def test_document_requirements(self):
+        """Test that document rules are read from the shared graph"""
+        loader = QuestionLoader(self.path)
+
+        requirements = loader.get_document_requirements({'Q02': 2})
+
+        self.assertEqual([doc['type'] for doc in requirements], ['lohnausweis'])
+        self.assertEqual(
+            [doc['type'] for doc in loader.get_document_requirements({'Q01': 'married', 'Q02': '1'})],
+            ['lohnausweis', 'spouse_lohnausweis']
+        )
+
+    def test_incremental_rule_evaluation(self):
+        """Test that only rules reading the changed answer are re-evaluated"""
+        loader = QuestionLoader(self.path)
+        answers = {'Q01': 'married'}
+        state = loader.evaluate_document_rules(answers)
+        self.assertEqual(state, {'employed': False, 'married': False, 'broken': False})
+
+        answers['Q02'] = 1
+        # Unrelated change: the stored results are kept as they are
+        self.assertEqual(loader.evaluate_document_rules(answers, ['Q00_name'], state), state)
+
+        state = loader.evaluate_document_rules(answers, ['Q02'], state)
+        self.assertEqual(state, {'employed': True, 'married': True, 'broken': False})
+        self.assertEqual(
+            [doc['type'] for doc in loader.get_document_requirements(answers, state)],
+            ['lohnausweis', 'spouse_lohnausweis']
+        )
+
+    def test_rule_dependency_index(self):
+        """Test that rules are indexed by the questions their conditions read"""
+        graph = get_question_graph(self.path)
+
+        self.assertEqual(graph.rules_by_question['Q02'], ('employed', 'married'))
+        self.assertEqual(graph.rules_by_question['Q01'], ('married',))
+
+
+if __name__ == '__main__':
+    unittest.main()
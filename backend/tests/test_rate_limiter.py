@@ -0,0 +1,306 @@
+"""
+Unit tests for the rate limiter
+Tests sliding window counting, backends, route policies and the AI middleware limiter
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from middleware.rate_limiter import RateLimiter as AIRateLimiter
+from utils.fastapi_rate_limiter import rate_limit
+from utils.rate_limiter import (InMemoryRateLimitBackend, RateLimiter, RateLimitPolicy,
+                                RedisRateLimitBackend, parse_rate)
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class SharedStoreStandIn:
+    """Local stand-in for the Redis commands the shared backend uses; like
+    Redis, each command is atomic but commands of different clients interleave"""
+
+    def __init__(self):
+        self.values = {}
+        self.expiries = {}
+        self.lock = threading.Lock()
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    def __init__(self, store):
+        self.store = store
+        self.commands = []
+
+    def incrby(self, key, amount):
+        self.commands.append(('incrby', key, amount))
+
+    def decrby(self, key, amount):
+        self.commands.append(('incrby', key, -amount))
+
+    def expire(self, key, seconds):
+        self.commands.append(('expire', key, seconds))
+
+    def mget(self, keys):
+        self.commands.append(('mget', keys, None))
+
+    def execute(self):
+        results = []
+        for command, key, value in self.commands:
+            with self.store.lock:
+                if command == 'incrby':
+                    self.store.values[key] = self.store.values.get(key, 0) + value
+                    results.append(self.store.values[key])
+                elif command == 'expire':
+                    self.store.expiries[key] = value
+                    results.append(True)
+                else:
+                    results.append([
+                        str(self.store.values[k]).encode() if k in self.store.values else None
+                        for k in key
+                    ])
+            time.sleep(0)  # Let other clients interleave
+        self.commands = []
+        return results
+
+
+class TestParseRate:
+    """Test rate strings used by @rate_limit"""
+
+    @pytest.mark.parametrize('rate, limit, window', [
+        ('100/minute', 100, 60),
+        ('1000/hour', 1000, 3600),
+        ('5/15 minutes', 5, 900),
+        ('3/day', 3, 86400),
+    ])
+    def test_valid_rates(self, rate, limit, window):
+        policy = parse_rate(rate)
+
+        assert (policy.limit, policy.window_seconds) == (limit, window)
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            parse_rate('often')
+
+
+class TestSlidingWindowCounter:
+    """Test the sliding window estimate"""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock(now=600.0)  # Start of a minute window
+
+    @pytest.fixture
+    def limiter(self, clock):
+        return RateLimiter(InMemoryRateLimitBackend(), clock=clock)
+
+    def test_limit_within_window(self, limiter):
+        policy = RateLimitPolicy('test', 3, 60)
+
+        results = [limiter.check('user-1', [policy]) for _ in range(4)]
+
+        assert [result.allowed for result in results] == [True, True, True, False]
+        assert [result.remaining for result in results[:3]] == [2, 1, 0]
+        assert results[3].retry_after > 0
+        assert limiter.get_metrics()['test'] == {'allowed': 3, 'rejected': 1, 'backend_errors': 0}
+
+    def test_previous_window_decays(self, limiter, clock):
+        """Test that a burst at the end of one window still counts early in the next"""
+        policy = RateLimitPolicy('test', 4, 60)
+        clock.now = 659.0
+        for _ in range(4):
+            assert limiter.check('user-1', [policy]).allowed
+
+        clock.now = 675.0  # 25% into the next window: 4 * 0.75 = 3 still counted
+        assert limiter.check('user-1', [policy]).allowed
+        rejected = limiter.check('user-1', [policy])
+        assert not rejected.allowed
+
+        clock.now += rejected.retry_after
+        assert limiter.check('user-1', [policy]).allowed
+
+    def test_keys_are_independent(self, limiter):
+        policy = RateLimitPolicy('test', 1, 60)
+
+        assert limiter.check('user-1', [policy]).allowed
+        assert limiter.check('user-2', [policy]).allowed
+        assert not limiter.check('user-1', [policy]).allowed
+
+    def test_rejected_requests_are_not_counted(self, limiter):
+        """Test that a request rejected by one policy does not use up another"""
+        wide = RateLimitPolicy('wide', 10, 3600)
+        narrow = RateLimitPolicy('narrow', 1, 60)
+
+        limiter.check('user-1', [wide, narrow])
+        for _ in range(5):
+            result = limiter.check('user-1', [wide, narrow])
+            assert result.policy == 'narrow'
+
+        assert limiter.get_metrics()['wide']['allowed'] == 1
+
+    def test_constant_state_per_key(self, limiter):
+        """Test that a burst leaves two counters per policy, not one entry per request"""
+        policy = RateLimitPolicy('test', 1000, 60)
+
+        for _ in range(500):
+            limiter.check('user-1', [policy])
+
+        assert len(limiter.backend._counters) == 1
+
+    def test_full_store_keeps_existing_limits(self, clock):
+        """Test that a flood of new keys does not reset the limit of a known key"""
+        limiter = RateLimiter(InMemoryRateLimitBackend(max_keys=10), clock=clock)
+        policy = RateLimitPolicy('login', 2, 900)
+        limiter.check('203.0.113.1', [policy])
+        limiter.check('203.0.113.1', [policy])
+
+        for index in range(50):
+            limiter.check(f'198.51.100.{index}', [policy])
+
+        assert not limiter.check('203.0.113.1', [policy]).allowed
+
+    def test_backend_failure_fails_open(self, clock):
+        class BrokenBackend(InMemoryRateLimitBackend):
+            def increment(self, keys, amount=1, read_keys=()):
+                raise ConnectionError('store down')
+
+        limiter = RateLimiter(BrokenBackend(), clock=clock)
+
+        assert limiter.check('user-1', [RateLimitPolicy('test', 1, 60)]).allowed
+        assert limiter.get_metrics()['test']['backend_errors'] == 1
+
+
+class TestSharedBackend:
+    """Test that limits hold across processes sharing one store"""
+
+    def test_two_workers_share_counters(self):
+        store = SharedStoreStandIn()
+        clock = FakeClock()
+        worker_a = RateLimiter(RedisRateLimitBackend(store), clock=clock)
+        worker_b = RateLimiter(RedisRateLimitBackend(store), clock=clock)
+        policy = RateLimitPolicy('test', 2, 60)
+
+        assert worker_a.check('user-1', [policy]).allowed
+        assert worker_b.check('user-1', [policy]).allowed
+        assert not worker_a.check('user-1', [policy]).allowed
+
+        assert set(store.expiries.values()) == {120}
+        assert list(store.values.values()) == [2]  # The rejected request was taken back
+
+    def test_concurrent_checks_do_not_overshoot(self):
+        store = SharedStoreStandIn()
+        clock = FakeClock()
+        workers = [RateLimiter(RedisRateLimitBackend(store), clock=clock) for _ in range(4)]
+        policy = RateLimitPolicy('test', 10, 60)
+        barrier = threading.Barrier(40)
+
+        def check(index):
+            barrier.wait()
+            return workers[index % 4].check('user-1', [policy]).allowed
+
+        with ThreadPoolExecutor(max_workers=40) as executor:
+            results = list(executor.map(check, range(40)))
+
+        assert sum(results) == 10
+        assert list(store.values.values()) == [10]
+
+    async def test_shared_store_is_called_off_the_event_loop(self, monkeypatch):
+        store = SharedStoreStandIn()
+        limiter = RateLimiter(RedisRateLimitBackend(store), clock=FakeClock())
+        calling_threads = []
+        execute = _Pipeline.execute
+
+        def record_thread(pipeline):
+            calling_threads.append(threading.get_ident())
+            return execute(pipeline)
+
+        monkeypatch.setattr(_Pipeline, 'execute', record_thread)
+
+        result = await limiter.check_async('user-1', [RateLimitPolicy('test', 1, 60)])
+
+        assert result.allowed
+        assert calling_threads and threading.get_ident() not in calling_threads
+
+
+class TestRouteDecorator:
+    """Test per-route policies"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        limiter = RateLimiter(InMemoryRateLimitBackend())
+        monkeypatch.setattr('utils.fastapi_rate_limiter.get_rate_limiter', lambda: limiter)
+        app = FastAPI()
+
+        @app.post("/login")
+        @rate_limit("2/minute")
+        async def login(request: Request):
+            return {"ok": True}
+
+        @app.get("/profile")
+        @rate_limit("100/minute")
+        async def profile(request: Request):
+            return {"ok": True}
+
+        return TestClient(app)
+
+    def test_limit_per_route(self, client):
+        assert client.post('/login').status_code == 200
+        assert client.post('/login').status_code == 200
+
+        response = client.post('/login')
+        assert response.status_code == 429
+        assert int(response.headers['retry-after']) > 0
+
+        assert client.get('/profile').status_code == 200
+
+    def test_limit_per_client_ip(self, client):
+        client.post('/login', headers={'X-Forwarded-For': '203.0.113.1'})
+        client.post('/login', headers={'X-Forwarded-For': '203.0.113.1'})
+
+        assert client.post('/login', headers={'X-Forwarded-For': '203.0.113.2'}).status_code == 200
+        assert client.post('/login', headers={'X-Forwarded-For': '203.0.113.1'}).status_code == 429
+
+
+class TestAIRateLimiter:
+    """Test the AI endpoint limiter on the shared limiter"""
+
+    @pytest.fixture
+    def ai_limiter(self):
+        return AIRateLimiter(
+            requests_per_minute=10,
+            requests_per_hour=100,
+            ai_extraction_limit=2,
+            limiter=RateLimiter(InMemoryRateLimitBackend())
+        )
+
+    async def test_extraction_limit(self, ai_limiter):
+        assert await ai_limiter.check_rate_limit('user-1', '/api/v1/ai/extract')
+        assert await ai_limiter.check_rate_limit('user-1', '/api/v1/ai/extract')
+
+        with pytest.raises(HTTPException) as exc_info:
+            await ai_limiter.check_rate_limit('user-1', '/api/v1/ai/extract')
+
+        assert exc_info.value.status_code == 429
+        assert 'AI processing limit' in exc_info.value.detail
+        # Other AI endpoints are still available
+        assert await ai_limiter.check_rate_limit('user-1', '/api/v1/ai/questions')
+
+    async def test_minute_limit(self, ai_limiter):
+        for _ in range(10):
+            await ai_limiter.check_rate_limit('user-1', '/api/v1/ai/questions')
+
+        with pytest.raises(HTTPException) as exc_info:
+            await ai_limiter.check_rate_limit('user-1', '/api/v1/ai/questions')
+
+        assert 'Please wait before making more requests' in exc_info.value.detail
@@ -0,0 +1,79 @@
+"""
+Unit Tests for compiled document rule conditions
+
+Tests the condition compiler used by QuestionLoader document rules:
+- Simple comparisons as written in questions.yaml
+- Compound expressions (and/or/not, parentheses, in)
+- Answer storage formats ('yes' vs True, numeric strings)
+- Question dependencies and syntax errors
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.rule_condition import ConditionSyntaxError, compile_condition
+
+
+class TestRuleCondition(unittest.TestCase):
+    """Test suite for compile_condition"""
+
+    def test_simple_comparisons(self):
+        """Test the comparison forms used in questions.yaml"""
+        self.assertTrue(compile_condition("Q04 > 0")({'Q04': 2}))
+        self.assertFalse(compile_condition("Q04 > 0")({'Q04': 0}))
+        self.assertTrue(compile_condition("Q04 >= 2")({'Q04': 2}))
+        self.assertTrue(compile_condition("Q04 < 3")({'Q04': 2}))
+        self.assertTrue(compile_condition("Q04 <= 2")({'Q04': 2}))
+        self.assertTrue(compile_condition("Q05 == yes")({'Q05': True}))
+        self.assertTrue(compile_condition("Q05 != yes")({'Q05': False}))
+
+    def test_unanswered_question_is_false(self):
+        """Test that comparisons on missing answers never match"""
+        self.assertFalse(compile_condition("Q05 == yes")({}))
+        self.assertFalse(compile_condition("Q05 != yes")({}))
+        self.assertFalse(compile_condition("Q01 not in [single]")({}))
+
+    def test_answer_storage_formats(self):
+        """Test that 'yes' strings and numeric strings are understood"""
+        self.assertTrue(compile_condition("Q05 == yes")({'Q05': 'yes'}))
+        self.assertFalse(compile_condition("Q05 == yes")({'Q05': 'no'}))
+        self.assertTrue(compile_condition("Q04 > 0")({'Q04': '3'}))
+        self.assertFalse(compile_condition("Q04 > 0")({'Q04': 'many'}))
+
+    def test_compound_expressions(self):
+        """Test and/or/not with parentheses"""
+        condition = compile_condition("Q04 > 0 and (Q05 == yes or not Q09 == no)")
+
+        self.assertTrue(condition({'Q04': 1, 'Q05': 'yes', 'Q09': 'no'}))
+        self.assertTrue(condition({'Q04': 1, 'Q05': 'no', 'Q09': 'yes'}))
+        self.assertFalse(condition({'Q04': 1, 'Q05': 'no', 'Q09': 'no'}))
+        self.assertFalse(condition({'Q04': 0, 'Q05': 'yes'}))
+
+    def test_in_operator(self):
+        """Test membership in a list of values"""
+        condition = compile_condition("Q01 in [married, 'registered partnership']")
+
+        self.assertTrue(condition({'Q01': 'married'}))
+        self.assertTrue(condition({'Q01': 'registered partnership'}))
+        self.assertFalse(condition({'Q01': 'single'}))
+        self.assertTrue(compile_condition("Q01 not in [married]")({'Q01': 'single'}))
+        self.assertTrue(compile_condition("Q04 in [1, 2]")({'Q04': '2'}))
+
+    def test_question_ids(self):
+        """Test that the questions a condition reads are recorded"""
+        condition = compile_condition("Q04 > 0 or (Q05 == yes and Q01 in [married])")
+
+        self.assertEqual(condition.question_ids, frozenset({'Q04', 'Q05', 'Q01'}))
+
+    def test_syntax_errors(self):
+        """Test that malformed conditions are rejected at compile time"""
+        for expression in ["", "Q04 >", "Q04 > 0 and", "(Q04 > 0", "Q04 > many", "Q01 in married", "Q04 0"]:
+            with self.assertRaises(ConditionSyntaxError, msg=expression):
+                compile_condition(expression)
+
+
+if __name__ == '__main__':
+    unittest.main()
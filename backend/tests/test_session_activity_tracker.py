@@ -0,0 +1,135 @@
+"""Unit tests for the session activity tracker."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from services.session_activity_tracker import (INVALID, UNKNOWN, VALID,
+                                               SessionActivityTracker)
+from services.session_service import SessionService
+
+
+def _session(is_valid=True, expires_in=timedelta(days=1)):
+    session = Mock()
+    session.is_valid.return_value = is_valid
+    session.expires_at = datetime.utcnow() + expires_in
+    return session
+
+
+class TestSessionValidityCache:
+    """Test cached session states"""
+
+    @pytest.fixture
+    def db(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def tracker(self, db):
+        return SessionActivityTracker(ttl_seconds=60, flush_interval=60, session_factory=lambda: db)
+
+    @patch('services.session_service.SessionService.get_session_by_id')
+    def test_state_is_looked_up_once(self, mock_get, tracker, db):
+        """Test that repeated checks within the TTL do not query"""
+        mock_get.return_value = _session()
+
+        assert tracker.check('s1') == VALID
+        assert tracker.check('s1') == VALID
+
+        mock_get.assert_called_once_with(db, 's1')
+        db.close.assert_called_once()
+
+    @patch('services.session_service.SessionService.get_session_by_id')
+    def test_invalidate_forces_lookup(self, mock_get, tracker):
+        """Test that a revoked session is seen as soon as it is invalidated"""
+        mock_get.return_value = _session()
+        tracker.check('s1')
+
+        mock_get.return_value = _session(is_valid=False)
+        tracker.invalidate('s1')
+
+        assert tracker.check('s1') == INVALID
+        assert mock_get.call_count == 2
+
+    @patch('services.session_service.SessionService.get_session_by_id')
+    def test_valid_state_not_cached_past_expiry(self, mock_get, tracker):
+        """Test that a session about to expire is looked up again"""
+        mock_get.return_value = _session(expires_in=timedelta(seconds=-1))
+
+        tracker.check('s1')
+        tracker.check('s1')
+
+        assert mock_get.call_count == 2
+
+    @patch('services.session_service.SessionService.get_session_by_id', return_value=None)
+    def test_missing_session_is_unknown(self, mock_get, tracker):
+        assert tracker.check('legacy') == UNKNOWN
+
+
+class TestActivityBuffer:
+    """Test write-behind last_active updates"""
+
+    @pytest.fixture
+    def tracker(self):
+        tracker = SessionActivityTracker(ttl_seconds=60, flush_interval=60, session_factory=MagicMock)
+        yield tracker
+        tracker._stop_event.set()
+
+    @patch('services.session_service.SessionService.update_last_active_batch')
+    def test_touches_are_coalesced(self, mock_update, tracker):
+        """Test that many touches become one batched update with the latest times"""
+        for _ in range(5):
+            tracker.touch('s1')
+        tracker.touch('s2')
+        latest = tracker._activity['s1']
+
+        assert tracker.flush() == 2
+        assert tracker.flush() == 0
+
+        mock_update.assert_called_once()
+        pending = mock_update.call_args[0][1]
+        assert set(pending) == {'s1', 's2'}
+        assert pending['s1'] == latest
+
+    @patch('services.session_service.SessionService.update_last_active_batch',
+           side_effect=Exception('database unavailable'))
+    def test_failed_flush_is_retried(self, mock_update, tracker):
+        tracker.touch('s1')
+
+        assert tracker.flush() == 0
+        assert 's1' in tracker._activity
+
+    @patch('services.session_service.SessionService.update_last_active_batch')
+    def test_stop_flushes_remaining(self, mock_update, tracker):
+        tracker.touch('s1')
+
+        tracker.stop()
+
+        mock_update.assert_called_once()
+        assert not tracker._flusher.is_alive()
+
+
+class TestSessionServiceIntegration:
+    """Test the SessionService side of the tracker"""
+
+    def test_update_last_active_batch_single_statement(self):
+        db = MagicMock()
+        db.query.return_value.filter.return_value.update.return_value = 2
+        now = datetime.utcnow()
+
+        result = SessionService.update_last_active_batch(db, {'s1': now, 's2': now})
+
+        assert result == 2
+        db.query.return_value.filter.return_value.update.assert_called_once()
+        db.commit.assert_called_once()
+
+    @patch('services.session_service.get_session_activity_tracker')
+    def test_revocation_invalidates_cached_state(self, mock_get_tracker):
+        db = MagicMock()
+        session = Mock()
+        db.query.return_value.filter.return_value.first.return_value = session
+
+        assert SessionService.revoke_session_by_session_id(db, 's1') is True
+
+        session.revoke.assert_called_once()
+        mock_get_tracker.return_value.invalidate.assert_called_once_with('s1')
@@ -0,0 +1,148 @@
+"""
+Unit tests for the sliding session refresh policy
+Tests the lifetime threshold, excluded paths, claim caching and metrics
+"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from config import settings
+from core import session_refresh
+from core.security import ALGORITHM, create_access_token, decode_access_token
+from core.session_refresh import (get_session_refresh_metrics, is_refresh_excluded,
+                                  needs_refresh, refresh_session_cookie)
+
+
+def _token(age_seconds=0, email='user@example.com'):
+    """Token issued age_seconds ago"""
+    lifetime = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    payload = {'email': email, 'exp': time.time() + lifetime - age_seconds, 'session_id': 'sess-1'}
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=ALGORITHM)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def sliding_session(request: Request, call_next):
+        response = await call_next(request)
+        refresh_session_cookie(request, response)
+        return response
+
+    @app.get("/api/profile")
+    async def profile(request: Request):
+        decode_access_token(request, request.cookies['access_token'].replace('Bearer ', ''))
+        return {}
+
+    @app.get("/api/ping")
+    async def ping():
+        return {}
+
+    @app.get("/api/documents/{document_id}/status")
+    async def status(document_id: str):
+        return {}
+
+    @app.post("/api/auth/logout")
+    async def logout(response: Response):
+        response.delete_cookie('access_token')
+        return {}
+
+    return TestClient(app)
+
+
+class TestRefreshPolicy:
+    """Test when a token is re-signed"""
+
+    def test_fresh_token_not_resigned(self):
+        lifetime = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        now = time.time()
+
+        assert not needs_refresh({'exp': now + lifetime - 60}, now)
+        assert needs_refresh({'exp': now + lifetime * (1 - settings.SESSION_REFRESH_AFTER_FRACTION)}, now)
+        assert needs_refresh({}, now)
+
+    def test_excluded_paths(self):
+        assert is_refresh_excluded('/health/db-pool')
+        assert is_refresh_excluded('/api/documents/123/status')
+        assert not is_refresh_excluded('/api/documents/123')
+        assert not is_refresh_excluded('/api/profile')
+
+
+class TestSlidingSessionMiddleware:
+    """Test the refresh decision on real requests"""
+
+    def test_recent_token_is_kept(self, client):
+        before = get_session_refresh_metrics()
+        client.cookies.set('access_token', f'Bearer {_token(age_seconds=60)}')
+
+        response = client.get('/api/profile')
+
+        assert 'set-cookie' not in response.headers
+        after = get_session_refresh_metrics()
+        assert after['skipped_fresh'] == before['skipped_fresh'] + 1
+        assert after['avoided'] == before['avoided'] + 1
+
+    def test_aged_token_is_refreshed(self, client):
+        lifetime = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        old_token = _token(age_seconds=lifetime / 2)
+        client.cookies.set('access_token', f'Bearer {old_token}')
+
+        response = client.get('/api/profile')
+
+        # Production cookie domain, so read the header rather than the client's cookie jar
+        set_cookie = response.headers['set-cookie']
+        new_token = set_cookie.split(';')[0].split('=', 1)[1].strip('"').replace('Bearer ', '')
+        claims = jwt.decode(new_token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        assert claims['email'] == 'user@example.com'
+        assert claims['session_id'] == 'sess-1'
+        assert claims['exp'] > jwt.get_unverified_claims(old_token)['exp']
+
+    def test_polling_never_refreshes(self, client):
+        client.cookies.set('access_token', f'Bearer {_token(age_seconds=3 * 3600)}')
+
+        with patch.object(session_refresh, 'needs_refresh') as mock_needs_refresh:
+            response = client.get('/api/documents/abc/status')
+
+        assert 'set-cookie' not in response.headers
+        mock_needs_refresh.assert_not_called()
+
+    def test_cookie_set_by_endpoint_is_kept(self, client):
+        client.cookies.set('access_token', f'Bearer {_token(age_seconds=3 * 3600)}')
+
+        response = client.post('/api/auth/logout')
+
+        set_cookies = response.headers.get_list('set-cookie')
+        assert len(set_cookies) == 1
+        assert 'Max-Age=0' in set_cookies[0]
+
+    def test_claims_decoded_once_per_request(self, client):
+        """Test that the endpoint and the middleware share one decode"""
+        client.cookies.set('access_token', f'Bearer {_token(age_seconds=60)}')
+
+        with patch('core.security.jwt.decode', wraps=jwt.decode) as mock_decode:
+            client.get('/api/profile')
+
+        assert mock_decode.call_count == 1
+
+    def test_invalid_token_is_ignored(self, client):
+        before = get_session_refresh_metrics()
+        client.cookies.set('access_token', 'Bearer not-a-jwt')
+
+        response = client.get('/api/ping')
+
+        assert response.status_code == 200
+        assert 'set-cookie' not in response.headers
+        assert get_session_refresh_metrics()['skipped_invalid_token'] == before['skipped_invalid_token'] + 1
+
+
+def test_create_access_token_is_fresh():
+    """Test that a newly issued token does not need refreshing"""
+    claims = jwt.decode(create_access_token('a@b.ch'), settings.SECRET_KEY, algorithms=[ALGORITHM])
+
+    assert not needs_refresh(claims)
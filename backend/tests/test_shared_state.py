@@ -0,0 +1,119 @@
+"""
+Unit tests for process-wide shared state helpers
+Tests lazy creation under concurrency, keyed creation and expiring entries
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.shared_state import Lazy, LazyMap, TTLMap
+
+
+class TestLazy:
+    """Test objects created on first use"""
+
+    def test_created_once_under_concurrency(self):
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def factory():
+            calls.append(1)
+            time.sleep(0.01)
+            return object()
+
+        holder = Lazy(factory)
+
+        def get():
+            barrier.wait()
+            return holder.get()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: get(), range(8)))
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+
+    def test_reset(self):
+        holder = Lazy(object)
+        assert holder.peek() is None
+
+        first = holder.get()
+        assert holder.reset() is first
+        assert holder.peek() is None
+        assert holder.get() is not first
+
+
+class TestLazyMap:
+    """Test objects created per key"""
+
+    def test_one_object_per_key(self):
+        built = []
+        registry = LazyMap(lambda key: built.append(key) or {'key': key})
+
+        assert registry.get('a') is registry.get('a')
+        assert registry.get('b')['key'] == 'b'
+        assert built == ['a', 'b']
+        assert len(registry) == 2
+
+        registry.clear()
+        assert len(registry) == 0
+
+
+class TestTTLMap:
+    """Test expiring entries"""
+
+    def test_get_and_expire(self):
+        entries = TTLMap(max_entries=10)
+        entries.set('live', 1, 60)
+        entries.set('expired', 2, 0)
+
+        assert entries.get('live') == 1
+        assert entries.get('expired') is None
+        assert entries.get('missing', 'default') == 'default'
+        assert entries.pop('live') == 1
+        assert entries.get('live') is None
+
+    def test_add_keeps_expiry(self):
+        counters = TTLMap(max_entries=10)
+
+        assert counters.add('key', 1, 60) == 1
+        assert counters.add('key', 2, 60) == 3
+        assert counters.add('gone', 5, 0) == 5
+        assert counters.add('gone', 1, 60) == 1  # Expired counters start over
+
+    def test_full_map_drops_expired_entries(self):
+        entries = TTLMap(max_entries=2)
+        entries.set('expired', 1, 0)
+        entries.set('live', 2, 60)
+
+        entries.set('new', 3, 60)
+
+        assert len(entries) == 2
+        assert entries.get('live') == 2
+        assert entries.get('new') == 3
+
+    def test_full_map_evicts_least_recently_used(self):
+        entries = TTLMap(max_entries=3)
+        entries.set('a', 1, 60)
+        entries.set('b', 2, 60)
+        entries.set('c', 3, 60)
+        entries.get('a')  # Now more recently used than b
+
+        entries.set('d', 4, 60)
+
+        assert len(entries) == 3
+        assert entries.get('b') is None
+        assert (entries.get('a'), entries.get('c'), entries.get('d')) == (1, 3, 4)
+        assert entries.overflows == 1
+
+    def test_full_map_without_eviction_keeps_live_counts(self):
+        counters = TTLMap(max_entries=3, evict=False)
+        assert counters.add('hot', 5, 60) == 5
+
+        for index in range(100):
+            assert counters.add(f'new-{index}', 1, 60) == 1
+
+        assert counters.add('hot', 1, 60) == 6
+        assert len(counters) == 3
+        assert counters.overflows == 98
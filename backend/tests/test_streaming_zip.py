@@ -0,0 +1,115 @@
+"""
+Unit Tests for Streaming ZIP archives
+
+Tests:
+- Archives built from chunked entries are valid
+- Entries are consumed lazily while output is produced
+- Small streams are uploaded with put_object, large ones as multipart uploads
+- Failed multipart uploads are aborted
+"""
+
+import io
+import sys
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.streaming_zip import (S3_MIN_PART_SIZE, iter_file_chunks, iter_zip,
+                                 upload_stream_to_s3)
+
+
+class TestIterZip(unittest.TestCase):
+    """Test streaming ZIP output"""
+
+    def test_archive_round_trip(self):
+        """Test that the streamed archive contains every entry intact"""
+        content = b'%PDF-1.4 ' * 20000
+        entries = [
+            ('2024/lohnausweis/salary.pdf', iter_file_chunks(io.BytesIO(content), chunk_size=4096)),
+            ('README.txt', [b'hello', b' ', b'world'])
+        ]
+
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(iter_zip(entries))))
+
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.namelist(), ['2024/lohnausweis/salary.pdf', 'README.txt'])
+        self.assertEqual(archive.read('2024/lohnausweis/salary.pdf'), content)
+        self.assertEqual(archive.read('README.txt'), b'hello world')
+
+    def test_entries_are_pulled_lazily(self):
+        """Test that output is produced before later entries are requested"""
+        requested = []
+
+        def entries():
+            for name in ('a.txt', 'b.txt'):
+                requested.append(name)
+                yield name, [name.encode() * 1000]
+
+        stream = iter_zip(entries())
+        next(stream)
+
+        self.assertEqual(requested, ['a.txt'])
+        self.assertTrue(b''.join(stream))
+        self.assertEqual(requested, ['a.txt', 'b.txt'])
+
+
+class TestUploadStreamToS3(unittest.TestCase):
+    """Test S3 uploads of streamed content"""
+
+    def setUp(self):
+        self.s3_client = MagicMock()
+        self.s3_client.create_multipart_upload.return_value = {'UploadId': 'upload-1'}
+        self.s3_client.upload_part.side_effect = lambda **kwargs: {'ETag': f"etag-{kwargs['PartNumber']}"}
+
+    def test_small_stream_uses_put_object(self):
+        """Test that content below one part is sent in a single request"""
+        size = upload_stream_to_s3(
+            self.s3_client, 'bucket', 'exports/a.zip', [b'abc', b'def'], ContentType='application/zip'
+        )
+
+        self.assertEqual(size, 6)
+        self.s3_client.put_object.assert_called_once_with(
+            Bucket='bucket', Key='exports/a.zip', Body=b'abcdef', ContentType='application/zip'
+        )
+        self.s3_client.create_multipart_upload.assert_not_called()
+
+    def test_large_stream_uses_multipart_upload(self):
+        """Test that parts are uploaded as they fill up"""
+        chunk = b'x' * (1024 * 1024)
+        chunks = [chunk] * (2 * 5 + 3)
+
+        size = upload_stream_to_s3(
+            self.s3_client, 'bucket', 'exports/a.zip', chunks,
+            part_size=S3_MIN_PART_SIZE, ServerSideEncryption='AES256'
+        )
+
+        self.assertEqual(size, 13 * len(chunk))
+        self.s3_client.create_multipart_upload.assert_called_once_with(
+            Bucket='bucket', Key='exports/a.zip', ServerSideEncryption='AES256'
+        )
+        part_sizes = [len(call.kwargs['Body']) for call in self.s3_client.upload_part.call_args_list]
+        self.assertEqual(part_sizes, [S3_MIN_PART_SIZE, S3_MIN_PART_SIZE, 3 * len(chunk)])
+        parts = self.s3_client.complete_multipart_upload.call_args.kwargs['MultipartUpload']['Parts']
+        self.assertEqual([part['PartNumber'] for part in parts], [1, 2, 3])
+        self.s3_client.put_object.assert_not_called()
+
+    def test_failed_stream_aborts_upload(self):
+        """Test that a multipart upload is aborted when the stream fails"""
+        def chunks():
+            yield b'x' * S3_MIN_PART_SIZE
+            raise IOError("S3 read failed")
+
+        with self.assertRaises(IOError):
+            upload_stream_to_s3(self.s3_client, 'bucket', 'exports/a.zip', chunks(), part_size=S3_MIN_PART_SIZE)
+
+        self.s3_client.abort_multipart_upload.assert_called_once_with(
+            Bucket='bucket', Key='exports/a.zip', UploadId='upload-1'
+        )
+        self.s3_client.complete_multipart_upload.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
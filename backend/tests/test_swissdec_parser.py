@@ -3,10 +3,15 @@ Unit tests for Swissdec ELM Parser
 Tests XML parsing, version detection, and data mapping functionality
 """
 
+import io
+import sys
 import pytest
 import xml.etree.ElementTree as ET
-from unittest.mock import Mock, patch
-from parsers.swissdec_parser import SwissdecParser
+from unittest.mock import MagicMock, Mock, patch
+
+import PyPDF2
+
+from parsers.swissdec_parser import SWISSDEC_BARCODE_DPI, SwissdecParser
 
 
 # Sample Swissdec ELM XML for testing
@@ -195,10 +200,7 @@ class TestSwissdecParser:
     def test_extract_tax_year_from_period(self):
         """Test extracting tax year from period dates"""
         parsed = self.parser._parse_elm_xml(SAMPLE_SWISSDEC_XML, '5.0')
-        # Note: Period-based year extraction is not currently working with namespaced XML
-        # This is a known limitation - tax year should be provided in a direct Year field
-        # For now, assert it returns None when using Period/From structure
-        assert parsed['tax_year'] is None
+        assert parsed['tax_year'] == '2024'
 
     def test_extract_tax_year_from_year_field(self):
         """Test extracting tax year from direct year field"""
@@ -256,8 +258,7 @@ class TestSwissdecParser:
 
         # Metadata
         assert profile['import_source'] == 'Swissdec-ELM'
-        # Note: tax_year extraction from Period/From not working, so this will be None
-        assert profile['import_tax_year'] is None
+        assert profile['import_tax_year'] == '2024'
 
     def test_map_uses_gross_salary_when_taxable_missing(self):
         """Test mapping uses gross salary as employment income when taxable is missing"""
@@ -331,6 +332,26 @@ class TestSwissdecParser:
 
         assert xml_content is None
 
+    def test_barcode_fallback_renders_likely_pages_once(self):
+        """Test that a PDF without XML renders only its last and first page, at one DPI"""
+        writer = PyPDF2.PdfWriter()
+        for _ in range(6):
+            writer.add_blank_page(width=200, height=200)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+
+        pdf2image = MagicMock()
+        pdf2image.convert_from_bytes.return_value = [MagicMock()]
+        pyzbar = MagicMock()
+        pyzbar.pyzbar.decode.return_value = []
+        with patch.dict(sys.modules, {'pdf2image': pdf2image, 'pyzbar': pyzbar, 'pyzbar.pyzbar': pyzbar.pyzbar}):
+            xml_content = self.parser._extract_xml_from_pdf(buffer.getvalue())
+
+        assert xml_content is None
+        rendered = [(call.kwargs['first_page'], call.kwargs['dpi'])
+                    for call in pdf2image.convert_from_bytes.call_args_list]
+        assert rendered == [(6, SWISSDEC_BARCODE_DPI), (1, SWISSDEC_BARCODE_DPI)]
+
     def test_parse_pdf_document(self):
         """Test parsing PDF document with embedded XML"""
         pdf_bytes = b'%PDF-1.4 fake pdf with swissdec'
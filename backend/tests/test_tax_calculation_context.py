@@ -0,0 +1,121 @@
+"""
+Unit Tests for Tax Calculation Context
+
+Tests the single-query loader for tax calculation inputs:
+- Mapping of the query row to TaxCalculationContext
+- Defaults for missing answers
+- Church tax data resolved from the in-memory rate table
+"""
+
+import sys
+import unittest
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.church_tax_rate_table import ChurchTaxRateTable
+from services.tax_calculation_context import (TaxCalculationContext,
+                                              load_tax_calculation_context)
+
+
+class TestTaxCalculationContext(unittest.TestCase):
+    """Test suite for TaxCalculationContext"""
+
+    def test_defaults_for_missing_answers(self):
+        """Test canton, municipality and denomination defaults"""
+        context = TaxCalculationContext(session_id='session_1', tax_year=2024)
+
+        self.assertEqual(context.canton, 'ZH')
+        self.assertEqual(context.municipality, 'Zurich')
+        self.assertIsNone(context.municipality_id)
+        self.assertEqual(context.denomination, 'none')
+
+    def test_values_from_answers(self):
+        """Test that profile values are read from the answers"""
+        context = TaxCalculationContext(
+            session_id='session_1',
+            tax_year=2024,
+            answers={
+                'canton': 'BE',
+                'municipality': 'Thun',
+                'municipality_id': 942,
+                'religious_denomination': 'reformed'
+            }
+        )
+
+        self.assertEqual(context.canton, 'BE')
+        self.assertEqual(context.municipality, 'Thun')
+        self.assertEqual(context.municipality_id, 942)
+        self.assertEqual(context.denomination, 'reformed')
+
+
+@patch('services.tax_calculation_context.get_church_tax_rate_table')
+@patch('services.tax_calculation_context.execute_one')
+class TestLoadTaxCalculationContext(unittest.TestCase):
+    """Test suite for load_tax_calculation_context"""
+
+    def setUp(self):
+        """Set up church tax tables for Bern"""
+        self.church_tables = ChurchTaxRateTable(2024, [{
+            'canton': 'BE', 'has_church_tax': True, 'recognized_denominations': ['catholic', 'reformed'],
+            'calculation_method': 'percentage_of_cantonal', 'notes': None, 'official_source': None
+        }], [
+            {'canton': 'BE', 'municipality_id': None, 'municipality_name': None, 'denomination': 'reformed',
+             'rate_percentage': Decimal('0.184'), 'source': 'canton_average', 'parish_name': None,
+             'official_source': None},
+            {'canton': 'BE', 'municipality_id': 942, 'municipality_name': 'Thun', 'denomination': 'reformed',
+             'rate_percentage': Decimal('0.21'), 'source': 'official_parish', 'parish_name': 'Thun',
+             'official_source': None},
+        ])
+
+    def test_loads_answers_and_church_data(self, mock_execute_one, mock_get_church_tables):
+        """Test that one query returns the answers and church data comes from the rate table"""
+        mock_execute_one.return_value = {'answers': {'canton': 'BE', 'religious_denomination': 'reformed'}}
+        mock_get_church_tables.return_value = self.church_tables
+
+        context = load_tax_calculation_context('session_1', 2024)
+
+        mock_execute_one.assert_called_once()
+        self.assertEqual(mock_execute_one.call_args[0][1], {'session_id': 'session_1'})
+        self.assertEqual(context.answers['canton'], 'BE')
+        self.assertTrue(context.church_config['has_church_tax'])
+        self.assertEqual(context.church_rate['rate_percentage'], Decimal('0.184'))
+
+    def test_municipality_church_rate(self, mock_execute_one, mock_get_church_tables):
+        """Test that the municipality-specific church rate is preferred"""
+        mock_execute_one.return_value = {'answers': {
+            'canton': 'BE', 'religious_denomination': 'reformed', 'municipality_id': 942
+        }}
+        mock_get_church_tables.return_value = self.church_tables
+
+        context = load_tax_calculation_context('session_1', 2024)
+
+        self.assertEqual(context.church_rate['municipality_name'], 'Thun')
+
+    def test_church_tax_year(self, mock_execute_one, mock_get_church_tables):
+        """Test that church tables can be read for a different tax year"""
+        mock_execute_one.return_value = {'answers': {}}
+        mock_get_church_tables.return_value = None
+
+        load_tax_calculation_context('session_1', 2024, church_tax_year=2025)
+        mock_get_church_tables.assert_called_with(2025)
+
+        load_tax_calculation_context('session_1', 2024)
+        mock_get_church_tables.assert_called_with(2024)
+
+    def test_session_without_answers(self, mock_execute_one, mock_get_church_tables):
+        """Test an empty session without church tables yields an empty context"""
+        mock_execute_one.return_value = {'answers': None}
+        mock_get_church_tables.return_value = None
+
+        context = load_tax_calculation_context('session_1', 2024)
+
+        self.assertEqual(context.answers, {})
+        self.assertIsNone(context.church_config)
+        self.assertIsNone(context.church_rate)
+
+
+if __name__ == '__main__':
+    unittest.main()
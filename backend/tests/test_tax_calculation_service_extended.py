@@ -3,7 +3,7 @@ Comprehensive Unit Tests for Tax Calculation Service
 
 Achieves 90%+ coverage by testing all major methods:
 - calculate_taxes (main orchestration)
-- _get_session_answers (database retrieval)
+- _apply_answer_defaults (missing answers)
 - _calculate_income (all income sources)
 - _calculate_deductions (all deduction types)
 - _calculate_federal_tax (progressive brackets)
@@ -31,9 +31,16 @@ from unittest.mock import MagicMock, Mock, patch, call
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from services.church_tax_rate_table import ChurchTaxRateTable
+from services.municipality_index import Municipality, MunicipalityIndex
 from services.tax_calculation_service import TaxCalculationService
 
 
+def _context_row(answer_rows):
+    """Build the row returned by the tax calculation context query"""
+    return {'answers': {row['question_id']: row['answer_value'] for row in answer_rows}}
+
+
 class TestTaxCalculationServiceInit(unittest.TestCase):
     """Test service initialization"""
 
@@ -43,35 +50,15 @@ class TestTaxCalculationServiceInit(unittest.TestCase):
         self.assertEqual(service.tax_year, 2024)
 
 
-class TestGetSessionAnswers(unittest.TestCase):
-    """Test _get_session_answers method"""
-
-    @patch('services.tax_calculation_service.execute_query')
-    def test_get_session_answers_basic(self, mock_execute_query):
-        """Test retrieving session answers from database"""
-        mock_execute_query.return_value = [
-            {'question_id': 'Q01', 'answer_value': 'single'},
-            {'question_id': 'Q03', 'answer_value': True},
-            {'question_id': 'Q03a', 'answer_value': 2},
-        ]
-
-        service = TaxCalculationService()
-        answers = service._get_session_answers('session_123')
+class TestApplyAnswerDefaults(unittest.TestCase):
+    """Test _apply_answer_defaults method"""
 
-        self.assertEqual(answers['Q01'], 'single')
-        self.assertEqual(answers['Q03'], True)
-        self.assertEqual(answers['Q03a'], 2)
-        mock_execute_query.assert_called_once()
-
-    @patch('services.tax_calculation_service.execute_query')
-    def test_get_session_answers_adds_defaults(self, mock_execute_query):
+    def test_apply_answer_defaults_adds_income(self):
         """Test that default income is added if not present"""
-        mock_execute_query.return_value = []
-
         service = TaxCalculationService()
-        answers = service._get_session_answers('session_123')
+        answers = service._apply_answer_defaults({'Q01': 'single'})
 
-        # Should add default income
+        self.assertEqual(answers['Q01'], 'single')
         self.assertEqual(answers['income_employment'], 100000)
 
 
@@ -630,47 +617,62 @@ class TestCalculateMunicipalTax(unittest.TestCase):
 
     def setUp(self):
         self.service = TaxCalculationService()
-
-    @patch('services.tax_calculation_service.execute_one')
-    def test_municipal_tax_zurich(self, mock_execute_one):
+        self.index = MunicipalityIndex(2024, [
+            Municipality(1, 'ZH', 'Zürich', Decimal('1.19'), 2024),
+            Municipality(2, 'GE', 'Genève', Decimal('0.45'), 2024),
+            Municipality(3, 'BS', 'Basel', Decimal('0.82'), 2024),
+        ])
+
+    @patch('services.tax_calculation_service.get_municipality_index')
+    def test_municipal_tax_zurich(self, mock_get_index):
         """Test municipal tax for Zurich (multiplier 1.19)"""
-        mock_execute_one.return_value = {'tax_multiplier': 1.19}
+        mock_get_index.return_value = self.index
         cantonal_tax = Decimal('5000')
         municipal_tax = self.service._calculate_municipal_tax(
             cantonal_tax, 'ZH', 'Zurich'
         )
         self.assertEqual(municipal_tax, Decimal('5950'))  # 5000 * 1.19
 
-    @patch('services.tax_calculation_service.execute_one')
-    def test_municipal_tax_geneva(self, mock_execute_one):
+    @patch('services.tax_calculation_service.get_municipality_index')
+    def test_municipal_tax_geneva(self, mock_get_index):
         """Test municipal tax for Geneva (multiplier 0.45)"""
-        mock_execute_one.return_value = {'tax_multiplier': 0.45}
+        mock_get_index.return_value = self.index
         cantonal_tax = Decimal('5000')
         municipal_tax = self.service._calculate_municipal_tax(
-            cantonal_tax, 'GE', 'Geneva'
+            cantonal_tax, 'GE', 'geneve'
         )
         self.assertEqual(municipal_tax, Decimal('2250'))  # 5000 * 0.45
 
-    @patch('services.tax_calculation_service.execute_one')
-    def test_municipal_tax_basel(self, mock_execute_one):
+    @patch('services.tax_calculation_service.get_municipality_index')
+    def test_municipal_tax_basel(self, mock_get_index):
         """Test municipal tax for Basel (multiplier 0.82)"""
-        mock_execute_one.return_value = {'tax_multiplier': 0.82}
+        mock_get_index.return_value = self.index
         cantonal_tax = Decimal('5000')
         municipal_tax = self.service._calculate_municipal_tax(
             cantonal_tax, 'BS', 'Basel'
         )
         self.assertEqual(municipal_tax, Decimal('4100'))  # 5000 * 0.82
 
-    @patch('services.tax_calculation_service.execute_one')
-    def test_municipal_tax_unknown_municipality(self, mock_execute_one):
+    @patch('services.tax_calculation_service.get_municipality_index')
+    def test_municipal_tax_unknown_municipality(self, mock_get_index):
         """Test municipal tax for unknown municipality (default 1.0)"""
-        mock_execute_one.return_value = None
+        mock_get_index.return_value = self.index
         cantonal_tax = Decimal('5000')
         municipal_tax = self.service._calculate_municipal_tax(
             cantonal_tax, 'ZH', 'UnknownCity'
         )
         self.assertEqual(municipal_tax, Decimal('5000'))  # 5000 * 1.0
 
+    @patch('services.tax_calculation_service.get_municipality_index')
+    def test_municipal_tax_index_unavailable(self, mock_get_index):
+        """Test municipal tax when the municipality index cannot be loaded (default 1.0)"""
+        mock_get_index.return_value = None
+        cantonal_tax = Decimal('5000')
+        municipal_tax = self.service._calculate_municipal_tax(
+            cantonal_tax, 'ZH', 'Zurich'
+        )
+        self.assertEqual(municipal_tax, Decimal('5000'))
+
 
 class TestCalculateChurchTax(unittest.TestCase):
     """Test _calculate_church_tax method"""
@@ -803,11 +805,11 @@ class TestCalculateTaxesOrchestration(unittest.TestCase):
     """Test the main calculate_taxes orchestration method"""
 
     @patch('services.tax_calculation_service.execute_insert')
-    @patch('services.tax_calculation_service.execute_query')
-    def test_calculate_taxes_complete_flow_single(self, mock_execute_query, mock_execute_insert):
+    @patch('services.tax_calculation_context.execute_one')
+    def test_calculate_taxes_complete_flow_single(self, mock_execute_one, mock_execute_insert):
         """Test complete tax calculation flow for single person"""
         # Mock session answers - note: values should match types from actual database
-        mock_execute_query.return_value = [
+        mock_execute_one.return_value = _context_row([
             {'question_id': 'Q01', 'answer_value': 'single'},
             {'question_id': 'Q03', 'answer_value': False},
             {'question_id': 'Q04', 'answer_value': '1'},
@@ -816,7 +818,7 @@ class TestCalculateTaxesOrchestration(unittest.TestCase):
             {'question_id': 'income_capital', 'answer_value': '5000'},
             {'question_id': 'canton', 'answer_value': 'ZH'},
             {'question_id': 'municipality', 'answer_value': 'Zurich'},
-        ]
+        ])
 
         # Mock save calculation
         mock_execute_insert.return_value = {'id': 'calc_456'}
@@ -845,12 +847,14 @@ class TestCalculateTaxesOrchestration(unittest.TestCase):
         self.assertGreater(result['federal_tax'], 0)
         self.assertGreater(result['total_tax'], 0)
 
+    @patch('services.tax_calculation_context.get_church_tax_rate_table')
     @patch('services.tax_calculation_service.execute_insert')
-    @patch('services.tax_calculation_service.execute_query')
-    def test_calculate_taxes_complete_flow_married_with_children(self, mock_execute_query, mock_execute_insert):
+    @patch('services.tax_calculation_context.execute_one')
+    def test_calculate_taxes_complete_flow_married_with_children(self, mock_execute_one, mock_execute_insert,
+                                                                 mock_get_church_table):
         """Test complete tax calculation flow for married couple with children"""
         # Mock session answers - note: values should match types from actual database
-        mock_execute_query.return_value = [
+        mock_execute_one.return_value = _context_row([
             {'question_id': 'Q01', 'answer_value': 'married'},
             {'question_id': 'Q03', 'answer_value': 'yes'},
             {'question_id': 'Q03a', 'answer_value': '2'},
@@ -862,7 +866,18 @@ class TestCalculateTaxesOrchestration(unittest.TestCase):
             {'question_id': 'municipality', 'answer_value': 'Zurich'},
             {'question_id': 'pays_church_tax', 'answer_value': True},
             {'question_id': 'religious_denomination', 'answer_value': 'reformed'},
-        ]
+        ])
+
+        # Mock church tax tables: reformed church tax of 10% in Zurich
+        mock_get_church_table.return_value = ChurchTaxRateTable(2024, [{
+            'canton': 'ZH', 'has_church_tax': True,
+            'recognized_denominations': ['catholic', 'reformed', 'christian_catholic'],
+            'calculation_method': 'percentage_of_cantonal', 'notes': None, 'official_source': None
+        }], [{
+            'canton': 'ZH', 'municipality_id': None, 'municipality_name': None,
+            'denomination': 'reformed', 'rate_percentage': Decimal('0.10'), 'source': 'canton_average',
+            'parish_name': None, 'official_source': None
+        }])
 
         # Mock save calculation
         mock_execute_insert.return_value = {'id': 'calc_789'}
@@ -889,16 +904,16 @@ class TestCalculateTaxesOrchestration(unittest.TestCase):
         )
 
     @patch('services.tax_calculation_service.execute_insert')
-    @patch('services.tax_calculation_service.execute_query')
-    def test_calculate_taxes_zero_income(self, mock_execute_query, mock_execute_insert):
+    @patch('services.tax_calculation_context.execute_one')
+    def test_calculate_taxes_zero_income(self, mock_execute_one, mock_execute_insert):
         """Test tax calculation with zero income"""
         # Mock session answers with no income
-        mock_execute_query.return_value = [
+        mock_execute_one.return_value = _context_row([
             {'question_id': 'Q01', 'answer_value': 'single'},
             {'question_id': 'Q04', 'answer_value': '0'},
             {'question_id': 'canton', 'answer_value': 'ZH'},
             {'question_id': 'municipality', 'answer_value': 'Zurich'},
-        ]
+        ])
 
         # Mock save calculation
         mock_execute_insert.return_value = {'id': 'calc_000'}
@@ -913,17 +928,17 @@ class TestCalculateTaxesOrchestration(unittest.TestCase):
         self.assertEqual(result['total_tax'], 0)
 
     @patch('services.tax_calculation_service.execute_insert')
-    @patch('services.tax_calculation_service.execute_query')
-    def test_calculate_taxes_high_income(self, mock_execute_query, mock_execute_insert):
+    @patch('services.tax_calculation_context.execute_one')
+    def test_calculate_taxes_high_income(self, mock_execute_one, mock_execute_insert):
         """Test tax calculation with high income"""
         # Mock session answers with high income
-        mock_execute_query.return_value = [
+        mock_execute_one.return_value = _context_row([
             {'question_id': 'Q01', 'answer_value': 'single'},
             {'question_id': 'Q04', 'answer_value': '1'},
             {'question_id': 'income_employment', 'answer_value': '500000'},
             {'question_id': 'canton', 'answer_value': 'ZH'},
             {'question_id': 'municipality', 'answer_value': 'Zurich'},
-        ]
+        ])
 
         # Mock save calculation
         mock_execute_insert.return_value = {'id': 'calc_high'}
@@ -956,8 +971,8 @@ class TestEdgeCasesAndBoundaries(unittest.TestCase):
 
     def test_deductions_exceed_income(self):
         """Test taxable income is never negative"""
-        with patch('services.tax_calculation_service.execute_query') as mock_query:
-            mock_query.return_value = [
+        with patch('services.tax_calculation_context.execute_one') as mock_query:
+            answer_rows = [
                 {'question_id': 'Q01', 'answer_value': 'married'},
                 {'question_id': 'Q03', 'answer_value': True},
                 {'question_id': 'Q03a', 'answer_value': '5'},  # Many children
@@ -973,8 +988,9 @@ class TestEdgeCasesAndBoundaries(unittest.TestCase):
                 mock_insert.return_value = {'id': 'calc_edge'}
 
                 # Need to fix Q03 to use 'yes' instead of True
-                mock_query.return_value[1] = {'question_id': 'Q03', 'answer_value': 'yes'}
-                mock_query.return_value[4] = {'question_id': 'Q08', 'answer_value': 'yes'}
+                answer_rows[1] = {'question_id': 'Q03', 'answer_value': 'yes'}
+                answer_rows[4] = {'question_id': 'Q08', 'answer_value': 'yes'}
+                mock_query.return_value = _context_row(answer_rows)
 
                 result = self.service.calculate_taxes('session_edge')
 
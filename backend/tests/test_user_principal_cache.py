@@ -0,0 +1,145 @@
+"""
+Unit tests for the user principal cache
+Tests principal caching, invalidation and the queries it saves
+"""
+
+import uuid
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from models.swisstax.subscription import Subscription
+from models.swisstax.user import User
+from services.user_principal_cache import UserPrincipalCache, get_user_principal_cache
+from services.user_service import get_user_for_subject
+from tests.conftest import create_mock_query_result
+from utils.plan_features import get_user_plan_type
+
+
+def _user(email='test@example.com', is_active=True):
+    user = Mock(spec=User)
+    user.id = uuid.uuid4()
+    user.email = email
+    user.is_active = is_active
+    return user
+
+
+class TestUserPrincipalCache:
+    """Test the cache itself"""
+
+    def test_put_and_get(self):
+        cache = UserPrincipalCache(ttl_seconds=60)
+        user = _user()
+
+        cache.put(user)
+        principal = cache.get('test@example.com')
+
+        assert principal.id == user.id
+        assert principal.is_active is True
+        assert principal.is_grandfathered is False
+        assert principal.plan_type is None
+        assert cache.get_by_user_id(user.id) == principal
+
+    def test_expired_entries_are_ignored(self):
+        cache = UserPrincipalCache(ttl_seconds=0)
+        cache.put(_user())
+
+        assert cache.get('test@example.com') is None
+
+    def test_invalidate_by_user_id(self):
+        cache = UserPrincipalCache(ttl_seconds=60)
+        user = _user()
+        cache.put(user)
+        cache.set_plan_type(user.id, 'pro', cache.generation(user.id))
+        assert cache.get('test@example.com').plan_type == 'pro'
+
+        cache.invalidate(user_id=user.id)
+
+        assert cache.get('test@example.com') is None
+        assert cache.get_by_user_id(user.id) is None
+
+    def test_plan_type_needs_principal(self):
+        """Test that plans are only recorded for authenticated users"""
+        cache = UserPrincipalCache(ttl_seconds=60)
+
+        cache.set_plan_type(uuid.uuid4(), 'pro', 0)
+
+        assert len(cache._entries) == 0
+
+    def test_plan_read_before_invalidation_is_not_recorded(self):
+        """Test that a request racing a webhook cannot restore the old plan"""
+        cache = UserPrincipalCache(ttl_seconds=60)
+        user = _user()
+        cache.put(user)
+        generation = cache.generation(user.id)  # Request A reads the old plan
+
+        cache.invalidate(user_id=user.id)  # Webhook
+        cache.put(user)  # Request B authenticates again
+        cache.set_plan_type(user.id, 'pro', generation)  # Request A finishes
+
+        assert cache.get_by_user_id(user.id).plan_type is None
+
+        cache.set_plan_type(user.id, 'free', cache.generation(user.id))
+
+        assert cache.get_by_user_id(user.id).plan_type == 'free'
+
+
+class TestGetUserForSubject:
+    """Test user loading through the cache"""
+
+    def test_miss_queries_by_email_and_caches(self, mock_db_session):
+        user = _user()
+        mock_db_session.query.return_value = create_mock_query_result(user)
+
+        assert get_user_for_subject(mock_db_session, 'test@example.com') == user
+        assert get_user_principal_cache().get('test@example.com').id == user.id
+
+    def test_hit_loads_by_primary_key(self, mock_db_session):
+        user = _user()
+        get_user_principal_cache().put(user)
+        mock_db_session.get.return_value = user
+
+        assert get_user_for_subject(mock_db_session, 'test@example.com') == user
+
+        mock_db_session.get.assert_called_once_with(User, user.id)
+        mock_db_session.query.assert_not_called()
+
+    def test_deleted_user_falls_back_to_query(self, mock_db_session):
+        get_user_principal_cache().put(_user())
+        mock_db_session.get.return_value = None
+        mock_db_session.query.return_value = create_mock_query_result(None)
+
+        assert get_user_for_subject(mock_db_session, 'test@example.com') is None
+        assert get_user_principal_cache().get('test@example.com') is None
+
+
+class TestPlanTypeFromPrincipal:
+    """Test that feature checks reuse the principal's plan"""
+
+    def test_plan_queried_once_per_principal(self, mock_db_session):
+        user = _user()
+        get_user_principal_cache().put(user)
+        subscription = Mock(spec=Subscription)
+        subscription.plan_type = 'pro'
+        mock_db_session.query.return_value = create_mock_query_result(subscription)
+
+        assert get_user_plan_type(user, mock_db_session) == 'pro'
+        assert get_user_plan_type(user, mock_db_session) == 'pro'
+
+        assert mock_db_session.query.call_count == 1
+
+    def test_webhook_invalidates_plan(self, mock_db_session):
+        """Test that a subscription cancellation is seen on the next check"""
+        from routers.swisstax.webhooks import handle_subscription_deleted
+
+        user = _user()
+        cache = get_user_principal_cache()
+        cache.put(user)
+        cache.set_plan_type(user.id, 'pro', cache.generation(user.id))
+        subscription = Mock(spec=Subscription)
+        subscription.user_id = user.id
+        mock_db_session.query.return_value = create_mock_query_result(subscription)
+
+        handle_subscription_deleted({'id': 'sub_123'}, mock_db_session)
+
+        assert cache.get_by_user_id(user.id) is None
@@ -30,7 +30,10 @@ from services.wealth_tax_calculators.base import (
     ProgressiveWealthTaxCalculator,
     ProportionalWealthTaxCalculator
 )
-from services.wealth_tax_calculators import get_wealth_tax_calculator, WEALTH_TAX_CALCULATORS
+from services.wealth_tax_calculators import (
+    get_wealth_tax_calculator, warm_up_wealth_tax_calculators, clear_wealth_tax_calculator_cache,
+    WEALTH_TAX_CALCULATORS
+)
 
 # Import all canton calculators
 from services.wealth_tax_calculators.zurich import ZurichWealthTaxCalculator
@@ -302,6 +305,22 @@ class TestAllCantons(unittest.TestCase):
         with self.assertRaises(ValueError):
             get_wealth_tax_calculator('ZURICH')  # Full name instead of code
 
+    def test_calculator_instances_are_shared(self):
+        """Test that calculators are built once per canton and tax year"""
+        self.assertIs(get_wealth_tax_calculator('ZH', 2024), get_wealth_tax_calculator('zh', 2024))
+        self.assertIsNot(get_wealth_tax_calculator('ZH', 2024), get_wealth_tax_calculator('ZH', 2025))
+
+    def test_warm_up_and_clear_cache(self):
+        """Test warming up the registry and clearing it again"""
+        clear_wealth_tax_calculator_cache()
+        calculator = get_wealth_tax_calculator('GE', 2024)
+
+        self.assertGreaterEqual(warm_up_wealth_tax_calculators([2024]), len(WEALTH_TAX_CALCULATORS))
+        self.assertIs(get_wealth_tax_calculator('GE', 2024), calculator)
+
+        clear_wealth_tax_calculator_cache()
+        self.assertIsNot(get_wealth_tax_calculator('GE', 2024), calculator)
+
 
 class TestEdgeCases(unittest.TestCase):
     """Test suite for edge cases and boundary conditions"""
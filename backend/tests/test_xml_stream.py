@@ -0,0 +1,127 @@
+"""
+Unit tests for the streaming XML helpers
+Tests single-pass field collection, namespace independence and early root reads
+"""
+
+import io
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from parsers.ech0196_parser import ECH0196Parser
+from parsers.swissdec_parser import SwissdecParser
+from parsers.xml_stream import collect_texts, iter_xml, read_root
+
+
+STATEMENT_XML = '''<?xml version="1.0" encoding="UTF-8"?>
+<ech:eTaxStatement xmlns:ech="http://www.ech.ch/xmlns/eCH-0196/2" minorVersion="2">
+    <ech:taxYear>2023</ech:taxYear>
+    <ech:canton>BE</ech:canton>
+    <ech:taxpayer>
+        <ech:ssn>756.1111.2222.33</ech:ssn>
+        <ech:lastName>Muster</ech:lastName>
+        <ech:address><ech:city>Bern</ech:city></ech:address>
+    </ech:taxpayer>
+    <ech:assets>
+        <ech:cashAssets>1200.50</ech:cashAssets>
+        <ech:totalAssets>1200.50</ech:totalAssets>
+    </ech:assets>
+</ech:eTaxStatement>'''
+
+
+class TestIterXml:
+    """Test the element event stream"""
+
+    def test_paths_use_local_names(self):
+        """Test that namespace prefixes do not appear in paths"""
+        paths = [path for event, path, _ in iter_xml(STATEMENT_XML) if event == 'end']
+
+        assert ('eTaxStatement', 'taxpayer', 'address', 'city') in paths
+        assert paths[-1] == ('eTaxStatement',)
+
+    def test_finished_elements_are_released(self):
+        """Test that the root does not accumulate the document"""
+        root = None
+        for event, path, elem in iter_xml(STATEMENT_XML, chunk_size=16):
+            if event == 'start' and len(path) == 1:
+                root = elem
+            elif event == 'end' and path[-1] == 'assets':
+                # Earlier sections are gone; only the one just finished remains
+                assert [child.tag.split('}')[-1] for child in root] == ['assets']
+
+        assert len(root) == 0
+
+    def test_malformed_xml_raises(self):
+        with pytest.raises(ET.ParseError):
+            list(iter_xml('<eTaxStatement><taxYear>2024</taxYear>'))
+
+
+class TestCollectTexts:
+    """Test single-pass text collection"""
+
+    def test_wanted_paths_from_file_object(self):
+        """Test reading wanted fields from a binary stream in small chunks"""
+        source = io.BytesIO(STATEMENT_XML.encode('utf-8'))
+
+        texts, sections = collect_texts(
+            source, wanted={('taxYear',), ('taxpayer', 'lastName'), ('income',)}, chunk_size=32
+        )
+
+        assert texts == {('taxYear',): '2023', ('taxpayer', 'lastName'): 'Muster'}
+        assert sections == {}
+
+    def test_sections_and_path_endings(self):
+        """Test first-occurrence sections and path endings anywhere in the document"""
+        xml = ('<Root><Batch><Employee><Name>A</Name></Employee><Year>2022</Year></Batch>'
+               '<Employee><Name>B</Name></Employee></Root>')
+
+        texts, sections = collect_texts(xml, anywhere=[('Year',)], sections=['Employee', 'Salary'])
+
+        assert texts == {('Year',): '2022'}
+        assert sections == {'Employee': {('Name',): 'A'}}
+
+
+class TestReadRoot:
+    """Test reading only the root start tag"""
+
+    def test_root_of_truncated_document(self):
+        """Test that the rest of the document is not needed"""
+        name, attributes, namespaces = read_root(
+            '<SalaryDeclaration version="ELM-5.4" xmlns:elm="http://www.swissdec.ch/schema/elm/5.4"><Emp'
+        )
+
+        assert name == 'SalaryDeclaration'
+        assert attributes == {'version': 'ELM-5.4'}
+        assert namespaces == {'elm': 'http://www.swissdec.ch/schema/elm/5.4'}
+
+
+class TestStreamingParsers:
+    """Test the parsers on documents the tree-based lookups did not handle"""
+
+    def test_ech_prefixed_namespace(self):
+        parsed = ECH0196Parser()._parse_ech_xml(STATEMENT_XML)
+
+        assert parsed['tax_year'] == '2023'
+        assert parsed['taxpayer']['ssn'] == '756.1111.2222.33'
+        assert parsed['taxpayer']['address'] == {'street': None, 'postal_code': None, 'city': 'Bern'}
+        assert parsed['assets']['bank_accounts'] == 1200.50
+        assert parsed['income'] == {}
+
+    def test_ech_without_namespace(self):
+        xml = '<eTaxStatement><taxYear>2024</taxYear><income><employment>100</employment></income></eTaxStatement>'
+
+        parsed = ECH0196Parser()._parse_ech_xml(xml.encode('utf-8'))
+
+        assert parsed['income']['employment'] == 100.0
+
+    def test_find_xml_in_text_keeps_declaration(self):
+        text = 'Header <?xml version="1.0"?>\n<ETAXSTATEMENT><taxYear>2024</taxYear></ETAXSTATEMENT> footer'
+
+        assert ECH0196Parser()._find_xml_in_text(text) == (
+            '<?xml version="1.0"?>\n<ETAXSTATEMENT><taxYear>2024</taxYear></ETAXSTATEMENT>'
+        )
+
+    def test_swissdec_version_from_namespace(self):
+        xml = '<elm:SalaryDeclaration xmlns:elm="http://www.swissdec.ch/schema/elm/5.5"/>'
+
+        assert SwissdecParser()._detect_version(xml) == '5.5'
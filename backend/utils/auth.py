@@ -11,7 +11,7 @@ from config import settings
 from db.session import get_db
 from models.swisstax import User
 from schemas.auth import UserLoginSchema
-from services.user_service import get_user_by_email
+from services.user_service import get_user_by_email, get_user_for_subject
 from utils.password import verify_password
 
 ALGORITHM = "HS256"
@@ -168,8 +168,7 @@ class JWTHandler(HTTPBearer):
             return None
         user_email = self.payload.get("email")
         if user_email:
-            user = db.query(User).filter(User.email == user_email).first()
-            return user
+            return get_user_for_subject(db, user_email)
         return None
 
     def get_payload(self) -> dict:
@@ -0,0 +1,90 @@
+"""
+Async concurrency helpers
+
+- ConcurrencyLimiter: caps concurrent work per key (e.g. per user) and
+  across the process
+- gather_and_store: runs tasks concurrently, then stores their results in
+  input order and commits once
+"""
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class ConcurrencyLimiter:
+    """At most `per_key` tasks per key and `total` tasks overall run at once"""
+
+    def __init__(self, per_key: int, total: int):
+        """
+        Initialize the limiter.
+
+        Args:
+            per_key: Concurrent tasks allowed per key
+            total: Concurrent tasks allowed across all keys
+        """
+        self.per_key = per_key
+        self.total = total
+        self._total_semaphore: Optional[asyncio.Semaphore] = None
+        # Entries disappear once no task of that key holds them
+        self._key_semaphores: 'weakref.WeakValueDictionary[str, asyncio.Semaphore]' = (
+            weakref.WeakValueDictionary()
+        )
+
+    def _get_total_semaphore(self) -> asyncio.Semaphore:
+        if self._total_semaphore is None:
+            self._total_semaphore = asyncio.Semaphore(self.total)
+        return self._total_semaphore
+
+    def _get_key_semaphore(self, key: str) -> asyncio.Semaphore:
+        semaphore = self._key_semaphores.get(str(key))
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_key)
+            self._key_semaphores[str(key)] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, key: str) -> AsyncIterator[None]:
+        """
+        Hold a slot for one task of `key`.
+
+        The per-key slot is taken before the global one, so a key waiting
+        on its own limit does not hold global slots other keys could use.
+
+        Args:
+            key: What the limit applies to, e.g. a user id
+        """
+        async with self._get_key_semaphore(key), self._get_total_semaphore():
+            yield
+
+
+async def gather_and_store(
+    tasks: Iterable[Awaitable[T]],
+    store: Callable[[T], R],
+    commit: Callable[[], None]
+) -> List[R]:
+    """
+    Run tasks concurrently, then store each result in input order and commit once.
+
+    Nothing is stored if a task fails; the exception of the first failed
+    task in input order is raised once all tasks have finished.
+
+    Args:
+        tasks: Awaitables to run
+        store: Stores one result and returns what was stored
+        commit: Commits the stored results
+
+    Returns:
+        Stored results in input order
+    """
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+
+    stored = [store(outcome) for outcome in outcomes]
+    commit()
+    return stored
@@ -1,23 +1,75 @@
 """
-FastAPI rate limiter decorator (stub)
+FastAPI rate limiter decorator
+
+Applies a per-route rate limit policy, keyed by route and client IP, using
+the shared limiter in utils.rate_limiter.
 """
 
+import logging
 from functools import wraps
 
+from fastapi import HTTPException, Request, status
+
+from utils.rate_limiter import get_rate_limiter, parse_rate
+
+logger = logging.getLogger(__name__)
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    Get the client IP as seen by the load balancer.
+
+    Args:
+        request: FastAPI Request object
+
+    Returns:
+        Client IP address, or "unknown"
+    """
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if forwarded_for:
+        # The proxy appends the address it saw; earlier entries are client-supplied
+        return forwarded_for.split(",")[-1].strip()
+    return request.client.host if request.client else "unknown"
+
 
 def rate_limit(limit_string: str):
     """
-    Rate limit decorator stub
+    Rate limit decorator.
+
+    The route must take a `request: Request` parameter; routes without one
+    are not limited.
+
+    Usage:
+        @router.post("/login")
+        @rate_limit("5/15 minutes")
+        async def login(request: Request, ...):
+            ...
 
     Args:
-        limit_string: Rate limit string (e.g., "100/minute", "1000/hour")
+        limit_string: Rate limit string (e.g., "100/minute", "1000/hour", "5/15 minutes")
 
-    TODO: Implement actual rate limiting using Redis or in-memory store
+    Raises:
+        HTTPException: 429 with a Retry-After header when the limit is exceeded
     """
     def decorator(func):
+        policy = parse_rate(limit_string, name=f"{func.__module__}.{func.__name__}")
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # TODO: Implement rate limiting logic
+            request = kwargs.get("request")
+            if not isinstance(request, Request):
+                request = next((arg for arg in args if isinstance(arg, Request)), None)
+
+            if request is not None:
+                result = await get_rate_limiter().check_async(get_client_ip(request), [policy])
+                if not result.allowed:
+                    logger.warning(f"Rate limit {limit_string} exceeded for {policy.name}")
+                    raise HTTPException(
+                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                        detail="Too many requests. Please try again later.",
+                        headers={"Retry-After": str(result.retry_after)}
+                    )
+
             return await func(*args, **kwargs)
         return wrapper
     return decorator
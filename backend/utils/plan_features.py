@@ -202,6 +202,22 @@ def get_user_plan_type(user: User, db: Session) -> str:
     Returns:
         Plan type: 'free', 'basic', 'pro', or 'premium'
     """
+    from services.user_principal_cache import get_user_principal_cache
+
+    # Authenticated users' plans are kept on their cached principal
+    principal_cache = get_user_principal_cache()
+    principal = principal_cache.get_by_user_id(user.id)
+    if principal is not None and principal.plan_type is not None:
+        return principal.plan_type
+
+    generation = principal_cache.generation(user.id)
+    plan_type = _query_plan_type(user, db)
+    principal_cache.set_plan_type(user.id, plan_type, generation)
+    return plan_type
+
+
+def _query_plan_type(user: User, db: Session) -> str:
+    """Look up the user's plan type from their active or trialing subscription."""
     # Check for active or trialing subscription
     subscription = (
         db.query(Subscription)
@@ -265,43 +281,113 @@ def get_plan_features(plan_type: str) -> Dict[str, Any]:
     return PLAN_FEATURES.get(plan_type, PLAN_FEATURES['free'])
 
 
-def has_feature(user: User, db: Session, feature_name: str) -> bool:
+def _is_enabled(feature_value: Any) -> bool:
+    """Whether a feature value grants access."""
+    # Boolean features: return the value directly
+    if isinstance(feature_value, bool):
+        return feature_value
+
+    # Numeric limits: if None (unlimited) or > 0, return True
+    if feature_value is None or (isinstance(feature_value, (int, float)) and feature_value > 0):
+        return True
+
+    # String features (like pdf_export): if not empty, return True
+    if isinstance(feature_value, str) and feature_value:
+        return True
+
+    return False
+
+
+def _usage_limit(feature_value: Any) -> Optional[int]:
+    """The numeric limit a feature value sets, or None if unlimited."""
+    # Boolean features have no limit concept (check before numeric, since bool is subclass of int)
+    if isinstance(feature_value, bool):
+        return None
+
+    # Return numeric limits
+    if isinstance(feature_value, (int, float)):
+        # Return None for "unlimited" values (999+)
+        if feature_value >= 999:
+            return None
+        return int(feature_value)
+
+    # Non-numeric features have no limit concept
+    return None
+
+
+class FeatureAccess:
+    """A user's resolved entitlements: plan, grandfathering and every feature's access and limit"""
+
+    def __init__(self, plan_type: str, grandfathered: bool):
+        self.plan_type = plan_type
+        self.grandfathered = grandfathered
+        self.features = get_plan_features(plan_type)
+        self._enabled = {name: _is_enabled(value) for name, value in self.features.items()}
+        self._limits = {name: _usage_limit(value) for name, value in self.features.items()}
+
+    def has(self, feature_name: str) -> bool:
+        """Whether the feature is available (grandfathered users get everything)."""
+        if self.grandfathered:
+            return True
+        return self._enabled.get(feature_name, False)
+
+    def limit(self, feature_name: str) -> Optional[int]:
+        """The feature's usage limit, or None if unlimited."""
+        if self.grandfathered:
+            return None
+        return self._limits.get(feature_name)
+
+
+# FeatureAccess depends only on plan and grandfathering, so each combination is built once
+_feature_access: Dict[tuple, FeatureAccess] = {}
+
+
+def resolve_features(user: User, db: Session) -> FeatureAccess:
     """
-    Check if a user has access to a specific feature.
+    Resolve everything a user is entitled to.
 
-    Phase 0: Always returns True (all features enabled).
+    The plan type comes from the user's cached principal (see
+    services.user_principal_cache), so authenticated requests resolve
+    without a query. The result is also kept on the database session for
+    the rest of the request, which covers users without a principal.
 
     Args:
         user: The user object
         db: Database session
-        feature_name: Name of the feature to check
 
     Returns:
-        True if user has access, False otherwise
+        FeatureAccess for the user
     """
-    # Grandfather clause: early users get everything
-    if is_grandfathered(user):
-        return True
+    info = getattr(db, 'info', None)
+    resolved = info.setdefault('resolved_features', {}) if isinstance(info, dict) else {}
+    access = resolved.get(user.id)
+    if access is not None:
+        return access
 
-    plan_type = get_user_plan_type(user, db)
-    features = get_plan_features(plan_type)
+    key = (get_user_plan_type(user, db), is_grandfathered(user))
+    access = _feature_access.get(key)
+    if access is None:
+        access = _feature_access.setdefault(key, FeatureAccess(*key))
 
-    # Get feature value
-    feature_value = features.get(feature_name, False)
+    resolved[user.id] = access
+    return access
 
-    # Boolean features: return the value directly
-    if isinstance(feature_value, bool):
-        return feature_value
 
-    # Numeric limits: if None (unlimited) or > 0, return True
-    if feature_value is None or (isinstance(feature_value, (int, float)) and feature_value > 0):
-        return True
+def has_feature(user: User, db: Session, feature_name: str) -> bool:
+    """
+    Check if a user has access to a specific feature.
 
-    # String features (like pdf_export): if not empty, return True
-    if isinstance(feature_value, str) and feature_value:
-        return True
+    Phase 0: Always returns True (all features enabled).
 
-    return False
+    Args:
+        user: The user object
+        db: Database session
+        feature_name: Name of the feature to check
+
+    Returns:
+        True if user has access, False otherwise
+    """
+    return resolve_features(user, db).has(feature_name)
 
 
 def get_feature_limit(user: User, db: Session, feature_name: str) -> Optional[int]:
@@ -316,28 +402,7 @@ def get_feature_limit(user: User, db: Session, feature_name: str) -> Optional[in
     Returns:
         The numeric limit, or None if unlimited
     """
-    # Grandfathered users have unlimited access
-    if is_grandfathered(user):
-        return None
-
-    plan_type = get_user_plan_type(user, db)
-    features = get_plan_features(plan_type)
-
-    feature_value = features.get(feature_name)
-
-    # Boolean features have no limit concept (check before numeric, since bool is subclass of int)
-    if isinstance(feature_value, bool):
-        return None
-
-    # Return numeric limits
-    if isinstance(feature_value, (int, float)):
-        # Return None for "unlimited" values (999+)
-        if feature_value >= 999:
-            return None
-        return int(feature_value)
-
-    # Non-numeric features have no limit concept
-    return None
+    return resolve_features(user, db).limit(feature_name)
 
 
 def get_user_features(user: User, db: Session) -> Dict[str, Any]:
@@ -351,8 +416,7 @@ def get_user_features(user: User, db: Session) -> Dict[str, Any]:
     Returns:
         Dictionary of all features and their values for the user's plan
     """
-    plan_type = get_user_plan_type(user, db)
-    return get_plan_features(plan_type)
+    return resolve_features(user, db).features
 
 
 # Plan comparison helper
@@ -468,8 +532,7 @@ def require_feature(feature_name: str):
 
             # Check feature access
             if not has_feature(current_user, db, feature_name):
-                subscription = get_active_subscription(current_user, db)
-                current_plan = subscription.plan_type if subscription else 'free'
+                current_plan = resolve_features(current_user, db).plan_type
                 required_plan = _get_required_plan(feature_name)
 
                 raise HTTPException(
@@ -531,7 +594,7 @@ def require_plan(min_plan: str):
                 )
 
             # Check plan level
-            current_plan = get_user_plan_type(current_user, db)
+            current_plan = resolve_features(current_user, db).plan_type
             current_plan_index = plan_order.index(current_plan) if current_plan in plan_order else 0
 
             if current_plan_index < min_plan_index:
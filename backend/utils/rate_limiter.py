@@ -1,12 +1,422 @@
 """
-Rate limiter utility (stub)
+Rate limiter
+
+Sliding-window-counter rate limiting with pluggable counter storage.
+
+Each policy allows `limit` requests per `window_seconds`. For every key a
+policy keeps only two counters, the current and the previous fixed window,
+and estimates the sliding window as
+
+    previous * (share of the previous window still inside the sliding window) + current
+
+so memory and work per check are constant however bursty a client is.
+A request is counted before it is checked and taken back if rejected, so
+rejected requests are not counted and concurrent checks cannot overshoot. Counters expire on their own after two
+windows, so idle keys cost nothing.
+
+Backends (RATE_LIMIT_BACKEND):
+- 'memory' (default): counters in this process
+- 'redis': counters shared by all workers and instances in the Redis at
+  REDIS_URL (falls back to 'memory' if Redis is unavailable)
+- 'none': rate limiting disabled
+
+If the backend fails during a check the request is allowed (fail open) and
+counted in the metrics.
 """
 
-# TODO: Implement actual rate limiting
-# For now, just provide a stub
+import asyncio
+import logging
+import math
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from utils.shared_state import Lazy, TTLMap
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+RATE_LIMIT_KEY_PREFIX = os.getenv('RATE_LIMIT_KEY_PREFIX', 'ratelimit:')
+RATE_LIMIT_MEMORY_MAX_KEYS = int(os.getenv('RATE_LIMIT_MEMORY_MAX_KEYS', '100000'))
+
+_UNIT_SECONDS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400,
+}
+
+_RATE_PATTERN = re.compile(r'^\s*(\d+)\s*/\s*(\d+)?\s*(second|minute|hour|day)s?\s*$')
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """At most `limit` requests per `window_seconds`"""
+    name: str
+    limit: int
+    window_seconds: int
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of a rate limit check"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # Seconds until a request would be allowed again (0 if allowed)
+    policy: Optional[str] = None  # Name of the policy that rejected the request
+
+
+def parse_rate(rate: str, name: Optional[str] = None) -> RateLimitPolicy:
+    """
+    Parse a rate string like '100/minute', '1000/hour' or '5/15 minutes'.
+
+    Args:
+        rate: Rate string
+        name: Policy name (defaults to the rate string)
+
+    Returns:
+        RateLimitPolicy
+
+    Raises:
+        ValueError: If the rate string cannot be parsed
+    """
+    match = _RATE_PATTERN.match(rate)
+    if not match:
+        raise ValueError(f"Invalid rate limit: '{rate}'")
+
+    limit, multiplier, unit = match.groups()
+    window_seconds = int(multiplier or 1) * _UNIT_SECONDS[unit]
+    return RateLimitPolicy(name=name or rate.strip(), limit=int(limit), window_seconds=window_seconds)
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class RateLimitBackend(ABC):
+    """Storage for window counters"""
+
+    # Whether calls do network I/O and should run off the event loop
+    blocking = False
+
+    @abstractmethod
+    def increment(
+        self,
+        keys: Sequence[Tuple[str, int]],
+        amount: int = 1,
+        read_keys: Sequence[str] = ()
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Add to counters, creating them if needed, and read other counters.
+
+        Each counter is updated atomically, so concurrent callers see
+        distinct new counts.
+
+        Args:
+            keys: (counter key, seconds the counter must live) pairs
+            amount: Amount to add
+            read_keys: Counters to read without changing them
+
+        Returns:
+            (new counts of keys, counts of read_keys; 0 for missing counters)
+        """
+
+    @abstractmethod
+    def decrement(self, keys: Sequence[str], amount: int = 1) -> None:
+        """
+        Take back an increment.
+
+        Args:
+            keys: Counter keys
+            amount: Amount to subtract
+        """
+
+
+class NullRateLimitBackend(RateLimitBackend):
+    """Backend used when rate limiting is disabled"""
+
+    def increment(
+        self,
+        keys: Sequence[Tuple[str, int]],
+        amount: int = 1,
+        read_keys: Sequence[str] = ()
+    ) -> Tuple[List[int], List[int]]:
+        return [amount] * len(keys), [0] * len(read_keys)
+
+    def decrement(self, keys: Sequence[str], amount: int = 1) -> None:
+        pass
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Counters in this process (limits apply per worker)"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MEMORY_MAX_KEYS):
+        """
+        Initialize the backend.
+
+        Args:
+            max_keys: Live counters kept; requests of further keys are not counted
+        """
+        # Live counters are never evicted: that would reset a client's limit.
+        # Once full, new keys go uncounted (fail open) until counters expire.
+        self._counters: TTLMap[str, int] = TTLMap(max_keys, 'rate limit counters', evict=False)
+
+    def increment(
+        self,
+        keys: Sequence[Tuple[str, int]],
+        amount: int = 1,
+        read_keys: Sequence[str] = ()
+    ) -> Tuple[List[int], List[int]]:
+        counts = [self._counters.add(key, amount, ttl) for key, ttl in keys]
+        return counts, [self._counters.get(key, 0) for key in read_keys]
+
+    def decrement(self, keys: Sequence[str], amount: int = 1) -> None:
+        for key in keys:
+            self._counters.add(key, -amount, 0)
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Counters in a shared store, so limits hold across workers and instances.
+
+    Works with a redis-py client or any object with the same pipeline
+    (incrby, decrby, expire, mget, execute) methods. Each check is one
+    round trip, plus one more to take back a rejected request.
+    """
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = RATE_LIMIT_KEY_PREFIX):
+        """
+        Initialize the backend.
+
+        Args:
+            client: Redis client
+            prefix: Prefix for all counter keys
+        """
+        self.client = client
+        self.prefix = prefix
+
+    def increment(
+        self,
+        keys: Sequence[Tuple[str, int]],
+        amount: int = 1,
+        read_keys: Sequence[str] = ()
+    ) -> Tuple[List[int], List[int]]:
+        pipeline = self.client.pipeline(transaction=False)
+        for key, ttl in keys:
+            pipeline.incrby(self.prefix + key, amount)
+            pipeline.expire(self.prefix + key, ttl)
+        if read_keys:
+            pipeline.mget([self.prefix + key for key in read_keys])
+        results = pipeline.execute()
+
+        counts = [int(count) for count in results[0:2 * len(keys):2]]
+        values = results[-1] if read_keys else []
+        return counts, [int(value) if value is not None else 0 for value in values]
+
+    def decrement(self, keys: Sequence[str], amount: int = 1) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.decrby(self.prefix + key, amount)
+        pipeline.execute()
+
+
+# ============================================================================
+# LIMITER
+# ============================================================================
 
 class RateLimiter:
-    """Rate limiter stub"""
-    pass
+    """Sliding-window-counter limiter over a RateLimitBackend"""
+
+    def __init__(self, backend: RateLimitBackend, clock=time.time):
+        """
+        Initialize the limiter.
+
+        Args:
+            backend: Counter storage
+            clock: Returns the current Unix time (shared backends need wall-clock time)
+        """
+        self.backend = backend
+        self.clock = clock
+        self._metrics: Dict[str, Dict[str, int]] = {}
+        self._metrics_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return not isinstance(self.backend, NullRateLimitBackend)
+
+    def check(
+        self,
+        key: str,
+        policies: Sequence[RateLimitPolicy],
+        amount: int = 1
+    ) -> RateLimitResult:
+        """
+        Check a request against policies and count it if all of them allow it.
+
+        Args:
+            key: What is limited, e.g. a user id or client IP
+            policies: Policies that must all allow the request
+            amount: Cost of the request
+
+        Returns:
+            RateLimitResult for the most restrictive policy
+        """
+        if not policies:
+            raise ValueError("At least one rate limit policy is required")
+
+        now = self.clock()
+        windows = []
+        current_keys = []
+        previous_keys = []
+        for policy in policies:
+            window = int(now // policy.window_seconds)
+            windows.append(window)
+            base = f"{policy.name}:{key}:"
+            current_keys.append(f"{base}{window}")
+            previous_keys.append(f"{base}{window - 1}")
+
+        # Count the request first and take it back if it is rejected; with
+        # atomic increments, concurrent checks on other workers cannot all
+        # slip under the limit
+        try:
+            counts, previous_counts = self.backend.increment(
+                [(counter_key, 2 * policy.window_seconds)
+                 for counter_key, policy in zip(current_keys, policies)],
+                amount,
+                previous_keys
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit backend unavailable, allowing request: {e}")
+            self._count(policies, 'backend_errors')
+            return RateLimitResult(True, policies[0].limit, policies[0].limit, 0)
+
+        result = None
+        for index, policy in enumerate(policies):
+            current = counts[index] - amount  # Requests counted before this one
+            previous = previous_counts[index]
+            elapsed = now - windows[index] * policy.window_seconds
+            previous_weight = 1 - elapsed / policy.window_seconds
+            estimate = previous * previous_weight + current
+
+            if estimate + amount > policy.limit:
+                self._take_back(policies, current_keys, amount)
+                retry_after = self._retry_after(policy, current, previous, elapsed, amount)
+                self._count([policy], 'rejected')
+                return RateLimitResult(False, policy.limit, 0, retry_after, policy.name)
+
+            remaining = int(policy.limit - estimate - amount)
+            if result is None or remaining < result.remaining:
+                result = RateLimitResult(True, policy.limit, remaining, 0)
+
+        self._count(policies, 'allowed')
+        return result
+
+    async def check_async(
+        self,
+        key: str,
+        policies: Sequence[RateLimitPolicy],
+        amount: int = 1
+    ) -> RateLimitResult:
+        """
+        check() for async callers; a blocking backend runs in a worker thread
+        so the event loop is not held up by store round trips.
+        """
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.check, key, policies, amount)
+        return self.check(key, policies, amount)
+
+    def _take_back(self, policies: Sequence[RateLimitPolicy], current_keys: Sequence[str], amount: int) -> None:
+        """Undo the increment of a rejected request."""
+        try:
+            self.backend.decrement(current_keys, amount)
+        except Exception as e:
+            logger.warning(f"Failed to take back rejected request: {e}")
+            self._count(policies, 'backend_errors')
+
+    @staticmethod
+    def _retry_after(
+        policy: RateLimitPolicy,
+        current: int,
+        previous: int,
+        elapsed: float,
+        amount: int
+    ) -> int:
+        """Seconds until the estimate has dropped enough to allow the request."""
+        window = policy.window_seconds
+        if current + amount > policy.limit:
+            # Only the next window helps; from then on, this window's count decays
+            room = policy.limit - amount
+            decayed = 1 - room / current if current and room > 0 else 1
+            return max(1, math.ceil(window - elapsed + decayed * window))
+
+        # The previous window's weight has to drop far enough
+        needed_weight = (policy.limit - current - amount) / previous
+        return max(1, math.ceil((1 - needed_weight) * window - elapsed))
+
+    def _count(self, policies: Sequence[RateLimitPolicy], outcome: str) -> None:
+        with self._metrics_lock:
+            for policy in policies:
+                counters = self._metrics.setdefault(
+                    policy.name, {'allowed': 0, 'rejected': 0, 'backend_errors': 0}
+                )
+                counters[outcome] += 1
+
+    def get_metrics(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get check outcomes per policy.
+
+        Returns:
+            {policy name: {'allowed', 'rejected', 'backend_errors'}}
+        """
+        with self._metrics_lock:
+            return {name: dict(counters) for name, counters in self._metrics.items()}
+
+
+def _create_backend() -> RateLimitBackend:
+    """Create the backend selected by RATE_LIMIT_BACKEND."""
+    backend = RATE_LIMIT_BACKEND.lower()
+    if backend == 'redis':
+        try:
+            import redis
+
+            from config import settings
+            if not settings.REDIS_URL:
+                raise ValueError("REDIS_URL is not set")
+            client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.5)
+            client.ping()
+            return RedisRateLimitBackend(client)
+        except Exception as e:
+            logger.error(f"Could not initialize Redis rate limit backend, limits are per process: {e}")
+            return InMemoryRateLimitBackend()
+    if backend == 'none':
+        return NullRateLimitBackend()
+
+    if backend != 'memory':
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND '{backend}', using 'memory'")
+    return InMemoryRateLimitBackend()
+
+
+def _create_limiter() -> RateLimiter:
+    limiter = RateLimiter(_create_backend())
+    logger.info(f"Rate limiter using {type(limiter.backend).__name__}")
+    return limiter
+
+
+_limiter = Lazy(_create_limiter)
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the process-wide rate limiter.
 
-limiter = RateLimiter()
+    Returns:
+        Shared RateLimiter
+    """
+    return _limiter.get()
@@ -0,0 +1,249 @@
+"""
+Process-wide shared state
+
+Small thread-safe building blocks for the per-process caches and
+singletons used across services:
+
+- Lazy: an object created on first use and shared by all threads
+- LazyMap: the same, one object per key
+- TTLMap: a size-bounded dict whose entries expire, evicting least
+  recently used entries when full
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar('K', bound=Hashable)
+T = TypeVar('T')
+
+
+class Lazy(Generic[T]):
+    """Object created by `factory` on first use"""
+
+    def __init__(self, factory: Callable[[], T]):
+        """
+        Initialize the holder.
+
+        Args:
+            factory: Creates the object; called at most once until reset()
+        """
+        self._factory = factory
+        self._value: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        """
+        Get the object, creating it if needed.
+
+        Returns:
+            The shared object
+        """
+        value = self._value
+        if value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._factory()
+                value = self._value
+        return value
+
+    def peek(self) -> Optional[T]:
+        """Get the object if it was created, without creating it."""
+        return self._value
+
+    def reset(self) -> Optional[T]:
+        """
+        Forget the object; the next get() creates a new one.
+
+        Returns:
+            The previous object, or None
+        """
+        with self._lock:
+            value, self._value = self._value, None
+        return value
+
+
+class LazyMap(Generic[K, T]):
+    """Objects created by `factory(key)` on first use of each key"""
+
+    def __init__(self, factory: Callable[[K], T]):
+        """
+        Initialize the map.
+
+        Args:
+            factory: Creates the object for a key
+        """
+        self._factory = factory
+        self._values: Dict[K, T] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> T:
+        """
+        Get the object for a key, creating it if needed.
+
+        Args:
+            key: Key
+
+        Returns:
+            The shared object for the key
+        """
+        value = self._values.get(key)
+        if value is None:
+            with self._lock:
+                value = self._values.get(key)
+                if value is None:
+                    value = self._factory(key)
+                    self._values[key] = value
+        return value
+
+    def clear(self) -> None:
+        """Forget all objects."""
+        with self._lock:
+            self._values.clear()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class TTLMap(Generic[K, T]):
+    """
+    Dict whose entries expire after a per-entry time to live.
+
+    When the map reaches `max_entries`, expired entries are dropped (at most
+    once per PURGE_INTERVAL_SECONDS). If it is still full, a new key either
+    evicts the least recently used entry, or, with evict=False, is not
+    stored, so live entries are never lost to a flood of new keys.
+    """
+
+    PURGE_INTERVAL_SECONDS = 1.0
+
+    def __init__(self, max_entries: int, name: str = 'entries', evict: bool = True):
+        """
+        Initialize the map.
+
+        Args:
+            max_entries: Entries kept before expired ones are dropped
+            name: What the entries are, for the overflow warning
+            evict: Whether a new key may evict a live entry when the map is full
+        """
+        self.max_entries = max_entries
+        self.name = name
+        self.evict = evict
+        self.overflows = 0  # Live entries evicted, or new keys not stored
+        self._entries: 'OrderedDict[K, Tuple[Any, float]]' = OrderedDict()  # key -> (value, expires_at), LRU first
+        self._lock = threading.Lock()
+        self._last_purge = float('-inf')
+
+    def get(self, key: K, default: Optional[T] = None) -> Optional[T]:
+        """
+        Get the value of an unexpired entry.
+
+        Args:
+            key: Key
+            default: Returned if the key is missing or expired
+
+        Returns:
+            Value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: K, value: T, ttl_seconds: float) -> bool:
+        """
+        Store a value for `ttl_seconds`.
+
+        Args:
+            key: Key
+            value: Value
+            ttl_seconds: Time to live
+
+        Returns:
+            False if the map is full and does not evict
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not self._make_room(key, now):
+                return False
+            self._entries[key] = (value, now + ttl_seconds)
+            self._entries.move_to_end(key)
+            return True
+
+    def add(self, key: K, amount: int, ttl_seconds: float) -> int:
+        """
+        Add to a counter. A missing or expired counter starts from zero and
+        lives `ttl_seconds`; adding to a live counter keeps its expiry.
+
+        Args:
+            key: Counter key
+            amount: Amount to add
+            ttl_seconds: Time to live of a new counter
+
+        Returns:
+            The new count (not stored if the map is full and does not evict)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if self._make_room(key, now):
+                    self._entries[key] = (amount, now + ttl_seconds)
+                    self._entries.move_to_end(key)
+                return amount
+            count = entry[0] + amount
+            self._entries[key] = (count, entry[1])
+            self._entries.move_to_end(key)
+            return count
+
+    def pop(self, key: K, default: Optional[T] = None) -> Optional[T]:
+        """
+        Remove an entry.
+
+        Args:
+            key: Key
+            default: Returned if the key is missing or expired
+
+        Returns:
+            Value of the removed entry or default
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None or entry[1] <= time.monotonic():
+            return default
+        return entry[0]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _make_room(self, key: K, now: float) -> bool:
+        """Make room before adding a new key to a full map (caller holds the lock)."""
+        if key in self._entries or len(self._entries) < self.max_entries:
+            return True
+
+        if now - self._last_purge >= self.PURGE_INTERVAL_SECONDS:
+            self._last_purge = now
+            for k in [k for k, entry in self._entries.items() if entry[1] <= now]:
+                del self._entries[k]
+            if len(self._entries) < self.max_entries:
+                return True
+
+        # Still full of live entries
+        self.overflows += 1
+        if self.overflows % 1000 == 1:
+            action = 'evicting the least recently used' if self.evict else 'not storing new ones'
+            logger.warning(f"More than {self.max_entries} live {self.name}, {action} ({self.overflows} so far)")
+        if not self.evict:
+            return False
+        self._entries.popitem(last=False)
+        return True
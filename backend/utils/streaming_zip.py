@@ -0,0 +1,191 @@
+"""
+Streaming ZIP archives
+
+Builds ZIP archives entry by entry and hands out the compressed bytes as
+they are produced, so neither the archive nor a complete entry has to be
+held in memory. Entries are (name, chunks) pairs whose chunks can come
+from a generator, a file or an S3 object body.
+
+Archives that are persisted to S3 are uploaded with a multipart upload,
+one part at a time, so memory stays bounded by the part size regardless
+of how many documents go into the archive.
+"""
+
+import logging
+import zipfile
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Read size for file-like entry sources (S3 bodies, files)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# S3 requires every multipart part except the last to be at least 5 MiB
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+S3_PART_SIZE = 8 * 1024 * 1024
+
+ZipEntry = Tuple[str, Iterable[bytes]]
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object collecting what ZipFile writes"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        """Return and forget everything written since the last drain."""
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_file_chunks(stream: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Read a file-like object (e.g. an S3 StreamingBody) in chunks.
+
+    Args:
+        stream: Object with a read(size) method
+        chunk_size: Bytes per read
+
+    Yields:
+        Chunks until the stream is exhausted
+    """
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        close = getattr(stream, 'close', None)
+        if close is not None:
+            close()
+
+
+def iter_zip(
+    entries: Iterable[ZipEntry],
+    compression: int = zipfile.ZIP_DEFLATED
+) -> Iterator[bytes]:
+    """
+    Stream a ZIP archive.
+
+    Entries are pulled one at a time and their content chunk by chunk; the
+    compressed output is yielded as soon as it is written. Sizes and CRCs
+    go into data descriptors after each entry, so the archive is written
+    strictly front to back.
+
+    Args:
+        entries: (archive name, content chunks) pairs, consumed lazily
+        compression: zipfile compression method
+
+    Yields:
+        Consecutive pieces of the ZIP archive
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression) as zip_file:
+        for name, chunks in entries:
+            # force_zip64: the entry size is unknown until its content has been streamed
+            with zip_file.open(name, 'w', force_zip64=True) as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+
+    # Central directory
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def upload_stream_to_s3(
+    s3_client,
+    bucket: str,
+    key: str,
+    chunks: Iterable[bytes],
+    part_size: int = S3_PART_SIZE,
+    **put_args: Any
+) -> int:
+    """
+    Upload a stream of bytes to S3 without holding it in memory.
+
+    Streams larger than one part are sent as a multipart upload, which is
+    aborted if the stream or an upload fails. Smaller streams are sent
+    with a single put_object.
+
+    Args:
+        s3_client: boto3 S3 client
+        bucket: Bucket name
+        key: Object key
+        chunks: Object content
+        part_size: Multipart part size (at least 5 MiB)
+        **put_args: Extra object arguments, e.g. ContentType, ServerSideEncryption
+
+    Returns:
+        Number of bytes uploaded
+    """
+    part_size = max(part_size, S3_MIN_PART_SIZE)
+    buffer = bytearray()
+    total = 0
+    upload_id = None
+    parts = []
+
+    try:
+        for chunk in chunks:
+            buffer.extend(chunk)
+            total += len(chunk)
+
+            while len(buffer) >= part_size:
+                if upload_id is None:
+                    upload_id = s3_client.create_multipart_upload(
+                        Bucket=bucket, Key=key, **put_args
+                    )['UploadId']
+                parts.append(_upload_part(s3_client, bucket, key, upload_id, len(parts) + 1, buffer[:part_size]))
+                del buffer[:part_size]
+
+        if upload_id is None:
+            s3_client.put_object(Bucket=bucket, Key=key, Body=bytes(buffer), **put_args)
+            return total
+
+        if buffer or not parts:
+            parts.append(_upload_part(s3_client, bucket, key, upload_id, len(parts) + 1, buffer))
+
+        s3_client.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': parts}
+        )
+        logger.info(f"Uploaded s3://{bucket}/{key} in {len(parts)} parts ({total} bytes)")
+        return total
+
+    except Exception:
+        if upload_id is not None:
+            try:
+                s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            except Exception as abort_error:
+                logger.warning(f"Could not abort multipart upload of {key}: {abort_error}")
+        raise
+
+
+def _upload_part(s3_client, bucket: str, key: str, upload_id: str, part_number: int, data) -> Dict[str, Any]:
+    """Upload one multipart part and return its completion entry."""
+    response = s3_client.upload_part(
+        Bucket=bucket,
+        Key=key,
+        UploadId=upload_id,
+        PartNumber=part_number,
+        Body=bytes(data)
+    )
+    return {'ETag': response['ETag'], 'PartNumber': part_number}